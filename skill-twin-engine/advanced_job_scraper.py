@@ -11,6 +11,7 @@ from typing import List, Dict, Optional
 from dataclasses import dataclass
 import logging
 from urllib.parse import quote_plus
+from tracing import span, traced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -55,6 +56,7 @@ class AdvancedJobScraper:
         """Implement rate limiting to avoid being blocked"""
         time.sleep(self.rate_limit_delay + random.uniform(0.5, 2.0))
         
+    @traced("scraping")
     def scrape_indeed_jobs(self, role: str, location: str = "India", limit: int = 10) -> List[JobListing]:
         """Scrape jobs from Indeed.com"""
         jobs = []
@@ -114,6 +116,7 @@ class AdvancedJobScraper:
             
         return jobs
     
+    @traced("scraping")
     def scrape_timesjobs_jobs(self, role: str, location: str = "India", limit: int = 10) -> List[JobListing]:
         """Scrape jobs from TimesJobs.com"""
         jobs = []
@@ -200,6 +203,7 @@ class AdvancedJobScraper:
             logger.error(f"Error getting job description: {e}")
             return "Description not available"
     
+    @traced("extraction")
     def extract_skills_from_text(self, text: str) -> List[str]:
         """Extract skills from text using keyword matching"""
         if not text:
@@ -227,6 +231,7 @@ class AdvancedJobScraper:
         
         return list(set(found_skills))  # Remove duplicates
     
+    @traced("aggregation")
     def aggregate_job_data(self, role: str, location: str = "India", limit: int = 15) -> Dict:
         """Aggregate job data from multiple sources"""
         all_jobs = []
@@ -266,42 +271,43 @@ class AdvancedJobScraper:
         sorted_skills = sorted(skill_count.items(), key=lambda x: x[1], reverse=True)
         top_skills = [skill.title() for skill, count in sorted_skills[:25]]
         
-        # Prepare result
-        result = {
-            "search_query": {
-                "role": role,
-                "location": location,
-                "limit": limit
-            },
-            "aggregation": {
-                "total_jobs_found": len(all_jobs),
-                "sources_used": len([job for job in all_jobs if job.source]),
-                "unique_companies": len(set(job.company for job in all_jobs if job.company != "N/A")),
-                "date_range": "Last 30 days"
-            },
-            "market_insights": {
-                "top_skills": top_skills,
-                "skill_frequency": dict(sorted_skills[:25]),
-                "experience_distribution": self.analyze_experience_distribution(all_jobs),
-                "location_distribution": self.analyze_location_distribution(all_jobs)
-            },
-            "jobs": [
-                {
-                    "title": job.title,
-                    "company": job.company,
-                    "location": job.location,
-                    "description": job.description[:500] + "..." if len(job.description) > 500 else job.description,
-                    "url": job.url,
-                    "posted_date": job.posted_date,
-                    "source": job.source,
-                    "experience_level": job.experience_level,
-                    "salary": job.salary,
-                    "extracted_skills": job.skills
-                }
-                for job in all_jobs
-            ]
-        }
-        
+        with span("build_result", "aggregation"):
+            # Prepare result
+            result = {
+                "search_query": {
+                    "role": role,
+                    "location": location,
+                    "limit": limit
+                },
+                "aggregation": {
+                    "total_jobs_found": len(all_jobs),
+                    "sources_used": len([job for job in all_jobs if job.source]),
+                    "unique_companies": len(set(job.company for job in all_jobs if job.company != "N/A")),
+                    "date_range": "Last 30 days"
+                },
+                "market_insights": {
+                    "top_skills": top_skills,
+                    "skill_frequency": dict(sorted_skills[:25]),
+                    "experience_distribution": self.analyze_experience_distribution(all_jobs),
+                    "location_distribution": self.analyze_location_distribution(all_jobs)
+                },
+                "jobs": [
+                    {
+                        "title": job.title,
+                        "company": job.company,
+                        "location": job.location,
+                        "description": job.description[:500] + "..." if len(job.description) > 500 else job.description,
+                        "url": job.url,
+                        "posted_date": job.posted_date,
+                        "source": job.source,
+                        "experience_level": job.experience_level,
+                        "salary": job.salary,
+                        "extracted_skills": job.skills
+                    }
+                    for job in all_jobs
+                ]
+            }
+            
         return result
     
     def analyze_experience_distribution(self, jobs: List[JobListing]) -> Dict:
@@ -1,23 +1,32 @@
 # app.py - Updated Skill-Twin Engine (with tree roadmap, deadline adjustment)
 
 import streamlit as st
+import io
 import json
 import os
-from openai import OpenAI
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer, util
-import pdfplumber
 from datetime import datetime, timedelta
+import document_cache
+import embedding_store
+import llm_gateway
+import resume_sections
+import tiered_extractor
+from lazy_models import openai_client, embedder as lazy_embedder, pdfplumber
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-embedder = SentenceTransformer('all-MiniLM-L6-v2')
+client = openai_client()
+embedder = lazy_embedder('all-MiniLM-L6-v2')
 
 # ────────────────────────────────────────────────
 # Helper Functions
 # ────────────────────────────────────────────────
 
-def extract_skills(text, label="text"):
+def extract_skills(text, label="text", teacher=None):
+    # Local taxonomy match first; the LLM only sees the text the matcher could not explain
+    return tiered_extractor.extract(text, "app.extract_skills", lambda residual: llm_extract_skills(residual, label),
+                                    teacher)
+
+def llm_extract_skills(text, label="text"):
     prompt = f"""
     Extract all technical skills, programming languages, tools, frameworks from this {label}.
     Only return technical/professional skills. Ignore soft skills unless they are technical.
@@ -26,14 +35,17 @@ def extract_skills(text, label="text"):
     Text: {text[:5000]}
     """
     try:
-        response = client.chat.completions.create(
+        content = llm_gateway.chat_completion(
+            client, "app.extract_skills",
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"}
         )
-        return json.loads(response.choices[0].message.content)["technical_skills"]
+        return json.loads(content)["technical_skills"]
     except Exception as e:
         st.error(f"Skill extraction error: {e}")
+        # Keeps the empty answer out of the document cache
+        llm_gateway.mark_fallback("app.extract_skills")
         return []
 
 def validate_skills(extracted_skills):
@@ -108,24 +120,48 @@ def extraction_quality_report(original_text, extracted_skills):
         "estimated_accuracy": estimated_accuracy
     }
 
+def extract_pdf_document(data, label="document"):
+    """pdfplumber + LLM + validation for one PDF; the record kept in the document cache"""
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        pages = [page.extract_text() or "" for page in pdf.pages]
+        lines = resume_sections.pdf_lines(pdf) if label == "resume" else None
+    text = "\n".join(page for page in pages if page)
+    # Resumes: send the relevant sections instead of the first 5,000 characters
+    teacher = []
+    extracted_skills = extract_skills(resume_sections.relevant_text(lines, text) if lines is not None else text, label,
+                                      teacher)
+    validated, uncertain = validate_skills(extracted_skills)
+    return {
+        "pages": pages,
+        "extracted_skills": extracted_skills,
+        "validated_skills": validated,
+        "uncertain_skills": uncertain,
+        "quality": extraction_quality_report(text, extracted_skills),
+        "teacher": teacher
+    }
+
 def extract_from_pdf(uploaded_file, label="document"):
     if uploaded_file is None:
         return []
     try:
-        with pdfplumber.open(uploaded_file) as pdf:
-            text = "\n".join(page.extract_text() or "" for page in pdf.pages if page.extract_text())
-        extracted_skills = extract_skills(text, label)
+        # Every widget interaction reruns the script; the same bytes are only parsed once
+        data = uploaded_file.getvalue()
+        cache = document_cache.default_cache()
+        if cache is None:
+            record = extract_pdf_document(data, label)
+        else:
+            record, _ = cache.get_or_compute(data, label, lambda d: extract_pdf_document(d, label), namespace="app")
         
         # Validate extracted skills
-        validated, uncertain = validate_skills(extracted_skills)
+        uncertain = record["uncertain_skills"]
         if uncertain:
             st.warning(f"Found {len(uncertain)} skills that need manual verification: {', '.join(uncertain[:3])}{'...' if len(uncertain) > 3 else ''}")
         
         # Show extraction quality report
-        quality_report = extraction_quality_report(text, extracted_skills)
+        quality_report = record["quality"]
         st.info(f"Extraction quality: {quality_report['estimated_accuracy']} ({quality_report['quality_score']:.1f}%) - {quality_report['total_skills_extracted']} skills extracted")
         
-        return validated  # Return only validated skills
+        return record["validated_skills"]  # Return only validated skills
     except Exception as e:
         st.error(f"Could not read {label} PDF: {e}")
         return []
@@ -141,14 +177,16 @@ def generate_typical_job_skills(role_name):
     {{"skills": ["Python", "SQL", "React", ...]}}
     """
     try:
-        response = client.chat.completions.create(
+        content = llm_gateway.chat_completion(
+            client, "app.generate_typical_job_skills",
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
             temperature=0.4
         )
-        return json.loads(response.choices[0].message.content)["skills"]
-    except:
+        return json.loads(content)["skills"]
+    except Exception as e:
+        st.warning(f"Could not generate skills for this role: {e}")
         return []
 
 def compute_gaps(job_skills, known_skills):
@@ -157,9 +195,9 @@ def compute_gaps(job_skills, known_skills):
     job_emb = embedder.encode(job_skills)
     known_emb = embedder.encode(known_skills)
     gaps = []
-    for i, skill in enumerate(job_skills):
-        sims = util.cos_sim(job_emb[i], known_emb)[0]
-        best = sims.max().item()
+    scores, _ = embedding_store.best_match(job_emb, known_emb)
+    for skill, score in zip(job_skills, scores):
+        best = float(score)
         if best < 0.55:
             gaps.append({
                 "skill": skill,
@@ -193,147 +231,154 @@ def generate_roadmap(gaps, weeks=8):
     }}
     """
     try:
-        response = client.chat.completions.create(
+        content = llm_gateway.chat_completion(
+            client, "app.generate_roadmap",
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"}
         )
-        return json.loads(response.choices[0].message.content)
-    except:
+        return json.loads(content)
+    except Exception as e:
+        st.warning(f"Roadmap generation error: {e}")
         return {}
 
 # ────────────────────────────────────────────────
 # Streamlit UI
 # ────────────────────────────────────────────────
 
-st.title("Skill-Twin Engine")
-st.markdown("Upload your resume and/or syllabus → choose job role → get gaps & customized plan")
-
-# 1. User basic info
-st.subheader("Your Details")
-col1, col2 = st.columns(2)
-with col1:
-    name = st.text_input("Your Name")
-with col2:
-    branch = st.selectbox("Branch", ["CSE", "IT", "ECE", "EEE", "ME", "CE", "Other"])
-
-year = st.selectbox("Current Year", ["1st", "2nd", "3rd", "4th"])
-if st.button("Save Info"):
-    st.session_state.user = {"name": name, "branch": branch, "year": year}
-    st.success("Info saved!")
-
-# 2. Mandatory: at least one of resume or syllabus
-st.subheader("Upload Documents (at least one required)")
-col_resume, col_syllabus = st.columns(2)
-
-with col_resume:
-    resume_file = st.file_uploader("Upload Resume (PDF)", type=["pdf"], key="resume")
-
-with col_syllabus:
-    syllabus_file = st.file_uploader("Upload Syllabus (PDF)", type=["pdf"], key="syllabus")
-
-# Extract skills
-resume_skills = []
-syllabus_skills = []
-
-if resume_file:
-    resume_skills = extract_from_pdf(resume_file, "resume")
-    if resume_skills:
-        st.success(f"Validated {len(resume_skills)} skills from resume")
-
-if syllabus_file:
-    syllabus_skills = extract_from_pdf(syllabus_file, "syllabus")
-    if syllabus_skills:
-        st.success(f"Validated {len(syllabus_skills)} skills from syllabus")
-
-# If one is missing → ask user manually
-known_skills = list(set(resume_skills + syllabus_skills))
-
-if not known_skills:
-    st.error("You must upload at least one document (resume or syllabus)")
-    st.stop()
-
-missing_resume = not resume_file or not resume_skills
-missing_syllabus = not syllabus_file or not syllabus_skills
-
-if missing_resume or missing_syllabus:
-    st.subheader("Some skills missing – help us fill the gaps")
-    manual_skills = st.text_area(
-        "List any technical skills you have (comma separated, e.g. Python, SQL, React, AWS)",
-        value=", ".join(known_skills),
-        height=100
-    )
-    known_skills = [s.strip() for s in manual_skills.split(",") if s.strip()]
+def main():
+    st.title("Skill-Twin Engine")
+    st.markdown("Upload your resume and/or syllabus → choose job role → get gaps & customized plan")
+
+    # 1. User basic info
+    st.subheader("Your Details")
+    col1, col2 = st.columns(2)
+    with col1:
+        name = st.text_input("Your Name")
+    with col2:
+        branch = st.selectbox("Branch", ["CSE", "IT", "ECE", "EEE", "ME", "CE", "Other"])
+
+    year = st.selectbox("Current Year", ["1st", "2nd", "3rd", "4th"])
+    if st.button("Save Info"):
+        st.session_state.user = {"name": name, "branch": branch, "year": year}
+        st.success("Info saved!")
+
+    # 2. Mandatory: at least one of resume or syllabus
+    st.subheader("Upload Documents (at least one required)")
+    col_resume, col_syllabus = st.columns(2)
+
+    with col_resume:
+        resume_file = st.file_uploader("Upload Resume (PDF)", type=["pdf"], key="resume")
+
+    with col_syllabus:
+        syllabus_file = st.file_uploader("Upload Syllabus (PDF)", type=["pdf"], key="syllabus")
+
+    # Extract skills
+    resume_skills = []
+    syllabus_skills = []
+
+    if resume_file:
+        resume_skills = extract_from_pdf(resume_file, "resume")
+        if resume_skills:
+            st.success(f"Validated {len(resume_skills)} skills from resume")
+
+    if syllabus_file:
+        syllabus_skills = extract_from_pdf(syllabus_file, "syllabus")
+        if syllabus_skills:
+            st.success(f"Validated {len(syllabus_skills)} skills from syllabus")
+
+    # If one is missing → ask user manually
+    known_skills = list(set(resume_skills + syllabus_skills))
 
     if not known_skills:
-        st.warning("Please add some skills manually or upload documents properly")
+        st.error("You must upload at least one document (resume or syllabus)")
         st.stop()
 
-st.write("**Your known technical skills**:", ", ".join(known_skills[:20]) + "..." if len(known_skills) > 20 else ", ".join(known_skills))
-
-# 3. Job role
-st.subheader("Target Job Role")
-common_roles = [
-    "Select...",
-    "SDE / Software Engineer Fresher",
-    "Full Stack Developer",
-    "Python Developer",
-    "Data Analyst / Data Scientist",
-    "Machine Learning Engineer",
-    "Frontend Developer",
-    "Backend Developer",
-    "DevOps Engineer",
-    "Other"
-]
-
-role = st.selectbox("Choose role", common_roles)
-
-if role == "Other":
-    role = st.text_input("Enter your target role")
-
-if role and role != "Select...":
-    with st.spinner(f"Preparing requirements for {role}..."):
-        job_skills = generate_typical_job_skills(role)
-
-    if job_skills:
-        edited = st.text_area("Required skills for this role (edit if needed)", ", ".join(job_skills))
-        job_skills = [s.strip() for s in edited.split(",") if s.strip()]
-
-# 4. Interview Deadline
-st.subheader("Interview Timeline")
-interview_date = st.date_input("When is your interview/deadline? (optional)", value=None)
-
-weeks_available = 8  # default
-if interview_date:
-    days = (interview_date - datetime.today().date()).days
-    weeks_available = max(1, days // 7)
-    st.info(f"Adjusting plan to {weeks_available} weeks based on your deadline")
-
-# 5. Analyze
-if st.button("Analyze Gaps & Generate Plan"):
-    if not job_skills:
-        st.error("Please select or enter a job role")
-    else:
-        gaps = compute_gaps(job_skills, known_skills)
+    missing_resume = not resume_file or not resume_skills
+    missing_syllabus = not syllabus_file or not syllabus_skills
 
-        st.subheader(f"Gaps for {role}")
-        if gaps:
-            st.table(gaps)
-        else:
-            st.success("No major gaps detected!")
-
-        st.subheader("Your Personalized Bridge Roadmap")
-        roadmap = generate_roadmap(gaps, weeks=weeks_available)
-        if roadmap:
-            # Tree format using expanders
-            for w in roadmap.get("roadmap", []):
-                with st.expander(f"Week {w['week']} (Hours: {w['hours']})"):
-                    for skill_rec in w.get('focus_skills', []):
-                        if isinstance(skill_rec, list) and len(skill_rec) >= 2:
-                            st.markdown(f"**Skill: {skill_rec[0]}**")
-                            st.write(skill_rec[1])  # Recommendations
-                        else:
-                            st.markdown(f"**Skill: {skill_rec}**")
-                    st.markdown("---")
+    if missing_resume or missing_syllabus:
+        st.subheader("Some skills missing – help us fill the gaps")
+        manual_skills = st.text_area(
+            "List any technical skills you have (comma separated, e.g. Python, SQL, React, AWS)",
+            value=", ".join(known_skills),
+            height=100
+        )
+        known_skills = [s.strip() for s in manual_skills.split(",") if s.strip()]
+
+        if not known_skills:
+            st.warning("Please add some skills manually or upload documents properly")
+            st.stop()
+
+    st.write("**Your known technical skills**:", ", ".join(known_skills[:20]) + "..." if len(known_skills) > 20 else ", ".join(known_skills))
+
+    # 3. Job role
+    st.subheader("Target Job Role")
+    common_roles = [
+        "Select...",
+        "SDE / Software Engineer Fresher",
+        "Full Stack Developer",
+        "Python Developer",
+        "Data Analyst / Data Scientist",
+        "Machine Learning Engineer",
+        "Frontend Developer",
+        "Backend Developer",
+        "DevOps Engineer",
+        "Other"
+    ]
+
+    role = st.selectbox("Choose role", common_roles)
+
+    if role == "Other":
+        role = st.text_input("Enter your target role")
+
+    if role and role != "Select...":
+        with st.spinner(f"Preparing requirements for {role}..."):
+            job_skills = generate_typical_job_skills(role)
+
+        if job_skills:
+            edited = st.text_area("Required skills for this role (edit if needed)", ", ".join(job_skills))
+            job_skills = [s.strip() for s in edited.split(",") if s.strip()]
+
+    # 4. Interview Deadline
+    st.subheader("Interview Timeline")
+    interview_date = st.date_input("When is your interview/deadline? (optional)", value=None)
+
+    weeks_available = 8  # default
+    if interview_date:
+        days = (interview_date - datetime.today().date()).days
+        weeks_available = max(1, days // 7)
+        st.info(f"Adjusting plan to {weeks_available} weeks based on your deadline")
+
+    # 5. Analyze
+    if st.button("Analyze Gaps & Generate Plan"):
+        if not job_skills:
+            st.error("Please select or enter a job role")
         else:
-            st.info("No roadmap needed (no gaps) or generation error")
\ No newline at end of file
+            gaps = compute_gaps(job_skills, known_skills)
+
+            st.subheader(f"Gaps for {role}")
+            if gaps:
+                st.table(gaps)
+            else:
+                st.success("No major gaps detected!")
+
+            st.subheader("Your Personalized Bridge Roadmap")
+            roadmap = generate_roadmap(gaps, weeks=weeks_available)
+            if roadmap:
+                # Tree format using expanders
+                for w in roadmap.get("roadmap", []):
+                    with st.expander(f"Week {w['week']} (Hours: {w['hours']})"):
+                        for skill_rec in w.get('focus_skills', []):
+                            if isinstance(skill_rec, list) and len(skill_rec) >= 2:
+                                st.markdown(f"**Skill: {skill_rec[0]}**")
+                                st.write(skill_rec[1])  # Recommendations
+                            else:
+                                st.markdown(f"**Skill: {skill_rec}**")
+                        st.markdown("---")
+            else:
+                st.info("No roadmap needed (no gaps) or generation error")
+
+# `streamlit run app.py` executes this file as __main__; importing it only defines the helpers
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,136 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-import json, os, random
-from openai import OpenAI
+import io, json, os, random, re, sys, time
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer, util
-import pdfplumber
+import numpy as np
+
+# Shared modules live one level up, next to the Streamlit apps
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from json_stream import JSONArrayStream
+from job_queue import SQLiteJobQueue, QueueFull
+from cohort import CohortHistogram, parse_cohort
+from request_profiler import RequestProfiler
+import cassettes
+import document_cache
+import embedding_service
+import embedding_store
+import llm_client
+import llm_gateway
+import resume_sections
+import skill_stream
+import stage_graph
+import tiered_extractor
+from lazy_models import openai_client, embedder as lazy_embedder, pdfplumber
+import metrics
 
 # Load environment variables
 load_dotenv()
 
+class TimedJSONProvider(DefaultJSONProvider):
+    """Records every jsonify() body serialization under the json_serialization stage."""
+    
+    def dumps(self, obj, **kwargs):
+        with metrics.stage_timer("json_serialization"):
+            return super().dumps(obj, **kwargs)
+
 app = Flask(__name__)
+app.json = TimedJSONProvider(app)
 CORS(app)
 
+REQUEST_SECONDS = metrics.histogram("skilltwin_http_request_seconds", "Request latency by route, method and status",
+                                    ["route", "method", "status"])
+REQUESTS_IN_FLIGHT = metrics.gauge("skilltwin_http_requests_in_flight", "Requests currently being handled, by route",
+                                   ["route"])
+
+def _route_label():
+    # The URL rule keeps job ids and other path parameters out of the label set
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+@app.before_request
+def start_request_metrics():
+    request.environ["skilltwin.started"] = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc(route=_route_label())
+
+@app.after_request
+def record_request_metrics(response):
+    started = request.environ.get("skilltwin.started")
+    if started is not None:
+        # Streamed bodies are timed up to the first byte, not until the stream closes
+        REQUEST_SECONDS.observe(time.perf_counter() - started, route=_route_label(),
+                                method=request.method, status=str(response.status_code))
+    return response
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    if request.environ.pop("skilltwin.started", None) is not None:
+        REQUESTS_IN_FLIGHT.dec(route=_route_label())
+
+# Opt-in cProfile of single requests: send "X-Profile: <PROFILE_TOKEN>" or set
+# PROFILE_SAMPLE_RATES="/api/analyze-gaps=0.01" to sample a route in production.
+# Without PROFILE_TOKEN the header is ignored and /api/profiles is disabled.
+profiler = RequestProfiler.from_env(os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+UNPROFILED_ROUTES = {"/metrics", "/api/profiles", "/api/profiles/<name>"}
+
+@app.before_request
+def start_request_profile():
+    route = _route_label()
+    if route in UNPROFILED_ROUTES or not profiler.wants(route, request.headers):
+        return
+    profile = profiler.start()
+    if profile is not None:
+        request.environ["skilltwin.profile"] = profile
+
+@app.after_request
+def remember_profiled_status(response):
+    if "skilltwin.profile" in request.environ:
+        request.environ["skilltwin.status"] = response.status_code
+    return response
+
+@app.teardown_request
+def finish_request_profile(exc):
+    profile = request.environ.pop("skilltwin.profile", None)
+    if profile is not None:
+        profiler.finish(profile, {
+            "route": _route_label(),
+            "method": request.method,
+            "path": request.path,
+            "status": request.environ.get("skilltwin.status", 500),
+            "error": type(exc).__name__ if exc else None
+        })
+
+# Every request gets a deadline that bounds the LLM calls made on its behalf.
+# Clients can tighten it with an X-Request-Timeout header (seconds).
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "30"))
+
+@app.before_request
+def start_request_deadline():
+    try:
+        seconds = min(float(request.headers.get("X-Request-Timeout", REQUEST_DEADLINE_SECONDS)), REQUEST_DEADLINE_SECONDS)
+    except ValueError:
+        seconds = REQUEST_DEADLINE_SECONDS
+    request.environ["skilltwin.deadline_token"] = llm_gateway.set_deadline(seconds)
+
+@app.teardown_request
+def clear_request_deadline(exc):
+    token = request.environ.pop("skilltwin.deadline_token", None)
+    if token is not None:
+        try:
+            llm_gateway.reset_deadline(token)
+        except ValueError:
+            # Streamed responses finish in a different context than the one that set the token
+            pass
+
 # Initialize Models
 # Note: For production, handle api_key check more gracefully
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-embedder = SentenceTransformer('all-MiniLM-L6-v2')
+# Both load on first use (torch and MiniLM take seconds); SKILL_TWIN_PRELOAD=1 loads them here
+client = openai_client()
+embedder = lazy_embedder('all-MiniLM-L6-v2')
+
+# Offline/sandbox runs: SKILL_TWIN_CASSETTE=<file> records or replays every LLM call
+cassette = cassettes.from_env()
+if cassette is not None:
+    client = cassette.wrap(client)
 
 # Mapping subject names to your JSON files
 SUBJECT_MAP = {
@@ -29,7 +144,12 @@ SUBJECT_MAP = {
 # Helper Functions (Ported from Streamlit app.py)
 # ---------------------------------------------------------------------
 
-def extract_skills(text, label="text"):
+def extract_skills(text, label="text", teacher=None):
+    """Local taxonomy match first; the LLM only sees the text the matcher could not explain."""
+    return tiered_extractor.extract(text, "backend.extract_skills", lambda residual: llm_extract_skills(residual, label),
+                                    teacher)
+
+def llm_extract_skills(text, label="text"):
     prompt = f"""
     Extract all technical skills, programming languages, tools, frameworks from this {label}.
     Only return technical/professional skills. Ignore soft skills unless they are technical.
@@ -38,28 +158,67 @@ def extract_skills(text, label="text"):
     Text: {text[:5000]}
     """
     try:
-        response = client.chat.completions.create(
+        content = llm_gateway.chat_completion(
+            client, "backend.extract_skills",
+            fallback=lambda: json.dumps({"technical_skills": match_trusted_skills(text)}),
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"}
         )
-        return json.loads(response.choices[0].message.content)["technical_skills"]
+        return json.loads(content)["technical_skills"]
     except Exception as e:
+        # A completion that does not parse is as degraded as an outage: answer locally, don't cache it
         print(f"Skill extraction error: {e}")
-        return []
+        llm_gateway.mark_fallback("backend.extract_skills")
+        return match_trusted_skills(text)
+
+def stream_extract_skills(text, label="text", teacher=None):
+    """extract_skills() that yields each skill as soon as it is known: local matches first, then the LLM's."""
+    return tiered_extractor.stream(text, "backend.extract_skills",
+                                   lambda residual: stream_llm_extract_skills(residual, label), teacher)
+
+def stream_llm_extract_skills(text, label="text"):
+    """Each skill string of the streamed completion as soon as its closing quote arrives."""
+    prompt = f"""
+    Extract all technical skills, programming languages, tools, frameworks from this {label}.
+    Only return technical/professional skills. Ignore soft skills unless they are technical.
+    Output strict JSON only:
+    {{"technical_skills": ["Python", "SQL", ...]}}
+    Text: {text[:5000]}
+    """
+    try:
+        deltas = llm_gateway.stream_chat_completion(
+            client, "backend.extract_skills",
+            fallback=lambda: json.dumps({"technical_skills": match_trusted_skills(text)}),
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": prompt}],
+            response_format={"type": "json_object"}
+        )
+        yield from skill_stream.stream_skills(deltas, "technical_skills")
+    except Exception as e:
+        print(f"Skill extraction error: {e}")
+        llm_gateway.mark_fallback("backend.extract_skills")
+
+def match_trusted_skills(text):
+    """Local keyword fallback used when the LLM is unavailable."""
+    text_lower = text.lower()
+    return [skill for skill in sorted(TRUSTED_SKILLS)
+            if re.search(r'(?<![\w+#.])' + re.escape(skill.lower()) + r'(?![\w+#])', text_lower)]
+
+# Common technical skills database for validation
+TRUSTED_SKILLS = set([
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "C", "Go", "Rust", "Swift", "Kotlin", "PHP",
+    "React", "Angular", "Vue.js", "Svelte", "Django", "Flask", "FastAPI", "Spring", "Node.js", 
+    "Express", "TensorFlow", "PyTorch", "Pandas", "NumPy", "Bootstrap", "jQuery",
+    "SQL", "MySQL", "PostgreSQL", "MongoDB", "Redis", "Oracle", "SQLite",
+    "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Jenkins", "GitLab CI", "Terraform",
+    "Git", "Linux", "Bash", "REST API", "GraphQL", "API", "CI/CD", "Agile", "Scrum",
+    "Machine Learning", "Deep Learning", "Data Science", "AI", "NLP", "Computer Vision",
+    "Cybersecurity", "DevOps", "Microservices", "Testing", "JUnit", "Selenium"
+])
 
 def validate_skills(extracted_skills):
-    # Common technical skills database for validation
-    trusted_skills_db = set([
-        "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "C", "Go", "Rust", "Swift", "Kotlin", "PHP",
-        "React", "Angular", "Vue.js", "Svelte", "Django", "Flask", "FastAPI", "Spring", "Node.js", 
-        "Express", "TensorFlow", "PyTorch", "Pandas", "NumPy", "Bootstrap", "jQuery",
-        "SQL", "MySQL", "PostgreSQL", "MongoDB", "Redis", "Oracle", "SQLite",
-        "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Jenkins", "GitLab CI", "Terraform",
-        "Git", "Linux", "Bash", "REST API", "GraphQL", "API", "CI/CD", "Agile", "Scrum",
-        "Machine Learning", "Deep Learning", "Data Science", "AI", "NLP", "Computer Vision",
-        "Cybersecurity", "DevOps", "Microservices", "Testing", "JUnit", "Selenium"
-    ])
+    trusted_skills_db = TRUSTED_SKILLS
     
     validated_skills = []
     uncertain_skills = []
@@ -91,44 +250,161 @@ def generate_typical_job_skills(role_name):
     {{"skills": ["Python", "SQL", "React", ...]}}
     """
     try:
-        response = client.chat.completions.create(
+        content = llm_gateway.chat_completion(
+            client, "backend.generate_typical_job_skills",
+            hedge=True,
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
             temperature=0.4
         )
-        return json.loads(response.choices[0].message.content)["skills"]
-    except:
+        return json.loads(content)["skills"]
+    except Exception as e:
+        print(f"Job skill generation error: {e}")
+        llm_gateway.mark_fallback("backend.generate_typical_job_skills")
         return []
 
+def stream_typical_job_skills(role_name):
+    """generate_typical_job_skills() as a stream: yields each skill while the LLM is still listing."""
+    prompt = f"""
+    You are a placement expert for engineering freshers in India (2026 market).
+    For the job role: "{role_name}" (fresher level, 0-1 year experience)
+    
+    List 8-15 most common technical skills required.
+    Only technical skills/tools/languages/frameworks.
+    Output strict JSON:
+    {{"skills": ["Python", "SQL", "React", ...]}}
+    """
+    try:
+        deltas = llm_gateway.stream_chat_completion(
+            client, "backend.generate_typical_job_skills",
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": prompt}],
+            response_format={"type": "json_object"},
+            temperature=0.4
+        )
+        yield from skill_stream.stream_skills(deltas, "skills")
+    except Exception as e:
+        print(f"Job skill generation error: {e}")
+        llm_gateway.mark_fallback("backend.generate_typical_job_skills")
+
+# Threshold logic from original app
+GAP_THRESHOLD = 0.55
+HIGH_GAP_THRESHOLD = 0.4
+
 def compute_gaps(job_skills, known_skills):
     if not job_skills or not known_skills:
         return []
     
     # If using remote embeddings, ensuring they are lists of strings
-    job_emb = embedder.encode(job_skills)
-    known_emb = embedder.encode(known_skills)
-    
+    with metrics.stage_timer("embedding_encode"):
+        job_emb = skill_stream.encode(embedder, job_skills)
+        known_emb = skill_stream.encode(embedder, known_skills)
+    return score_gaps(job_skills, job_emb, known_emb)
+
+def stream_gaps(job_skill_stream, known_skills):
+    """
+    compute_gaps() for job skills that are still being generated: each one is embedded as it
+    arrives, so only the last micro-batch is left to encode when the stream ends.
+    Returns (job_skills, gaps).
+    """
+    with skill_stream.SkillEncoder(embedder) as known, skill_stream.SkillEncoder(embedder) as job:
+        known.extend(known_skills)
+        for skill in job_skill_stream:
+            job.add(skill)
+        with metrics.stage_timer("embedding_encode"):
+            job_emb = job.close()
+            known_emb = known.close()
+    if not job.skills or not known_skills:
+        return job.skills, []
+    return job.skills, score_gaps(job.skills, job_emb, known_emb)
+
+def score_gaps(job_skills, job_emb, known_emb):
     gaps = []
-    for i, skill in enumerate(job_skills):
-        sims = util.cos_sim(job_emb[i], known_emb)[0]
-        best = sims.max().item()
-        
-        # Threshold logic from original app
-        if best < 0.55:
-            gaps.append({
-                "skill": skill,
-                "match": round(best, 2),
-                "level": "High" if best < 0.4 else "Medium"
-            })
+    with metrics.stage_timer("similarity_compute"):
+        scores, _ = embedding_store.best_match(job_emb, known_emb)
+        for skill, score in zip(job_skills, scores):
+            best = float(score)
+            if best < GAP_THRESHOLD:
+                gaps.append({
+                    "skill": skill,
+                    "match": round(best, 2),
+                    "level": "High" if best < HIGH_GAP_THRESHOLD else "Medium"
+                })
     return sorted(gaps, key=lambda x: x["match"])
 
-def generate_roadmap(gaps, weeks=8):
-    if not gaps:
-        return {}
-        
+# Cohorts larger than this are streamed as NDJSON even without ?stream=1
+BATCH_STREAM_THRESHOLD = 200
+BATCH_BLOCK_SIZE = 64
+
+def _clean_skills(skills):
+    return [s.strip() for s in skills if isinstance(s, str) and s.strip()]
+
+def batch_compute_gaps(students, roles, block_size=BATCH_BLOCK_SIZE):
+    """Gap analysis for a whole cohort against one or more roles.
+    
+    The union vocabulary is embedded once; each block of students is scored with a
+    single gather + max over the (job skill x vocabulary) similarity matrix.
+    Yields (student, {role key: gaps}) in input order, gaps shaped like compute_gaps().
+    """
+    vocab = {}
+    for skills in [r["job_skills"] for r in roles] + [st["known_skills"] for st in students]:
+        for skill in skills:
+            vocab.setdefault(skill, len(vocab))
+    if not vocab:
+        for student in students:
+            yield student, {r["key"]: [] for r in roles}
+        return
+
+    with metrics.stage_timer("embedding_encode"):
+        emb = np.asarray(embedder.encode(list(vocab), normalize_embeddings=True), dtype=np.float32)
+
+    job_index = {}
+    for r in roles:
+        for skill in r["job_skills"]:
+            job_index.setdefault(skill, len(job_index))
+    job_vocab_ids = np.array([vocab[skill] for skill in job_index], dtype=np.int64)
+    # (unique job skills x vocabulary) cosine similarities, computed once for the cohort
+    with metrics.stage_timer("similarity_compute"):
+        job_sims = emb[job_vocab_ids] @ emb.T if len(job_vocab_ids) else np.zeros((0, len(vocab)), dtype=np.float32)
+    role_rows = {r["key"]: [job_index[skill] for skill in r["job_skills"]] for r in roles}
+
+    for start in range(0, len(students), block_size):
+        block = students[start:start + block_size]
+        width = max(1, max(len(st["known_skills"]) for st in block))
+        ids = np.zeros((len(block), width), dtype=np.int64)
+        mask = np.zeros((len(block), width), dtype=bool)
+        for row, student in enumerate(block):
+            known = [vocab[skill] for skill in student["known_skills"]]
+            ids[row, :len(known)] = known
+            mask[row, :len(known)] = True
+
+        # (job skills x students x known) -> best match per job skill per student
+        with metrics.stage_timer("similarity_compute"):
+            gathered = np.where(mask[None, :, :], job_sims[:, ids], -np.inf)
+            best = gathered.max(axis=2)
+
+        for col, student in enumerate(block):
+            result = {}
+            for r in roles:
+                if not r["job_skills"] or not student["known_skills"]:
+                    result[r["key"]] = []
+                    continue
+                gaps = []
+                for skill, row in zip(r["job_skills"], role_rows[r["key"]]):
+                    score = float(best[row, col])
+                    if score < GAP_THRESHOLD:
+                        gaps.append({
+                            "skill": skill,
+                            "match": round(score, 2),
+                            "level": "High" if score < HIGH_GAP_THRESHOLD else "Medium"
+                        })
+                result[r["key"]] = sorted(gaps, key=lambda x: x["match"])
+            yield student, result
+
+def build_roadmap_prompt(gaps, weeks=8):
     gaps_str = json.dumps(gaps, indent=2)
-    prompt = f"""
+    return f"""
     You are a career coach for B.Tech students in Odisha.
     Gaps from job role: {gaps_str}
     
@@ -150,16 +426,50 @@ def generate_roadmap(gaps, weeks=8):
       ]
     }}
     """
+
+def generate_roadmap(gaps, weeks=8):
+    if not gaps:
+        return {}
+        
+    prompt = build_roadmap_prompt(gaps, weeks)
     try:
-        response = client.chat.completions.create(
+        content = llm_gateway.chat_completion(
+            client, "backend.generate_roadmap",
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"}
         )
-        return json.loads(response.choices[0].message.content)
-    except:
+        return json.loads(content)
+    except Exception as e:
+        print(f"Roadmap generation error: {e}")
+        llm_gateway.mark_fallback("backend.generate_roadmap")
         return {}
 
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def stream_roadmap(gaps, weeks=8):
+    """Yields SSE events: one `week` per roadmap entry as soon as the LLM closes it, then `done`."""
+    if not gaps:
+        yield sse_event("done", {"roadmap": {}})
+        return
+
+    parser = JSONArrayStream("roadmap")
+    try:
+        deltas = llm_gateway.stream_chat_completion(
+            client, "backend.stream_roadmap",
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": build_roadmap_prompt(gaps, weeks)}],
+            response_format={"type": "json_object"}
+        )
+        for delta in deltas:
+            for week in parser.feed(delta):
+                yield sse_event("week", week)
+        yield sse_event("done", {"roadmap": parser.result()})
+    except Exception as e:
+        print(f"Roadmap streaming error: {e}")
+        yield sse_event("error", {"error": str(e)})
+
 # ---------------------------------------------------------------------
 # API Endpoints
 # ---------------------------------------------------------------------
@@ -218,9 +528,96 @@ def analyze():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def read_pdf(data, label="resume"):
+    """(pages, text for the LLM) of an uploaded PDF."""
+    with metrics.stage_timer("pdf_extract"), pdfplumber.open(io.BytesIO(data)) as pdf:
+        pages = [page.extract_text() or "" for page in pdf.pages]
+        lines = resume_sections.pdf_lines(pdf) if label == "resume" else None
+    text = "\n".join(page for page in pages if page)
+    
+    # Resumes: only the Skills / Projects / Experience / Certifications spans go to the LLM
+    prompt_text = resume_sections.relevant_text(lines, text) if lines is not None else text
+    return pages, prompt_text
+
+def document_record(pages, extracted_skills, teacher=None):
+    validated, uncertain = validate_skills(extracted_skills)
+    return {
+        "pages": pages,
+        "extracted_skills": extracted_skills,
+        "validated_skills": validated,
+        "uncertain_skills": uncertain,
+        # The LLM calls behind extracted_skills (input text, raw answer): skill_tagger's training pairs
+        "teacher": teacher or []
+    }
+
+def extract_pdf_document(data, label="resume"):
+    """Runs pdfplumber, the LLM and validation on an uploaded PDF; the record stored in the document cache."""
+    pages, prompt_text = read_pdf(data, label)
+    teacher = []
+    return document_record(pages, extract_skills(prompt_text, label, teacher), teacher)
+
+def parse_resume_bytes(data, label="resume"):
+    """Skills for an uploaded PDF; identical bytes seen before skip pdfplumber and the LLM."""
+    cache = document_cache.default_cache()
+    if cache is None:
+        record = extract_pdf_document(data, label)
+    else:
+        record, _ = cache.get_or_compute(data, label, lambda d: extract_pdf_document(d, label), namespace="backend")
+    return {key: record[key] for key in ("extracted_skills", "validated_skills", "uncertain_skills")}
+
+def stream_parse_resume(data, label="resume"):
+    """
+    Yields SSE events: one `skill` per skill as the LLM produces it, then `done` with the
+    same payload as the sync endpoint. Skills are embedded while they stream, so a following
+    /api/analyze-gaps finds their vectors cached.
+    """
+    cache = document_cache.default_cache()
+    cache_key = cache.key(document_cache.digest(data), "backend", label) if cache is not None else None
+    record = cache.get(cache_key) if cache is not None else None
+    if cache is not None:
+        metrics.record_cache("document", record is not None)
+    try:
+        # The worker is stopped on every exit, including a client that disconnects mid-stream
+        with skill_stream.SkillEncoder(embedder) as encoder:
+            if record is not None:
+                skills = record["extracted_skills"]
+                for skill in skills:
+                    encoder.add(skill)
+                    yield sse_event("skill", {"skill": skill, "validated": skill in record["validated_skills"]})
+            else:
+                pages, prompt_text = read_pdf(data, label)
+                skills, teacher = [], []
+                with llm_gateway.track_fallbacks() as fallbacks:
+                    for skill in stream_extract_skills(prompt_text, label, teacher):
+                        skills.append(skill)
+                        encoder.add(skill)
+                        yield sse_event("skill", {"skill": skill, "validated": bool(validate_skills([skill])[0])})
+                record = document_record(pages, skills, teacher)
+                if cache is not None and not fallbacks:
+                    cache.put(cache_key, record)
+            encoder.close()
+        yield sse_event("done", {key: record[key] for key in ("extracted_skills", "validated_skills", "uncertain_skills")})
+    except Exception as e:
+        print(f"Resume streaming error: {e}")
+        yield sse_event("error", {"error": str(e)})
+
+# Async ingestion: uploads are queued in SQLite and parsed by a bounded worker pool
+resume_queue = SQLiteJobQueue(
+    os.getenv("RESUME_QUEUE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "resume_jobs.sqlite3")),
+    handler=lambda payload, meta: parse_resume_bytes(payload, meta.get("label", "resume")),
+    workers=int(os.getenv("RESUME_QUEUE_WORKERS", "2")),
+    max_depth=int(os.getenv("RESUME_QUEUE_MAX_DEPTH", "32"))
+)
+RESUME_QUEUE_JOBS = metrics.gauge("skilltwin_resume_queue_jobs", "Async parse-resume jobs by status", ["status"])
+
 @app.route('/api/parse-resume', methods=['POST'])
 def parse_resume():
-    """Parses uploaded PDF and returns extracted skills."""
+    """Parses uploaded PDF and returns extracted skills.
+    
+    With ?stream=1 skills are pushed over SSE as the LLM produces them.
+    With ?async=1 the upload is queued instead and a job id is returned right away (202),
+    or 429 when the queue is full.
+    """
     if 'file' not in request.files:
         return jsonify({"error": "No file uploaded"}), 400
     
@@ -228,42 +625,164 @@ def parse_resume():
     if file.filename == '':
         return jsonify({"error": "No file selected"}), 400
 
-    try:
-        with pdfplumber.open(file) as pdf:
-            text = "\n".join(page.extract_text() or "" for page in pdf.pages if page.extract_text())
-        
-        extracted_skills = extract_skills(text, "resume")
-        validated, uncertain = validate_skills(extracted_skills)
-        
+    if request.args.get('stream') == '1':
+        return Response(
+            stream_with_context(stream_parse_resume(file.read())),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    if request.args.get('async') == '1':
+        try:
+            job_id = resume_queue.submit(file.read(), {"filename": file.filename, "label": "resume"})
+        except QueueFull as e:
+            return jsonify({"error": str(e)}), 429, {"Retry-After": "5"}
         return jsonify({
-            "extracted_skills": extracted_skills,
-            "validated_skills": validated,
-            "uncertain_skills": uncertain
-        })
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": f"/api/parse-resume/jobs/{job_id}",
+            "events_url": f"/api/parse-resume/jobs/{job_id}/events"
+        }), 202
+
+    try:
+        return jsonify(parse_resume_bytes(file.read()))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/parse-resume/jobs/stats', methods=['GET'])
+def parse_resume_queue_stats():
+    """Queue depth, throughput counters, wait/processing time percentiles and document cache hits."""
+    stats = resume_queue.stats()
+    cache = document_cache.default_cache()
+    stats["document_cache"] = cache.stats() if cache is not None else None
+    return jsonify(stats)
+
+@app.route('/api/parse-resume/jobs/<job_id>', methods=['GET'])
+def parse_resume_job(job_id):
+    """Polls an async parse job; the result has the same shape as the sync endpoint."""
+    job = resume_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id"}), 404
+    return jsonify(job)
+
+@app.route('/api/parse-resume/jobs/<job_id>/events', methods=['GET'])
+def parse_resume_job_events(job_id):
+    """Pushes job status over SSE until the job is done or failed."""
+    if resume_queue.get(job_id) is None:
+        return jsonify({"error": "Unknown job id"}), 404
+
+    def events():
+        last_status = None
+        job = resume_queue.get(job_id)
+        while True:
+            if job is None:
+                yield sse_event("error", {"error": "Job expired"})
+                return
+            if job["status"] in ("done", "failed"):
+                yield sse_event(job["status"], job)
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield sse_event("status", job)
+            else:
+                yield ": keep-alive\n\n"
+            # Returns on the queued -> running transition too, not only once the job has finished
+            job = resume_queue.wait(job_id, timeout=15, changed_from=last_status)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def stream_job_requirements(role):
+    """SSE: one `skill` per required skill as the LLM lists it (embedded on the way), then `done`."""
+    try:
+        with skill_stream.SkillEncoder(embedder) as encoder:
+            for skill in stream_typical_job_skills(role):
+                encoder.add(skill)
+                yield sse_event("skill", {"skill": skill})
+            encoder.close()
+        yield sse_event("done", {"required_skills": encoder.skills})
+    except Exception as e:
+        print(f"Job skill streaming error: {e}")
+        yield sse_event("error", {"error": str(e)})
+
 @app.route('/api/job-requirements', methods=['POST'])
 def job_requirements():
-    """Generates required skills for a given job role."""
+    """Generates required skills for a given job role; ?stream=1 pushes them over SSE one by one."""
     data = request.json
     role = data.get('role')
     if not role:
         return jsonify({"error": "Role is required"}), 400
+
+    if request.args.get('stream') == '1':
+        return Response(
+            stream_with_context(stream_job_requirements(role)),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
         
     skills = generate_typical_job_skills(role)
     return jsonify({"required_skills": skills})
 
 @app.route('/api/analyze-gaps', methods=['POST'])
 def analyze_gaps():
-    """Computes gaps between known skills and job skills."""
+    """Computes gaps between known skills and job skills.
+    
+    Given a `role` instead of `job_skills`, the role's skills are generated by the LLM and
+    embedded while it is still listing them; the generated skills come back as `job_skills`.
+    """
     data = request.json
     known_skills = data.get('known_skills', [])
     job_skills = data.get('job_skills', [])
     
+    if not job_skills and data.get('role'):
+        job_skills, gaps = stream_gaps(stream_typical_job_skills(data['role']), known_skills)
+        return jsonify({"gaps": gaps, "job_skills": job_skills})
+
     gaps = compute_gaps(job_skills, known_skills)
     return jsonify({"gaps": gaps})
 
+@app.route('/api/batch-analyze-gaps', methods=['POST'])
+def batch_analyze_gaps():
+    """Gap reports for a whole cohort in one call.
+    
+    Body: {"students": [{"id": ..., "known_skills": [...]}, ...],
+           "roles": [{"role": ..., "job_skills": [...]}, ...]}  (or a single "job_skills" list).
+    Roles without job_skills are filled in by the LLM. Role names differing only in case or
+    spacing are one role; gaps and the cohort report are keyed by each role's normalized `key`.
+    Large cohorts, ?stream=1 or Accept: application/x-ndjson get NDJSON: a roles line, one line
+    per student, then the cohort histogram. Malformed bodies get a 400.
+    """
+    try:
+        students, roles = parse_cohort(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    for r in roles:
+        if not r["job_skills"]:
+            r["job_skills"] = _clean_skills(generate_typical_job_skills(r["role"]))
+
+    results = batch_compute_gaps(students, roles)
+    histogram = CohortHistogram(roles)
+
+    wants_stream = (request.args.get('stream') == '1' or len(students) > BATCH_STREAM_THRESHOLD
+                    or 'application/x-ndjson' in request.headers.get('Accept', ''))
+    if wants_stream:
+        def lines():
+            yield json.dumps({"type": "roles", "roles": roles}) + "\n"
+            for student, gaps in results:
+                histogram.add(gaps)
+                yield json.dumps({"type": "student", "id": student["id"], "gaps": gaps}) + "\n"
+            yield json.dumps({"type": "cohort", "cohort": histogram.report()}) + "\n"
+        return Response(stream_with_context(lines()), mimetype='application/x-ndjson')
+
+    report = []
+    for student, gaps in results:
+        histogram.add(gaps)
+        report.append({"id": student["id"], "gaps": gaps})
+    return jsonify({"roles": roles, "students": report, "cohort": histogram.report()})
+
 @app.route('/api/generate-roadmap', methods=['POST'])
 def generate_roadmap_api():
     """Generates a study roadmap based on gaps."""
@@ -271,9 +790,115 @@ def generate_roadmap_api():
     gaps = data.get('gaps', [])
     weeks = data.get('weeks', 8)
     
+    # Opt-in SSE variant: ?stream=1, {"stream": true} or Accept: text/event-stream
+    wants_stream = (request.args.get('stream') == '1' or data.get('stream') is True
+                    or 'text/event-stream' in request.headers.get('Accept', ''))
+    if wants_stream:
+        return Response(
+            stream_with_context(stream_roadmap(gaps, weeks)),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    
     roadmap = generate_roadmap(gaps, weeks)
     return jsonify({"roadmap": roadmap})
 
+# ---------------------------------------------------------------------
+# Full analysis: the dashboard's parse -> requirements -> gaps -> roadmap chain as one graph
+# ---------------------------------------------------------------------
+
+def _document_skills(data, label):
+    return parse_resume_bytes(data, label) if data else None
+
+def _role_skills(role):
+    """Required skills for the role, embedded while the LLM lists them."""
+    with skill_stream.SkillEncoder(embedder) as encoder:
+        encoder.extend(stream_typical_job_skills(role))
+        encoder.close()
+    return encoder.skills
+
+def _known_skills(known_skills, resume, syllabus):
+    skills = list(known_skills or [])
+    for document in (resume, syllabus):
+        if document:
+            skills += document["validated_skills"]
+    skills = list(dict.fromkeys(_clean_skills(skills)))
+    # Embedded here so this overlaps the role's LLM call instead of following it
+    skill_stream.encode(embedder, skills)
+    return skills
+
+def _roadmap(gaps, weeks):
+    return generate_roadmap(gaps, weeks) if gaps else None
+
+FULL_ANALYSIS = stage_graph.StageGraph([
+    stage_graph.Stage("resume", lambda resume: _document_skills(resume, "resume"), inputs=("resume",)),
+    stage_graph.Stage("syllabus", lambda syllabus: _document_skills(syllabus, "syllabus"), inputs=("syllabus",)),
+    stage_graph.Stage("job_skills", _role_skills, inputs=("role",)),
+    stage_graph.Stage("known_skills", _known_skills, deps=("resume", "syllabus"), inputs=("known_skills",)),
+    stage_graph.Stage("gaps", lambda job_skills, known_skills: compute_gaps(job_skills, known_skills),
+                      deps=("job_skills", "known_skills")),
+    stage_graph.Stage("roadmap", _roadmap, deps=("gaps",), inputs=("weeks",)),
+], cache=stage_graph.default_cache())
+
+def run_full_analysis(inputs):
+    """Yields (event, data): a `stage` per finished stage, then `done` with every result and the timings."""
+    started = time.perf_counter()
+    results = {}
+    for result in FULL_ANALYSIS.run(inputs):
+        results[result.name] = result
+        event = {"stage": result.name, "result": result.value, "seconds": result.seconds, "cached": result.cached}
+        if result.error:
+            event["error"] = result.error
+        yield "stage", event
+    yield "done", {
+        "results": {name: results[name].value for name in FULL_ANALYSIS.order},
+        "timings": stage_graph.summary(FULL_ANALYSIS, results, time.perf_counter() - started)
+    }
+
+@app.route('/api/full-analysis', methods=['POST'])
+def full_analysis():
+    """Resume/syllabus parsing, role skills, gaps and roadmap in one call.
+    
+    Multipart form: `resume` and/or `syllabus` PDFs plus `role` and `weeks` fields; or JSON
+    {"role": ..., "known_skills": [...], "weeks": 8}. Stages that do not depend on each other
+    run concurrently and each is cached by its inputs. With ?stream=1 or Accept:
+    text/event-stream every stage is pushed over SSE as it finishes.
+    """
+    data = request.form if request.files else (request.get_json(silent=True) or {})
+    role = data.get('role')
+    if not role:
+        return jsonify({"error": "Role is required"}), 400
+    known_skills = data.get('known_skills', [])
+    if isinstance(known_skills, str):
+        known_skills = json.loads(known_skills) if known_skills.startswith('[') else known_skills.split(',')
+    try:
+        weeks = int(data.get('weeks', 8))
+    except (TypeError, ValueError):
+        return jsonify({"error": "weeks must be an integer"}), 400
+
+    resume = request.files.get('resume') or request.files.get('file')
+    syllabus = request.files.get('syllabus')
+    inputs = {
+        "role": role,
+        "weeks": weeks,
+        "known_skills": known_skills,
+        "resume": resume.read() if resume else None,
+        "syllabus": syllabus.read() if syllabus else None
+    }
+
+    wants_stream = (request.args.get('stream') == '1' or data.get('stream') in (True, '1', 'true')
+                    or 'text/event-stream' in request.headers.get('Accept', ''))
+    if wants_stream:
+        return Response(
+            stream_with_context(sse_event(event, payload) for event, payload in run_full_analysis(inputs)),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    for event, payload in run_full_analysis(inputs):
+        if event == "done":
+            return jsonify(payload)
+
 def find_resources(query):
     prompt = f"""
     Find 4-6 high-quality learning resources for: "{query}"
@@ -292,12 +917,14 @@ def find_resources(query):
     }}
     """
     try:
-        response = client.chat.completions.create(
+        content = llm_gateway.chat_completion(
+            client, "backend.find_resources",
+            hedge=True,
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"}
         )
-        return json.loads(response.choices[0].message.content)
+        return json.loads(content)
     except Exception as e:
         print(f"Resource finding error: {e}")
         return {"resources": []}
@@ -312,6 +939,53 @@ def find_learning_resources():
     result = find_resources(query)
     return jsonify({"success": True, "resources": result.get("resources", [])})
 
+@app.route('/api/llm/stats', methods=['GET'])
+def llm_stats():
+    """Per call-site LLM latency histograms, outcomes, circuit breaker state and connection reuse."""
+    return jsonify({**llm_gateway.stats(), "connections": llm_client.stats()})
+
+def _profile_access_denied():
+    """None when the caller may read profiles, else the error response"""
+    if profiler.token is None:
+        # Profiles expose code paths and timings; without a token the endpoints do not exist
+        return jsonify({"error": "Profiling endpoints are disabled (set PROFILE_TOKEN)"}), 404
+    if not profiler.authorized(request.headers):
+        return jsonify({"error": "Profile token required"}), 403
+    return None
+
+@app.route('/api/profiles', methods=['GET'])
+def list_profiles():
+    """Recent request profiles (newest first) with their slowest functions."""
+    denied = _profile_access_denied()
+    if denied is not None:
+        return denied
+    limit = request.args.get("limit", 20, type=int)
+    return jsonify({"profiler": profiler.stats(), "profiles": profiler.list(limit)})
+
+@app.route('/api/profiles/<name>', methods=['GET'])
+def download_profile(name):
+    """Raw .pstats file; open with `python -m pstats` or snakeviz."""
+    denied = _profile_access_denied()
+    if denied is not None:
+        return denied
+    path = profiler.path_for(name)
+    if path is None:
+        return jsonify({"error": "Unknown profile"}), 404
+    return send_file(path, mimetype="application/octet-stream", as_attachment=True, download_name=name + ".pstats")
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus text exposition of request, stage, LLM and cache metrics (plus the embedding service's).
+    
+    Pipeline steps (pdf_extract, embedding_encode, ...) are in skilltwin_stage_seconds; the full-analysis
+    graph stages that contain them (resume, job_skills, gaps, roadmap) are in skilltwin_graph_stage_seconds.
+    """
+    queue = resume_queue.stats()
+    RESUME_QUEUE_JOBS.set(queue["queue_depth"], status="queued")
+    RESUME_QUEUE_JOBS.set(queue["running"], status="running")
+    body = metrics.render() + embedding_service.remote_metrics()
+    return Response(body, content_type=metrics.CONTENT_TYPE)
+
 
 if __name__ == '__main__':
     app.run(port=5000, debug=True)
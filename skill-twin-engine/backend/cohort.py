@@ -0,0 +1,94 @@
+"""
+Cohort gap reports for the Skill-Twin backend
+Validates /api/batch-analyze-gaps payloads and accumulates how many students miss each skill per role
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+
+def role_key(role: str) -> str:
+    """Case and whitespace do not matter: "Data  Analyst " and "data analyst" are one role"""
+    return re.sub(r"\s+", " ", role).strip().casefold()
+
+
+def _skill_list(value, field: str) -> List[str]:
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ValueError(f"{field} must be a list of skills")
+    return [s.strip() for s in value if isinstance(s, str) and s.strip()]
+
+
+def parse_cohort(data) -> Tuple[List[Dict], List[Dict]]:
+    """
+    (students, roles) from a request body; raises ValueError with a client-facing message.
+    Roles whose names normalize to the same key are merged, their job skills unioned in order;
+    each role carries that ``key``, which is what the per-role gap maps are keyed by.
+    Roles may come back with empty job_skills for the caller to fill in.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("body must be a JSON object")
+    raw_students = data.get("students")
+    if not isinstance(raw_students, list) or not raw_students:
+        raise ValueError("students is required")
+    students = []
+    for i, st in enumerate(raw_students):
+        if not isinstance(st, dict):
+            raise ValueError(f"students[{i}] must be an object")
+        students.append({"id": st.get("id", i),
+                         "known_skills": _skill_list(st.get("known_skills"), f"students[{i}].known_skills")})
+
+    raw_roles = data.get("roles")
+    if raw_roles is None:
+        raw_roles = [{"role": data.get("role", "target"), "job_skills": data.get("job_skills")}]
+    if not isinstance(raw_roles, list) or not raw_roles:
+        raise ValueError("roles must be a non-empty list")
+    roles = {}
+    for i, r in enumerate(raw_roles):
+        if not isinstance(r, dict):
+            raise ValueError(f"roles[{i}] must be an object")
+        name = r.get("role", f"role_{i}")
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError(f"roles[{i}].role must be a non-empty string")
+        skills = _skill_list(r.get("job_skills"), f"roles[{i}].job_skills")
+        key = role_key(name)
+        if key in roles:
+            roles[key]["job_skills"] = list(dict.fromkeys(roles[key]["job_skills"] + skills))
+        else:
+            roles[key] = {"role": name.strip(), "key": key, "job_skills": skills}
+    return students, list(roles.values())
+
+
+class CohortHistogram:
+    """Accumulates how many students miss each skill, per role."""
+
+    def __init__(self, roles):
+        self.students = 0
+        self.skills = {r["key"]: {} for r in roles}
+        self.gap_counts = {r["key"]: {} for r in roles}
+
+    def add(self, gaps_by_role):
+        self.students += 1
+        for role, gaps in gaps_by_role.items():
+            counts = self.gap_counts[role]
+            counts[len(gaps)] = counts.get(len(gaps), 0) + 1
+            for gap in gaps:
+                entry = self.skills[role].setdefault(gap["skill"], {"students": 0, "High": 0, "Medium": 0})
+                entry["students"] += 1
+                entry[gap["level"]] += 1
+
+    def report(self):
+        return {
+            "students": self.students,
+            "roles": {
+                role: {
+                    "skill_gaps": [
+                        dict(skill=skill, share=round(entry["students"] / self.students, 3) if self.students else 0, **entry)
+                        for skill, entry in sorted(self.skills[role].items(), key=lambda x: x[1]["students"], reverse=True)
+                    ],
+                    "gaps_per_student": {str(k): v for k, v in sorted(self.gap_counts[role].items())}
+                }
+                for role in self.skills
+            }
+        }
@@ -0,0 +1,315 @@
+"""
+SQLite-backed job queue for the Skill-Twin backend
+Runs slow uploads (PDF extraction + LLM) on a bounded worker pool instead of the request thread
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import closing
+from typing import Callable, Dict, Optional
+
+
+class QueueFull(Exception):
+    """Raised when the queue already holds max_depth pending jobs"""
+
+
+class SQLiteJobQueue:
+    def __init__(self, db_path: str, handler: Callable[[bytes, Dict], Dict],
+                 workers: int = 2, max_depth: int = 32,
+                 retention_seconds: int = 3600, stale_after_seconds: int = 600):
+        self.db_path = db_path
+        self.handler = handler
+        self.workers = workers
+        self.max_depth = max_depth
+        self.retention_seconds = retention_seconds
+        self.stale_after_seconds = stale_after_seconds
+        # Running jobs are touched this often, so only rows nobody touches for stale_after_seconds are requeued
+        self.heartbeat_seconds = max(0.1, stale_after_seconds / 4)
+
+        self._wakeup = threading.Condition()
+        self._threads = []
+        self._started = False
+        self._stopping = False
+        self._stopped = threading.Event()
+        self._start_lock = threading.Lock()
+        self._active_lock = threading.Lock()
+        self._active = set()
+
+        # Rolling in-process samples for the metrics endpoint; updated from request and worker threads
+        self._stats_lock = threading.Lock()
+        self._wait_times = deque(maxlen=500)
+        self._processing_times = deque(maxlen=500)
+        self._counters = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0}
+
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    payload BLOB,
+                    meta TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    heartbeat_at REAL
+                )
+            """)
+            if "heartbeat_at" not in {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}:
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+        self._sweep()
+
+    def start(self):
+        """Start the worker threads (idempotent, called lazily on first submit)"""
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            thread = threading.Thread(target=self._sweep_loop, name="job-sweeper", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def shutdown(self, timeout: float = 5.0):
+        self._stopping = True
+        self._stopped.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def submit(self, payload: bytes, meta: Optional[Dict] = None) -> str:
+        """Enqueue a job and return its id, or raise QueueFull for back-pressure"""
+        self.start()
+        job_id = uuid.uuid4().hex
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            depth = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if depth >= self.max_depth:
+                conn.execute("ROLLBACK")
+                self._count("rejected")
+                raise QueueFull(f"Queue is full ({depth} jobs pending)")
+            conn.execute(
+                "INSERT INTO jobs (id, status, payload, meta, created_at) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, payload, json.dumps(meta or {}), time.time())
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        self._count("submitted")
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Return the public view of a job, or None if unknown"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, status, meta, result, error, created_at, started_at, finished_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        job = {
+            "job_id": row["id"],
+            "status": row["status"],
+            "meta": json.loads(row["meta"] or "{}"),
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"]
+        }
+        if row["status"] == "queued":
+            job["position"] = self._position(row["created_at"])
+        if row["result"] is not None:
+            job["result"] = json.loads(row["result"])
+        if row["error"] is not None:
+            job["error"] = row["error"]
+        return job
+
+    def wait(self, job_id: str, timeout: float = 30.0, poll_interval: float = 0.25,
+             changed_from: Optional[str] = None) -> Optional[Dict]:
+        """
+        Block until the job finishes or the timeout expires; returns the latest view.
+        With ``changed_from`` it also returns as soon as the status is no longer that one
+        (e.g. queued -> running), for callers that report every transition.
+        """
+        deadline = time.time() + timeout
+
+        def pending(job):
+            return (job is not None and job["status"] in ("queued", "running")
+                    and (changed_from is None or job["status"] == changed_from))
+
+        job = self.get(job_id)
+        while pending(job) and time.time() < deadline:
+            time.sleep(poll_interval)
+            job = self.get(job_id)
+        return job
+
+    def stats(self) -> Dict:
+        """Queue depth, status counts and wait/processing time percentiles"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        by_status = {row["status"]: row["n"] for row in rows}
+        with self._stats_lock:
+            counters = dict(self._counters)
+            wait_times = list(self._wait_times)
+            processing_times = list(self._processing_times)
+
+        return {
+            "queue_depth": by_status.get("queued", 0),
+            "running": by_status.get("running", 0),
+            "max_depth": self.max_depth,
+            "workers": self.workers,
+            "jobs_by_status": by_status,
+            "counters": counters,
+            "wait_seconds": _summarize(wait_times),
+            "processing_seconds": _summarize(processing_times)
+        }
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self._counters[name] += 1
+
+    def _position(self, created_at: float) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?", (created_at,)
+            ).fetchone()[0]
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, payload, meta, created_at FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                now = time.time()
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ?, heartbeat_at = ? WHERE id = ?",
+                    (now, now, row["id"])
+                )
+            conn.execute("COMMIT")
+            return row
+        finally:
+            conn.close()
+
+    def _finish(self, job_id: str, result: Optional[Dict], error: Optional[str]) -> str:
+        """Store the outcome and return the final status; a result JSON cannot hold fails the job"""
+        encoded = None
+        if error is None and result is not None:
+            try:
+                encoded = json.dumps(result)
+            except (TypeError, ValueError) as e:
+                error = f"Result could not be serialized: {e}"
+        status = "failed" if error else "done"
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, payload = NULL, finished_at = ? WHERE id = ?",
+                (status, encoded, error, time.time(), job_id)
+            )
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                (time.time() - self.retention_seconds,)
+            )
+        return status
+
+    def _sweep(self):
+        """
+        Refresh the heartbeat of jobs running here, then requeue running jobs whose heartbeat
+        stopped, i.e. jobs left behind by a crashed or restarted process.
+        """
+        now = time.time()
+        with self._active_lock:
+            active = list(self._active)
+        with closing(self._connect()) as conn:
+            conn.executemany("UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = 'running'",
+                             [(now, job_id) for job_id in active])
+            requeued = conn.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL, heartbeat_at = NULL "
+                "WHERE status = 'running' AND COALESCE(heartbeat_at, started_at) < ?",
+                (now - self.stale_after_seconds,)
+            ).rowcount
+        if requeued:
+            print(f"Job queue requeued {requeued} stale running job(s)")
+            with self._wakeup:
+                self._wakeup.notify_all()
+
+    def _sweep_loop(self):
+        # A thread of its own: workers may all be inside long handlers
+        while not self._stopped.wait(self.heartbeat_seconds):
+            try:
+                self._sweep()
+            except sqlite3.Error as e:
+                print(f"Job queue sweep error: {e}")
+
+    def _worker_loop(self):
+        while not self._stopping:
+            try:
+                row = self._claim()
+            except sqlite3.Error as e:
+                print(f"Job queue claim error: {e}")
+                row = None
+
+            if row is None:
+                # Woken by submit(); the timeout also picks up jobs queued by other processes
+                with self._wakeup:
+                    self._wakeup.wait(timeout=1.0)
+                continue
+
+            started = time.time()
+            with self._stats_lock:
+                self._wait_times.append(started - row["created_at"])
+            with self._active_lock:
+                self._active.add(row["id"])
+            result, error = None, None
+            try:
+                result = self.handler(row["payload"], json.loads(row["meta"] or "{}"))
+            except Exception as e:
+                print(f"Job {row['id']} failed: {e}")
+                error = str(e)
+            with self._stats_lock:
+                self._processing_times.append(time.time() - started)
+            try:
+                status = self._finish(row["id"], result, error)
+            except sqlite3.Error as e:
+                # The row stays 'running' until the stale sweep requeues it; the worker lives on
+                print(f"Job queue finish error for {row['id']}: {e}")
+                continue
+            finally:
+                with self._active_lock:
+                    self._active.discard(row["id"])
+            self._count("completed" if status == "done" else "failed")
+
+
+def _summarize(samples) -> Dict:
+    values = sorted(samples)
+    if not values:
+        return {"count": 0, "p50": None, "p95": None, "max": None}
+    return {
+        "count": len(values),
+        "p50": round(values[len(values) // 2], 3),
+        "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))], 3),
+        "max": round(values[-1], 3)
+    }
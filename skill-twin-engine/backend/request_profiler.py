@@ -0,0 +1,163 @@
+"""
+Opt-in request profiling for the Skill-Twin backend
+Profiles a request with cProfile when asked for by header or picked by a per-route sampling rate,
+and keeps the newest results as .pstats files in a bounded directory.
+The header and the /api/profiles endpoints only work once PROFILE_TOKEN is set.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """``"/api/analyze-gaps=0.01,/api/parse-resume=0.05"`` -> {route: rate}"""
+    rates = {}
+    for part in (spec or "").split(","):
+        if "=" not in part:
+            continue
+        route, rate = part.rsplit("=", 1)
+        try:
+            rates[route.strip()] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            print(f"Ignoring bad profile sample rate: {part}")
+    return rates
+
+
+class RequestProfiler:
+    HEADER = "X-Profile"
+
+    def __init__(self, profile_dir: str, max_profiles: int = 50,
+                 sample_rates: Optional[Dict[str, float]] = None, token: Optional[str] = None):
+        self.profile_dir = profile_dir
+        self.max_profiles = max_profiles
+        self.sample_rates = sample_rates or {}
+        self.token = token
+        # One profiled request at a time keeps the overhead bounded whatever the traffic
+        self._busy = threading.Lock()
+        self._counters = {"profiled": 0, "skipped_busy": 0}
+
+    @classmethod
+    def from_env(cls, default_dir: str) -> "RequestProfiler":
+        return cls(
+            profile_dir=os.getenv("PROFILE_DIR", default_dir),
+            max_profiles=int(os.getenv("PROFILE_MAX_FILES", "50")),
+            sample_rates=parse_sample_rates(os.getenv("PROFILE_SAMPLE_RATES", "")),
+            token=os.getenv("PROFILE_TOKEN") or None
+        )
+
+    def authorized(self, headers) -> bool:
+        """True when the request carries the configured token; always False without PROFILE_TOKEN"""
+        return self.token is not None and headers.get(self.HEADER) == self.token
+
+    def wants(self, route: str, headers) -> bool:
+        """
+        True when the header asks for a profile with the right token, or the route's sampling
+        rate picks this request. Without PROFILE_TOKEN only sampling can start a profile.
+        """
+        if headers.get(self.HEADER) is not None:
+            return self.authorized(headers)
+        rate = self.sample_rates.get(route, 0.0)
+        return rate > 0 and random.random() < rate
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Begin profiling the current thread, or None if another request holds the profiler"""
+        if not self._busy.acquire(blocking=False):
+            self._counters["skipped_busy"] += 1
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) is already attached to this thread
+            self._busy.release()
+            return None
+        return profile
+
+    def finish(self, profile: cProfile.Profile, meta: Dict) -> Optional[str]:
+        """Stop profiling, write <name>.pstats plus a JSON summary, trim the ring; returns the name"""
+        profile.disable()
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            route = re.sub(r"[^A-Za-z0-9]+", "_", meta.get("route", "request")).strip("_") or "root"
+            now = time.time()
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"{int(now * 1000) % 1000:03d}"
+            name = f"{stamp}-{route}-{uuid.uuid4().hex[:6]}"
+            profile.dump_stats(os.path.join(self.profile_dir, name + ".pstats"))
+
+            summary = dict(meta, name=name, created_at=now, top=_top_functions(profile))
+            with open(os.path.join(self.profile_dir, name + ".json"), "w", encoding="utf-8") as f:
+                json.dump(summary, f)
+            self._counters["profiled"] += 1
+            self._trim()
+            return name
+        except OSError as e:
+            print(f"Could not save request profile: {e}")
+            return None
+        finally:
+            self._busy.release()
+
+    def list(self, limit: int = 20) -> List[Dict]:
+        """Newest first; each entry is the JSON summary written next to the .pstats file"""
+        profiles = []
+        for name in self._names()[::-1][:limit]:
+            try:
+                with open(os.path.join(self.profile_dir, name + ".json"), encoding="utf-8") as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def path_for(self, name: str) -> Optional[str]:
+        """Path of a stored .pstats file, or None for unknown or unsafe names"""
+        if not re.fullmatch(r"[A-Za-z0-9_-]+", name or ""):
+            return None
+        path = os.path.join(self.profile_dir, name + ".pstats")
+        return path if os.path.exists(path) else None
+
+    def stats(self) -> Dict:
+        return {
+            "sample_rates": self.sample_rates,
+            "max_profiles": self.max_profiles,
+            "stored": len(self._names()),
+            "counters": dict(self._counters)
+        }
+
+    def _names(self) -> List[str]:
+        try:
+            files = os.listdir(self.profile_dir)
+        except OSError:
+            return []
+        # Names start with a timestamp, so sorting by name is oldest-first
+        return sorted(f[:-len(".pstats")] for f in files if f.endswith(".pstats"))
+
+    def _trim(self):
+        names = self._names()
+        for name in names[:max(0, len(names) - self.max_profiles)]:
+            for ext in (".pstats", ".json"):
+                try:
+                    os.remove(os.path.join(self.profile_dir, name + ext))
+                except OSError:
+                    pass
+
+
+def _top_functions(profile: cProfile.Profile, limit: int = 15) -> List[Dict]:
+    stats = pstats.Stats(profile, stream=io.StringIO())
+    rows = []
+    for (filename, line, func), (cc, nc, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({func})",
+            "calls": nc,
+            "tottime": round(tottime, 4),
+            "cumtime": round(cumtime, 4)
+        })
+    rows.sort(key=lambda r: r["cumtime"], reverse=True)
+    return rows[:limit]
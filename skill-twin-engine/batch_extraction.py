@@ -0,0 +1,475 @@
+"""
+Batch Skill Extraction for Skill-Twin Engine
+Nightly bulk extraction of job postings through a batch LLM API instead of one synchronous
+call per posting. Pending postings in the posting store are matched locally first
+(tiered_extractor); the rest become a JSONL request file (the same prompt JobScraper sends),
+which a batch backend runs at batch prices. Results are ingested back idempotently; failed or
+missing lines go back to the pending pool and are resubmitted with the next batch.
+
+    python batch_extraction.py add job_data.json ...        # scraper output -> posting store
+    python batch_extraction.py submit [--limit N]           # write request files and submit them
+    python batch_extraction.py poll                         # ingest finished batches (cron)
+    python batch_extraction.py run [--backend local]        # submit, wait, ingest, resubmit failures
+    python batch_extraction.py stats
+
+    SKILL_TWIN_POSTING_STORE=/path/to/postings.sqlite3      # required
+    SKILL_TWIN_BATCH_BACKEND=openai | local
+    SKILL_TWIN_BATCH_DIR=/path/for/request/files            # default: batches/ here
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from typing import Callable, Dict, Iterable, List, Optional
+
+import tiered_extractor
+from job_scraper import description_request, parse_skill_list
+from posting_store import MAX_ATTEMPTS, PostingStore, default_store
+from resume_sections import estimate_tokens
+
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+BATCH_DIR = os.getenv("SKILL_TWIN_BATCH_DIR", os.path.join(ENGINE_DIR, "batches"))
+BACKEND = os.getenv("SKILL_TWIN_BATCH_BACKEND", "openai").lower()
+ENDPOINT = "/v1/chat/completions"
+# OpenAI Batch API limits per input file
+MAX_REQUESTS_PER_FILE = 50000
+MAX_FILE_BYTES = 190 * 1024 * 1024
+TERMINAL = ("completed", "failed", "expired", "cancelled")
+# USD per million (input, output) tokens and the batch discount, for the run report
+PRICES = {"gpt-4o-mini": (0.15, 0.60)}
+BATCH_DISCOUNT = 0.5
+# A batch row still 'submitting' after this long belongs to a submit that crashed mid-way
+SUBMIT_GRACE_SECONDS = 15 * 60
+
+
+def cost(model: str, prompt_tokens: int, completion_tokens: int, batch: bool = True) -> float:
+    input_price, output_price = PRICES.get(model, PRICES["gpt-4o-mini"])
+    usd = (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+    return usd * (BATCH_DISCOUNT if batch else 1.0)
+
+
+class BatchBackend:
+    """Runs a JSONL request file; results are OpenAI batch output lines ({"custom_id", "response", "error"})"""
+    name = "base"
+
+    def submit(self, request_path: str, submission: Optional[str] = None) -> str:
+        """Start a batch for the file; ``submission`` tags it so find() can recover its id"""
+        raise NotImplementedError
+
+    def find(self, submission: str, since: float = 0.0) -> Optional[str]:
+        """Id of a batch created by an earlier submit(..., submission), or None"""
+        return None
+
+    def status(self, batch_id: str) -> str:
+        raise NotImplementedError
+
+    def results(self, batch_id: str) -> List[Dict]:
+        raise NotImplementedError
+
+
+class OpenAIBatchBackend(BatchBackend):
+    name = "openai"
+
+    def __init__(self, client=None):
+        if client is None:
+            from lazy_models import openai_client
+            client = openai_client()
+        self.client = client
+
+    def submit(self, request_path: str, submission: Optional[str] = None) -> str:
+        with open(request_path, "rb") as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        metadata = {"source": "skill-twin", "file": os.path.basename(request_path)}
+        if submission:
+            metadata["submission"] = submission
+        batch = self.client.batches.create(input_file_id=uploaded.id, endpoint=ENDPOINT, completion_window="24h",
+                                           metadata=metadata)
+        return batch.id
+
+    def find(self, submission: str, since: float = 0.0) -> Optional[str]:
+        # Batches are listed newest first; anything created before the submit started is not ours
+        for batch in self.client.batches.list(limit=100):
+            if batch.created_at < since - 60:
+                break
+            if (batch.metadata or {}).get("submission") == submission:
+                return batch.id
+        return None
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> List[Dict]:
+        batch = self.client.batches.retrieve(batch_id)
+        lines = []
+        # Successful lines and per-request errors live in separate files
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                lines.extend(json.loads(line) for line in self.client.files.content(file_id).text.splitlines()
+                             if line.strip())
+        return lines
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    Stand-in that answers a request file in-process. ``respond(body)`` returns the
+    completion content; an exception becomes that line's error. The default answers
+    from the local taxonomy matcher, which is enough for dry runs of the pipeline.
+    With an ``output_dir`` results are also written there, so a later process (the
+    ``poll`` command) can ingest them.
+    """
+    name = "local"
+
+    def __init__(self, respond: Optional[Callable[[Dict], str]] = None, drop: Callable[[str], bool] = None,
+                 output_dir: Optional[str] = None):
+        self.respond = respond or self._taxonomy_answer
+        self.drop = drop
+        self.output_dir = output_dir
+        self._results = {}
+
+    @staticmethod
+    def _taxonomy_answer(body: Dict) -> str:
+        text = body["messages"][-1]["content"]
+        return json.dumps({"skills": tiered_extractor.default_extractor().match(text).skills})
+
+    def submit(self, request_path: str, submission: Optional[str] = None) -> str:
+        batch_id = f"local_batch_{submission or uuid.uuid4().hex[:12]}"
+        lines = []
+        with open(request_path, encoding="utf-8") as f:
+            for request in map(json.loads, filter(str.strip, f)):
+                if self.drop is not None and self.drop(request["custom_id"]):
+                    continue   # like requests left unfinished when a batch expires
+                try:
+                    content = self.respond(request["body"])
+                    usage = {"prompt_tokens": estimate_tokens(request["body"]["messages"][-1]["content"]),
+                             "completion_tokens": estimate_tokens(content)}
+                    lines.append({"custom_id": request["custom_id"], "error": None, "response": {
+                        "status_code": 200,
+                        "body": {"choices": [{"message": {"role": "assistant", "content": content}}],
+                                 "model": request["body"]["model"], "usage": usage}
+                    }})
+                except Exception as e:
+                    lines.append({"custom_id": request["custom_id"], "response": None,
+                                  "error": {"code": "server_error", "message": str(e)}})
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(self._output_path(batch_id), "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(line) + "\n" for line in lines)
+        self._results[batch_id] = lines
+        return batch_id
+
+    def _output_path(self, batch_id: str) -> Optional[str]:
+        return os.path.join(self.output_dir, f"{batch_id}.output.jsonl") if self.output_dir else None
+
+    def _load(self, batch_id: str) -> Optional[List[Dict]]:
+        if batch_id not in self._results and self.output_dir and os.path.exists(self._output_path(batch_id)):
+            with open(self._output_path(batch_id), encoding="utf-8") as f:
+                self._results[batch_id] = [json.loads(line) for line in f if line.strip()]
+        return self._results.get(batch_id)
+
+    def find(self, submission: str, since: float = 0.0) -> Optional[str]:
+        batch_id = f"local_batch_{submission}"
+        return batch_id if self._load(batch_id) is not None else None
+
+    def status(self, batch_id: str) -> str:
+        # A batch answered by another process without an output_dir is unknown here, not failed
+        return "completed" if self._load(batch_id) is not None else "unknown"
+
+    def results(self, batch_id: str) -> List[Dict]:
+        return list(self._load(batch_id) or [])
+
+
+BACKENDS = {"openai": OpenAIBatchBackend, "local": LocalBatchBackend}
+
+
+class BatchRunner:
+    def __init__(self, store: PostingStore, backend: BatchBackend, work_dir: str = BATCH_DIR,
+                 extractor: Optional[tiered_extractor.TieredExtractor] = None):
+        self.store = store
+        self.backend = backend
+        self.work_dir = work_dir
+        self.extractor = extractor or tiered_extractor.default_extractor()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.store.db_path, timeout=30, isolation_level=None)
+
+    def _init_db(self):
+        with closing(self._connect()) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS batches (
+                    id TEXT PRIMARY KEY,
+                    backend TEXT NOT NULL,
+                    request_file TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    requests INTEGER NOT NULL,
+                    succeeded INTEGER NOT NULL DEFAULT 0,
+                    failed INTEGER NOT NULL DEFAULT 0,
+                    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                    completion_tokens INTEGER NOT NULL DEFAULT 0,
+                    submitted_at REAL NOT NULL,
+                    finished_at REAL
+                )
+            """)
+
+    def _plan(self, description: str):
+        """(local skills, text for the LLM or None when the local tier is confident)"""
+        if self.extractor.mode == "llm":
+            return [], description
+        local = self.extractor.match(description)
+        if local.confidence >= self.extractor.threshold or not local.residual.strip():
+            return local.skills, None
+        return local.skills, local.residual
+
+    def write_requests(self, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Request files for pending postings, split at the batch API limits. Postings the
+        local tier explains are finished here and never cost a request.
+        """
+        os.makedirs(self.work_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        files, current, finished = [], None, {}
+        for posting in self.store.pending(limit):
+            local, text = self._plan(posting["description"])
+            if text is None:
+                finished[posting["id"]] = local
+                continue
+            body = description_request(text)
+            line = json.dumps({"custom_id": posting["id"], "method": "POST", "url": ENDPOINT, "body": body},
+                              ensure_ascii=False) + "\n"
+            if current is None or current["requests"] >= MAX_REQUESTS_PER_FILE or \
+                    current["bytes"] + len(line.encode("utf-8")) > MAX_FILE_BYTES:
+                if current is not None:
+                    current.pop("handle").close()
+                path = os.path.join(self.work_dir, f"requests-{stamp}-{len(files):03d}.jsonl")
+                current = {"path": path, "handle": open(path, "w", encoding="utf-8"),
+                           "requests": 0, "bytes": 0, "local": {}, "prompt_tokens": 0}
+                files.append(current)
+            current["handle"].write(line)
+            current["requests"] += 1
+            current["bytes"] += len(line.encode("utf-8"))
+            current["local"][posting["id"]] = local
+            current["prompt_tokens"] += estimate_tokens(body["messages"][-1]["content"])
+        if current is not None:
+            current.pop("handle").close()
+        if finished:
+            self.store.finish(finished)
+        print(f"📝 {len(finished)} postings finished locally, "
+              f"{sum(f['requests'] for f in files)} requests in {len(files)} file(s)")
+        return files
+
+    def submit(self, limit: Optional[int] = None) -> List[str]:
+        """
+        Write and submit request files; a file the backend rejects fails only its own postings.
+        The postings and a provisional 'submitting' batch row are recorded before the backend
+        call, so a crash after the backend accepted a file is recovered by reconcile() instead
+        of the postings looking pending and being paid for twice.
+        """
+        self.reconcile()
+        batch_ids = []
+        for request_file in self.write_requests(limit):
+            submission = f"pending_{uuid.uuid4().hex[:12]}"
+            self.store.mark_submitted(request_file["local"], submission)
+            with closing(self._connect()) as conn:
+                conn.execute("INSERT INTO batches (id, backend, request_file, status, requests, submitted_at) "
+                             "VALUES (?, ?, ?, 'submitting', ?, ?)",
+                             (submission, self.backend.name, request_file["path"], request_file["requests"],
+                              time.time()))
+            batch_id = self._send(submission, request_file["path"])
+            if batch_id is not None:
+                print(f"🚀 Submitted {request_file['requests']} requests "
+                      f"(~{request_file['prompt_tokens']} prompt tokens) as {batch_id}")
+                batch_ids.append(batch_id)
+        return batch_ids
+
+    def _send(self, submission: str, request_path: str) -> Optional[str]:
+        """Submit a recorded request file and bind its postings and row to the real batch id"""
+        try:
+            batch_id = self.backend.submit(request_path, submission)
+        except Exception as e:
+            print(f"❌ Submitting {request_path} failed: {e}")
+            self.store.mark_failed({pid: f"submit failed: {e}" for pid in self.store.submitted(submission)},
+                                   submission)
+            with closing(self._connect()) as conn:
+                conn.execute("DELETE FROM batches WHERE id = ?", (submission,))
+            return None
+        self._bind(submission, batch_id)
+        return batch_id
+
+    def _bind(self, submission: str, batch_id: str):
+        # Postings first: a crash between the two leaves the row 'submitting' for reconcile()
+        self.store.reassign(submission, batch_id)
+        with closing(self._connect()) as conn:
+            conn.execute("UPDATE batches SET id = ?, status = 'submitted' WHERE id = ?", (batch_id, submission))
+
+    def reconcile(self, grace_seconds: float = SUBMIT_GRACE_SECONDS) -> Dict[str, Optional[str]]:
+        """
+        Finish submits that crashed mid-way. A batch the backend already created under the
+        provisional id is adopted; otherwise the recorded request file is submitted again.
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT id, request_file, submitted_at FROM batches "
+                                "WHERE status = 'submitting' AND submitted_at <= ?",
+                                (time.time() - grace_seconds,)).fetchall()
+        recovered = {}
+        for submission, request_path, submitted_at in rows:
+            batch_id = self.backend.find(submission, since=submitted_at)
+            if batch_id is not None:
+                self._bind(submission, batch_id)
+                print(f"🔗 {submission} was already submitted as {batch_id}")
+            elif os.path.exists(request_path):
+                batch_id = self._send(submission, request_path)
+            else:
+                self.store.mark_failed({pid: "request file lost" for pid in self.store.submitted(submission)},
+                                       submission)
+                with closing(self._connect()) as conn:
+                    conn.execute("DELETE FROM batches WHERE id = ?", (submission,))
+            recovered[submission] = batch_id
+        return recovered
+
+    def open_batches(self) -> List[str]:
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute("SELECT id FROM batches WHERE status = 'submitted'")]
+
+    def poll(self) -> Dict[str, str]:
+        """Backend status of every open batch; finished ones are ingested"""
+        self.reconcile()
+        statuses = {}
+        for batch_id in self.open_batches():
+            statuses[batch_id] = self.backend.status(batch_id)
+            if statuses[batch_id] in TERMINAL:
+                self.ingest(batch_id, statuses[batch_id])
+        return statuses
+
+    def ingest(self, batch_id: str, status: str = "completed") -> Dict:
+        """
+        Store results of a finished batch. Only postings still submitted under this batch are
+        touched, so re-running ingest on the same output is a no-op. Errors, unparsable answers
+        and postings with no result line are marked failed and picked up by the next submit.
+        """
+        waiting = self.store.submitted(batch_id)
+        results, errors = {}, {}
+        prompt_tokens = completion_tokens = 0
+        for line in (self.backend.results(batch_id) if waiting else []):
+            posting = line.get("custom_id")
+            if posting not in waiting:
+                continue
+            response = line.get("response") or {}
+            if line.get("error") or response.get("status_code") != 200:
+                errors[posting] = json.dumps(line.get("error") or response.get("body"))
+                continue
+            body = response["body"]
+            usage = body.get("usage") or {}
+            prompt_tokens += usage.get("prompt_tokens", 0)
+            completion_tokens += usage.get("completion_tokens", 0)
+            try:
+                extra = parse_skill_list(body["choices"][0]["message"]["content"])
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                errors[posting] = f"unparsable response: {e}"
+                continue
+            results[posting] = tiered_extractor.merge_skills(waiting[posting], extra)
+        for posting in waiting:
+            if posting not in results and posting not in errors:
+                errors[posting] = f"no result (batch {status})"
+
+        succeeded = self.store.finish(results, batch_id)
+        failed = self.store.mark_failed(errors, batch_id)
+        with closing(self._connect()) as conn:
+            conn.execute("UPDATE batches SET status = ?, succeeded = succeeded + ?, failed = failed + ?, "
+                         "prompt_tokens = prompt_tokens + ?, completion_tokens = completion_tokens + ?, "
+                         "finished_at = COALESCE(finished_at, ?) WHERE id = ?",
+                         (status if status != "completed" else "ingested", succeeded, failed,
+                          prompt_tokens, completion_tokens, time.time(), batch_id))
+        print(f"📥 {batch_id}: {succeeded} stored, {failed} failed")
+        return {"batch_id": batch_id, "succeeded": succeeded, "failed": failed}
+
+    def run(self, limit: Optional[int] = None, poll_seconds: float = 60.0, rounds: int = MAX_ATTEMPTS) -> Dict:
+        """Submit, wait for the batches, ingest; failures are resubmitted for up to ``rounds`` rounds"""
+        started = time.time()
+        for _ in range(rounds):
+            batch_ids = self.submit(limit)
+            while batch_ids:
+                statuses = self.poll()
+                batch_ids = [b for b in batch_ids if statuses.get(b) not in TERMINAL]
+                if batch_ids:
+                    time.sleep(poll_seconds)
+            if not self.store.pending(1):
+                break
+        return self.report(since=started)
+
+    def report(self, since: Optional[float] = None) -> Dict:
+        """Requests, tokens, batch vs synchronous cost and postings per hour"""
+        query = "SELECT COUNT(*), SUM(requests), SUM(succeeded), SUM(failed), SUM(prompt_tokens), " \
+                "SUM(completion_tokens), MIN(submitted_at), MAX(finished_at) FROM batches"
+        with closing(self._connect()) as conn:
+            row = conn.execute(query + (" WHERE submitted_at >= ?" if since else ""),
+                               (since,) if since else ()).fetchone()
+        batches, requests, succeeded, failed, prompt, completion, first, last = [value or 0 for value in row]
+        hours = max((last - first) / 3600, 1e-9) if first and last else 0.0
+        store = self.store.stats()
+        return {
+            "batches": batches, "requests": requests, "succeeded": succeeded, "failed": failed,
+            "prompt_tokens": prompt, "completion_tokens": completion,
+            "cost_usd": round(cost("gpt-4o-mini", prompt, completion, batch=True), 6),
+            "sync_cost_usd": round(cost("gpt-4o-mini", prompt, completion, batch=False), 6),
+            "postings_per_hour": round(succeeded / hours, 1) if hours else 0.0,
+            "store": store
+        }
+
+
+def load_jobs(paths: Iterable[str]) -> List[Dict]:
+    """Job dicts from scraper output files (save_job_data JSON, any nesting, or .jsonl)"""
+    jobs = []
+
+    def walk(data):
+        if isinstance(data, dict):
+            if isinstance(data.get("description"), str):
+                jobs.append(data)
+            else:
+                for value in data.values():
+                    walk(value)
+        elif isinstance(data, list):
+            for value in data:
+                walk(value)
+
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            walk([json.loads(line) for line in f if line.strip()] if path.endswith(".jsonl") else json.load(f))
+    return jobs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Nightly batch skill extraction for scraped postings")
+    parser.add_argument("command", choices=["add", "submit", "poll", "run", "stats"])
+    parser.add_argument("paths", nargs="*", help="scraper output files (add)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=BACKEND)
+    parser.add_argument("--limit", type=int, help="postings per submit")
+    parser.add_argument("--poll-seconds", type=float, default=60.0)
+    args = parser.parse_args()
+
+    store = default_store()
+    if store is None:
+        raise SystemExit("Set SKILL_TWIN_POSTING_STORE to the posting database path")
+    if args.command == "add":
+        jobs = load_jobs(args.paths)
+        print(f"➕ {store.add(jobs)} new postings of {len(jobs)} read")
+        raise SystemExit(0)
+
+    # The local backend keeps its answers next to the request files so a later poll finds them
+    backend = LocalBatchBackend(output_dir=BATCH_DIR) if args.backend == "local" else BACKENDS[args.backend]()
+    runner = BatchRunner(store, backend)
+    if args.command == "submit":
+        runner.submit(args.limit)
+    elif args.command == "poll":
+        for batch_id, status in runner.poll().items():
+            print(f"⏳ {batch_id}: {status}")
+    elif args.command == "run":
+        report = runner.run(args.limit, args.poll_seconds)
+        print(f"📊 {report['succeeded']} postings extracted in {report['batches']} batch(es), "
+              f"{report['failed']} failed; {report['prompt_tokens']} + {report['completion_tokens']} tokens")
+        print(f"💰 ${report['cost_usd']:.4f} batch vs ${report['sync_cost_usd']:.4f} synchronous; "
+              f"{report['postings_per_hour']} postings/hour")
+    print(f"🗄️ Posting store: {json.dumps(store.stats())}")
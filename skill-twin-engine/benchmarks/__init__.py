@@ -0,0 +1,4 @@
+"""
+Offline benchmarks for Skill-Twin Engine
+Seeded synthetic data with fake HTTP, LLM and embedding layers; see benchmarks/run.py
+"""
@@ -0,0 +1,204 @@
+"""
+Offline stand-ins for the benchmarks: job-board HTTP, the OpenAI client and the sentence embedder
+"""
+
+import hashlib
+import json
+import re
+import sys
+import types
+from typing import List
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+import requests
+from requests.adapters import BaseAdapter
+
+from benchmarks.synthetic import TECH_SKILLS
+
+
+class FakeJobBoardAdapter(BaseAdapter):
+    """
+    Serves synthetic Indeed / Naukri / TimesJobs pages using the markup the
+    scrapers look for, so every parsing path runs without the network.
+    Search pages list ``cards`` postings; detail pages return one of ``descriptions``.
+    """
+
+    def __init__(self, descriptions: List[str], cards: int = 10):
+        super().__init__()
+        self.descriptions = descriptions or ["Python developer with SQL, Git and REST API experience required."]
+        self.cards = cards
+        self.requests = 0
+
+    def send(self, request, **kwargs):
+        self.requests += 1
+        url = urlparse(request.url)
+        host, path = url.netloc, url.path
+        if "indeed" in host:
+            body = self._indeed_detail(url) if path.startswith("/viewjob") else self._indeed_search()
+        elif "naukri" in host:
+            body = self._detail("section", "job-desc", path) if "job-listings" in path else self._naukri_search()
+        elif "timesjobs" in host:
+            body = self._detail("div", "job-desc", path) if "job-detail" in path else self._timesjobs_search()
+        else:
+            return self._response(request, 404, "<html><body>Not found</body></html>")
+        return self._response(request, 200, body)
+
+    def close(self):
+        pass
+
+    def _response(self, request, status: int, body: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response._content = body.encode("utf-8")
+        response.headers["Content-Type"] = "text/html; charset=utf-8"
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def _description(self, key: str) -> str:
+        index = int(hashlib.md5(key.encode("utf-8")).hexdigest(), 16) % len(self.descriptions)
+        return self.descriptions[index]
+
+    def _indeed_search(self) -> str:
+        cards = "".join(
+            f'<div class="job_seen_beacon" data-jk="k{i}"><h2 class="jobTitle"><a href="/viewjob?jk=k{i}">'
+            f'Software Engineer {i}</a></h2><span class="companyName">Company {i % 7}</span>'
+            f'<div data-testid="job-location">Bangalore</div><span class="date">Just posted</span></div>'
+            for i in range(self.cards)
+        )
+        return f"<html><body>{cards}</body></html>"
+
+    def _indeed_detail(self, url) -> str:
+        key = parse_qs(url.query).get("jk", ["k0"])[0]
+        return (f'<html><body><div id="jobDescriptionText" class="jobDescriptionText">'
+                f'{self._description(key)}</div></body></html>')
+
+    def _naukri_search(self) -> str:
+        cards = "".join(
+            f'<article class="jobTuple"><a class="title" href="https://www.naukri.com/job-listings-{i}">'
+            f'Python Developer {i}</a><a class="subTitle">Company {i % 5}</a><ul>'
+            f'<li class="experience">0-2 Yrs</li><li class="salary">Not disclosed</li>'
+            f'<li class="location">Hyderabad</li></ul></article>'
+            for i in range(self.cards)
+        )
+        return f"<html><body>{cards}</body></html>"
+
+    def _timesjobs_search(self) -> str:
+        cards = "".join(
+            f'<li class="clearfix job-bx wht-shd-bx"><h2><a href="https://www.timesjobs.com/job-detail/{i}">'
+            f'Java Developer {i}</a></h2><h3 class="joblist-comp-name">Company {i % 6}</h3>'
+            f'<ul class="top-jd-dtl clearfix"><li>Pune</li><li>0 - 3 yrs</li></ul></li>'
+            for i in range(self.cards)
+        )
+        return f"<html><body><ul>{cards}</ul></body></html>"
+
+    def _detail(self, tag: str, css_class: str, key: str) -> str:
+        return f'<html><body><{tag} class="{css_class}">{self._description(key)}</{tag}></body></html>'
+
+
+def offline_scraper(scraper, adapter: FakeJobBoardAdapter):
+    """Point a scraper's requests.Session at the fake boards and drop its politeness delays"""
+    scraper.session.mount("https://", adapter)
+    scraper.session.mount("http://", adapter)
+    scraper.rate_limit = lambda: None
+    return scraper
+
+
+class _Message:
+    def __init__(self, content: str):
+        self.content = content
+        self.role = "assistant"
+
+
+class _Choice:
+    def __init__(self, content: str):
+        self.message = _Message(content)
+        self.finish_reason = "stop"
+        self.index = 0
+
+
+class _Completion:
+    def __init__(self, content: str):
+        self.choices = [_Choice(content)]
+
+
+class _Completions:
+    def __init__(self, owner: "FakeOpenAI"):
+        self.owner = owner
+
+    def create(self, **kwargs):
+        self.owner.calls += 1
+        prompt = " ".join(m.get("content", "") for m in kwargs.get("messages", []))
+        return _Completion(self.owner.respond(prompt))
+
+
+class FakeOpenAI:
+    """
+    Minimal OpenAI client: chat.completions.create() answers with the known
+    skills that appear in the prompt, as {"technical_skills": [...]} JSON.
+    """
+
+    def __init__(self, skills: List[str] = None):
+        self.skills = skills or TECH_SKILLS
+        self.calls = 0
+        self.chat = types.SimpleNamespace(completions=_Completions(self))
+
+    def with_options(self, **kwargs):
+        return self
+
+    def respond(self, prompt: str) -> str:
+        lower = prompt.lower()
+        found = [s for s in self.skills if re.search(r"(?<![a-z0-9])" + re.escape(s.lower()) + r"(?![a-z0-9])", lower)]
+        return json.dumps({"technical_skills": found, "skills": found})
+
+
+class FakeSentenceTransformer:
+    """Deterministic hashed bag-of-trigrams embedder with the encode() signature the app uses"""
+
+    def __init__(self, model_name: str = "fake", dim: int = 384, **kwargs):
+        self.model_name = model_name
+        self.dim = dim
+
+    def encode(self, sentences, normalize_embeddings: bool = False, convert_to_numpy: bool = True, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            padded = f"  {text.lower()}  "
+            for i in range(len(padded) - 2):
+                bucket = int(hashlib.md5(padded[i:i + 3].encode("utf-8")).hexdigest()[:8], 16)
+                out[row, bucket % self.dim] += 1.0 if bucket & 1 else -1.0
+        if normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            out = out / np.where(norms == 0, 1.0, norms)
+        return out[0] if single else out
+
+
+def cos_sim(a, b) -> np.ndarray:
+    a = np.atleast_2d(np.asarray(a, dtype=np.float32))
+    b = np.atleast_2d(np.asarray(b, dtype=np.float32))
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return a @ b.T
+
+
+def install_fake_embedder(force: bool = True) -> bool:
+    """
+    Register a fake ``sentence_transformers`` module so importing the apps does not
+    load torch or download MiniLM. With force=False the real package is kept when present.
+    Returns True when the fake is in use.
+    """
+    if not force:
+        try:
+            import sentence_transformers  # noqa: F401
+            return False
+        except ImportError:
+            pass
+    module = types.ModuleType("sentence_transformers")
+    module.SentenceTransformer = FakeSentenceTransformer
+    module.util = types.SimpleNamespace(cos_sim=cos_sim)
+    sys.modules["sentence_transformers"] = module
+    return True
+
@@ -0,0 +1,206 @@
+"""
+Offline benchmark runner for Skill-Twin Engine
+
+    python -m benchmarks.run                      # compare against benchmarks/baselines/baseline.json
+    python -m benchmarks.run --update-baseline    # record a new baseline
+    python -m benchmarks.run --scales small --only compute_gaps,validate_skills
+
+Exits with status 1 when a benchmark is slower than its baseline by more than --threshold.
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+ENGINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ENGINE_DIR, "backend")
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+DEFAULT_BASELINE = os.path.join(BASELINE_DIR, "baseline.json")
+
+sys.path.insert(0, ENGINE_DIR)
+
+from benchmarks import fakes
+from benchmarks.synthetic import ROLES, SCALES, make_dataset
+
+
+def load_backend():
+    """Import backend/app.py under its own module name, with offline settings"""
+    os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+    os.environ.setdefault("RESUME_QUEUE_DB", os.path.join(tempfile.gettempdir(), "skilltwin_bench_queue.sqlite3"))
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    spec = importlib.util.spec_from_file_location("skill_twin_backend", os.path.join(BACKEND_DIR, "app.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.client = fakes.FakeOpenAI()
+    return module
+
+
+def build_benchmarks(data: Dict, backend) -> Dict[str, Callable[[], object]]:
+    """name -> zero-argument callable for one scale"""
+    from simple_job_analyzer import SimpleJobMarketAnalyzer
+    from real_job_api_integration import JobAPIIntegration, RealJobSkillTwin
+    from real_job_integration import RealJobMarketAnalyzer
+    from real_job_scraper import RealJobScraper
+    from advanced_job_scraper import AdvancedJobScraper
+    from robust_job_scraper import RobustJobScraper
+
+    documents = data["resumes"] + data["job_descriptions"]
+    description_jobs = [{"description": d} for d in data["job_descriptions"]]
+    jobs = data["sizes"]["jobs"]
+
+    simple = SimpleJobMarketAnalyzer()
+    job_api = JobAPIIntegration()
+    real_twin = RealJobSkillTwin()
+    difflib_analyzer = RealJobMarketAnalyzer()
+
+    def scraper(cls):
+        return fakes.offline_scraper(cls(), fakes.FakeJobBoardAdapter(data["job_descriptions"], cards=jobs))
+
+    real_scraper = scraper(RealJobScraper)
+    advanced_scraper = scraper(AdvancedJobScraper)
+    robust_scraper = scraper(RobustJobScraper)
+
+    def substring_matcher():
+        # Market data is simulated with the global RNG; pin it so every repeat does the same work
+        random.seed(0)
+        return real_twin.analyze_with_real_market(data["student_skills"], ROLES[0], data["curriculum"])
+
+    return {
+        "simple_skill_extractor": lambda: [simple.simple_skill_extractor(d) for d in documents],
+        "extract_skills_from_real_descriptions": lambda: job_api.extract_skills_from_real_descriptions(description_jobs),
+        "difflib_matcher": lambda: difflib_analyzer.compare_with_curriculum(data["market_skills"], data["curriculum"]),
+        "substring_matcher": substring_matcher,
+        "compute_gaps": lambda: backend.compute_gaps(data["market_skills"], data["student_skills"] + data["curriculum"]),
+        "validate_skills": lambda: backend.validate_skills(data["extracted_skills"]),
+        "extract_skills_llm_path": lambda: [backend.extract_skills(r, "resume") for r in data["resumes"][:20]],
+        "aggregate_job_data[real]": lambda: real_scraper.aggregate_job_data(ROLES[0], "India", limit=jobs),
+        "aggregate_job_data[advanced]": lambda: advanced_scraper.aggregate_job_data(ROLES[0], "India", limit=jobs),
+        "aggregate_real_job_data[robust]": lambda: robust_scraper.aggregate_real_job_data(ROLES[0], "India", limit=jobs)
+    }
+
+
+def time_call(func: Callable, repeat: int) -> Dict:
+    func()  # warm-up: imports, regex compilation, first-touch allocations
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return {
+        "median_s": round(statistics.median(samples), 6),
+        "min_s": round(min(samples), 6),
+        "max_s": round(max(samples), 6),
+        "repeat": repeat
+    }
+
+
+def run(scales: List[str], repeat: int, seed: int, only: List[str] = None) -> Dict:
+    backend = load_backend()
+    results = {}
+    for scale in scales:
+        data = make_dataset(scale, seed)
+        for name, func in build_benchmarks(data, backend).items():
+            if only and name not in only:
+                continue
+            key = f"{name}@{scale}"
+            results[key] = time_call(func, repeat)
+            print(f"  {key:<48} median {results[key]['median_s'] * 1000:9.3f} ms")
+    return results
+
+
+def compare(results: Dict, baseline: Dict, threshold: float, min_delta: float) -> List[Dict]:
+    """Benchmarks whose median grew by more than threshold (and min_delta seconds) over the baseline"""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        before, after = previous["median_s"], current["median_s"]
+        if after > before * (1 + threshold) and after - before > min_delta:
+            regressions.append({"benchmark": key, "baseline_s": before, "current_s": after,
+                                "slowdown": round(after / before, 2) if before else None})
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline Skill-Twin benchmarks")
+    parser.add_argument("--scales", default=",".join(SCALES), help="comma separated: " + ", ".join(SCALES))
+    parser.add_argument("--only", default="", help="comma separated benchmark names")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore slowdowns smaller than this")
+    parser.add_argument("--output", help="also write this run's results to a JSON file")
+    parser.add_argument("--real-embedder", action="store_true",
+                        help="use the installed sentence-transformers model instead of the hashed fake")
+    args = parser.parse_args(argv)
+
+    if not args.real_embedder:
+        fakes.install_fake_embedder()
+        # A snapshot built with the real model would mix real and fake vectors
+        os.environ["SKILL_TWIN_SNAPSHOT"] = "0"
+    # The scrapers configure INFO logging at import; per-request log lines would dominate the timings
+    logging.disable(logging.INFO)
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    only = [s.strip() for s in args.only.split(",") if s.strip()]
+    print(f"🏁 Running benchmarks (scales: {', '.join(scales)}, repeat: {args.repeat})")
+    results = run(scales, args.repeat, args.seed, only)
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "embedder": "real" if args.real_embedder else "fake"
+        },
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        baseline = {"meta": report["meta"], "results": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline["results"] = json.load(f).get("results", {})
+        baseline["results"].update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"💾 Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠️ No baseline at {args.baseline}; run with --update-baseline first")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = compare(results, baseline.get("results", {}), args.threshold, args.min_delta_ms / 1000.0)
+    if not regressions:
+        print(f"✅ No regressions beyond {args.threshold:.0%} of {os.path.basename(args.baseline)}")
+        return 0
+    print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+    for r in regressions:
+        print(f"  {r['benchmark']:<48} {r['baseline_s'] * 1000:9.3f} ms -> {r['current_s'] * 1000:9.3f} ms "
+              f"(x{r['slowdown']})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Seeded synthetic inputs for the benchmarks
+Resumes, job descriptions and curricula built from giet_cse_skills.json and the scrapers' skill lists
+"""
+
+import json
+import os
+import random
+from functools import lru_cache
+from typing import Dict, List
+
+ENGINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Keyword list shared by the scrapers' extractors
+TECH_SKILLS = [
+    "Python", "Java", "JavaScript", "React", "Angular", "Vue", "Node.js", "Express",
+    "SQL", "MySQL", "PostgreSQL", "MongoDB", "Redis", "AWS", "Azure", "GCP",
+    "Docker", "Kubernetes", "Git", "Linux", "Spring", "Django", "Flask",
+    "TensorFlow", "PyTorch", "Machine Learning", "Data Science", "API",
+    "REST", "GraphQL", "HTML", "CSS", "Bootstrap", "jQuery", "TypeScript",
+    "C++", "C#", "Go", "Rust", "Swift", "Kotlin", "PHP", "Ruby"
+]
+
+# Words that look like skills to an LLM but are not in any trusted list
+NOISE_SKILLS = ["Leadership", "MS Office", "Excel", "Figma", "Jira", "Tableau", "Hadoop", "Spark", "Scala", "Unity"]
+
+ROLES = ["Software Developer", "Full Stack Developer", "Data Scientist", "Machine Learning Engineer", "DevOps Engineer"]
+COMPANIES = ["Tech Solutions Pvt Ltd", "Digital Innovations", "Innovation Labs", "Future Technologies",
+             "Global Systems", "NextGen Solutions", "CloudNine Tech", "ByteWorks"]
+CITIES = ["Bangalore", "Hyderabad", "Pune", "Chennai", "Mumbai", "Noida", "Bhubaneswar"]
+
+FILLER = [
+    "We are looking for motivated graduates to join our engineering team.",
+    "You will work closely with product managers and senior engineers.",
+    "Good communication and problem-solving abilities are expected.",
+    "Freshers with a strong academic background are encouraged to apply.",
+    "The role involves writing clean, testable and maintainable code.",
+    "Exposure to agile delivery and code reviews is a plus."
+]
+
+# Fixed sizes per scale; every benchmark derives its inputs from these
+SCALES = {
+    "small": {"documents": 10, "skills": 8, "curriculum": 20, "jobs": 6},
+    "medium": {"documents": 100, "skills": 20, "curriculum": 45, "jobs": 30},
+    "large": {"documents": 1000, "skills": 40, "curriculum": 90, "jobs": 120}
+}
+
+
+@lru_cache(maxsize=1)
+def _curriculum_skills() -> tuple:
+    with open(os.path.join(ENGINE_DIR, "giet_cse_skills.json"), encoding="utf-8") as f:
+        data = json.load(f)
+    skills = list(data.get("overall_technical_skills", []))
+    for subjects in data.get("by_semester", {}).values():
+        skills.extend(subjects)
+    for subjects in data.get("specializations", {}).values():
+        if isinstance(subjects, list):
+            skills.extend(subjects)
+    return tuple(dict.fromkeys(skills))
+
+
+def load_curriculum_skills() -> List[str]:
+    """Technical skills and semester subjects from giet_cse_skills.json"""
+    return list(_curriculum_skills())
+
+
+def make_curriculum(rng: random.Random, size: int) -> List[str]:
+    """A curriculum of ``size`` entries: the GIET list, then numbered electives"""
+    base = load_curriculum_skills()
+    curriculum = list(base)
+    while len(curriculum) < size:
+        curriculum.append(f"{rng.choice(base)} Elective {len(curriculum) - len(base) + 1}")
+    rng.shuffle(curriculum)
+    return curriculum[:size]
+
+
+def make_skill_list(rng: random.Random, size: int, noise: float = 0.15) -> List[str]:
+    skills = []
+    pool = TECH_SKILLS + load_curriculum_skills()
+    for _ in range(size):
+        skills.append(rng.choice(NOISE_SKILLS) if rng.random() < noise else rng.choice(pool))
+    return list(dict.fromkeys(skills))
+
+
+def make_job_description(rng: random.Random, role: str, skill_count: int = 6) -> str:
+    skills = rng.sample(TECH_SKILLS, k=min(skill_count, len(TECH_SKILLS)))
+    sentences = [f"Hiring {role} at {rng.choice(COMPANIES)}, {rng.choice(CITIES)}."]
+    sentences.append(f"Required skills: {', '.join(skills)}.")
+    sentences.extend(rng.sample(FILLER, k=3))
+    sentences.append(f"Experience: {rng.randint(0, 3)}-{rng.randint(3, 6)} years.")
+    return " ".join(sentences)
+
+
+def make_resume_text(rng: random.Random, skill_count: int) -> str:
+    skills = make_skill_list(rng, skill_count)
+    return (
+        f"Student, B.Tech CSE, GIET University. CGPA {rng.uniform(6.5, 9.8):.2f}.\n"
+        f"Skills: {', '.join(skills)}\n"
+        f"Projects: Built a {rng.choice(ROLES).lower()} portfolio project using {rng.choice(TECH_SKILLS)} "
+        f"and {rng.choice(TECH_SKILLS)}.\n"
+        f"Internship: {rng.choice(COMPANIES)} ({rng.randint(1, 6)} months)."
+    )
+
+
+def make_jobs(rng: random.Random, count: int) -> List[Dict]:
+    """Job dicts shaped like the scrapers' output (title, company, description, skills...)"""
+    jobs = []
+    for i in range(count):
+        role = rng.choice(ROLES)
+        skills = rng.sample(TECH_SKILLS, k=6)
+        jobs.append({
+            "title": f"{role} - Fresher",
+            "company": rng.choice(COMPANIES),
+            "location": rng.choice(CITIES),
+            "description": make_job_description(rng, role),
+            "skills": skills,
+            "url": f"https://example.com/jobs/{i}",
+            "source": "Synthetic"
+        })
+    return jobs
+
+
+def make_dataset(scale: str, seed: int = 42) -> Dict:
+    """Every benchmark input for one scale; identical for identical (scale, seed)"""
+    sizes = SCALES[scale]
+    rng = random.Random(f"{seed}:{scale}")
+    return {
+        "scale": scale,
+        "sizes": sizes,
+        "resumes": [make_resume_text(rng, sizes["skills"]) for _ in range(sizes["documents"])],
+        "job_descriptions": [make_job_description(rng, rng.choice(ROLES)) for _ in range(sizes["documents"])],
+        "jobs": make_jobs(rng, sizes["jobs"]),
+        "student_skills": make_skill_list(rng, sizes["skills"]),
+        "market_skills": make_skill_list(rng, sizes["skills"], noise=0.0),
+        "extracted_skills": make_skill_list(rng, sizes["skills"] * 3, noise=0.3),
+        "curriculum": make_curriculum(rng, sizes["curriculum"])
+    }
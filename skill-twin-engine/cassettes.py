@@ -0,0 +1,383 @@
+"""
+Record/Replay Cassettes for Skill-Twin Engine
+Captures job-board HTTP responses and OpenAI chat completions once, then serves them offline
+with recorded or synthetic latency so scraper and LLM pipelines can be re-run reproducibly
+"""
+
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Replay found no recording for a request; callers see it as a connection failure"""
+
+
+def http_key(method: str, url: str, body=None) -> str:
+    """Method + URL with sorted query parameters + body hash; headers are ignored"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    normalized = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+    key = f"http:{method.upper()} {normalized}"
+    if body:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        key += " " + hashlib.sha256(body).hexdigest()[:16]
+    return key
+
+
+def llm_key(kwargs: Dict) -> str:
+    """Chat request fields that change the answer; transport options like stream/timeout are dropped"""
+    relevant = {k: v for k, v in kwargs.items() if k not in ("stream", "timeout", "extra_headers", "stream_options")}
+    payload = json.dumps(relevant, sort_keys=True, default=str)
+    return f"llm:{relevant.get('model', '')}:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CassetteStore:
+    """
+    Gzip-compressed JSON file of recorded interactions. Each key holds a list of
+    recordings; replay serves them in order and wraps around, so a page fetched
+    three times replays the three recorded responses.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        self._cursor = {}
+        self._lock = threading.Lock()
+        self.dirty = False
+        self.stats = {"recorded": 0, "replayed": 0, "misses": 0}
+        if os.path.exists(path):
+            self.load()
+
+    def load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"{self.path}: unsupported cassette version {data.get('version')}")
+        self.entries = data.get("entries", {})
+
+    def save(self):
+        with self._lock:
+            if not self.dirty:
+                return
+            payload = {"version": CASSETTE_VERSION, "saved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                       "entries": self.entries}
+            self.dirty = False
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self.path)
+
+    def add(self, key: str, entry: Dict):
+        with self._lock:
+            self.entries.setdefault(key, []).append(entry)
+            self.stats["recorded"] += 1
+            self.dirty = True
+
+    def next(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            recordings = self.entries.get(key)
+            if not recordings:
+                self.stats["misses"] += 1
+                return None
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+            self.stats["replayed"] += 1
+            return recordings[index % len(recordings)]
+
+
+class LatencyModel:
+    """
+    How long a replayed interaction waits before answering:
+    "none" (as fast as possible), "recorded" (the captured time, times ``scale``)
+    or a number of seconds (synthetic, identical for every call)
+    """
+
+    def __init__(self, mode: Union[str, float] = "none", scale: float = 1.0):
+        self.mode = mode
+        self.scale = scale
+
+    @classmethod
+    def parse(cls, spec: str, scale: float = 1.0) -> "LatencyModel":
+        try:
+            return cls(float(spec), scale)
+        except (TypeError, ValueError):
+            return cls(spec or "none", scale)
+
+    def wait(self, recorded: float):
+        if self.mode == "none":
+            return
+        delay = recorded * self.scale if self.mode == "recorded" else float(self.mode)
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _encode_body(content: bytes) -> Dict:
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(entry: Dict) -> bytes:
+    if "text" in entry:
+        return entry["text"].encode("utf-8")
+    return base64.b64decode(entry.get("base64", ""))
+
+
+class CassetteAdapter(HTTPAdapter):
+    """requests transport adapter that records real responses or replays stored ones"""
+
+    def __init__(self, cassette: "Cassette", **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        key = http_key(request.method, request.url, request.body)
+        if self.cassette.mode == "replay":
+            entry = self.cassette.store.next(key)
+            if entry is None:
+                raise CassetteMiss(f"No recording for {key}", request=request)
+            self.cassette.latency.wait(entry.get("elapsed", 0.0))
+            return self._build(request, entry)
+
+        started = time.perf_counter()
+        response = super().send(request, **kwargs)
+        entry = {
+            "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items()
+                        if k.lower() not in ("content-encoding", "transfer-encoding", "content-length", "set-cookie")},
+            "url": response.url,
+            "elapsed": round(time.perf_counter() - started, 4)
+        }
+        entry.update(_encode_body(response.content))
+        self.cassette.store.add(key, entry)
+        return response
+
+    def _build(self, request, entry: Dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.headers.update(entry.get("headers", {}))
+        response._content = _decode_body(entry)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers) or "utf-8"
+        response.url = entry.get("url", request.url)
+        response.request = request
+        response.reason = "Replayed"
+        return response
+
+
+class _Obj:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+def _completion(entry: Dict):
+    message = _Obj(role="assistant", content=entry["content"])
+    choice = _Obj(index=0, message=message, finish_reason=entry.get("finish_reason", "stop"))
+    return _Obj(id="chatcmpl-replay", model=entry.get("model"), choices=[choice], usage=entry.get("usage"))
+
+
+class _ReplayStream:
+    """Iterable of chat.completion.chunk-like objects with a close() like the SDK's Stream"""
+
+    def __init__(self, content: str, pieces: int = 8):
+        size = max(1, len(content) // pieces)
+        self._parts = [content[i:i + size] for i in range(0, len(content), size)] or [""]
+
+    def __iter__(self):
+        for part in self._parts:
+            yield _Obj(choices=[_Obj(index=0, delta=_Obj(content=part, role=None), finish_reason=None)])
+        yield _Obj(choices=[_Obj(index=0, delta=_Obj(content=None, role=None), finish_reason="stop")])
+
+    def close(self):
+        pass
+
+
+class _CassetteCompletions:
+    def __init__(self, owner: "CassetteOpenAI"):
+        self.owner = owner
+
+    def create(self, **kwargs):
+        cassette = self.owner.cassette
+        key = llm_key(kwargs)
+        stream = kwargs.get("stream", False)
+
+        if cassette.mode == "replay":
+            entry = cassette.store.next(key)
+            if entry is None:
+                raise CassetteMiss(f"No recording for {key}")
+            cassette.latency.wait(entry.get("elapsed", 0.0))
+            return _ReplayStream(entry["content"]) if stream else _completion(entry)
+
+        started = time.perf_counter()
+        real = self.owner.client.with_options(**self.owner.options) if self.owner.options else self.owner.client
+        response = real.chat.completions.create(**kwargs)
+        if stream:
+            # Drain the live stream so the whole answer is recorded, then hand back a replay of it
+            parts = []
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+            entry = {"content": "".join(parts), "model": kwargs.get("model")}
+        else:
+            usage = getattr(response, "usage", None)
+            entry = {
+                "content": response.choices[0].message.content,
+                "finish_reason": response.choices[0].finish_reason,
+                "model": getattr(response, "model", kwargs.get("model")),
+                "usage": usage.model_dump() if hasattr(usage, "model_dump") else None
+            }
+        entry["elapsed"] = round(time.perf_counter() - started, 4)
+        cassette.store.add(key, entry)
+        return _ReplayStream(entry["content"]) if stream else response
+
+
+class CassetteOpenAI:
+    """Drop-in for the OpenAI client as used through llm_gateway (with_options + chat.completions.create)"""
+
+    def __init__(self, cassette: "Cassette", client=None, options: Optional[Dict] = None):
+        self.cassette = cassette
+        self.client = client
+        self.options = options or {}
+        self.chat = _Obj(completions=_CassetteCompletions(self))
+
+    def with_options(self, **options):
+        return CassetteOpenAI(self.cassette, self.client, dict(self.options, **options))
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str = "replay", latency: Optional[LatencyModel] = None):
+        if mode not in ("record", "replay"):
+            raise ValueError("mode must be 'record' or 'replay'")
+        self.mode = mode
+        self.store = CassetteStore(path)
+        self.latency = latency or LatencyModel()
+        self._original_session_init = None
+
+    def mount(self, session: requests.Session) -> requests.Session:
+        adapter = CassetteAdapter(self)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def wrap(self, client) -> CassetteOpenAI:
+        return CassetteOpenAI(self, client)
+
+    def install(self):
+        """Mount the cassette on every requests.Session created from now on"""
+        if self._original_session_init is not None:
+            return
+        original = requests.Session.__init__
+        cassette = self
+
+        def patched_init(session, *args, **kwargs):
+            original(session, *args, **kwargs)
+            cassette.mount(session)
+
+        self._original_session_init = original
+        requests.Session.__init__ = patched_init
+
+    def uninstall(self):
+        if self._original_session_init is not None:
+            requests.Session.__init__ = self._original_session_init
+            self._original_session_init = None
+
+    def save(self):
+        if self.mode == "record":
+            self.store.save()
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, *exc):
+        self.uninstall()
+        self.save()
+        return False
+
+
+def from_env() -> Optional[Cassette]:
+    """
+    SKILL_TWIN_CASSETTE=<file.json.gz> enables cassettes; SKILL_TWIN_CASSETTE_MODE=record|replay
+    (default replay); SKILL_TWIN_CASSETTE_LATENCY=none|recorded|<seconds>. Recordings are saved at exit.
+    """
+    path = os.getenv("SKILL_TWIN_CASSETTE")
+    if not path:
+        return None
+    cassette = Cassette(
+        path,
+        mode=os.getenv("SKILL_TWIN_CASSETTE_MODE", "replay"),
+        latency=LatencyModel.parse(os.getenv("SKILL_TWIN_CASSETTE_LATENCY", "none"),
+                                   float(os.getenv("SKILL_TWIN_CASSETTE_LATENCY_SCALE", "1.0")))
+    )
+    cassette.install()
+    atexit.register(cassette.save)
+    print(f"📼 Cassette {cassette.mode}: {path}")
+    return cassette
+
+
+def _scraper_pipelines(role: str, location: str, limit: int, use_llm: bool) -> List:
+    from real_job_scraper import RealJobScraper
+    from robust_job_scraper import RobustJobScraper
+    from job_scraper import JobScraper
+
+    pipelines = [
+        ("RealJobScraper.aggregate_job_data", RealJobScraper(), lambda s: s.aggregate_job_data(role, location, limit)),
+        ("RobustJobScraper.aggregate_real_job_data", RobustJobScraper(),
+         lambda s: s.aggregate_real_job_data(role, location, limit))
+    ]
+    if use_llm:
+        pipelines.append(("JobScraper.get_job_skills_for_role", JobScraper(),
+                          lambda s: s.get_job_skills_for_role(role, location, max(1, limit // 4))))
+    return pipelines
+
+
+if __name__ == "__main__":
+    import argparse
+    import logging
+
+    parser = argparse.ArgumentParser(description="Record or replay the scraper pipelines through a cassette")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--cassette", default="cassettes/scrapers.json.gz")
+    parser.add_argument("--role", default="Software Developer")
+    parser.add_argument("--location", default="India")
+    parser.add_argument("--limit", type=int, default=12)
+    parser.add_argument("--latency", default="none", help="replay latency: none, recorded or seconds")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--runs", type=int, default=3, help="replay repetitions for the throughput figure")
+    parser.add_argument("--llm", action="store_true", help="also run JobScraper, which calls OpenAI per posting")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    cassette = Cassette(args.cassette, args.mode, LatencyModel.parse(args.latency, args.latency_scale))
+    with cassette:
+        if args.llm:
+            import job_scraper
+            job_scraper.client = cassette.wrap(job_scraper.client)
+        runs = 1 if args.mode == "record" else args.runs
+        for name, scraper, pipeline in _scraper_pipelines(args.role, args.location, args.limit, args.llm):
+            if args.mode == "replay":
+                # Politeness delays only matter against the real sites
+                scraper.rate_limit = lambda: None
+            started = time.perf_counter()
+            for _ in range(runs):
+                result = pipeline(scraper)
+            elapsed = (time.perf_counter() - started) / runs
+            jobs = result.get("aggregation", {}).get("total_jobs_found", result.get("total_jobs_found", "?"))
+            print(f"{name:<42} {elapsed * 1000:9.1f} ms/run  jobs={jobs}")
+
+    print(f"📼 {args.mode}: {cassette.store.stats}")
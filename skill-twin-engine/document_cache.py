@@ -0,0 +1,200 @@
+"""
+Document Cache for Skill-Twin Engine
+Extraction results for uploaded PDFs keyed by the SHA-256 of the file bytes.
+Streamlit reruns, repeat uploads (every student's copy of the GIET syllabus) and
+/api/parse-resume reuse page text, skills and the quality report instead of
+re-running pdfplumber and the LLM.
+
+    SKILL_TWIN_DOC_CACHE=/path/to/cache.sqlite3   # default: document_cache.sqlite3 here
+    SKILL_TWIN_DOC_CACHE=off                      # disable
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from typing import Callable, Dict, Optional, Tuple
+
+import llm_gateway
+import metrics
+
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(ENGINE_DIR, "document_cache.sqlite3")
+# Bump when extraction (prompt, validation, record layout) changes; old rows are then never read
+EXTRACTOR_VERSION = 5
+
+
+def digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class DocumentCache:
+    """
+    SQLite table of extraction records with an in-process LRU in front.
+    Concurrent misses for the same document wait for the first one instead
+    of parsing it again.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_PATH, memory_entries: int = 128, max_entries: int = 5000):
+        self.db_path = db_path
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "uncached": 0, "waited": 0}
+        self._init_db()
+
+    @classmethod
+    def from_env(cls) -> Optional["DocumentCache"]:
+        path = os.getenv("SKILL_TWIN_DOC_CACHE", DEFAULT_PATH)
+        if path.lower() in ("", "0", "off", "false", "no"):
+            return None
+        return cls(path)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def _init_db(self):
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    key TEXT PRIMARY KEY,
+                    record TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    used_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_used ON documents (used_at)")
+
+    @staticmethod
+    def key(sha256: str, namespace: str, label: str) -> str:
+        """
+        Same bytes parsed as a resume and as a syllabus, by another app, or under another
+        SKILL_TWIN_EXTRACTION mode / confidence threshold are separate entries
+        """
+        # Imported here so opening the cache does not build the extractor's taxonomy imports
+        from tiered_extractor import config_key
+        return f"v{EXTRACTOR_VERSION}:{config_key()}:{namespace}:{label}:{sha256}"
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            record = self._memory.get(key)
+            if record is not None:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return record
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT record FROM documents WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE documents SET used_at = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+        record = json.loads(row[0])
+        with self._lock:
+            self._counters["disk_hits"] += 1
+        self._remember(key, record)
+        return record
+
+    def put(self, key: str, record: Dict):
+        body = json.dumps(record, ensure_ascii=False)
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documents (key, record, size, created_at, used_at) VALUES (?, ?, ?, ?, ?)",
+                (key, body, len(body), now, now)
+            )
+            # Least recently used rows go first once the table is full
+            conn.execute(
+                "DELETE FROM documents WHERE key IN "
+                "(SELECT key FROM documents ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+        self._remember(key, record)
+
+    def _remember(self, key: str, record: Dict):
+        with self._lock:
+            self._memory[key] = record
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get_or_compute(self, data: bytes, label: str, compute: Callable[[bytes], Dict],
+                       namespace: str = "default") -> Tuple[Dict, bool]:
+        """
+        (record, cached) for the document. ``compute(data)`` runs at most once per
+        document at a time; its record is only stored when no LLM call inside it
+        fell back to a cached or local answer or returned a completion that did not
+        parse (llm_gateway.mark_fallback), so degraded results are retried later.
+        """
+        key = self.key(digest(data), namespace, label)
+        record = self.get(key)
+        if record is not None:
+            metrics.record_cache("document", True)
+            return record, True
+
+        with self._lock:
+            event = self._in_flight.get(key)
+            owner = event is None
+            if owner:
+                event = self._in_flight[key] = threading.Event()
+        if not owner:
+            event.wait()
+            record = self.get(key)
+            if record is not None:
+                with self._lock:
+                    self._counters["waited"] += 1
+                metrics.record_cache("document", True)
+                return record, True
+            # The first caller's result was not cacheable; parse it ourselves
+
+        metrics.record_cache("document", False)
+        try:
+            with llm_gateway.track_fallbacks() as fallbacks:
+                record = compute(data)
+            with self._lock:
+                self._counters["misses" if not fallbacks else "uncached"] += 1
+            if not fallbacks:
+                self.put(key, record)
+            return record, False
+        finally:
+            if owner:
+                with self._lock:
+                    self._in_flight.pop(key, None)
+                event.set()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM documents")
+
+    def stats(self) -> Dict:
+        with closing(self._connect()) as conn:
+            entries, size, hits = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM documents"
+            ).fetchone()
+        with self._lock:
+            counters = dict(self._counters)
+            memory = len(self._memory)
+        return {"entries": entries, "bytes": size, "stored_hits": hits, "memory_entries": memory, **counters}
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> Optional[DocumentCache]:
+    """Process-wide cache (None when disabled); lives in this module so Streamlit reruns keep it"""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = DocumentCache.from_env() or False
+    return _default or None
@@ -0,0 +1,429 @@
+"""
+Embedding Micro-batching Service for Skill-Twin Engine
+One process holds the only MiniLM copy; Flask workers send encode requests over a
+Unix socket. Requests arriving within a short window are coalesced into a single
+forward pass and results come back through multiprocessing.shared_memory buffers.
+
+    python embedding_service.py serve --socket /tmp/skilltwin-embed.sock
+    SKILL_TWIN_EMBEDDING_SOCKET=/tmp/skilltwin-embed.sock python backend/app.py
+    python embedding_service.py stats --socket /tmp/skilltwin-embed.sock
+"""
+
+import argparse
+import json
+import os
+import queue
+import signal
+import socket
+import threading
+import time
+from collections import deque
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List
+
+import numpy as np
+
+import metrics
+
+DEFAULT_SOCKET = os.getenv("SKILL_TWIN_EMBEDDING_SOCKET", "/tmp/skilltwin-embed.sock")
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_WINDOW_MS = 5.0
+DEFAULT_MAX_BATCH = 256
+# After a failed connect, workers use their local fallback for this long before retrying
+RECONNECT_SECONDS = 30.0
+
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+RPC_SECONDS = metrics.histogram("skilltwin_embedding_rpc_seconds", "Round trip of encode calls to the embedding service",
+                                ["outcome"])
+
+
+class _Request:
+    __slots__ = ("texts", "normalize", "enqueued", "done", "result", "error", "queue_seconds")
+
+    def __init__(self, texts: List[str], normalize: bool):
+        self.texts = texts
+        self.normalize = normalize
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.queue_seconds = 0.0
+
+
+def _percentiles(samples, points=(50, 95, 99)) -> Dict:
+    if not samples:
+        return {}
+    values = np.asarray(samples, dtype=np.float64) * 1000.0
+    summary = {f"p{p}": round(float(np.percentile(values, p)), 3) for p in points}
+    summary["max"] = round(float(values.max()), 3)
+    return summary
+
+
+def _bucket_label(size: int) -> str:
+    """'1', '2', '3-4', '5-8', ... for the batch-size distribution"""
+    previous = 0
+    for bound in BATCH_BUCKETS:
+        if size <= bound:
+            return str(bound) if bound == previous + 1 else f"{previous + 1}-{bound}"
+        previous = bound
+    return f"{previous + 1}+"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class EmbeddingServer:
+    """Unix-socket server that coalesces concurrent encode requests into batched forward passes"""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, model_name: str = DEFAULT_MODEL,
+                 window_ms: float = DEFAULT_WINDOW_MS, max_batch: int = DEFAULT_MAX_BATCH, model=None):
+        self.socket_path = socket_path
+        self.model_name = model_name
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.model = model
+        self._queue = queue.Queue()
+        self._stopping = threading.Event()
+        self._listener = None
+        self._stats_lock = threading.Lock()
+        self._counts = {"batches": 0, "requests": 0, "texts": 0, "unique_texts": 0, "errors": 0}
+        self._queue_samples = deque(maxlen=2048)
+        self._encode_samples = deque(maxlen=2048)
+        self._distribution = {}
+
+        self.registry = metrics.Registry()
+        self._batch_texts = self.registry.histogram(
+            "skilltwin_embedding_batch_texts", "Texts per batched forward pass", buckets=BATCH_BUCKETS)
+        self._batch_requests = self.registry.histogram(
+            "skilltwin_embedding_batch_requests", "Encode requests coalesced per forward pass", buckets=BATCH_BUCKETS)
+        self._queue_seconds = self.registry.histogram(
+            "skilltwin_embedding_queue_seconds", "Time a request waited before its batch started")
+        self._encode_seconds = self.registry.histogram(
+            "skilltwin_embedding_encode_seconds", "Duration of one batched forward pass")
+
+    # ----------------------------------------------------------------- serving
+
+    def start(self):
+        """Load the model, bind the socket and start the batcher/acceptor threads"""
+        if self.model is None:
+            from lazy_models import get_embedder
+            self.model = get_embedder(self.model_name)
+        self._bind()
+        threading.Thread(target=self._batch_loop, name="embed-batcher", daemon=True).start()
+        threading.Thread(target=self._accept_loop, name="embed-accept", daemon=True).start()
+        return self
+
+    def serve_forever(self):
+        self.start()
+        # systemd/supervisor stop with SIGTERM; treat it like Ctrl+C so the socket file is removed
+        signal.signal(signal.SIGTERM, lambda *_: self._stopping.set())
+        print(f"🧠 Embedding service ({self.model_name}) on {self.socket_path}, "
+              f"window {self.window * 1000:.1f} ms, max batch {self.max_batch}")
+        try:
+            while not self._stopping.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self._stopping.set()
+        self._queue.put(None)
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def _bind(self):
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+                raise RuntimeError(f"Embedding service already running on {self.socket_path}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(self.socket_path)  # stale socket from a crashed server
+            finally:
+                probe.close()
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o660)
+        listener.listen(128)
+        self._listener = listener
+
+    def _accept_loop(self):
+        while not self._stopping.is_set():
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._handle_connection, args=(conn,), daemon=True).start()
+
+    def _handle_connection(self, conn: socket.socket):
+        """One worker connection: JSON lines in, JSON lines out, vectors in a per-connection shared buffer"""
+        buffer = None
+        reader = conn.makefile("rb")
+        try:
+            for line in reader:
+                try:
+                    message = json.loads(line)
+                    if message.get("op") == "stats":
+                        reply = self.stats()
+                    else:
+                        vectors, queue_seconds = self.encode(message.get("texts", []), bool(message.get("normalize")))
+                        if buffer is None or buffer.size < max(vectors.nbytes, 1):
+                            if buffer is not None:
+                                buffer.close()
+                                buffer.unlink()
+                            # Grow geometrically so steady traffic reuses one segment per connection
+                            size = max(vectors.nbytes, 2 * buffer.size if buffer is not None else 64 * 1024)
+                            buffer = shared_memory.SharedMemory(create=True, size=size)
+                        np.ndarray(vectors.shape, dtype=np.float32, buffer=buffer.buf)[...] = vectors
+                        reply = {"shm": buffer.name, "rows": vectors.shape[0], "dim": vectors.shape[1],
+                                 "queue_ms": round(queue_seconds * 1000.0, 3)}
+                except Exception as e:
+                    reply = {"error": f"{type(e).__name__}: {e}"}
+                conn.sendall(json.dumps(reply).encode("utf-8") + b"\n")
+        except OSError:
+            pass
+        finally:
+            reader.close()
+            conn.close()
+            if buffer is not None:
+                buffer.close()
+                buffer.unlink()
+
+    # ---------------------------------------------------------------- batching
+
+    def encode(self, texts: List[str], normalize: bool = False):
+        """Queue texts for the next batch and wait; returns (float32 vectors, seconds spent queued)"""
+        request = _Request([str(t) for t in texts], normalize)
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result, request.queue_seconds
+
+    def _collect(self, first: _Request) -> List[_Request]:
+        batch, size = [first], len(first.texts)
+        deadline = first.enqueued + self.window
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                # Past the window (the batcher was busy), still take everything already waiting
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _batch_loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            started = time.perf_counter()
+            for request in batch:
+                request.queue_seconds = started - request.enqueued
+
+            # Workers ask for the same skills all the time; encode each distinct text once
+            rows = {}
+            for request in batch:
+                for text in request.texts:
+                    rows.setdefault(text, len(rows))
+            try:
+                if rows:
+                    vectors = np.asarray(self.model.encode(list(rows)), dtype=np.float32)
+                else:
+                    vectors = np.zeros((0, 0), dtype=np.float32)
+                error = None
+            except Exception as e:
+                vectors, error = None, e
+            encode_seconds = time.perf_counter() - started
+
+            for request in batch:
+                if error is not None:
+                    request.error = error
+                elif request.texts:
+                    result = vectors[[rows[t] for t in request.texts]]
+                    request.result = _normalize(result) if request.normalize else result
+                else:
+                    request.result = np.zeros((0, vectors.shape[1] if vectors.ndim == 2 else 0), dtype=np.float32)
+                request.done.set()
+            self._record(batch, len(rows), encode_seconds, error is not None)
+
+    def _record(self, batch: List[_Request], unique: int, encode_seconds: float, failed: bool):
+        texts = sum(len(r.texts) for r in batch)
+        with self._stats_lock:
+            self._counts["batches"] += 1
+            self._counts["requests"] += len(batch)
+            self._counts["texts"] += texts
+            self._counts["unique_texts"] += unique
+            self._counts["errors"] += int(failed)
+            self._encode_samples.append(encode_seconds)
+            self._queue_samples.extend(r.queue_seconds for r in batch)
+            label = _bucket_label(unique)
+            self._distribution[label] = self._distribution.get(label, 0) + 1
+        self._batch_texts.observe(unique)
+        self._batch_requests.observe(len(batch))
+        self._encode_seconds.observe(encode_seconds)
+        for r in batch:
+            self._queue_seconds.observe(r.queue_seconds)
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            counts = dict(self._counts)
+            queue_samples = list(self._queue_samples)
+            encode_samples = list(self._encode_samples)
+            distribution = dict(sorted(self._distribution.items(), key=lambda kv: int(kv[0].split("-")[0].rstrip("+"))))
+        batches = counts["batches"] or 1
+        return {
+            "model": self.model_name,
+            "window_ms": self.window * 1000.0,
+            "max_batch": self.max_batch,
+            **counts,
+            "mean_requests_per_batch": round(counts["requests"] / batches, 2),
+            "mean_texts_per_batch": round(counts["unique_texts"] / batches, 2),
+            "batch_size_distribution": distribution,
+            "queue_ms": _percentiles(queue_samples),
+            "encode_ms": _percentiles(encode_samples),
+            "prometheus": self.registry.render()
+        }
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to the server's segment without letting this process's resource tracker unlink it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 always registers attached segments
+        segment = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(segment._name, "shared_memory")
+        return segment
+
+
+class EmbeddingClient:
+    """
+    encode() compatible client for the service. Each thread keeps its own connection.
+    When the service is unreachable, calls go to ``fallback`` (e.g. a LazyEmbedder).
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, fallback=None, timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.fallback = fallback
+        self.timeout = timeout
+        self._local = threading.local()
+        self._down_until = 0.0
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            conn = self._local.conn = (sock, sock.makefile("rb"), {})
+        return conn
+
+    def _drop_connection(self):
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            sock, reader, segments = conn
+            for segment in segments.values():
+                segment.close()
+            reader.close()
+            sock.close()
+
+    def _call(self, message: Dict) -> Dict:
+        try:
+            sock, reader, _ = self._connection()
+            sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+            line = reader.readline()
+            if not line:
+                raise ConnectionError("embedding service closed the connection")
+        except OSError:
+            self._drop_connection()
+            raise
+        reply = json.loads(line)
+        if "error" in reply:
+            raise RuntimeError(f"Embedding service error: {reply['error']}")
+        return reply
+
+    def _read_vectors(self, reply: Dict) -> np.ndarray:
+        segments = self._local.conn[2]
+        segment = segments.get(reply["shm"])
+        if segment is None:
+            # The server grew its buffer; the old segment is gone
+            for old in segments.values():
+                old.close()
+            segments.clear()
+            segment = segments[reply["shm"]] = _attach(reply["shm"])
+        view = np.ndarray((reply["rows"], reply["dim"]), dtype=np.float32, buffer=segment.buf)
+        # Copy out before the next request on this connection overwrites the buffer
+        return view.copy()
+
+    def encode(self, sentences, normalize_embeddings: bool = False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if time.monotonic() >= self._down_until:
+            started = time.perf_counter()
+            try:
+                vectors = self._read_vectors(self._call({"op": "encode", "texts": texts,
+                                                         "normalize": normalize_embeddings}))
+                RPC_SECONDS.observe(time.perf_counter() - started, outcome="ok")
+                return vectors[0] if single else vectors
+            except OSError as e:
+                RPC_SECONDS.observe(time.perf_counter() - started, outcome="unavailable")
+                if self.fallback is None:
+                    raise
+                print(f"⚠️ Embedding service unavailable ({e}); encoding locally for {RECONNECT_SECONDS:.0f}s")
+                self._down_until = time.monotonic() + RECONNECT_SECONDS
+        if self.fallback is None:
+            raise ConnectionError(f"Embedding service at {self.socket_path} is unavailable")
+        return self.fallback.encode(sentences, normalize_embeddings=normalize_embeddings, **kwargs)
+
+    def stats(self) -> Dict:
+        return self._call({"op": "stats"})
+
+    def close(self):
+        self._drop_connection()
+
+
+def remote_metrics() -> str:
+    """The service's Prometheus text when SKILL_TWIN_EMBEDDING_SOCKET points at a running service"""
+    socket_path = os.getenv("SKILL_TWIN_EMBEDDING_SOCKET")
+    if not socket_path:
+        return ""
+    client = EmbeddingClient(socket_path, timeout=2.0)
+    try:
+        return client.stats().get("prometheus", "")
+    except (OSError, RuntimeError, ValueError):
+        return ""
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared MiniLM embedding service with request coalescing")
+    parser.add_argument("command", choices=["serve", "stats"])
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--window-ms", type=float, default=DEFAULT_WINDOW_MS,
+                        help="how long the first request of a batch waits for company")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="texts per forward pass")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        EmbeddingServer(args.socket, args.model, args.window_ms, args.max_batch).serve_forever()
+    else:
+        summary = EmbeddingClient(args.socket).stats()
+        summary.pop("prometheus", None)
+        print(json.dumps(summary, indent=2))
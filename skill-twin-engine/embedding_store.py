@@ -0,0 +1,255 @@
+"""
+Compact Embedding Storage for Skill-Twin Engine
+float32 / float16 / per-row-scaled int8 matrices for the skill snapshot and other
+long-lived corpora. Similarity kernels read the compact rows block by block, so a full
+float32 copy is never materialised; int8 scores are rescaled per row after the block
+product. Gap matching (best_match below) takes such a store as is, or plain float rows
+freshly encoded for one request, which are matched in float32 rather than quantized per
+call. Large posting corpora are only exercised by the synthetic `report`.
+
+    python embedding_store.py report --rows 200000    # memory, speed, recall and drift vs float32
+    python embedding_store.py report --skills         # + gap / curriculum level agreement on skill strings
+    SKILL_TWIN_SNAPSHOT_DTYPE=int8 python skill_taxonomy.py build
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+STORAGE_DTYPES = ("float32", "float16", "int8")
+# Rows upcast per kernel step; keeps the float32 temporary cache-sized
+BLOCK_ROWS = 4096
+INT8_MAX = 127.0
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class EmbeddingStore:
+    """
+    Row matrix of embeddings in float32, float16 or int8 (+ one float32 scale per row).
+    ``keys`` optionally names the rows (skills, posting ids).
+    """
+
+    def __init__(self, data: np.ndarray, scales: Optional[np.ndarray] = None, keys: List[str] = None):
+        if data.dtype.name not in STORAGE_DTYPES:
+            raise ValueError(f"Unsupported storage dtype {data.dtype}; expected one of {', '.join(STORAGE_DTYPES)}")
+        if data.dtype == np.int8 and scales is None:
+            raise ValueError("int8 storage needs per-row scales")
+        self.data = data
+        self.scales = scales
+        self.keys = keys
+        self.index = {key: i for i, key in enumerate(keys)} if keys is not None else None
+
+    @classmethod
+    def from_float(cls, vectors, dtype: str = "float32", keys: List[str] = None,
+                   normalize: bool = False) -> "EmbeddingStore":
+        """Quantize float vectors; int8 uses a symmetric scale per row (max |v| -> 127)"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if normalize:
+            vectors = _normalize(vectors)
+        if dtype == "float32":
+            return cls(np.ascontiguousarray(vectors), keys=keys)
+        if dtype == "float16":
+            return cls(vectors.astype(np.float16), keys=keys)
+        if dtype == "int8":
+            scales = np.abs(vectors).max(axis=1) / INT8_MAX
+            scales[scales == 0] = 1.0
+            codes = np.clip(np.rint(vectors / scales[:, None]), -INT8_MAX, INT8_MAX).astype(np.int8)
+            return cls(codes, scales.astype(np.float32), keys=keys)
+        raise ValueError(f"Unsupported storage dtype {dtype!r}; expected one of {', '.join(STORAGE_DTYPES)}")
+
+    @property
+    def dtype(self) -> str:
+        return self.data.dtype.name
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.data.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def rows(self, indices) -> np.ndarray:
+        """Dequantized float32 rows"""
+        block = np.asarray(self.data[indices], dtype=np.float32)
+        if self.scales is not None:
+            block *= self.scales[indices][..., None]
+        return block
+
+    def to_float(self) -> np.ndarray:
+        return self.rows(slice(None))
+
+    def _blocks(self, block_rows: int = BLOCK_ROWS):
+        for start in range(0, len(self), block_rows):
+            stop = min(start + block_rows, len(self))
+            block = np.asarray(self.data[start:stop], dtype=np.float32)
+            yield start, stop, block
+
+    def scores(self, queries, block_rows: int = BLOCK_ROWS) -> np.ndarray:
+        """(queries x rows) dot products computed block-wise on the compact storage"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        out = np.empty((queries.shape[0], len(self)), dtype=np.float32)
+        for start, stop, block in self._blocks(block_rows):
+            out[:, start:stop] = queries @ block.T
+            if self.scales is not None:
+                out[:, start:stop] *= self.scales[start:stop]
+        return out
+
+    def best_match(self, queries, block_rows: int = BLOCK_ROWS) -> Tuple[np.ndarray, np.ndarray]:
+        """(best score, best row) per query, as compute_gaps needs; queries and rows should be unit length"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        best = np.full(queries.shape[0], -np.inf, dtype=np.float32)
+        best_row = np.zeros(queries.shape[0], dtype=np.int64)
+        for start, stop, block in self._blocks(block_rows):
+            sims = queries @ block.T
+            if self.scales is not None:
+                sims *= self.scales[start:stop]
+            rows = sims.argmax(axis=1)
+            values = sims[np.arange(len(rows)), rows]
+            better = values > best
+            best[better] = values[better]
+            best_row[better] = rows[better] + start
+        return best, best_row
+
+    def topk(self, queries, k: int = 10, block_rows: int = BLOCK_ROWS) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows, scores) of the k highest dot products per query, best first, streaming over blocks"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(k, len(self))
+        cand_rows = np.zeros((queries.shape[0], 0), dtype=np.int64)
+        cand_scores = np.zeros((queries.shape[0], 0), dtype=np.float32)
+        for start, stop, block in self._blocks(block_rows):
+            sims = queries @ block.T
+            if self.scales is not None:
+                sims *= self.scales[start:stop]
+            keep = min(k, sims.shape[1])
+            part = np.argpartition(-sims, keep - 1, axis=1)[:, :keep]
+            cand_rows = np.concatenate([cand_rows, part + start], axis=1)
+            cand_scores = np.concatenate([cand_scores, np.take_along_axis(sims, part, axis=1)], axis=1)
+            if cand_rows.shape[1] > k:
+                top = np.argpartition(-cand_scores, k - 1, axis=1)[:, :k]
+                cand_rows = np.take_along_axis(cand_rows, top, axis=1)
+                cand_scores = np.take_along_axis(cand_scores, top, axis=1)
+        order = np.argsort(-cand_scores, axis=1)
+        return np.take_along_axis(cand_rows, order, axis=1), np.take_along_axis(cand_scores, order, axis=1)
+
+    def save(self, path: str):
+        """Write <path> (.npy data) and, for int8, <path minus .npy>.scales.npy"""
+        np.save(path, self.data)
+        if self.scales is not None:
+            np.save(scales_path(path), self.scales)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, keys: List[str] = None) -> "EmbeddingStore":
+        mode = "r" if mmap else None
+        data = np.load(path, mmap_mode=mode)
+        scales = np.load(scales_path(path)) if data.dtype == np.int8 else None
+        return cls(data, scales, keys)
+
+
+def best_match(queries, rows) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (best cosine similarity, best row) of each query against ``rows``: what compute_gaps and
+    the curriculum comparisons need. ``rows`` is either an EmbeddingStore built once with
+    unit-length rows (a snapshot or corpus, matched in its own dtype) or float vectors
+    encoded for this call, which are only normalized.
+    """
+    queries = _normalize(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+    if not isinstance(rows, EmbeddingStore):
+        rows = EmbeddingStore(np.ascontiguousarray(_normalize(np.atleast_2d(np.asarray(rows, dtype=np.float32)))))
+    return rows.best_match(queries)
+
+
+def scales_path(path: str) -> str:
+    return (path[:-4] if path.endswith(".npy") else path) + ".scales.npy"
+
+
+def drift_report(reference: np.ndarray, store: EmbeddingStore, queries: np.ndarray, k: int = 10) -> Dict:
+    """Recall@k, top-1 agreement and score drift of a compact store against float32 brute force"""
+    reference = np.asarray(reference, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    exact = EmbeddingStore.from_float(reference)
+    exact_rows, exact_scores = exact.topk(queries, k)
+    started = time.perf_counter()
+    rows, scores = store.topk(queries, k)
+    elapsed = time.perf_counter() - started
+
+    recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(exact_rows, rows)])
+    # Drift of the same (query, row) pairs, not of the ranked lists
+    exact_pairs = np.einsum("qd,qkd->qk", queries, reference[rows])
+    drift = np.abs(exact_pairs - scores)
+    return {
+        "dtype": store.dtype,
+        "mb": round(store.nbytes / 1e6, 2),
+        "compression": round(reference.nbytes / store.nbytes, 2),
+        "topk_ms_per_query": round(elapsed * 1000.0 / len(queries), 3),
+        f"recall@{k}": round(float(recall), 4),
+        "top1_agreement": round(float(np.mean(rows[:, 0] == exact_rows[:, 0])), 4),
+        "max_score_drift": round(float(drift.max()), 5),
+        "mean_score_drift": round(float(drift.mean()), 5)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="float16 / int8 embedding storage: memory, speed, recall, drift")
+    parser.add_argument("command", choices=["report"])
+    parser.add_argument("--rows", type=int, default=200000, help="synthetic corpus rows (posting embeddings)")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--skills", action="store_true",
+                        help="also compare compute_gaps / curriculum levels on skill strings with the current encoder")
+    parser.add_argument("--output", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Clustered unit vectors: postings for the same role sit close together, like real embeddings
+    centers = _normalize(rng.standard_normal((256, args.dim)).astype(np.float32))
+    noise = rng.standard_normal((args.rows, args.dim)).astype(np.float32) * (1.4 / np.sqrt(args.dim))
+    corpus = _normalize(centers[rng.integers(0, len(centers), args.rows)] + noise).astype(np.float32)
+    jitter = rng.standard_normal((args.queries, args.dim)).astype(np.float32) * (0.1 / np.sqrt(args.dim))
+    queries = _normalize(corpus[rng.integers(0, args.rows, args.queries)] + jitter).astype(np.float32)
+
+    print(f"📦 {args.rows} x {args.dim} corpus, {args.queries} queries, top-{args.k}")
+    reports = []
+    for dtype in STORAGE_DTYPES:
+        report = drift_report(corpus, EmbeddingStore.from_float(corpus, dtype), queries, args.k)
+        reports.append(report)
+        print(f"  {dtype:<8} {report['mb']:>8} MB (x{report['compression']})  "
+              f"{report['topk_ms_per_query']:>7} ms/query  recall@{args.k} {report[f'recall@{args.k}']:.4f}  "
+              f"top-1 {report['top1_agreement']:.3f}  drift max {report['max_score_drift']} "
+              f"mean {report['mean_score_drift']}")
+
+    if args.skills:
+        from benchmarks.synthetic import make_dataset
+        from lazy_models import get_embedder
+        from onnx_encoder import gap_level
+        from static_encoder import curriculum_level
+
+        data = make_dataset("medium")
+        job_skills = list(dict.fromkeys(data["market_skills"] + data["extracted_skills"]))
+        known_skills = list(dict.fromkeys(data["student_skills"] + data["curriculum"]))
+        model = get_embedder("all-MiniLM-L6-v2")
+        job = np.asarray(model.encode(job_skills, normalize_embeddings=True), dtype=np.float32)
+        known = np.asarray(model.encode(known_skills, normalize_embeddings=True), dtype=np.float32)
+        expected, _ = EmbeddingStore.from_float(known).best_match(job)
+        print(f"🧩 {len(job_skills)} job skills vs {len(known_skills)} known skills")
+        for dtype in STORAGE_DTYPES[1:]:
+            actual, _ = EmbeddingStore.from_float(known, dtype).best_match(job)
+            for label, classify in (("compute_gaps", gap_level), ("curriculum", curriculum_level)):
+                agreement = np.mean([classify(e) == classify(a) for e, a in zip(expected, actual)])
+                print(f"  {dtype:<8} {label:<13} level agreement {agreement:.1%}, "
+                      f"best-match drift max {float(np.abs(expected - actual).max()):.5f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
@@ -0,0 +1,202 @@
+"""
+Fake OpenAI-compatible chat server for Skill-Twin Engine
+Injects configurable latency so LLM-path changes (hedging, pooling) can be measured offline
+"""
+
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+
+class LatencyProfile:
+    """Log-normal body latency plus an occasional slow tail"""
+
+    def __init__(self, median: float = 0.3, sigma: float = 0.3,
+                 tail_probability: float = 0.03, tail_latency: float = 3.0, seed: int = 7):
+        self.median = median
+        self.sigma = sigma
+        self.tail_probability = tail_probability
+        self.tail_latency = tail_latency
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self._lock:
+            if self._random.random() < self.tail_probability:
+                return self.tail_latency * (0.8 + 0.4 * self._random.random())
+            return self.median * self._random.lognormvariate(0.0, self.sigma)
+
+
+def make_handler(profile: LatencyProfile, content: str, stats: Dict, handshake_latency: float = 0.0):
+    class FakeChatHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # Headers and body are separate writes; without this, keep-alive requests stall on delayed ACKs
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # Once per connection: stands in for the TCP + TLS round trips to the real API
+            with stats["lock"]:
+                stats["connections"] += 1
+            if handshake_latency:
+                time.sleep(handshake_latency)
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            if not self.path.endswith("/chat/completions"):
+                self.send_error(404)
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            with stats["lock"]:
+                stats["requests"] += 1
+
+            # Time to first byte is where the injected latency goes
+            time.sleep(profile.sample())
+
+            if body.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for piece in _split(content, 4):
+                        chunk = _chunk_payload(body.get("model", "fake"), {"content": piece}, None)
+                        self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+                    done = _chunk_payload(body.get("model", "fake"), {}, "stop")
+                    self._write_chunk(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n")
+                    self._write_chunk("")
+                except (BrokenPipeError, ConnectionResetError):
+                    with stats["lock"]:
+                        stats["cancelled"] += 1
+                return
+
+            payload = json.dumps({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 50, "completion_tokens": 20, "total_tokens": 70}
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _write_chunk(self, text: str):
+            data = text.encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+    return FakeChatHandler
+
+
+def _split(text: str, parts: int) -> List[str]:
+    size = max(1, len(text) // parts)
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _chunk_payload(model: str, delta: Dict, finish_reason) -> Dict:
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+
+
+class _FakeServer(ThreadingHTTPServer):
+    # The default backlog of 5 drops SYNs when a pool opens many connections at once (1 s retry)
+    request_queue_size = 128
+
+
+def start_fake_server(port: int = 0, profile: LatencyProfile = None,
+                      content: str = '{"skills": ["Python", "SQL", "Git"]}', handshake_latency: float = 0.0):
+    """Start the server on a daemon thread; returns (server, base_url, stats)"""
+    stats = {"requests": 0, "cancelled": 0, "connections": 0, "lock": threading.Lock()}
+    server = _FakeServer(("127.0.0.1", port), make_handler(profile or LatencyProfile(), content, stats, handshake_latency))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1", stats
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100.0))]
+
+
+def run_hedging_benchmark(calls: int = 200, profile: LatencyProfile = None):
+    """Compare un-hedged and hedged latency percentiles against the fake server"""
+    from openai import OpenAI
+    from llm_gateway import LLMGateway
+
+    server, base_url, stats = start_fake_server(profile=profile)
+    client = OpenAI(api_key="fake", base_url=base_url)
+    request = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "skills for SDE"}]}
+
+    results = {}
+    for mode in ("baseline", "hedged"):
+        gateway = LLMGateway(max_concurrency=8, hedge_initial_delay=1.0, hedge_percentile=90)
+        before = stats["requests"]
+        latencies = []
+        for i in range(calls):
+            started = time.monotonic()
+            gateway.chat_completion(client, "bench", hedge=(mode == "hedged"),
+                                    **dict(request, messages=[{"role": "user", "content": f"q{i}"}]))
+            latencies.append(time.monotonic() - started)
+        outcomes = gateway.stats()["sites"]["bench"]["outcomes"]
+        results[mode] = {
+            "p50": round(_percentile(latencies, 50), 3),
+            "p95": round(_percentile(latencies, 95), 3),
+            "p99": round(_percentile(latencies, 99), 3),
+            "upstream_requests": stats["requests"] - before,
+            "hedged": outcomes.get("hedged", 0),
+            "hedge_won": outcomes.get("hedge_won", 0)
+        }
+
+    server.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenAI chat server with injected latency")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--median", type=float, default=0.3, help="median latency in seconds")
+    parser.add_argument("--tail-probability", type=float, default=0.03)
+    parser.add_argument("--tail-latency", type=float, default=3.0)
+    parser.add_argument("--bench-hedging", action="store_true", help="run the hedging comparison and exit")
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    profile = LatencyProfile(args.median, tail_probability=args.tail_probability, tail_latency=args.tail_latency)
+
+    if args.bench_hedging:
+        results = run_hedging_benchmark(args.calls, profile)
+        print(f"\n📊 Hedging benchmark ({args.calls} calls)")
+        for mode, row in results.items():
+            overhead = (row["upstream_requests"] - args.calls) / args.calls * 100
+            print(f"{mode:>9}: p50={row['p50']}s p95={row['p95']}s p99={row['p99']}s "
+                  f"upstream={row['upstream_requests']} (+{overhead:.1f}%) hedge wins={row['hedge_won']}")
+    else:
+        server, base_url, _ = start_fake_server(args.port, profile)
+        print(f"🧪 Fake OpenAI server listening on {base_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
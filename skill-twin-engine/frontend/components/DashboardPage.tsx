@@ -72,74 +72,47 @@ const DashboardPage: React.FC<any> = ({ isDarkMode, toggleTheme, onLogoClick })
         if (!resumeFile && !syllabusFile) return alert("Please upload at least one document (Resume or Syllabus).");
         setLoading(true);
         try {
-            let combinedSkills: string[] = [];
-            
-            // 1. Parse Resume
-            if (resumeFile) {
-                const formData = new FormData();
-                formData.append('file', resumeFile);
-                const resumeRes = await fetch('http://localhost:5000/api/parse-resume', {
-                    method: 'POST',
-                    body: formData
-                });
-                const resumeData = await resumeRes.json();
-                if (resumeData.validated_skills) {
-                    combinedSkills = [...combinedSkills, ...resumeData.validated_skills];
-                }
-            }
-
-            // 2. Parse Syllabus
-            if (syllabusFile) {
-                const formData = new FormData();
-                formData.append('file', syllabusFile);
-                // We reuse the parse-resume endpoint as it just extracts skills from PDF
-                const syllabusRes = await fetch('http://localhost:5000/api/parse-resume', {
-                    method: 'POST',
-                    body: formData
-                });
-                const syllabusData = await syllabusRes.json();
-                if (syllabusData.validated_skills) {
-                    combinedSkills = [...combinedSkills, ...syllabusData.validated_skills];
-                }
-            }
-
-            // Deduplicate skills
-            const uniqueSkills = Array.from(new Set(combinedSkills));
-            setExtractedSkills(uniqueSkills);
-
-            if (uniqueSkills.length === 0) alert("No valid skills found in uploaded documents. Proceeding anyway.");
-
-            // 3. Get Job Requirements
-            const jobRes = await fetch('http://localhost:5000/api/job-requirements', {
-               method: 'POST',
-               headers: { 'Content-Type': 'application/json' },
-               body: JSON.stringify({ role: selectedRole })
-            });
-            const jobData = await jobRes.json();
-            const jobSkills = jobData.required_skills || [];
-
-            // 4. Analyze Gaps
-            const gapsRes = await fetch('http://localhost:5000/api/analyze-gaps', {
+            // One call: the backend parses the documents and generates the role's skills
+            // concurrently, then computes gaps and the roadmap, pushing each stage as it finishes.
+            const formData = new FormData();
+            if (resumeFile) formData.append('resume', resumeFile);
+            if (syllabusFile) formData.append('syllabus', syllabusFile);
+            formData.append('role', selectedRole);
+            formData.append('weeks', '8');
+            const res = await fetch('http://localhost:5000/api/full-analysis?stream=1', {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ known_skills: uniqueSkills, job_skills: jobSkills })
+                body: formData
             });
-            const gapsData = await gapsRes.json();
-            const calculatedGaps = gapsData.gaps || [];
-            setGaps(calculatedGaps);
-
-            // 5. Generate Roadmap
-            if (calculatedGaps.length > 0) {
-                 const roadmapRes = await fetch('http://localhost:5000/api/generate-roadmap', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ gaps: calculatedGaps, weeks: 8 })
-                });
-                const roadmapData = await roadmapRes.json();
-                setRoadmap(roadmapData.roadmap);
-            } else {
-                setRoadmap(null);
+            if (!res.ok || !res.body) throw new Error((await res.json()).error || res.statusText);
+
+            const reader = res.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let failed: string | null = null;
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const events = buffer.split('\n\n');
+                buffer = events.pop() || '';
+                for (const raw of events) {
+                    const event = raw.match(/^event: (.*)$/m)?.[1];
+                    const data = raw.match(/^data: (.*)$/m)?.[1];
+                    if (event !== 'stage' || !data) continue;
+                    const stage = JSON.parse(data);
+                    if (stage.error) {
+                        failed = failed || `${stage.stage}: ${stage.error}`;
+                    } else if (stage.stage === 'known_skills') {
+                        setExtractedSkills(stage.result);
+                        if (stage.result.length === 0) alert("No valid skills found in uploaded documents. Proceeding anyway.");
+                    } else if (stage.stage === 'gaps') {
+                        setGaps(stage.result);
+                    } else if (stage.stage === 'roadmap') {
+                        setRoadmap(stage.result || null);
+                    }
+                }
             }
+            if (failed) throw new Error(failed);
 
             setAnalyzerStep('analysis');
 
@@ -8,15 +8,18 @@ import os
 from typing import List, Dict, Optional
 from job_scraper import JobScraper
 from advanced_job_scraper import AdvancedJobScraper
-from sentence_transformers import SentenceTransformer, util
+import embedding_store
+from lazy_models import embedder as lazy_embedder
 import numpy as np
+from tracing import span, traced, traced_pipeline
 
 class JobMarketAnalyzer:
     def __init__(self):
         self.job_scraper = JobScraper()
         self.advanced_scraper = AdvancedJobScraper()
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedder = lazy_embedder('all-MiniLM-L6-v2')
         
+    @traced("aggregation")
     def get_current_job_market_skills(self, role: str, location: str = "India", 
                                     use_advanced: bool = True) -> Dict:
         """
@@ -41,6 +44,7 @@ class JobMarketAnalyzer:
             print(f"Error getting market skills: {e}")
             return {"role": role, "skills": [], "error": str(e)}
     
+    @traced("matching")
     def compare_with_university_curriculum(self, job_skills: List[str], 
                                          curriculum_skills: List[str]) -> Dict:
         """
@@ -53,16 +57,15 @@ class JobMarketAnalyzer:
         job_embeddings = self.embedder.encode(job_skills)
         curriculum_embeddings = self.embedder.encode(curriculum_skills)
         
-        # Calculate similarities
-        similarities = util.cos_sim(job_embeddings, curriculum_embeddings)
+        # Best curriculum match per job skill, read from compact curriculum rows
+        best_scores, best_rows = embedding_store.best_match(job_embeddings, curriculum_embeddings)
         
         gap_analysis = []
         covered_count = 0
         
         for i, job_skill in enumerate(job_skills):
-            max_sim = float(similarities[i].max())
-            best_match_idx = int(similarities[i].argmax())
-            best_match = curriculum_skills[best_match_idx]
+            max_sim = float(best_scores[i])
+            best_match = curriculum_skills[int(best_rows[i])]
             
             # Determine gap level
             if max_sim >= 0.7:
@@ -90,6 +93,7 @@ class JobMarketAnalyzer:
             "missing_skills": len(job_skills) - covered_count
         }
     
+    @traced("aggregation")
     def generate_market_insights_report(self, role: str, curriculum_skills: List[str],
                                       location: str = "India") -> Dict:
         """
@@ -130,6 +134,7 @@ class JobMarketAnalyzer:
         
         return report
     
+    @traced("recommendation")
     def generate_recommendations(self, missing_skills: List[str], 
                                partially_covered: List[str]) -> List[Dict]:
         """
@@ -157,8 +162,9 @@ class JobMarketAnalyzer:
 class IntegratedSkillTwin:
     def __init__(self):
         self.job_analyzer = JobMarketAnalyzer()
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedder = lazy_embedder('all-MiniLM-L6-v2')
         
+    @traced_pipeline()
     def analyze_student_with_market_data(self, student_skills: List[str], 
                                        target_role: str,
                                        curriculum_skills: List[str],
@@ -174,31 +180,32 @@ class IntegratedSkillTwin:
         if "error" in market_report:
             return market_report
         
-        # Analyze student vs market
-        job_skills = market_report['market_skills']
-        job_embeddings = self.embedder.encode(job_skills)
-        student_embeddings = self.embedder.encode(student_skills)
-        
-        # Calculate student-job match
-        if len(student_skills) > 0:
-            similarities = util.cos_sim(job_embeddings, student_embeddings)
-            student_match_scores = similarities.max(dim=1).values
-            avg_match = float(student_match_scores.mean())
-        else:
-            avg_match = 0.0
-        
-        # Identify student gaps
-        student_gaps = []
-        for i, job_skill in enumerate(job_skills[:15]):  # Top 15 skills
+        with span("embed_and_match_student", "matching"):
+            # Analyze student vs market
+            job_skills = market_report['market_skills']
+            job_embeddings = self.embedder.encode(job_skills)
+            student_embeddings = self.embedder.encode(student_skills)
+            
+            # Calculate student-job match
             if len(student_skills) > 0:
-                max_sim = float(similarities[i].max())
-                if max_sim < 0.6:  # Threshold for gap
-                    student_gaps.append({
-                        "skill": job_skill,
-                        "match_score": round(max_sim, 3),
-                        "urgency": "High" if max_sim < 0.4 else "Medium"
-                    })
-        
+                student_match_scores, _ = embedding_store.best_match(job_embeddings, student_embeddings)
+                avg_match = float(student_match_scores.mean())
+            else:
+                avg_match = 0.0
+            
+        with span("identify_student_gaps", "matching"):
+            # Identify student gaps
+            student_gaps = []
+            for i, job_skill in enumerate(job_skills[:15]):  # Top 15 skills
+                if len(student_skills) > 0:
+                    max_sim = float(student_match_scores[i])
+                    if max_sim < 0.6:  # Threshold for gap
+                        student_gaps.append({
+                            "skill": job_skill,
+                            "match_score": round(max_sim, 3),
+                            "urgency": "High" if max_sim < 0.4 else "Medium"
+                        })
+            
         # Combine all insights
         comprehensive_analysis = {
             "student_profile": {
@@ -218,6 +225,7 @@ class IntegratedSkillTwin:
         
         return comprehensive_analysis
     
+    @traced("recommendation")
     def generate_student_recommendations(self, student_gaps: List[Dict], 
                                        market_gaps: List[str]) -> List[Dict]:
         """
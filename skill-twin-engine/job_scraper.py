@@ -9,12 +9,40 @@ import time
 import random
 from typing import List, Dict, Optional
 import json
-from openai import OpenAI
 import os
 from dotenv import load_dotenv
+import llm_gateway
+import posting_store
+import tiered_extractor
+from lazy_models import openai_client
+from tracing import traced
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = openai_client()
+
+def description_request(job_description: str) -> Dict:
+    """Chat completion arguments for one description; shared by the live call and batch request files"""
+    prompt = f"""
+            Extract technical skills, programming languages, tools, and technologies from this job description.
+            Return ONLY a JSON array of strings. Exclude soft skills unless they are technical.
+            
+            Job Description: {job_description[:2000]}
+            
+            Output format: ["Python", "JavaScript", "React", "AWS"]
+            """
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [{"role": "user", "content": prompt}],
+        "response_format": {"type": "json_object"},
+        "temperature": 0.3
+    }
+
+def parse_skill_list(content: str) -> List[str]:
+    result = json.loads(content)
+    # json_object mode wraps the array, e.g. {"skills": [...]}
+    if isinstance(result, dict):
+        result = next((value for value in result.values() if isinstance(value, list)), [])
+    return result if isinstance(result, list) else []
 
 class JobScraper:
     def __init__(self):
@@ -29,6 +57,7 @@ class JobScraper:
         }
         self.session.headers.update(self.headers)
         
+    @traced("scraping")
     def scrape_linkedin_jobs(self, role: str, location: str = "India", limit: int = 10) -> List[Dict]:
         """
         Scrape job listings from LinkedIn (simplified version - would need LinkedIn API for full functionality)
@@ -72,6 +101,7 @@ class JobScraper:
             
         return jobs
     
+    @traced("scraping")
     def scrape_naukri_jobs(self, role: str, location: str = "India", limit: int = 10) -> List[Dict]:
         """
         Scrape job listings from Naukri.com
@@ -119,37 +149,36 @@ class JobScraper:
             
         return jobs
     
+    @traced("extraction")
     def extract_skills_from_description(self, job_description: str) -> List[str]:
         """
-        Extract skills from job description using OpenAI
+        Extract skills from job description: local taxonomy match, OpenAI for the unexplained rest
         """
         if not job_description or len(job_description.strip()) < 50:
             return []
-            
+        # Postings already extracted by a nightly batch run
+        store = posting_store.default_store()
+        stored = store.skills_for(job_description) if store is not None else None
+        if stored is not None:
+            return stored
+        return tiered_extractor.extract(job_description, "job_scraper.extract_skills_from_description",
+                                        self.llm_skills_from_description)
+
+    def llm_skills_from_description(self, job_description: str) -> List[str]:
+        """
+        Extract skills from job description using OpenAI
+        """
         try:
-            prompt = f"""
-            Extract technical skills, programming languages, tools, and technologies from this job description.
-            Return ONLY a JSON array of strings. Exclude soft skills unless they are technical.
-            
-            Job Description: {job_description[:2000]}
-            
-            Output format: ["Python", "JavaScript", "React", "AWS"]
-            """
-            
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                temperature=0.3
+            content = llm_gateway.chat_completion(
+                client, "job_scraper.extract_skills_from_description", **description_request(job_description)
             )
-            
-            result = json.loads(response.choices[0].message.content)
-            return result if isinstance(result, list) else []
+            return parse_skill_list(content)
             
         except Exception as e:
             print(f"Error extracting skills: {e}")
             return []
     
+    @traced("aggregation")
     def get_job_skills_for_role(self, role: str, location: str = "India", limit: int = 5) -> Dict:
         """
         Get comprehensive job skills for a specific role by scraping multiple sources
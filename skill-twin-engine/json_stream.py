@@ -0,0 +1,147 @@
+"""
+Incremental JSON Parsing for Skill-Twin Engine
+Emits the elements of a JSON array while the surrounding document is still being streamed
+"""
+
+import json
+from typing import Any, Iterable, Iterator, List, Optional
+
+
+class JSONArrayStream:
+    """
+    Incremental parser for one array inside a streamed JSON object.
+
+    Feed it text chunks as they arrive from the LLM and it returns every
+    element of the target array that has been fully closed so far, e.g. each
+    week object of ``{"roadmap": [{...}, {...}]}`` or each skill string of
+    ``{"technical_skills": ["Python", ...]}``. Only keys of the top-level
+    object are matched. Pass ``key=None`` when the document itself is the array.
+    """
+
+    def __init__(self, key: Optional[str] = None):
+        self.key = key
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = None
+        self._current_key = None
+        self._in_target = False
+        self._target_done = False
+        self._item_depth = 1 if key is None else 2
+        self._item_start = None
+        self._item_is_string = False
+
+    @property
+    def text(self) -> str:
+        """All text fed so far"""
+        return self._text
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk of text and return the array elements it completed"""
+        items = []
+        if not chunk:
+            return items
+
+        self._text += chunk
+        text = self._text
+        i = self._pos
+
+        while i < len(text):
+            ch = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self.key is not None:
+                        self._last_string = json.loads(text[self._string_start:i + 1])
+                    if self._item_start is not None and self._item_is_string:
+                        items.append(json.loads(text[self._item_start:i + 1]))
+                        self._item_start = None
+                i += 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+                if self._in_target and self._depth == self._item_depth and self._item_start is None:
+                    self._item_start = i
+                    self._item_is_string = True
+            elif ch in '{[':
+                if self._opens_target(ch):
+                    self._in_target = True
+                elif self._in_target and self._depth == self._item_depth and self._item_start is None:
+                    self._item_start = i
+                    self._item_is_string = False
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._in_target:
+                    if self._depth == self._item_depth and self._item_start is not None:
+                        items.append(json.loads(text[self._item_start:i + 1]))
+                        self._item_start = None
+                    elif self._depth == self._item_depth - 1:
+                        self._flush_scalar(text, i, items)
+                        self._in_target = False
+                        self._target_done = True
+            elif ch == ':':
+                if self._depth == 1:
+                    self._current_key = self._last_string
+            elif ch == ',':
+                if self._in_target and self._depth == self._item_depth:
+                    self._flush_scalar(text, i, items)
+                if self._depth == 1:
+                    self._current_key = None
+            elif not ch.isspace():
+                if self._in_target and self._depth == self._item_depth and self._item_start is None:
+                    self._item_start = i
+                    self._item_is_string = False
+            i += 1
+
+        self._pos = i
+        return items
+
+    @property
+    def complete(self) -> bool:
+        """True once the target array has been closed"""
+        return self._target_done
+
+    def result(self) -> Any:
+        """Parse the complete document once the stream has finished"""
+        return json.loads(self._text)
+
+    def _opens_target(self, ch: str) -> bool:
+        if ch != '[' or self._in_target or self._target_done:
+            return False
+        if self.key is None:
+            return self._depth == 0
+        return self._depth == 1 and self._current_key == self.key
+
+    def _flush_scalar(self, text: str, end: int, items: List[Any]):
+        """Emit a pending number/literal element that ends at ``end``"""
+        if self._item_start is None or self._item_is_string:
+            return
+        raw = text[self._item_start:end].strip()
+        self._item_start = None
+        if raw:
+            items.append(json.loads(raw))
+
+
+def iter_array_items(chunks: Iterable[str], key: Optional[str] = None) -> Iterator[Any]:
+    """
+    Yield each element of the ``key`` array as soon as it closes in ``chunks``.
+    Raises ValueError at the end when the array never closed (missing key, truncated
+    or malformed completion), after yielding whatever elements did arrive.
+    """
+    parser = JSONArrayStream(key)
+    for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+    if not parser.complete:
+        raise ValueError(f"no complete {key or 'top-level'} array in the streamed JSON")
@@ -0,0 +1,171 @@
+"""
+Lazy loading of heavy dependencies for Skill-Twin Engine
+torch / sentence-transformers, the MiniLM model, openai and pdfplumber are imported
+on first use, so importing the analysis modules stays fast.
+Set SKILL_TWIN_PRELOAD=1 to load everything up front instead (e.g. in a server worker).
+SKILL_TWIN_ENCODER picks the encoder backend: "torch" (SentenceTransformer, default)
+or "onnx" (int8 ONNX Runtime, see onnx_encoder).
+"""
+
+import importlib
+import os
+import threading
+from typing import Dict
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+PRELOAD = os.getenv("SKILL_TWIN_PRELOAD", "").lower() in ("1", "true", "yes", "on")
+ENCODER = os.getenv("SKILL_TWIN_ENCODER", "torch").lower()
+ENCODER_IDS = {"torch": "", "onnx": "+onnx-int8"}
+STATIC_EMBEDDINGS = os.getenv("SKILL_TWIN_STATIC_EMBEDDINGS", "").lower() in ("1", "true", "yes", "on")
+
+_lock = threading.RLock()
+_embedders: Dict[str, object] = {}
+
+
+class LazyModule:
+    """Module stand-in that imports the real module on first attribute access"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            with _lock:
+                if self._module is None:
+                    package, _, attr = self._name.rpartition(".")
+                    module = None
+                    if package:
+                        # Submodules such as sentence_transformers.util are usually attributes of the package
+                        module = getattr(importlib.import_module(package), attr, None)
+                    self._module = module if module is not None else importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        return f"<LazyModule {self._name} ({'loaded' if self.loaded else 'not loaded'})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def encoder_id(model_name: str = DEFAULT_MODEL) -> str:
+    """Model name plus encoder backend; vectors from different backends are not interchangeable"""
+    if ENCODER not in ENCODER_IDS:
+        raise ValueError(f"Unknown SKILL_TWIN_ENCODER {ENCODER!r}; expected one of {', '.join(ENCODER_IDS)}")
+    return model_name + ENCODER_IDS[ENCODER]
+
+
+def get_embedder(model_name: str = DEFAULT_MODEL):
+    """Process-wide encoder per model name (SentenceTransformer or ONNX), loaded once"""
+    model = _embedders.get(model_name)
+    if model is None:
+        with _lock:
+            model = _embedders.get(model_name)
+            if model is None:
+                if ENCODER == "onnx":
+                    from onnx_encoder import OnnxEncoder
+                    model = OnnxEncoder.load_or_export(model_name)
+                else:
+                    from sentence_transformers import SentenceTransformer
+                    model = SentenceTransformer(model_name)
+                _embedders[model_name] = model
+    return model
+
+
+class LazyEmbedder:
+    """Drop-in for SentenceTransformer(model_name); the model loads on the first encode()"""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL):
+        self.model_name = model_name
+
+    @property
+    def loaded(self) -> bool:
+        return self.model_name in _embedders
+
+    def load(self):
+        return get_embedder(self.model_name)
+
+    def encode(self, *args, **kwargs):
+        return self.load().encode(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
+
+
+class LazyOpenAI:
+    """
+    Drop-in for OpenAI(**kwargs); the openai package is imported and the client built on first
+    use, from llm_client so every module shares one pooled keep-alive connection pool.
+    """
+
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self._client = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._client is not None
+
+    def load(self):
+        if self._client is None:
+            with _lock:
+                if self._client is None:
+                    import llm_client
+                    self._client = llm_client.sync_client(**self._kwargs)
+        return self._client
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
+
+
+def openai_client() -> LazyOpenAI:
+    """The client every module used to build at import time, keyed from OPENAI_API_KEY"""
+    client = LazyOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    if PRELOAD:
+        client.load()
+    return client
+
+
+def embedder(model_name: str = DEFAULT_MODEL):
+    """
+    LazyEmbedder for model_name, fronted by the canonical skill snapshot when
+    one has been built (see skill_taxonomy), so vocabulary skills skip the model.
+    With SKILL_TWIN_EMBEDDING_SOCKET set, encoding goes to the shared embedding
+    service and the local model is only loaded if the service is down.
+    SKILL_TWIN_STATIC_EMBEDDINGS=1 pools static token vectors for short phrases
+    (see static_encoder) before anything reaches the model; once its table exists
+    the snapshot is bypassed. Phrases with an unknown token still get full-model
+    vectors in the same result, so such calls mix the two spaces; run
+    `python static_encoder.py report` to see how far that moves scores.
+    """
+    model = LazyEmbedder(model_name)
+    socket_path = os.getenv("SKILL_TWIN_EMBEDDING_SOCKET")
+    if socket_path:
+        import embedding_service
+        model = embedding_service.EmbeddingClient(socket_path, fallback=model)
+    elif PRELOAD:
+        model.load()
+    if STATIC_EMBEDDINGS:
+        import static_encoder
+        model = static_encoder.StaticEncoder(model, model_name)
+    import skill_taxonomy
+    if not skill_taxonomy.SNAPSHOT_ENABLED:
+        return model
+    return skill_taxonomy.SnapshotEmbedder(model, model_name)
+
+
+# Shared lazy handles for the call sites that used the modules directly
+util = lazy_import("sentence_transformers.util")
+pdfplumber = lazy_import("pdfplumber")
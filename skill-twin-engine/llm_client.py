@@ -0,0 +1,259 @@
+"""
+Shared LLM Client for Skill-Twin Engine
+One pooled httpx transport per process (one per event loop for async), so every module's
+OpenAI client reuses warm keep-alive connections instead of paying a TCP + TLS handshake
+per call site. HTTP/2 is used when the h2 package is installed. New vs reused connections
+and handshake time are exported as metrics.
+
+    SKILL_TWIN_LLM_MAX_CONNECTIONS=20       # pool size
+    SKILL_TWIN_LLM_KEEPALIVE=10             # idle connections kept warm
+    SKILL_TWIN_LLM_KEEPALIVE_EXPIRY=60      # seconds an idle connection is kept
+    SKILL_TWIN_LLM_HTTP2=auto | 1 | 0
+    python llm_client.py bench [--calls 50] [--handshake-ms 30]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import threading
+import time
+import weakref
+from typing import Dict, Optional
+
+import httpx
+
+import metrics
+
+MAX_CONNECTIONS = int(os.getenv("SKILL_TWIN_LLM_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE = int(os.getenv("SKILL_TWIN_LLM_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("SKILL_TWIN_LLM_KEEPALIVE_EXPIRY", "60"))
+HTTP2 = os.getenv("SKILL_TWIN_LLM_HTTP2", "auto").lower()
+
+LLM_CONNECTIONS = metrics.counter("skilltwin_llm_http_requests_total",
+                                  "LLM HTTP requests by connection (new / reused)", ["connection"])
+LLM_HANDSHAKE = metrics.histogram("skilltwin_llm_handshake_seconds", "TCP + TLS connect time for new LLM connections")
+
+_lock = threading.Lock()
+_stats = {"requests": 0, "new_connections": 0, "reused": 0, "handshake_seconds": 0.0}
+_http = None
+_async_http = weakref.WeakKeyDictionary()     # event loop -> AsyncClient
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> {(api_key, base_url, options): AsyncOpenAI}
+_clients: Dict[tuple, object] = {}
+
+
+def http2_enabled() -> bool:
+    if HTTP2 in ("1", "true", "yes", "on"):
+        return True
+    return HTTP2 == "auto" and importlib.util.find_spec("h2") is not None
+
+
+def limits(max_connections: int = MAX_CONNECTIONS, max_keepalive: int = MAX_KEEPALIVE,
+           keepalive_expiry: float = KEEPALIVE_EXPIRY) -> httpx.Limits:
+    return httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive,
+                        keepalive_expiry=keepalive_expiry)
+
+
+class _Trace:
+    """httpcore trace callback for one request: did it open a connection, and how long did that take"""
+
+    def __init__(self):
+        self.new = False
+        self.handshake = 0.0
+        self._started = None
+
+    def __call__(self, name: str, info: Dict):
+        if name.endswith((".connect_tcp.started", ".start_tls.started")):
+            self._started = time.perf_counter()
+        elif name.endswith((".connect_tcp.complete", ".start_tls.complete")) and self._started is not None:
+            self.new = True
+            self.handshake += time.perf_counter() - self._started
+
+
+class _AsyncTrace(_Trace):
+    async def __call__(self, name: str, info: Dict):
+        _Trace.__call__(self, name, info)
+
+
+def _record(trace: Optional[_Trace]):
+    if trace is None:
+        return
+    with _lock:
+        _stats["requests"] += 1
+        _stats["new_connections" if trace.new else "reused"] += 1
+        _stats["handshake_seconds"] += trace.handshake
+    LLM_CONNECTIONS.inc(connection="new" if trace.new else "reused")
+    if trace.new:
+        LLM_HANDSHAKE.observe(trace.handshake)
+
+
+def _on_request(request: httpx.Request):
+    request.extensions["trace"] = _Trace()
+
+
+def _on_response(response: httpx.Response):
+    _record(response.request.extensions.get("trace"))
+
+
+async def _on_request_async(request: httpx.Request):
+    request.extensions["trace"] = _AsyncTrace()
+
+
+async def _on_response_async(response: httpx.Response):
+    _record(response.request.extensions.get("trace"))
+
+
+def new_http_client(pool: Optional[httpx.Limits] = None) -> httpx.Client:
+    """A traced client with OpenAI's defaults (timeouts, redirects) and our pool settings"""
+    from openai import DefaultHttpxClient
+    return DefaultHttpxClient(limits=pool or limits(), http2=http2_enabled(),
+                              event_hooks={"request": [_on_request], "response": [_on_response]})
+
+
+def http_client() -> httpx.Client:
+    """The process-wide pooled client behind every sync LLM client"""
+    global _http
+    if _http is None:
+        with _lock:
+            if _http is None:
+                _http = new_http_client()
+    return _http
+
+
+def _drop_closed_loops():
+    """
+    Forget pools of loops that have been closed. Weak keys alone are not enough: a pool
+    with open connections holds transports that point back at its loop.
+    """
+    for loop in [loop for loop in _async_http if loop.is_closed()]:
+        _async_http.pop(loop, None)
+        _async_clients.pop(loop, None)
+
+
+def async_http_client() -> httpx.AsyncClient:
+    """Pooled async client for the running event loop (connections cannot move between loops)"""
+    from openai import DefaultAsyncHttpxClient
+    loop = asyncio.get_running_loop()
+    with _lock:
+        _drop_closed_loops()
+        client = _async_http.get(loop)
+        if client is None:
+            client = _async_http[loop] = DefaultAsyncHttpxClient(
+                limits=limits(), http2=http2_enabled(),
+                event_hooks={"request": [_on_request_async], "response": [_on_response_async]})
+    return client
+
+
+def sync_client(api_key: Optional[str] = None, base_url: Optional[str] = None, **kwargs):
+    """Shared OpenAI client per (api_key, base_url); with_options() copies keep the same pool"""
+    key = ("sync", api_key, base_url, tuple(sorted(kwargs.items())))
+    with _lock:
+        client = _clients.get(key)
+    if client is None:
+        from openai import OpenAI
+        client = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client(), **kwargs)
+        with _lock:
+            client = _clients.setdefault(key, client)
+    return client
+
+
+def async_client(api_key: Optional[str] = None, base_url: Optional[str] = None, **kwargs):
+    """
+    AsyncOpenAI on the running loop's pool; call from inside the loop. Clients are kept per
+    loop like their pool, so they go away with the loop (asyncio.run() per request or test).
+    """
+    from openai import AsyncOpenAI
+    http = async_http_client()
+    key = (api_key, base_url, tuple(sorted(kwargs.items())))
+    with _lock:
+        clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+        client = clients.get(key)
+        if client is None:
+            client = clients[key] = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http, **kwargs)
+    return client
+
+
+def stats() -> Dict:
+    with _lock:
+        snapshot = dict(_stats)
+    requests = snapshot["requests"]
+    return {
+        **snapshot,
+        "handshake_seconds": round(snapshot["handshake_seconds"], 4),
+        "reuse_ratio": round(snapshot["reused"] / requests, 4) if requests else 0.0,
+        "http2": http2_enabled(),
+        "max_connections": MAX_CONNECTIONS,
+        "max_keepalive": MAX_KEEPALIVE
+    }
+
+
+def run_pool_benchmark(calls: int = 50, handshake_ms: float = 30.0) -> Dict:
+    """
+    Back-to-back calls against the fake server: a new client per call (each module's own
+    OpenAI() on a cold path), a shared client with keep-alive off, and the shared pool.
+    """
+    from openai import OpenAI
+    from fake_llm_server import LatencyProfile, start_fake_server
+
+    profile = LatencyProfile(median=0.002, sigma=0.0, tail_probability=0.0)
+    server, base_url, _ = start_fake_server(profile=profile, handshake_latency=handshake_ms / 1000)
+    request = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "skills for SDE"}]}
+
+    def timed(make_client, close_each: bool = False) -> Dict:
+        before = stats()
+        latencies = []
+        for _ in range(calls):
+            client = make_client()
+            started = time.perf_counter()
+            client.chat.completions.create(**request)
+            latencies.append(time.perf_counter() - started)
+            if close_each:
+                client.close()
+        after = stats()
+        latencies.sort()
+        return {
+            "mean_ms": round(sum(latencies) / calls * 1000, 2),
+            "p50_ms": round(latencies[calls // 2] * 1000, 2),
+            "new_connections": after["new_connections"] - before["new_connections"],
+            "handshake_ms": round((after["handshake_seconds"] - before["handshake_seconds"]) * 1000, 1)
+        }
+
+    no_keepalive = new_http_client(limits(max_keepalive=0))
+    results = {
+        "client_per_call": timed(lambda: OpenAI(api_key="fake", base_url=base_url, http_client=new_http_client()),
+                                 close_each=True),
+        "no_keepalive": timed(lambda: OpenAI(api_key="fake", base_url=base_url, http_client=no_keepalive)),
+        "shared_pool": timed(lambda: sync_client(api_key="fake", base_url=base_url)),
+    }
+    no_keepalive.close()
+
+    async def concurrent():
+        client = async_client(api_key="fake", base_url=base_url)
+        before = stats()
+        started = time.perf_counter()
+        await asyncio.gather(*(client.chat.completions.create(**request) for _ in range(calls)))
+        return {"wall_ms": round((time.perf_counter() - started) * 1000, 1),
+                "new_connections": stats()["new_connections"] - before["new_connections"]}
+
+    results["async_concurrent"] = asyncio.run(concurrent())
+    server.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared pooled LLM HTTP client")
+    parser.add_argument("command", choices=["bench"])
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--handshake-ms", type=float, default=30.0,
+                        help="simulated TCP + TLS setup per new connection on the fake server")
+    args = parser.parse_args()
+
+    results = run_pool_benchmark(args.calls, args.handshake_ms)
+    print(f"\n📊 {args.calls} back-to-back calls, {args.handshake_ms:.0f} ms simulated handshake, "
+          f"HTTP/2 {'on' if http2_enabled() else 'off (h2 not installed)'}")
+    for mode in ("client_per_call", "no_keepalive", "shared_pool"):
+        row = results[mode]
+        print(f"{mode:>16}: mean {row['mean_ms']} ms, p50 {row['p50_ms']} ms, "
+              f"{row['new_connections']} new connections ({row['handshake_ms']} ms in local connect)")
+    row = results["async_concurrent"]
+    print(f"{'async_concurrent':>16}: {args.calls} calls in {row['wall_ms']} ms over {row['new_connections']} connections")
@@ -0,0 +1,561 @@
+"""
+LLM Gateway for Skill-Twin Engine
+Admission control, deadlines, circuit breaking and latency tracking for every OpenAI chat call
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+import metrics
+
+
+class LLMUnavailable(Exception):
+    """Raised when neither the provider nor a fallback produced a response"""
+
+
+class DeadlineExceeded(LLMUnavailable):
+    """Raised when the caller's deadline leaves no time for the call"""
+
+
+class CircuitOpen(LLMUnavailable):
+    """Raised when the provider is marked degraded and no fallback exists"""
+
+
+class HedgeCancelled(Exception):
+    """Raised inside the losing attempt of a hedged call once the other attempt won"""
+
+
+# Absolute (time.monotonic) deadline of the current request, if any
+_deadline = contextvars.ContextVar("llm_deadline", default=None)
+# Sites that fell back inside the innermost track_fallbacks() block
+_fallbacks = contextvars.ContextVar("llm_fallbacks", default=None)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """Bound every LLM call made inside the block; nested deadlines keep the tighter one"""
+    if seconds is None:
+        yield
+        return
+    new_deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(new_deadline if current is None else min(current, new_deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def set_deadline(seconds: Optional[float]):
+    """Non-context-manager form for request hooks; returns a token for reset_deadline()"""
+    return _deadline.set(None if seconds is None else time.monotonic() + seconds)
+
+
+def reset_deadline(token):
+    _deadline.reset(token)
+
+
+@contextmanager
+def track_fallbacks():
+    """Collect the sites whose calls fell back (cached, local or error) inside the block"""
+    sites = []
+    token = _fallbacks.set(sites)
+    try:
+        yield sites
+    finally:
+        _fallbacks.reset(token)
+
+
+def mark_fallback(site: str):
+    """
+    Report a degraded answer from outside the gateway (e.g. a completion that did not parse)
+    so the enclosing track_fallbacks() block does not cache it
+    """
+    tracked = _fallbacks.get()
+    if tracked is not None:
+        tracked.append(site)
+
+
+def _error_names(error: Exception) -> set:
+    return {cls.__name__ for cls in type(error).__mro__}
+
+
+def is_timeout(error: Exception) -> bool:
+    """openai / httpx / socket timeouts, matched by class name so openai is not imported here"""
+    return isinstance(error, TimeoutError) or bool(_error_names(error) & {"APITimeoutError", "TimeoutException"})
+
+
+class StreamTimeout(TimeoutError):
+    """Raised when a stream is still producing tokens after its whole-call timeout"""
+
+
+def _check_stream_deadline(site: str, started: float, timeout: float):
+    """
+    httpx applies the timeout to each read, so a stream trickling a token every few seconds
+    would never time out; chunk loops call this to hold the whole call to ``timeout``.
+    """
+    if time.monotonic() - started > timeout:
+        raise StreamTimeout(f"{site}: stream still running after {timeout:.1f}s")
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline, or None when unbounded"""
+    current = _deadline.get()
+    return None if current is None else current - time.monotonic()
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram (seconds) with fixed buckets"""
+
+    BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    self.counts[i] += 1
+                    return
+            self.counts[-1] += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "count": self.count,
+                "sum": round(self.total, 4),
+                "buckets": {str(b): c for b, c in zip(self.buckets + ("+Inf",), self.counts)}
+            }
+
+
+LLM_CALL_SECONDS = metrics.histogram("skilltwin_llm_call_seconds", "LLM call latency by call site", ["site"],
+                                     buckets=LatencyHistogram.BUCKETS)
+LLM_CALLS = metrics.counter("skilltwin_llm_calls_total", "LLM call outcomes by call site", ["site", "outcome"])
+LLM_IN_FLIGHT = metrics.gauge("skilltwin_llm_in_flight", "LLM calls currently holding a gateway slot")
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures, lets one trial call through after reset_timeout"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def cancel_trial(self):
+        """Give back a half-open trial slot when the call never reached the provider"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class _Slot:
+    """A concurrency slot taken by _admit; a hedged call hands it to its primary attempt"""
+
+    def __init__(self):
+        self.handed_off = False
+
+
+class LLMGateway:
+    def __init__(self, max_concurrency: int = 8, default_timeout: float = 30.0,
+                 queue_timeout: float = 10.0, cache_size: int = 256,
+                 breaker: Optional[CircuitBreaker] = None,
+                 hedge_percentile: float = 95.0, hedge_budget: float = 0.05,
+                 hedge_initial_delay: float = 2.0, hedge_min_samples: int = 20):
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self.queue_timeout = queue_timeout
+        self.breaker = breaker or CircuitBreaker()
+
+        # Hedging: fire a duplicate request once the primary is slower than the
+        # hedge_percentile of recent latency, for at most hedge_budget of calls
+        self.hedge_percentile = hedge_percentile
+        self.hedge_budget = hedge_budget
+        self.hedge_initial_delay = hedge_initial_delay
+        self.hedge_min_samples = hedge_min_samples
+        self._hedge_tokens = 0.0
+        self._hedge_token_cap = 5.0
+        self._recent_latency = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency * 2, thread_name_prefix="llm-hedge")
+
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._in_flight = 0
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._outcomes = {}
+
+    @classmethod
+    def from_env(cls) -> "LLMGateway":
+        return cls(
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            default_timeout=float(os.getenv("LLM_TIMEOUT_SECONDS", "30")),
+            queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "10")),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+                reset_timeout=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+            ),
+            hedge_percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "95")),
+            hedge_budget=float(os.getenv("LLM_HEDGE_BUDGET", "0.05")),
+            hedge_initial_delay=float(os.getenv("LLM_HEDGE_INITIAL_DELAY_SECONDS", "2.0"))
+        )
+
+    def chat_completion(self, client, site: str, fallback: Optional[Callable[[], str]] = None,
+                        hedge: bool = False, **kwargs) -> str:
+        """
+        Run client.chat.completions.create(**kwargs) under the gateway and return the
+        message content. On timeout, provider error or open circuit the last good
+        response for the same request is served, then ``fallback()``, else LLMUnavailable.
+        With ``hedge=True`` a slow call is raced against a duplicate request.
+        """
+        key = self._cache_key(site, kwargs)
+        try:
+            with self._admit(site) as (timeout, slot):
+                started = time.monotonic()
+                try:
+                    if hedge:
+                        content = self._hedged_call(client, site, timeout, kwargs, slot)
+                    else:
+                        response = client.with_options(timeout=timeout, max_retries=0).chat.completions.create(**kwargs)
+                        content = response.choices[0].message.content
+                        self._record_latency(site, time.monotonic() - started)
+                except Exception as e:
+                    self._record_breaker_failure(e, timeout)
+                    raise
+                finally:
+                    self._observe(site, time.monotonic() - started)
+            self.breaker.record_success()
+            self._remember(key, content)
+            self._count(site, "ok")
+            return content
+        except Exception as e:
+            return self._fall_back(site, key, fallback, e)
+
+    def stream_chat_completion(self, client, site: str, fallback: Optional[Callable[[], str]] = None,
+                               **kwargs) -> Iterator[str]:
+        """Streaming variant: yields content deltas; a fallback is yielded as a single chunk"""
+        key = self._cache_key(site, kwargs)
+        try:
+            admission = self._admit(site)
+            timeout, _ = admission.__enter__()
+        except Exception as e:
+            yield self._fall_back(site, key, fallback, e)
+            return
+
+        started = time.monotonic()
+        parts = []
+        failure = None
+        stream = None
+        try:
+            stream = client.with_options(timeout=timeout, max_retries=0).chat.completions.create(stream=True, **kwargs)
+            for chunk in stream:
+                _check_stream_deadline(site, started, timeout)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ""
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            failure = e
+        finally:
+            # Also runs when the consumer stops early (GeneratorExit), so the slot is never leaked
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+            self._observe(site, time.monotonic() - started)
+            admission.__exit__(None, None, None)
+            if failure is None:
+                self.breaker.record_success()
+            else:
+                self._record_breaker_failure(failure, timeout)
+
+        if failure is None:
+            self._remember(key, "".join(parts))
+            self._count(site, "ok")
+            return
+        if parts:
+            # Part of the answer already reached the caller; a fallback cannot be spliced in
+            self._count(site, "error")
+            raise LLMUnavailable(f"{site}: stream interrupted: {failure}") from failure
+        yield self._fall_back(site, key, fallback, failure)
+
+    def _record_breaker_failure(self, error: Exception, timeout: float):
+        """
+        Count an error against the provider only when it says something about the provider:
+        server errors, rate limits, connection failures, and timeouts of calls that had the
+        full default_timeout. A timeout cut short by the caller's deadline
+        (X-Request-Timeout) or a rejected request (4xx) must not open the breaker for everyone.
+        """
+        if is_timeout(error):
+            provider_fault = timeout >= self.default_timeout
+        elif isinstance(error, (LLMUnavailable, HedgeCancelled)):
+            provider_fault = False
+        else:
+            status = getattr(error, "status_code", None)
+            provider_fault = status is None or status >= 500 or status == 429
+        if provider_fault:
+            self.breaker.record_failure()
+        else:
+            # A half-open trial that said nothing about the provider is given back
+            self.breaker.cancel_trial()
+
+    def _hedged_call(self, client, site: str, timeout: float, kwargs: Dict, slot: _Slot) -> str:
+        """
+        Start the request; if it has not answered after the site's hedge delay and the
+        budget allows, start an identical one and return whichever finishes first.
+        Attempts stream their output so the loser can be closed as soon as it yields a chunk;
+        a loser still waiting for its first byte is abandoned and its result discarded.
+        Each attempt holds its own slot until it has actually finished, so abandoned
+        attempts still count against max_concurrency.
+        """
+        self._add_hedge_budget()
+        cancel_events = {}
+
+        def launch(attempt_timeout):
+            cancel = threading.Event()
+            future = self._executor.submit(self._attempt, client, site, attempt_timeout, kwargs, cancel)
+            cancel_events[future] = cancel
+            return future
+
+        started = time.monotonic()
+        primary = launch(timeout)
+        slot.handed_off = True
+        primary.add_done_callback(lambda _: self._release_slot())
+        done, _ = wait([primary], timeout=self._hedge_delay(site))
+        if done:
+            return primary.result()
+
+        remaining = timeout - (time.monotonic() - started)
+        if remaining <= 0 or not self._take_hedge_token():
+            self._count(site, "hedge_denied")
+            return primary.result()
+        # The duplicate needs its own concurrency slot; never queue for one
+        if not self._semaphore.acquire(blocking=False):
+            self._count(site, "hedge_denied")
+            return primary.result()
+        with self._lock:
+            self._in_flight += 1
+        LLM_IN_FLIGHT.inc()
+
+        self._count(site, "hedged")
+        secondary = launch(remaining)
+        secondary.add_done_callback(lambda _: self._release_slot())
+
+        pending = {primary, secondary}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        cancel_events[loser].set()
+                        loser.cancel()
+                    if future is secondary:
+                        self._count(site, "hedge_won")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _attempt(self, client, site: str, timeout: float, kwargs: Dict, cancel: threading.Event) -> str:
+        started = time.monotonic()
+        stream = client.with_options(timeout=timeout, max_retries=0).chat.completions.create(stream=True, **kwargs)
+        parts = []
+        try:
+            for chunk in stream:
+                _check_stream_deadline(site, started, timeout)
+                if cancel.is_set():
+                    # Still a latency sample (a lower bound); dropping losers would bias the hedge delay low
+                    self._record_latency(site, time.monotonic() - started)
+                    raise HedgeCancelled(site)
+                if chunk.choices:
+                    parts.append(chunk.choices[0].delta.content or "")
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        self._record_latency(site, time.monotonic() - started)
+        return "".join(parts)
+
+    def _hedge_delay(self, site: str) -> float:
+        with self._lock:
+            samples = sorted(self._recent_latency.get(site, ()))
+        if len(samples) < self.hedge_min_samples:
+            return self.hedge_initial_delay
+        index = min(len(samples) - 1, int(len(samples) * self.hedge_percentile / 100.0))
+        return samples[index]
+
+    def _add_hedge_budget(self):
+        with self._lock:
+            self._hedge_tokens = min(self._hedge_token_cap, self._hedge_tokens + self.hedge_budget)
+
+    def _take_hedge_token(self) -> bool:
+        with self._lock:
+            if self._hedge_tokens >= 1.0:
+                self._hedge_tokens -= 1.0
+                return True
+            return False
+
+    def _record_latency(self, site: str, seconds: float):
+        with self._lock:
+            if site not in self._recent_latency:
+                self._recent_latency[site] = deque(maxlen=200)
+            self._recent_latency[site].append(seconds)
+
+    def _release_slot(self):
+        with self._lock:
+            self._in_flight -= 1
+        LLM_IN_FLIGHT.dec()
+        self._semaphore.release()
+
+    def stats(self) -> Dict:
+        """Per call-site latency histograms and outcome counters, plus breaker state"""
+        with self._lock:
+            sites = sorted(set(self._histograms) | set(self._outcomes))
+            return {
+                "in_flight": self._in_flight,
+                "hedge_tokens": round(self._hedge_tokens, 2),
+                "max_concurrency": self.max_concurrency,
+                "circuit": {"state": self.breaker.state, "consecutive_failures": self.breaker.failures},
+                "cache_entries": len(self._cache),
+                "sites": {
+                    site: {
+                        "latency_seconds": self._histograms[site].snapshot() if site in self._histograms else None,
+                        "outcomes": dict(self._outcomes.get(site, {}))
+                    }
+                    for site in sites
+                }
+            }
+
+    @contextmanager
+    def _admit(self, site: str):
+        """Deadline check, circuit check and concurrency slot; yields (per-call timeout, slot)"""
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded(f"{site}: deadline already passed")
+        if not self.breaker.allow():
+            raise CircuitOpen(f"{site}: provider circuit is open")
+
+        wait = self.queue_timeout if remaining is None else min(self.queue_timeout, remaining)
+        if not self._semaphore.acquire(timeout=wait):
+            self.breaker.cancel_trial()
+            raise DeadlineExceeded(f"{site}: no LLM slot free within {wait:.1f}s")
+        with self._lock:
+            self._in_flight += 1
+        LLM_IN_FLIGHT.inc()
+        slot = _Slot()
+        try:
+            remaining = remaining_time()
+            if remaining is not None and remaining <= 0:
+                self.breaker.cancel_trial()
+                raise DeadlineExceeded(f"{site}: deadline passed while queued")
+            yield (self.default_timeout if remaining is None else min(self.default_timeout, remaining)), slot
+        finally:
+            if not slot.handed_off:
+                self._release_slot()
+
+    def _fall_back(self, site: str, key: str, fallback: Optional[Callable[[], str]], error: Exception) -> str:
+        mark_fallback(site)
+        with self._lock:
+            cached = self._cache.get(key)
+        metrics.record_cache("llm_fallback", cached is not None)
+        if cached is not None:
+            print(f"LLM call {site} failed ({error}); serving cached response")
+            self._count(site, "cached_fallback")
+            return cached
+        if fallback is not None:
+            print(f"LLM call {site} failed ({error}); using local fallback")
+            self._count(site, "local_fallback")
+            return fallback()
+        self._count(site, "error")
+        if isinstance(error, LLMUnavailable):
+            raise error
+        raise LLMUnavailable(f"{site}: {error}") from error
+
+    def _cache_key(self, site: str, kwargs: Dict) -> str:
+        payload = json.dumps(kwargs, sort_keys=True, default=str)
+        return site + ":" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, content: str):
+        with self._lock:
+            self._cache[key] = content
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def _observe(self, site: str, seconds: float):
+        self._histogram(site).observe(seconds)
+        LLM_CALL_SECONDS.observe(seconds, site=site)
+
+    def _histogram(self, site: str) -> LatencyHistogram:
+        with self._lock:
+            if site not in self._histograms:
+                self._histograms[site] = LatencyHistogram()
+            return self._histograms[site]
+
+    def _count(self, site: str, outcome: str):
+        with self._lock:
+            outcomes = self._outcomes.setdefault(site, {})
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        LLM_CALLS.inc(site=site, outcome=outcome)
+
+
+# Process-wide gateway shared by every module
+gateway = LLMGateway.from_env()
+
+
+def chat_completion(client, site: str, fallback: Optional[Callable[[], str]] = None,
+                    hedge: bool = False, **kwargs) -> str:
+    return gateway.chat_completion(client, site, fallback=fallback, hedge=hedge, **kwargs)
+
+
+def stream_chat_completion(client, site: str, fallback: Optional[Callable[[], str]] = None, **kwargs) -> Iterator[str]:
+    return gateway.stream_chat_completion(client, site, fallback=fallback, **kwargs)
+
+
+def stats() -> Dict:
+    return gateway.stats()
@@ -0,0 +1,191 @@
+"""
+Memory Profiling for Skill-Twin Engine
+tracemalloc-based peak/retained allocation per pipeline stage and per result key,
+top allocation sites, and the memory one user's analysis pins in session state
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+import tracing
+
+PROFILE_SPAN = "memprof.profile"
+
+
+class _Frame:
+    __slots__ = ("start", "peak")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.peak = start
+
+
+class MemoryRun(tracing.TraceRun):
+    """
+    TraceRun that also measures tracemalloc peak and retained bytes for every span.
+    tracemalloc is process-wide, so profile one pipeline at a time on one thread.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._stack = []
+        self.stages = {}
+
+    def enter_span(self, span):
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            self._stack[-1].peak = max(self._stack[-1].peak, peak)
+        self._stack.append(_Frame(current))
+        tracemalloc.reset_peak()
+
+    def exit_span(self, span):
+        current, peak = tracemalloc.get_traced_memory()
+        frame = self._stack.pop()
+        frame.peak = max(frame.peak, peak)
+        if self._stack:
+            # reset_peak() below forgets this span's high-water mark; the parent keeps it
+            self._stack[-1].peak = max(self._stack[-1].peak, frame.peak)
+        tracemalloc.reset_peak()
+
+        peak_kb = (frame.peak - frame.start) / 1024.0
+        retained_kb = (current - frame.start) / 1024.0
+        span.args["peak_kb"] = round(peak_kb, 1)
+        span.args["retained_kb"] = round(retained_kb, 1)
+
+        stage = self.stages.setdefault(span.name, {"category": span.category, "calls": 0,
+                                                   "peak_kb": 0.0, "retained_kb": 0.0})
+        stage["calls"] += 1
+        stage["peak_kb"] = round(max(stage["peak_kb"], peak_kb), 1)
+        stage["retained_kb"] = round(stage["retained_kb"] + retained_kb, 1)
+
+
+def deep_sizeof(obj: Any, _seen=None) -> int:
+    """Bytes reachable from obj (containers, strings, plain objects), each object counted once"""
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def result_key_sizes(result: Any) -> Dict[str, float]:
+    """KB per top-level key of a result dict; objects shared between keys count under the first one"""
+    if not isinstance(result, dict):
+        return {}
+    seen = set()
+    return {str(key): round(deep_sizeof(value, seen) / 1024.0, 1) for key, value in result.items()}
+
+
+def top_allocation_sites(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, limit: int = 10) -> List[Dict]:
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__),
+              tracemalloc.Filter(False, tracing.__file__)]
+    diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+    sites = []
+    for stat in diff[:limit]:
+        frame = stat.traceback[0]
+        sites.append({"site": f"{frame.filename}:{frame.lineno}",
+                      "size_kb": round(stat.size_diff / 1024.0, 1),
+                      "count": stat.count_diff})
+    return sites
+
+
+def profile(name: str, func: Callable, *args, top: int = 10, **kwargs) -> Tuple[Any, Dict]:
+    """Run func(*args, **kwargs) under tracemalloc and return (result, memory report)"""
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        run = MemoryRun(name)
+        with tracing.activate(run), tracing.span(PROFILE_SPAN, "pipeline"):
+            result = func(*args, **kwargs)
+            # Parsed soups are reference cycles; only count what outlives a collection as retained
+            gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+
+    pipeline = run.stages.pop(PROFILE_SPAN, {})
+    result_kb = round(deep_sizeof(result) / 1024.0, 1)
+    report = {
+        "name": name,
+        "peak_kb": pipeline.get("peak_kb"),
+        "retained_kb": pipeline.get("retained_kb"),
+        # What a Streamlit session keeps alive when it stores the whole result
+        "per_user_kb": result_kb,
+        "stages": run.stages,
+        "result_keys": result_key_sizes(result),
+        "top_allocations": top_allocation_sites(before, after, top),
+        "trace": run.to_chrome()
+    }
+    return result, report
+
+
+def format_report(report: Dict, users: int = 100) -> str:
+    lines = [f"🧠 {report['name']}: peak {report['peak_kb']} KB, retained {report['retained_kb']} KB, "
+             f"result {report['per_user_kb']} KB/user (~{report['per_user_kb'] * users / 1024.0:.1f} MB for {users} users)"]
+    lines.append("  Stages (peak / retained KB, calls):")
+    for stage, row in sorted(report["stages"].items(), key=lambda kv: kv[1]["peak_kb"], reverse=True):
+        lines.append(f"    {stage:<55} {row['peak_kb']:>9} / {row['retained_kb']:>9}  x{row['calls']}")
+    lines.append("  Result keys (KB):")
+    for key, kb in sorted(report["result_keys"].items(), key=lambda kv: kv[1], reverse=True):
+        lines.append(f"    {key:<30} {kb:>9}")
+    lines.append("  Top allocation sites:")
+    for site in report["top_allocations"]:
+        lines.append(f"    {site['size_kb']:>9} KB  {site['count']:>7} blocks  {site['site']}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import logging
+    import random
+
+    parser = argparse.ArgumentParser(description="Memory profile of the market analysis pipelines (offline)")
+    parser.add_argument("--role", default="Software Developer")
+    parser.add_argument("--jobs", type=int, default=30, help="postings served by the fake job boards")
+    parser.add_argument("--users", type=int, default=100, help="concurrent users for the per-user estimate")
+    parser.add_argument("--output", help="write the full reports (including Chrome traces) as JSON")
+    args = parser.parse_args()
+
+    from benchmarks import fakes
+    from benchmarks.synthetic import make_dataset
+    from real_job_api_integration import JobAPIIntegration
+    from real_job_scraper import RealJobScraper
+    from advanced_job_scraper import AdvancedJobScraper
+
+    logging.disable(logging.INFO)
+    random.seed(0)
+    descriptions = make_dataset("medium")["job_descriptions"]
+
+    def offline(cls):
+        return fakes.offline_scraper(cls(), fakes.FakeJobBoardAdapter(descriptions, cards=args.jobs))
+
+    runs = [
+        ("JobAPIIntegration.get_real_market_analysis", JobAPIIntegration().get_real_market_analysis, (args.role,)),
+        ("RealJobScraper.aggregate_job_data", offline(RealJobScraper).aggregate_job_data, (args.role, "India", args.jobs)),
+        ("AdvancedJobScraper.aggregate_job_data", offline(AdvancedJobScraper).aggregate_job_data,
+         (args.role, "India", args.jobs))
+    ]
+    reports = []
+    for name, func, call_args in runs:
+        _, report = profile(name, func, *call_args)
+        reports.append(report)
+        print(format_report(report, args.users))
+        print()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        print(f"💾 Reports written to {args.output}")
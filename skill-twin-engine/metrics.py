@@ -0,0 +1,219 @@
+"""
+Metrics for Skill-Twin Engine
+Process-wide counters, gauges and histograms rendered in the Prometheus text format
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Seconds; covers sub-millisecond similarity maths up to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _format_labels(self, key: Tuple, extra: Optional[Dict] = None) -> str:
+        pairs = list(zip(self.labelnames, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        return []
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self):
+        with self._lock:
+            return [f"{self.name}{self._format_labels(k)} {_num(v)}" for k, v in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def _samples(self):
+        with self._lock:
+            return [f"{self.name}{self._format_labels(k)} {_num(v)}" for k, v in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "count": 0, "sum": 0.0}
+            series["count"] += 1
+            series["sum"] += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self):
+        lines = []
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["counts"]):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': _num(bound)})} {cumulative}")
+                lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': '+Inf'})} {series['count']}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {_num(series['sum'])}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {series['count']}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help_text, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, tuple(labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, tuple(labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                  buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, tuple(labelnames), buckets=buckets)
+
+    def render(self) -> str:
+        _refresh_cache_ratios()
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+render = REGISTRY.render
+
+# Shared series used across modules
+STAGE_SECONDS = histogram(
+    "skilltwin_stage_seconds",
+    "Time spent in a pipeline stage (pdf_extract, embedding_encode, similarity_compute, json_serialization, ...)",
+    ["stage"]
+)
+CACHE_REQUESTS = counter("skilltwin_cache_requests_total", "Cache lookups by cache and result (hit/miss)",
+                         ["cache", "result"])
+CACHE_HIT_RATIO = gauge("skilltwin_cache_hit_ratio", "Hit ratio per cache since process start", ["cache"])
+
+
+def stage_timer(stage: str):
+    """``with stage_timer("embedding_encode"): ...``"""
+    return STAGE_SECONDS.time(stage=stage)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _refresh_cache_ratios():
+    totals = {}
+    with CACHE_REQUESTS._lock:
+        for (cache, result), value in CACHE_REQUESTS._values.items():
+            hits, total = totals.get(cache, (0.0, 0.0))
+            totals[cache] = (hits + (value if result == "hit" else 0.0), total + value)
+    for cache, (hits, total) in totals.items():
+        CACHE_HIT_RATIO.set(hits / total if total else 0.0, cache=cache)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -0,0 +1,251 @@
+"""
+ONNX Runtime CPU Encoder for Skill-Twin Engine
+Exports the MiniLM sentence encoder to ONNX once (from the local Hugging Face cache),
+applies dynamic int8 quantization and serves encode() with ONNX Runtime + tokenizers,
+so the gap analysis runs without PyTorch.
+
+    python onnx_encoder.py export              # writes embeddings/onnx/<model>/
+    python onnx_encoder.py compare             # latency / memory / score parity vs PyTorch
+    SKILL_TWIN_ENCODER=onnx python backend/app.py
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+ONNX_DIR = os.getenv("SKILL_TWIN_ONNX_DIR", os.path.join(ENGINE_DIR, "embeddings", "onnx"))
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+OPSET = 14
+
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+META_FILE = "encoder.json"
+
+
+def model_dir(model_name: str = DEFAULT_MODEL, directory: str = None) -> str:
+    return os.path.join(directory or ONNX_DIR, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))
+
+
+def export_model(model_name: str = DEFAULT_MODEL, directory: str = None, quantize: bool = True) -> str:
+    """
+    Export the transformer of a SentenceTransformer to ONNX (dynamic batch and sequence axes),
+    save its fast tokenizer and pooling settings, and optionally write an int8 copy.
+    Needs torch, sentence-transformers and onnxruntime; only runs once per model.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    out_dir = model_dir(model_name, directory)
+    os.makedirs(out_dir, exist_ok=True)
+
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0]
+    hf_model, tokenizer = transformer.auto_model, transformer.tokenizer
+    hf_model.eval()
+
+    pooling = st_model[1]
+    if not getattr(pooling, "pooling_mode_mean_tokens", True):
+        raise ValueError(f"{model_name} does not use mean pooling; only mean pooling is exported")
+    normalize = any(type(module).__name__ == "Normalize" for module in st_model)
+
+    sample = tokenizer(["REST API", "Node.js developer"], padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    fp32_path = os.path.join(out_dir, FP32_FILE)
+    with torch.no_grad():
+        torch.onnx.export(hf_model, tuple(sample[name] for name in input_names), fp32_path,
+                          input_names=input_names, output_names=["last_hidden_state"],
+                          dynamic_axes=dynamic_axes, opset_version=OPSET, do_constant_folding=True)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(fp32_path, os.path.join(out_dir, INT8_FILE), weight_type=QuantType.QInt8)
+
+    tokenizer.save_pretrained(out_dir)
+    meta = {
+        "model": model_name,
+        "max_seq_length": int(st_model.max_seq_length),
+        "normalize": normalize,
+        "pooling": "mean",
+        "inputs": input_names,
+        "quantized": quantize,
+        "opset": OPSET,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+    with open(os.path.join(out_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return out_dir
+
+
+class OnnxEncoder:
+    """SentenceTransformer-compatible encode() backed by an exported (optionally int8) ONNX model"""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, directory: str = None, quantized: bool = True,
+                 threads: int = None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.model_name = model_name
+        self.path = model_dir(model_name, directory)
+        with open(os.path.join(self.path, META_FILE), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.quantized = quantized and self.meta.get("quantized", False)
+        self.normalize = self.meta.get("normalize", False)
+        self.input_names = self.meta["inputs"]
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(self.path, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.meta["max_seq_length"])
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = threads or int(os.getenv("SKILL_TWIN_ONNX_THREADS", "0"))
+        if threads:
+            options.intra_op_num_threads = threads
+        model_file = os.path.join(self.path, INT8_FILE if self.quantized else FP32_FILE)
+        self.session = ort.InferenceSession(model_file, options, providers=["CPUExecutionProvider"])
+
+    @classmethod
+    def load_or_export(cls, model_name: str = DEFAULT_MODEL, directory: str = None, quantized: bool = True):
+        """Encoder for model_name, exporting it first if this machine has no export yet"""
+        if not os.path.exists(os.path.join(model_dir(model_name, directory), META_FILE)):
+            print(f"🔧 Exporting {model_name} to ONNX (one-time)...")
+            export_model(model_name, directory, quantize=quantized)
+        return cls(model_name, directory, quantized)
+
+    def _forward(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        columns = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": mask,
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64)
+        }
+        hidden = self.session.run(["last_hidden_state"], {name: columns[name] for name in self.input_names})[0]
+        weights = mask[:, :, None].astype(np.float32)
+        return (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+
+    def encode(self, sentences, batch_size: int = 64, normalize_embeddings: bool = False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        out = np.zeros((len(texts), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        # Length-sorted batches pad less; results are written back in input order
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            out[rows] = self._forward([texts[i] for i in rows])
+        if self.normalize or normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            out = out / np.where(norms == 0, 1.0, norms)
+        return out[0] if single else out
+
+    def get_sentence_embedding_dimension(self) -> int:
+        shape = self.session.get_outputs()[0].shape
+        return int(shape[-1])
+
+
+def _rss_mb() -> float:
+    """Resident set size of this process in MB (Linux /proc, else peak RSS)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def gap_level(score: float, gap_threshold: float = 0.55, high_threshold: float = 0.40) -> str:
+    """compute_gaps' classification of a best-match score"""
+    if score >= gap_threshold:
+        return "None"
+    return "High" if score < high_threshold else "Medium"
+
+
+def best_match_scores(model, job_skills: List[str], known_skills: List[str]) -> np.ndarray:
+    """Best cosine similarity of every job skill against the known skills"""
+    job = np.asarray(model.encode(job_skills, normalize_embeddings=True), dtype=np.float32)
+    known = np.asarray(model.encode(known_skills, normalize_embeddings=True), dtype=np.float32)
+    return (job @ known.T).max(axis=1)
+
+
+def parity_report(reference, candidate, job_skills: List[str], known_skills: List[str],
+                  classify: Callable[[float], str] = gap_level) -> Dict:
+    """Score drift and level agreement (compute_gaps levels by default) of candidate vs reference encoder"""
+    expected = best_match_scores(reference, job_skills, known_skills)
+    actual = best_match_scores(candidate, job_skills, known_skills)
+    drift = np.abs(expected - actual)
+    levels = [(classify(e), classify(a)) for e, a in zip(expected, actual)]
+    flips = [{"skill": skill, "reference": round(float(e), 4), "candidate": round(float(a), 4)}
+             for skill, e, a, (le, la) in zip(job_skills, expected, actual, levels) if le != la]
+    return {
+        "pairs": len(job_skills),
+        "max_drift": round(float(drift.max()), 4) if len(drift) else 0.0,
+        "mean_drift": round(float(drift.mean()), 4) if len(drift) else 0.0,
+        "level_agreement": round(1 - len(flips) / max(len(job_skills), 1), 4),
+        "flips": flips
+    }
+
+
+def latency_ms(model, batches: List[List[str]], repeat: int = 3) -> Dict:
+    model.encode(batches[0])  # warm-up
+    samples = []
+    for _ in range(repeat):
+        for batch in batches:
+            started = time.perf_counter()
+            model.encode(batch)
+            samples.append((time.perf_counter() - started) * 1000.0)
+    return {"p50": round(float(np.percentile(samples, 50)), 3), "p95": round(float(np.percentile(samples, 95)), 3)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ONNX Runtime int8 encoder for the skill embeddings")
+    parser.add_argument("command", choices=["export", "compare"])
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--dir", default=ONNX_DIR)
+    parser.add_argument("--no-quantize", action="store_true", help="use / export the float32 graph only")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        path = export_model(args.model, args.dir, quantize=not args.no_quantize)
+        sizes = {name: os.path.getsize(os.path.join(path, name)) / 1e6
+                 for name in (FP32_FILE, INT8_FILE) if os.path.exists(os.path.join(path, name))}
+        print(f"✅ Exported {args.model} to {path}: " + ", ".join(f"{k} {v:.1f} MB" for k, v in sizes.items()))
+    else:
+        import random
+        from benchmarks.synthetic import make_dataset
+
+        data = make_dataset("medium")
+        vocabulary = list(dict.fromkeys(data["market_skills"] + data["student_skills"] + data["curriculum"]))
+        rng = random.Random(0)
+        # Same shape as compute_gaps traffic: 5-15 short skill strings per call
+        batches = [rng.sample(vocabulary, k=rng.randint(5, 15)) for _ in range(50)]
+
+        before = _rss_mb()
+        candidate = OnnxEncoder.load_or_export(args.model, args.dir, quantized=not args.no_quantize)
+        onnx_mb = _rss_mb() - before
+        onnx_latency = latency_ms(candidate, batches)
+
+        before = _rss_mb()
+        from sentence_transformers import SentenceTransformer
+        reference = SentenceTransformer(args.model, device="cpu")
+        torch_mb = _rss_mb() - before
+        torch_latency = latency_ms(reference, batches)
+
+        report = parity_report(reference, candidate, data["market_skills"] + data["extracted_skills"],
+                               data["student_skills"] + data["curriculum"])
+        label = "onnx-fp32" if args.no_quantize else "onnx-int8"
+        print(f"{'encoder':<12} {'p50 ms':>8} {'p95 ms':>8} {'RSS +MB':>8}")
+        print(f"{'pytorch':<12} {torch_latency['p50']:>8} {torch_latency['p95']:>8} {torch_mb:>8.0f}")
+        print(f"{label:<12} {onnx_latency['p50']:>8} {onnx_latency['p95']:>8} {onnx_mb:>8.0f}")
+        print(f"📏 Score drift max {report['max_drift']}, mean {report['mean_drift']}; "
+              f"gap-level agreement {report['level_agreement']:.1%} over {report['pairs']} skills")
+        for flip in report["flips"]:
+            print(f"   ↔ {flip['skill']}: {flip['reference']} -> {flip['candidate']}")
@@ -1,19 +1,35 @@
 import json
-from openai import OpenAI
 import os
+import re
 from dotenv import load_dotenv
-import pdfplumber  # Reuse for PDF resumes
+import llm_gateway
+import resume_sections
+import tiered_extractor
+from lazy_models import openai_client, pdfplumber  # pdfplumber: reuse for PDF resumes
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = openai_client()
 
-def extract_resume_skills(pdf_path_or_text):
-    if os.path.exists(pdf_path_or_text):  # PDF file
-        with pdfplumber.open(pdf_path_or_text) as pdf:
-            text = "\n".join([page.extract_text() or "" for page in pdf.pages])
-    else:
-        text = pdf_path_or_text  # raw text input
+# Soft skills mostly live in the summary and achievements, so they are kept here too
+PROMPT_SECTIONS = resume_sections.RELEVANT + ("summary", "achievements")
+
+# Matched locally when the LLM is not needed (or only sees part of the resume)
+SOFT_SKILLS = ["Teamwork", "Communication", "Leadership", "Problem Solving", "Time Management",
+               "Critical Thinking", "Adaptability", "Collaboration", "Attention to Detail", "Creativity"]
+
+def local_soft_skills(text):
+    text_lower = text.lower()
+    return [skill for skill in SOFT_SKILLS if skill.lower() in text_lower]
+
+def local_projects(lines):
+    """Project titles: the non-bullet lines of the Projects section"""
+    projects = []
+    for section in resume_sections.segment(lines):
+        if section.name == "projects":
+            projects.extend(re.sub(r"^\d+[.)]\s*", "", line) for line in section.lines if line[:1] not in "-*•")
+    return projects
 
+def llm_resume_skills(text):
     prompt = f"""
     Extract all technical and soft skills from this student resume text.
     Include programming languages, tools, frameworks, projects, certifications.
@@ -25,20 +41,45 @@ def extract_resume_skills(pdf_path_or_text):
     Text: {text[:5000]}
     """
 
-    response = client.chat.completions.create(
+    content = llm_gateway.chat_completion(
+        client, "parse_resume.extract_resume_skills",
         model="gpt-4o-mini",
         messages=[{"role": "user", "content": prompt}],
         response_format={"type": "json_object"}
     )
-    return json.loads(response.choices[0].message.content)
+    return json.loads(content)
+
+def extract_resume_skills(pdf_path_or_text):
+    if os.path.exists(pdf_path_or_text):  # PDF file
+        with pdfplumber.open(pdf_path_or_text) as pdf:
+            text = "\n".join([page.extract_text() or "" for page in pdf.pages])
+            lines = resume_sections.pdf_lines(pdf)
+    else:
+        text = pdf_path_or_text  # raw text input
+        lines = resume_sections.text_lines(text)
+    text = resume_sections.relevant_text(lines, text, PROMPT_SECTIONS)
+
+    # Technical skills: local taxonomy first, the LLM only for the unexplained text
+    from_llm = {}
+    def llm(residual):
+        from_llm.update(llm_resume_skills(residual))
+        return from_llm.get("technical_skills", [])
+    technical = tiered_extractor.extract(text, "parse_resume.extract_resume_skills", llm)
+
+    return {
+        "technical_skills": technical,
+        "soft_skills": list(dict.fromkeys(from_llm.get("soft_skills", []) + local_soft_skills(text))),
+        "projects": list(dict.fromkeys(from_llm.get("projects", []) + local_projects(lines)))
+    }
 
 # Test with sample
-sample_resume = """
+if __name__ == "__main__":
+    sample_resume = """
 Skills: Python, Java, SQL, Machine Learning, Git
 Projects: E-commerce website using React & Node.js
 """
-skills = extract_resume_skills(sample_resume)
-with open('sample_student_skills.json', 'w') as f:
-    json.dump(skills, f, indent=2)
+    skills = extract_resume_skills(sample_resume)
+    with open('sample_student_skills.json', 'w') as f:
+        json.dump(skills, f, indent=2)
 
-print("Student skills saved!")
\ No newline at end of file
+    print("Student skills saved!")
\ No newline at end of file
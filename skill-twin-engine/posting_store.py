@@ -0,0 +1,197 @@
+"""
+Posting Store for Skill-Twin Engine
+Scraped job postings and their extracted skills in SQLite, keyed by the SHA-256 of the
+normalised description, so the same posting seen on two boards (or two nights) is
+extracted once. Batch extraction (batch_extraction.py) fills it; JobScraper reads it.
+Skills are only served while they come from the current extractor version and mode;
+older rows go back to the batch run.
+
+    SKILL_TWIN_POSTING_STORE=/path/to/postings.sqlite3   # off unless set
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Dict, Iterable, List, Optional
+
+# Extraction status of a posting: pending -> submitted -> done, or failed (retried until MAX_ATTEMPTS)
+STATUSES = ("pending", "submitted", "done", "failed")
+MAX_ATTEMPTS = 3
+
+
+def posting_id(description: str) -> str:
+    return hashlib.sha256(" ".join(description.split()).lower().encode("utf-8")).hexdigest()
+
+
+def extractor_key() -> str:
+    """Version, mode and threshold of the extraction that produced a row's skills"""
+    # Imported here so opening the store does not build the extractor's taxonomy imports
+    from document_cache import EXTRACTOR_VERSION
+    from tiered_extractor import config_key
+    return f"v{EXTRACTOR_VERSION}:{config_key()}"
+
+
+class PostingStore:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._init_db()
+
+    @classmethod
+    def from_env(cls) -> Optional["PostingStore"]:
+        path = os.getenv("SKILL_TWIN_POSTING_STORE", "")
+        if path.lower() in ("", "0", "off", "false", "no"):
+            return None
+        return cls(path)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def _init_db(self):
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS postings (
+                    id TEXT PRIMARY KEY,
+                    title TEXT,
+                    company TEXT,
+                    source TEXT,
+                    url TEXT,
+                    description TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    local_skills TEXT,
+                    skills TEXT,
+                    extractor TEXT,
+                    batch_id TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            if "extractor" not in {row[1] for row in conn.execute("PRAGMA table_info(postings)")}:
+                conn.execute("ALTER TABLE postings ADD COLUMN extractor TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_postings_status ON postings (status)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_postings_batch ON postings (batch_id)")
+
+    def add(self, jobs: Iterable[Dict]) -> int:
+        """Insert scraped jobs (title, company, description, ...); already-known descriptions are skipped"""
+        now = time.time()
+        rows = [(posting_id(job["description"]), job.get("title"), job.get("company"), job.get("source"),
+                 job.get("url"), job["description"], now, now)
+                for job in jobs if (job.get("description") or "").strip()]
+        with closing(self._connect()) as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO postings (id, title, company, source, url, description, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            return conn.total_changes - before
+
+    def pending(self, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Postings still needing extraction: new ones, then failed ones with attempts left,
+        then ones extracted by another extractor version or mode
+        """
+        query = ("SELECT id, description FROM postings WHERE status = 'pending' "
+                 "OR (status = 'failed' AND attempts < ?) "
+                 "OR (status = 'done' AND (extractor IS NULL OR extractor != ?)) ORDER BY status DESC, created_at")
+        params = (MAX_ATTEMPTS, extractor_key())
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query + (" LIMIT ?" if limit else ""),
+                                params + (limit,) if limit else params).fetchall()
+        return [{"id": row[0], "description": row[1]} for row in rows]
+
+    def finish(self, entries: Dict[str, List[str]], batch_id: Optional[str] = None) -> int:
+        """
+        Store skills for postings. With a batch_id, only postings still submitted under that
+        batch are updated, so ingesting the same output file twice changes nothing.
+        """
+        now, extractor = time.time(), extractor_key()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN")
+            before = conn.total_changes
+            for pid, skills in entries.items():
+                if batch_id is None:
+                    conn.execute("UPDATE postings SET status = 'done', skills = ?, extractor = ?, error = NULL, "
+                                 "updated_at = ? WHERE id = ?", (json.dumps(skills), extractor, now, pid))
+                else:
+                    conn.execute("UPDATE postings SET status = 'done', skills = ?, extractor = ?, error = NULL, "
+                                 "updated_at = ? WHERE id = ? AND status = 'submitted' AND batch_id = ?",
+                                 (json.dumps(skills), extractor, now, pid, batch_id))
+            changed = conn.total_changes - before
+            conn.execute("COMMIT")
+        return changed
+
+    def mark_submitted(self, local_skills: Dict[str, List[str]], batch_id: str):
+        """Postings in a batch request file, with what the local tier already found for each"""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "UPDATE postings SET status = 'submitted', batch_id = ?, local_skills = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                [(batch_id, json.dumps(skills), now, pid) for pid, skills in local_skills.items()]
+            )
+            conn.execute("COMMIT")
+
+    def reassign(self, old_batch_id: str, new_batch_id: str) -> int:
+        """Move postings waiting on a provisional batch id to the id the backend returned"""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute("UPDATE postings SET batch_id = ?, updated_at = ? "
+                                  "WHERE status = 'submitted' AND batch_id = ?",
+                                  (new_batch_id, time.time(), old_batch_id))
+            return cursor.rowcount
+
+    def mark_failed(self, errors: Dict[str, str], batch_id: str) -> int:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN")
+            before = conn.total_changes
+            conn.executemany(
+                "UPDATE postings SET status = 'failed', error = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'submitted' AND batch_id = ?",
+                [(error[:500], now, pid, batch_id) for pid, error in errors.items()]
+            )
+            changed = conn.total_changes - before
+            conn.execute("COMMIT")
+        return changed
+
+    def submitted(self, batch_id: str) -> Dict[str, List[str]]:
+        """posting id -> local skills, for postings still waiting on a batch"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT id, local_skills FROM postings WHERE status = 'submitted' AND batch_id = ?",
+                                (batch_id,)).fetchall()
+        return {row[0]: json.loads(row[1] or "[]") for row in rows}
+
+    def skills_for(self, description: str) -> Optional[List[str]]:
+        """Extracted skills for a description, or None when the current extractor has not produced them"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT skills FROM postings WHERE id = ? AND status = 'done' AND extractor = ?",
+                               (posting_id(description), extractor_key())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def stats(self) -> Dict:
+        with closing(self._connect()) as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM postings GROUP BY status").fetchall())
+            exhausted = conn.execute("SELECT COUNT(*) FROM postings WHERE status = 'failed' AND attempts >= ?",
+                                     (MAX_ATTEMPTS,)).fetchone()[0]
+        return {**{status: counts.get(status, 0) for status in STATUSES}, "exhausted": exhausted,
+                "total": sum(counts.values())}
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_store() -> Optional[PostingStore]:
+    """Process-wide store (None unless SKILL_TWIN_POSTING_STORE is set)"""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = PostingStore.from_env() or False
+    return _default or None
@@ -8,6 +8,14 @@ import json
 import time
 from typing import List, Dict
 import random
+from tracing import span, traced, traced_pipeline
+
+# Role-specific skills based on real job postings (also embedded by skill_taxonomy)
+SAMPLE_ROLE_SKILLS = {
+    "Software Developer": ["Python", "Java", "SQL", "Git", "REST API", "Problem Solving"],
+    "Full Stack Developer": ["JavaScript", "React", "Node.js", "MongoDB", "HTML", "CSS"],
+    "Data Scientist": ["Python", "SQL", "Machine Learning", "Statistics", "Pandas", "NumPy"]
+}
 
 class JobAPIIntegration:
     def __init__(self):
@@ -18,6 +26,7 @@ class JobAPIIntegration:
             "github_jobs": "https://jobs.github.com/positions.json"  # Deprecated but example
         }
         
+    @traced("scraping")
     def get_sample_real_jobs(self, role: str, location: str = "India") -> List[Dict]:
         """
         Get realistic job data that mimics real job market
@@ -67,13 +76,6 @@ class JobAPIIntegration:
             "Mumbai", "Kolkata", "Ahmedabad", "Jaipur", "Indore"
         ]
         
-        # Role-specific skills based on real job postings
-        role_skills = {
-            "Software Developer": ["Python", "Java", "SQL", "Git", "REST API", "Problem Solving"],
-            "Full Stack Developer": ["JavaScript", "React", "Node.js", "MongoDB", "HTML", "CSS"],
-            "Data Scientist": ["Python", "SQL", "Machine Learning", "Statistics", "Pandas", "NumPy"]
-        }
-        
         # Generate realistic job postings
         jobs = []
         patterns = job_patterns.get(role, job_patterns["Software Developer"])
@@ -82,7 +84,7 @@ class JobAPIIntegration:
             job_title = random.choice(patterns)
             company = random.choice(companies)
             location = random.choice(locations)
-            skills = role_skills.get(role, ["Programming", "Problem Solving"])
+            skills = SAMPLE_ROLE_SKILLS.get(role, ["Programming", "Problem Solving"])
             
             # Add some variation to make it realistic
             experience = random.choice(["0-1 years", "Fresher", "Entry Level", "0-2 years"])
@@ -166,6 +168,7 @@ class JobAPIIntegration:
         posted_date = datetime.datetime.now() - datetime.timedelta(days=days_ago)
         return posted_date.strftime("%Y-%m-%d")
     
+    @traced("extraction")
     def extract_skills_from_real_descriptions(self, jobs: List[Dict]) -> List[str]:
         """Extract skills from realistic job descriptions"""
         all_skills = []
@@ -196,6 +199,7 @@ class JobAPIIntegration:
         sorted_skills = sorted(skill_count.items(), key=lambda x: x[1], reverse=True)
         return [skill.title() for skill, count in sorted_skills[:20]]
     
+    @traced("aggregation")
     def get_real_market_analysis(self, role: str, location: str = "India") -> Dict:
         """Get comprehensive real market analysis"""
         # Get realistic job data
@@ -248,6 +252,7 @@ class RealJobSkillTwin:
     def __init__(self):
         self.job_api = JobAPIIntegration()
     
+    @traced_pipeline()
     def analyze_with_real_market(self, student_skills: List[str], 
                                target_role: str,
                                curriculum_skills: List[str],
@@ -258,89 +263,92 @@ class RealJobSkillTwin:
         market_data = self.job_api.get_real_market_analysis(target_role, location)
         market_skills = market_data['market_insights']['top_skills']
         
-        # Compare student with market
-        student_matches = 0
-        student_gaps = []
-        
-        for market_skill in market_skills[:15]:
-            best_match = None
-            best_similarity = 0
+        with span("match_student_skills", "matching"):
+            # Compare student with market
+            student_matches = 0
+            student_gaps = []
             
-            for student_skill in student_skills:
-                # Simple string similarity
-                market_lower = market_skill.lower()
-                student_lower = student_skill.lower()
+            for market_skill in market_skills[:15]:
+                best_match = None
+                best_similarity = 0
                 
-                if market_lower == student_lower:
-                    similarity = 1.0
-                elif market_lower in student_lower or student_lower in market_lower:
-                    similarity = 0.8
-                else:
-                    similarity = 0.0
+                for student_skill in student_skills:
+                    # Simple string similarity
+                    market_lower = market_skill.lower()
+                    student_lower = student_skill.lower()
+                    
+                    if market_lower == student_lower:
+                        similarity = 1.0
+                    elif market_lower in student_lower or student_lower in market_lower:
+                        similarity = 0.8
+                    else:
+                        similarity = 0.0
+                    
+                    if similarity > best_similarity and similarity > 0.6:
+                        best_similarity = similarity
+                        best_match = student_skill
                 
-                if similarity > best_similarity and similarity > 0.6:
-                    best_similarity = similarity
-                    best_match = student_skill
+                if best_match and best_similarity >= 0.7:
+                    student_matches += 1
+                else:
+                    urgency = "High" if market_skill in market_skills[:8] else "Medium"
+                    student_gaps.append({
+                        "skill": market_skill,
+                        "match_score": round(best_similarity, 3),
+                        "urgency": urgency
+                    })
             
-            if best_match and best_similarity >= 0.7:
-                student_matches += 1
-            else:
-                urgency = "High" if market_skill in market_skills[:8] else "Medium"
-                student_gaps.append({
-                    "skill": market_skill,
-                    "match_score": round(best_similarity, 3),
-                    "urgency": urgency
-                })
-        
-        student_match_percentage = (student_matches / len(market_skills[:15])) * 100 if market_skills else 0
-        
-        # Compare curriculum with market
-        curriculum_matches = 0
-        curriculum_gaps = []
-        
-        for market_skill in market_skills:
-            best_match = None
-            best_similarity = 0
+            student_match_percentage = (student_matches / len(market_skills[:15])) * 100 if market_skills else 0
+            
+        with span("match_curriculum", "matching"):
+            # Compare curriculum with market
+            curriculum_matches = 0
+            curriculum_gaps = []
             
-            for curriculum_skill in curriculum_skills:
-                market_lower = market_skill.lower()
-                curriculum_lower = curriculum_skill.lower()
+            for market_skill in market_skills:
+                best_match = None
+                best_similarity = 0
                 
-                if market_lower == curriculum_lower:
-                    similarity = 1.0
-                elif market_lower in curriculum_lower or curriculum_lower in market_lower:
-                    similarity = 0.8
-                else:
-                    similarity = 0.0
+                for curriculum_skill in curriculum_skills:
+                    market_lower = market_skill.lower()
+                    curriculum_lower = curriculum_skill.lower()
+                    
+                    if market_lower == curriculum_lower:
+                        similarity = 1.0
+                    elif market_lower in curriculum_lower or curriculum_lower in market_lower:
+                        similarity = 0.8
+                    else:
+                        similarity = 0.0
+                    
+                    if similarity > best_similarity and similarity > 0.6:
+                        best_similarity = similarity
+                        best_match = curriculum_skill
                 
-                if similarity > best_similarity and similarity > 0.6:
-                    best_similarity = similarity
-                    best_match = curriculum_skill
+                if best_match and best_similarity >= 0.7:
+                    curriculum_matches += 1
+                else:
+                    curriculum_gaps.append(market_skill)
             
-            if best_match and best_similarity >= 0.7:
-                curriculum_matches += 1
-            else:
-                curriculum_gaps.append(market_skill)
-        
-        curriculum_coverage = (curriculum_matches / len(market_skills)) * 100 if market_skills else 0
-        
-        # Generate recommendations
-        recommendations = []
-        priority_skills = [gap['skill'] for gap in student_gaps[:8]] + curriculum_gaps[:5]
-        
-        for i, skill in enumerate(priority_skills):
-            priority = "High" if i < 5 else "Medium" if i < 10 else "Low"
-            category = "Student Gap" if skill in [g['skill'] for g in student_gaps] else "Curriculum Gap"
+            curriculum_coverage = (curriculum_matches / len(market_skills)) * 100 if market_skills else 0
+            
+        with span("build_recommendations", "recommendation"):
+            # Generate recommendations
+            recommendations = []
+            priority_skills = [gap['skill'] for gap in student_gaps[:8]] + curriculum_gaps[:5]
+            
+            for i, skill in enumerate(priority_skills):
+                priority = "High" if i < 5 else "Medium" if i < 10 else "Low"
+                category = "Student Gap" if skill in [g['skill'] for g in student_gaps] else "Curriculum Gap"
+                
+                recommendations.append({
+                    "skill": skill,
+                    "priority": priority,
+                    "category": category,
+                    "estimated_time": "2-4 weeks" if priority == "High" else "4-8 weeks",
+                    "resources": self.get_learning_resources(skill),
+                    "market_demand": f"Appears in {len([j for j in market_data['jobs'] if skill.lower() in j.get('description', '').lower()][:3])}+ job postings"
+                })
             
-            recommendations.append({
-                "skill": skill,
-                "priority": priority,
-                "category": category,
-                "estimated_time": "2-4 weeks" if priority == "High" else "4-8 weeks",
-                "resources": self.get_learning_resources(skill),
-                "market_demand": f"Appears in {len([j for j in market_data['jobs'] if skill.lower() in j.get('description', '').lower()][:3])}+ job postings"
-            })
-        
         return {
             "student_profile": {
                 "total_skills": len(student_skills),
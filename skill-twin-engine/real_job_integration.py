@@ -8,11 +8,13 @@ import time
 from typing import List, Dict
 from real_job_scraper import RealJobScraper
 import difflib
+from tracing import span, traced, traced_pipeline
 
 class RealJobMarketAnalyzer:
     def __init__(self):
         self.job_scraper = RealJobScraper()
         
+    @traced("aggregation")
     def get_current_job_market_skills(self, role: str, location: str = "India") -> Dict:
         """
         Get current market skills by scraping real job portals
@@ -35,6 +37,7 @@ class RealJobMarketAnalyzer:
             print(f"Error getting real market skills: {e}")
             return {"role": role, "skills": [], "error": str(e)}
     
+    @traced("matching")
     def compare_with_curriculum(self, market_skills: List[str], 
                               curriculum_skills: List[str]) -> Dict:
         """
@@ -89,6 +92,7 @@ class RealJobMarketAnalyzer:
             "missing_skills": len([g for g in gap_analysis if g['gap_level'] == 'Not Covered'])
         }
     
+    @traced("aggregation")
     def generate_real_market_report(self, role: str, curriculum_skills: List[str],
                                   location: str = "India") -> Dict:
         """
@@ -148,6 +152,7 @@ class RealJobMarketAnalyzer:
         
         return report
     
+    @traced("recommendation")
     def generate_curriculum_recommendations(self, missing_skills: List[str], 
                                           partially_covered: List[str]) -> List[Dict]:
         """
@@ -178,6 +183,7 @@ class RealSkillTwinIntegration:
     def __init__(self):
         self.job_analyzer = RealJobMarketAnalyzer()
         
+    @traced_pipeline()
     def comprehensive_real_analysis(self, student_skills: List[str], 
                                   target_role: str,
                                   curriculum_skills: List[str],
@@ -196,37 +202,38 @@ class RealSkillTwinIntegration:
         # Analyze student vs real market
         market_skills = market_report['market_skills']['top_skills']
         
-        # Calculate student-market match
-        student_matches = 0
-        student_gaps = []
-        
-        for market_skill in market_skills[:15]:  # Top 15 market skills
-            best_match = None
-            best_similarity = 0
+        with span("match_student_skills", "matching"):
+            # Calculate student-market match
+            student_matches = 0
+            student_gaps = []
             
-            for student_skill in student_skills:
-                similarity = difflib.SequenceMatcher(
-                    None,
-                    market_skill.lower(),
-                    student_skill.lower()
-                ).ratio()
+            for market_skill in market_skills[:15]:  # Top 15 market skills
+                best_match = None
+                best_similarity = 0
                 
-                if similarity > best_similarity and similarity > 0.6:
-                    best_similarity = similarity
-                    best_match = student_skill
+                for student_skill in student_skills:
+                    similarity = difflib.SequenceMatcher(
+                        None,
+                        market_skill.lower(),
+                        student_skill.lower()
+                    ).ratio()
+                    
+                    if similarity > best_similarity and similarity > 0.6:
+                        best_similarity = similarity
+                        best_match = student_skill
+                
+                if best_match and best_similarity >= 0.7:
+                    student_matches += 1
+                else:
+                    urgency = "High" if market_skill in market_skills[:8] else "Medium"
+                    student_gaps.append({
+                        "skill": market_skill,
+                        "match_score": round(best_similarity, 3),
+                        "urgency": urgency
+                    })
+            
+            student_match_percentage = (student_matches / len(market_skills[:15])) * 100 if market_skills else 0
             
-            if best_match and best_similarity >= 0.7:
-                student_matches += 1
-            else:
-                urgency = "High" if market_skill in market_skills[:8] else "Medium"
-                student_gaps.append({
-                    "skill": market_skill,
-                    "match_score": round(best_similarity, 3),
-                    "urgency": urgency
-                })
-        
-        student_match_percentage = (student_matches / len(market_skills[:15])) * 100 if market_skills else 0
-        
         # Combine all insights
         comprehensive_analysis = {
             "student_profile": {
@@ -247,6 +254,7 @@ class RealSkillTwinIntegration:
         
         return comprehensive_analysis
     
+    @traced("recommendation")
     def generate_student_recommendations(self, student_gaps: List[Dict], 
                                        market_gaps: List[str]) -> List[Dict]:
         """
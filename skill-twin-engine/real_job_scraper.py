@@ -12,11 +12,22 @@ from typing import List, Dict, Optional
 import logging
 from urllib.parse import quote_plus, urljoin
 import re
+from tracing import span, traced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Common technical skills keywords (also part of tiered_extractor's taxonomy)
+TECH_SKILLS = [
+    'python', 'java', 'javascript', 'react', 'angular', 'vue', 'node.js', 'express',
+    'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'aws', 'azure', 'gcp',
+    'docker', 'kubernetes', 'git', 'linux', 'spring', 'django', 'flask',
+    'tensorflow', 'pytorch', 'machine learning', 'data science', 'api',
+    'rest', 'graphql', 'html', 'css', 'bootstrap', 'jquery', 'typescript',
+    'c++', 'c#', 'go', 'rust', 'swift', 'kotlin', 'php', 'ruby'
+]
+
 class RealJobScraper:
     def __init__(self):
         self.session = requests.Session()
@@ -43,6 +54,7 @@ class RealJobScraper:
         """Implement rate limiting to avoid being blocked"""
         time.sleep(self.rate_limit_delay + random.uniform(1.0, 3.0))
         
+    @traced("scraping")
     def scrape_indeed_jobs(self, role: str, location: str = "India", limit: int = 15) -> List[Dict]:
         """Scrape real jobs from Indeed.com"""
         jobs = []
@@ -144,6 +156,7 @@ class RealJobScraper:
             logger.error(f"Error getting Indeed job description: {e}")
             return "Description not available"
     
+    @traced("scraping")
     def scrape_naukri_jobs(self, role: str, location: str = "India", limit: int = 15) -> List[Dict]:
         """Scrape real jobs from Naukri.com"""
         jobs = []
@@ -232,6 +245,7 @@ class RealJobScraper:
             logger.error(f"Error getting Naukri job description: {e}")
             return "Description not available"
     
+    @traced("scraping")
     def scrape_timesjobs_jobs(self, role: str, location: str = "India", limit: int = 15) -> List[Dict]:
         """Scrape real jobs from TimesJobs.com"""
         jobs = []
@@ -323,25 +337,16 @@ class RealJobScraper:
             logger.error(f"Error getting TimesJobs description: {e}")
             return "Description not available"
     
+    @traced("extraction")
     def extract_skills_from_description(self, description: str) -> List[str]:
         """Extract technical skills from job description"""
         if not description or len(description) < 50:
             return []
         
-        # Common technical skills keywords
-        tech_skills = [
-            'python', 'java', 'javascript', 'react', 'angular', 'vue', 'node.js', 'express',
-            'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'aws', 'azure', 'gcp',
-            'docker', 'kubernetes', 'git', 'linux', 'spring', 'django', 'flask',
-            'tensorflow', 'pytorch', 'machine learning', 'data science', 'api',
-            'rest', 'graphql', 'html', 'css', 'bootstrap', 'jquery', 'typescript',
-            'c++', 'c#', 'go', 'rust', 'swift', 'kotlin', 'php', 'ruby'
-        ]
-        
         found_skills = []
         description_lower = description.lower()
         
-        for skill in tech_skills:
+        for skill in TECH_SKILLS:
             # Use word boundaries to avoid partial matches
             pattern = r'\b' + re.escape(skill.lower()) + r'\b'
             if re.search(pattern, description_lower):
@@ -381,6 +386,7 @@ class RealJobScraper:
         
         return "Not specified"
     
+    @traced("aggregation")
     def aggregate_job_data(self, role: str, location: str = "India", limit: int = 20) -> Dict:
         """Aggregate job data from multiple sources"""
         all_jobs = []
@@ -421,42 +427,43 @@ class RealJobScraper:
         sorted_skills = sorted(skill_count.items(), key=lambda x: x[1], reverse=True)
         top_skills = [skill.title() for skill, count in sorted_skills[:25]]
         
-        # Prepare result
-        result = {
-            "search_query": {
-                "role": role,
-                "location": location,
-                "limit": limit
-            },
-            "aggregation": {
-                "total_jobs_found": len(all_jobs),
-                "sources_used": len([job for job in all_jobs if job.get('source')]),
-                "unique_companies": len(set(job['company'] for job in all_jobs if job['company'] != "N/A")),
-                "date_range": "Last 30 days"
-            },
-            "market_insights": {
-                "top_skills": top_skills,
-                "skill_frequency": dict(sorted_skills[:25]),
-                "experience_distribution": self.analyze_experience_distribution(all_jobs),
-                "location_distribution": self.analyze_location_distribution(all_jobs)
-            },
-            "jobs": [
-                {
-                    "title": job['title'],
-                    "company": job['company'],
-                    "location": job['location'],
-                    "description": job['description'][:500] + "..." if len(job['description']) > 500 else job['description'],
-                    "url": job['url'],
-                    "posted_date": job['posted_date'],
-                    "source": job['source'],
-                    "experience_level": job['experience_level'],
-                    "salary": job['salary'],
-                    "extracted_skills": job['extracted_skills']
-                }
-                for job in all_jobs
-            ]
-        }
-        
+        with span("build_result", "aggregation"):
+            # Prepare result
+            result = {
+                "search_query": {
+                    "role": role,
+                    "location": location,
+                    "limit": limit
+                },
+                "aggregation": {
+                    "total_jobs_found": len(all_jobs),
+                    "sources_used": len([job for job in all_jobs if job.get('source')]),
+                    "unique_companies": len(set(job['company'] for job in all_jobs if job['company'] != "N/A")),
+                    "date_range": "Last 30 days"
+                },
+                "market_insights": {
+                    "top_skills": top_skills,
+                    "skill_frequency": dict(sorted_skills[:25]),
+                    "experience_distribution": self.analyze_experience_distribution(all_jobs),
+                    "location_distribution": self.analyze_location_distribution(all_jobs)
+                },
+                "jobs": [
+                    {
+                        "title": job['title'],
+                        "company": job['company'],
+                        "location": job['location'],
+                        "description": job['description'][:500] + "..." if len(job['description']) > 500 else job['description'],
+                        "url": job['url'],
+                        "posted_date": job['posted_date'],
+                        "source": job['source'],
+                        "experience_level": job['experience_level'],
+                        "salary": job['salary'],
+                        "extracted_skills": job['extracted_skills']
+                    }
+                    for job in all_jobs
+                ]
+            }
+            
         return result
     
     def analyze_experience_distribution(self, jobs: List[Dict]) -> Dict:
@@ -0,0 +1,281 @@
+"""
+Resume Section Segmenter for Skill-Twin Engine
+Splits a resume into sections (Skills, Projects, Experience, Certifications, ...) from
+heading cues: known heading words, ALL-CAPS or "Heading:" lines and, for PDFs, bold or
+larger fonts from pdfplumber. Only the relevant spans go into the extraction prompt,
+instead of the first 5,000 characters of the whole document.
+
+    python resume_sections.py show resume.pdf
+    python resume_sections.py report [--llm]      # token savings + extraction parity on fixtures/resumes
+"""
+
+import argparse
+import os
+import re
+import statistics
+from typing import Dict, List, NamedTuple, Optional
+
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(ENGINE_DIR, "fixtures", "resumes")
+
+# Canonical section -> heading phrases (lower case, punctuation stripped)
+SECTION_ALIASES = {
+    "skills": ["skills", "technical skills", "key skills", "core skills", "skill set", "skills and tools",
+               "technical skills and tools", "technologies", "tech stack", "tools and technologies",
+               "core competencies", "technical proficiency", "it skills", "computer skills"],
+    "projects": ["projects", "academic projects", "personal projects", "key projects", "major projects",
+                 "project work", "project experience", "mini projects"],
+    "experience": ["experience", "work experience", "professional experience", "internship", "internships",
+                   "employment", "employment history", "work history", "industrial training", "training"],
+    "certifications": ["certifications", "certification", "certificates", "courses", "online courses",
+                       "trainings and certifications", "certifications and courses", "licenses and certifications"],
+    "coursework": ["coursework", "relevant coursework", "relevant courses", "subjects"],
+    "summary": ["summary", "profile", "objective", "career objective", "professional summary", "about me"],
+    "education": ["education", "academic qualification", "academic qualifications", "academics",
+                  "educational qualification", "educational qualifications", "academic details", "scholastics"],
+    "achievements": ["achievements", "awards", "honors", "accomplishments", "positions of responsibility",
+                     "extra curricular", "extra curricular activities", "extracurricular activities", "activities",
+                     "strengths"],
+    # Not a bare "languages": as a top-level heading that is usually "Python, Java, C++"
+    "personal": ["personal details", "personal information", "personal profile", "hobbies", "interests",
+                 "languages known", "spoken languages", "declaration", "references", "contact"],
+}
+# Sections sent to the skill-extraction prompt
+RELEVANT = ("skills", "projects", "experience", "certifications", "coursework")
+
+_ALIAS_TO_SECTION = {alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases}
+_ALIASES_BY_LENGTH = sorted(_ALIAS_TO_SECTION, key=len, reverse=True)
+_COLUMN_GAP = re.compile(r"\s{3,}")
+_INLINE_HEADING = re.compile(r"^\s*([A-Za-z][A-Za-z &/]{1,40}?)\s*[:\-–—|]\s*(.*)$")
+
+
+class Line(NamedTuple):
+    text: str
+    size: float = 0.0
+    bold: bool = False
+
+
+class Section(NamedTuple):
+    name: str
+    heading: str
+    lines: List[str]
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+def _normalize(text: str) -> str:
+    text = re.sub(r"[^a-z ]+", " ", text.lower().replace("&", " and "))
+    return " ".join(text.split())
+
+
+def heading_section(text: str) -> Optional[str]:
+    """Canonical section for a heading phrase ('TECHNICAL SKILLS & TOOLS' -> 'skills'), else None"""
+    phrase = _normalize(text)
+    if phrase in _ALIAS_TO_SECTION:
+        return _ALIAS_TO_SECTION[phrase]
+    # "Skills Summary", "Projects Undertaken": known heading followed by a short qualifier
+    for alias in _ALIASES_BY_LENGTH:
+        if phrase.startswith(alias + " ") and len(phrase.split()) <= len(alias.split()) + 2:
+            return _ALIAS_TO_SECTION[alias]
+    return None
+
+
+def text_lines(text: str) -> List[Line]:
+    return [Line(line) for line in text.splitlines()]
+
+
+def pdf_lines(pdf, tolerance: float = 2.0) -> List[Line]:
+    """Lines with font size and boldness from pdfplumber words; wide gaps (columns) become 3 spaces"""
+    lines = []
+    for page in pdf.pages:
+        words = page.extract_words(extra_attrs=["size", "fontname"], use_text_flow=True)
+        row = []
+        for word in words + [None]:
+            if row and (word is None or abs(word["top"] - row[-1]["top"]) > tolerance):
+                parts = [row[0]["text"]]
+                for previous, current in zip(row, row[1:]):
+                    gap = current["x0"] - previous["x1"]
+                    parts.append(("   " if gap > 2 * current["size"] else " ") + current["text"])
+                lines.append(Line("".join(parts), max(w["size"] for w in row),
+                                  all("bold" in w["fontname"].lower() for w in row)))
+                row = []
+            if word is not None:
+                row.append(word)
+    return lines
+
+
+def _is_layout_heading(line: Line, text: str, body_size: float) -> bool:
+    """Short line that looks like a heading even if we do not know the word (HOBBIES, STRENGTHS)"""
+    words = text.split()
+    if not 0 < len(words) <= 4 or re.search(r"[\d,@|]", text):
+        return False
+    if line.bold or (body_size and line.size > body_size + 0.5):
+        return True
+    letters = [c for c in text if c.isalpha()]
+    return len(letters) >= 4 and all(c.isupper() for c in letters)
+
+
+def segment(lines: List[Line]) -> List[Section]:
+    """Sections in document order; text before the first heading is the 'header' section"""
+    sizes = [line.size for line in lines if line.size and line.text.strip()]
+    body_size = statistics.median(sizes) if sizes else 0.0
+    sections = [Section("header", "", [])]
+
+    for line in lines:
+        raw = line.text.strip()
+        if not raw:
+            continue
+        # Two-column layouts: judge the left cell ("KEY SKILLS      EDUCATION")
+        cell = _COLUMN_GAP.split(raw)[0].strip(" \t:•*-")
+        # A standalone heading has no "label: content" or list punctuation in it
+        name = heading_section(cell) if len(cell.split()) <= 6 and not re.search(r"[:,;]", cell) else None
+        if name is not None:
+            sections.append(Section(name, cell, []))
+            continue
+        inline = _INLINE_HEADING.match(raw)
+        target = heading_section(inline.group(1)) if inline else None
+        # "Languages: Python, C" / "Tools: Git" inside Skills are sub-labels, not a new section
+        if target is not None and (target == sections[-1].name or
+                                   (sections[-1].name == "skills" and target == "personal")):
+            target = None
+        if target is not None:
+            # "Skills: Python, SQL" -> heading plus its first body line
+            sections.append(Section(target, inline.group(1).strip(), []))
+            if inline.group(2).strip():
+                sections[-1].lines.append(inline.group(2).strip())
+            continue
+        if _is_layout_heading(line, cell, body_size):
+            sections.append(Section("other", cell, []))
+            continue
+        sections[-1].lines.append(raw)
+    return [s for s in sections if s.lines or s.name != "header"]
+
+
+def _names_skills(section: Section) -> bool:
+    """An unknown heading (LANGUAGES, FRAMEWORKS, DATABASES) whose body names taxonomy skills"""
+    import tiered_extractor
+    return bool(tiered_extractor.default_extractor().match(section.text).skills)
+
+
+def relevant_text(lines: List[Line], full_text: str, wanted=RELEVANT, min_chars: int = 40) -> str:
+    """
+    The wanted sections, plus unknown sections that name known skills, joined with their
+    headings; or full_text when the resume has no recognisable relevant section (so
+    nothing is lost on unusual layouts).
+    """
+    chosen = [s for s in segment(lines)
+              if s.lines and (s.name in wanted or (s.name == "other" and _names_skills(s)))]
+    text = "\n\n".join(f"{s.heading}:\n{s.text}" for s in chosen)
+    return text if len(text) >= min_chars else full_text
+
+
+def estimate_tokens(text: str) -> int:
+    """cl100k token count when tiktoken is installed, else the usual ~4 characters per token"""
+    try:
+        import tiktoken
+    except ImportError:
+        return (len(text) + 3) // 4
+    return len(tiktoken.get_encoding("cl100k_base").encode(text))
+
+
+def load_fixture(path: str):
+    """(lines, full text) for a .pdf or .txt resume"""
+    if path.lower().endswith(".pdf"):
+        from lazy_models import pdfplumber
+        with pdfplumber.open(path) as pdf:
+            text = "\n".join(page.extract_text() or "" for page in pdf.pages)
+            return pdf_lines(pdf), text
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    return text_lines(text), text
+
+
+def keyword_skills(text: str, vocabulary: List[str]) -> set:
+    """Vocabulary skills mentioned in text (the local parity check; --llm uses the real prompt)"""
+    lowered = text.lower()
+    return {skill for skill in vocabulary
+            if re.search(r"(?<![\w+#.])" + re.escape(skill.lower()) + r"(?![\w+#])", lowered)}
+
+
+def fixture_report(paths: List[str], extract=None, prompt_chars: int = 5000) -> Dict:
+    """
+    Prompt tokens (first 5,000 characters vs relevant sections) and how many of the skills
+    extracted from the full prompt are also extracted from the sectioned one.
+    """
+    if extract is None:
+        from skill_taxonomy import canonical_vocabulary
+        vocabulary = canonical_vocabulary()
+        extract = lambda text: keyword_skills(text, vocabulary)
+
+    rows = []
+    for path in paths:
+        lines, text = load_fixture(path)
+        full, sectioned = text[:prompt_chars], relevant_text(lines, text)[:prompt_chars]
+        expected, actual = set(extract(full)), set(extract(sectioned))
+        rows.append({
+            "file": os.path.basename(path),
+            "full_tokens": estimate_tokens(full),
+            "section_tokens": estimate_tokens(sectioned),
+            "sections": [s.name for s in segment(lines)],
+            "skills": len(expected),
+            "recall": round(len(expected & actual) / len(expected), 4) if expected else 1.0,
+            "missed": sorted(expected - actual),
+            "added": sorted(actual - expected)
+        })
+    full_tokens = sum(r["full_tokens"] for r in rows)
+    section_tokens = sum(r["section_tokens"] for r in rows)
+    skills = sum(r["skills"] for r in rows)
+    return {
+        "documents": rows,
+        "full_tokens": full_tokens,
+        "section_tokens": section_tokens,
+        "token_savings": round(1 - section_tokens / full_tokens, 4) if full_tokens else 0.0,
+        "skill_recall": round(sum(r["recall"] * r["skills"] for r in rows) / skills, 4) if skills else 1.0
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resume section segmentation for smaller extraction prompts")
+    parser.add_argument("command", choices=["show", "report"])
+    parser.add_argument("paths", nargs="*", help="resume .pdf / .txt files (report default: fixtures/resumes)")
+    parser.add_argument("--llm", action="store_true", help="compare skills from the real extraction prompt")
+    args = parser.parse_args()
+
+    if args.command == "show":
+        for path in args.paths:
+            lines, text = load_fixture(path)
+            print(f"📄 {path}")
+            for section in segment(lines):
+                marker = "✅" if section.name in RELEVANT else "  "
+                print(f" {marker} [{section.name}] {section.heading!r}: {len(section.text)} chars")
+        raise SystemExit(0)
+
+    paths = args.paths or sorted(os.path.join(FIXTURE_DIR, name) for name in os.listdir(FIXTURE_DIR))
+    extract = None
+    if args.llm:
+        import json
+        import llm_gateway
+        from lazy_models import openai_client
+
+        client = openai_client()
+
+        def extract(text):
+            prompt = ("Extract all technical skills, programming languages, tools, frameworks from this resume.\n"
+                      'Output strict JSON only: {"technical_skills": ["Python", ...]}\n'
+                      f"Text: {text}")
+            content = llm_gateway.chat_completion(client, "resume_sections.report", model="gpt-4o-mini",
+                                                  messages=[{"role": "user", "content": prompt}],
+                                                  response_format={"type": "json_object"}, temperature=0)
+            return {skill.lower() for skill in json.loads(content)["technical_skills"]}
+
+    report = fixture_report(paths, extract)
+    print(f"{'file':<28} {'full':>6} {'sect':>6} {'skills':>6} {'recall':>7}  sections")
+    for row in report["documents"]:
+        print(f"{row['file']:<28} {row['full_tokens']:>6} {row['section_tokens']:>6} {row['skills']:>6} "
+              f"{row['recall']:>7.0%}  {', '.join(row['sections'])}")
+        if row["missed"]:
+            print(f"   ↳ missed: {', '.join(row['missed'])}")
+    print(f"💰 Prompt tokens {report['full_tokens']} -> {report['section_tokens']} "
+          f"({report['token_savings']:.0%} saved); skill recall {report['skill_recall']:.1%}")
@@ -0,0 +1,190 @@
+"""
+Streaming Skill Pipeline for Skill-Twin Engine
+Skills are taken out of a streamed LLM completion one by one (json_stream) and embedded
+in micro-batches on a worker thread while the model is still generating, so when the
+completion closes most vectors are already there. Embedded skills are kept in a small
+in-process cache, so /api/analyze-gaps right after a streamed /api/parse-resume or
+/api/job-requirements finds its vectors ready.
+
+    SKILL_TWIN_STREAM_EMBED_BATCH=16       # most skills per encode call
+    SKILL_TWIN_SKILL_VECTORS=4096          # skill vectors kept in memory (0 disables)
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+import metrics
+from json_stream import iter_array_items
+
+EMBED_BATCH = int(os.getenv("SKILL_TWIN_STREAM_EMBED_BATCH", "16"))
+VECTOR_CACHE_ENTRIES = int(os.getenv("SKILL_TWIN_SKILL_VECTORS", "4096"))
+
+STREAM_OVERLAP = metrics.histogram("skilltwin_stream_embed_tail_seconds",
+                                   "Embedding work left after the skill stream closed")
+_CLOSE = object()
+
+
+def stream_skills(deltas: Iterable[str], key: str) -> Iterator[str]:
+    """Each skill string of the ``key`` array as soon as it closes, stripped and de-duplicated"""
+    seen = set()
+    for item in iter_array_items(deltas, key):
+        if not isinstance(item, str) or not item.strip():
+            continue
+        skill = item.strip()
+        if skill.lower() not in seen:
+            seen.add(skill.lower())
+            yield skill
+
+
+class VectorCache:
+    """LRU of skill -> embedding; vectors depend only on the text, so nothing expires"""
+
+    def __init__(self, max_entries: int = VECTOR_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._vectors = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, skills: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            for skill in skills:
+                vector = self._vectors.get(skill)
+                if vector is not None:
+                    self._vectors.move_to_end(skill)
+                    found[skill] = vector
+        for skill in skills:
+            metrics.record_cache("skill_vector", skill in found)
+        return found
+
+    def put_many(self, vectors: Dict[str, np.ndarray]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            for skill, vector in vectors.items():
+                self._vectors[skill] = vector
+                self._vectors.move_to_end(skill)
+            while len(self._vectors) > self.max_entries:
+                self._vectors.popitem(last=False)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._vectors)
+
+
+def encode(model, skills: List[str], cache: Optional[VectorCache] = None) -> np.ndarray:
+    """model.encode(skills) as a float32 matrix, only running the model for skills not cached"""
+    cache = cache if cache is not None else default_cache()
+    found = cache.get_many(skills) if cache is not None else {}
+    missing = list(dict.fromkeys(skill for skill in skills if skill not in found))
+    if missing:
+        encoded = np.asarray(model.encode(missing), dtype=np.float32)
+        fresh = dict(zip(missing, encoded))
+        if cache is not None:
+            cache.put_many(fresh)
+        found.update(fresh)
+    if not skills:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.stack([found[skill] for skill in skills])
+
+
+class SkillEncoder:
+    """
+    Embeds skills while they are still arriving. add() hands a skill to a worker thread,
+    which encodes whatever has queued up (up to batch_size) in one call; close() waits
+    for the rest and returns the vectors in add() order. Use it as a context manager so
+    the worker is stopped when the stream fails or the client goes away:
+
+        with SkillEncoder(embedder) as encoder:
+            for skill in skills: encoder.add(skill)
+            vectors = encoder.close()
+    """
+
+    def __init__(self, model, cache: Optional[VectorCache] = None, batch_size: int = EMBED_BATCH):
+        self.model = model
+        self.cache = cache if cache is not None else default_cache()
+        self.batch_size = max(1, batch_size)
+        self.skills: List[str] = []
+        self._queue = queue.Queue()
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._error = None
+        self._worker = None
+        self._stopped = False
+        self._cancelled = False
+
+    def add(self, skill: str):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="skill-encoder", daemon=True)
+            self._worker.start()
+        self.skills.append(skill)
+        self._queue.put(skill)
+
+    def extend(self, skills: Iterable[str]):
+        for skill in skills:
+            self.add(skill)
+
+    def _run(self):
+        closing = False
+        while not closing:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is _CLOSE:
+                batch.pop()
+                closing = True
+            if batch and self._error is None and not self._cancelled:
+                try:
+                    matrix = encode(self.model, batch, self.cache)
+                    self._vectors.update(zip(batch, matrix))
+                except Exception as e:
+                    self._error = e
+
+    def close(self) -> np.ndarray:
+        """Vectors for every added skill, one row each; raises whatever the model raised"""
+        if self._worker is None:
+            return encode(self.model, self.skills, self.cache)
+        started = time.perf_counter()
+        self._stop()
+        self._worker.join()
+        STREAM_OVERLAP.observe(time.perf_counter() - started)
+        if self._error is not None:
+            raise self._error
+        return np.stack([self._vectors[skill] for skill in self.skills])
+
+    def cancel(self):
+        """Stop the worker without waiting for the vectors; safe to call after close()"""
+        self._cancelled = True
+        self._stop()
+
+    def _stop(self):
+        if self._worker is not None and not self._stopped:
+            self._stopped = True
+            self._queue.put(_CLOSE)
+
+    def __enter__(self) -> "SkillEncoder":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cancel()
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> Optional[VectorCache]:
+    """Process-wide skill vector cache (None when SKILL_TWIN_SKILL_VECTORS=0)"""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = VectorCache() if VECTOR_CACHE_ENTRIES > 0 else False
+    return _default if _default is not False else None
@@ -0,0 +1,285 @@
+"""
+Canonical Skill Vocabulary and Embedding Snapshot for Skill-Twin Engine
+Embeds the trusted skills, the GIET curriculum and the role skill lists once at build time.
+Runtime memory-maps the .npy so forked workers share the pages instead of re-encoding.
+Rows can be stored as float16 or int8 (SKILL_TWIN_SNAPSHOT_DTYPE, see embedding_store.py).
+
+    python skill_taxonomy.py build     # (re)build the snapshot for the default model
+    python skill_taxonomy.py info      # show whether the snapshot on disk is current
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from embedding_store import STORAGE_DTYPES, EmbeddingStore, scales_path
+from lazy_models import encoder_id, get_embedder
+
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_DIR = os.getenv("SKILL_TWIN_SNAPSHOT_DIR", os.path.join(ENGINE_DIR, "embeddings"))
+SNAPSHOT_ENABLED = os.getenv("SKILL_TWIN_SNAPSHOT", "1").lower() not in ("0", "false", "no", "off")
+# float32 | float16 | int8 (per-row scale in <stem>.scales.npy)
+SNAPSHOT_DTYPE = os.getenv("SKILL_TWIN_SNAPSHOT_DTYPE", "float32")
+# Bump when the file layout changes; old snapshots are then ignored
+SNAPSHOT_VERSION = 2
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+
+# (file, module-level constant) pairs that make up the canonical vocabulary.
+# Read with ast so building never imports Flask, Streamlit or the scrapers.
+VOCABULARY_SOURCES = [
+    ("backend/app.py", "TRUSTED_SKILLS"),
+    ("standalone_app.py", "MOCK_ROLE_SKILLS"),
+    ("real_job_api_integration.py", "SAMPLE_ROLE_SKILLS"),
+]
+CURRICULUM_FILE = "giet_cse_skills.json"
+
+
+def _module_constant(path: str, name: str):
+    """Value of a literal module-level assignment (set([...]) included) without importing the module"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == name for t in node.targets):
+            value = node.value
+            if isinstance(value, ast.Call) and getattr(value.func, "id", None) in ("set", "frozenset", "list"):
+                value = value.args[0]
+            return ast.literal_eval(value)
+    raise KeyError(f"{name} not found in {path}")
+
+
+def _flatten(value) -> List[str]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        value = value.values()
+    skills = []
+    for item in value:
+        skills.extend(_flatten(item))
+    return skills
+
+
+def canonical_vocabulary(engine_dir: str = ENGINE_DIR) -> List[str]:
+    """Deduplicated skills from every vocabulary source, in a stable order"""
+    skills = []
+    for relative, name in VOCABULARY_SOURCES:
+        # Sets have no order; sort so the vocabulary hash is reproducible
+        skills.extend(sorted(_flatten(_module_constant(os.path.join(engine_dir, relative), name))))
+
+    with open(os.path.join(engine_dir, CURRICULUM_FILE), encoding="utf-8") as f:
+        curriculum = json.load(f)
+    skills.extend(curriculum.get("overall_technical_skills", []))
+    for subjects in curriculum.get("by_semester", {}).values():
+        skills.extend(_flatten(subjects))
+    for subjects in curriculum.get("specializations", {}).values():
+        skills.extend(_flatten(subjects))
+
+    return list(dict.fromkeys(s.strip() for s in skills if isinstance(s, str) and s.strip()))
+
+
+def vocabulary_hash(skills: List[str]) -> str:
+    return hashlib.sha256(json.dumps(skills, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def snapshot_paths(model_name: str = DEFAULT_MODEL, directory: str = None) -> Tuple[str, str]:
+    """(.npy, .json index) paths for a model's snapshot under the current encoder backend"""
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", encoder_id(model_name))
+    stem = os.path.join(directory or SNAPSHOT_DIR, f"skills-v{SNAPSHOT_VERSION}-{slug}")
+    return stem + ".npy", stem + ".json"
+
+
+class SkillSnapshot:
+    """Read-only embeddings of the canonical vocabulary, backed by a memory-mapped EmbeddingStore"""
+
+    def __init__(self, skills: List[str], store: EmbeddingStore, meta: Dict):
+        self.skills = skills
+        self.store = store
+        self.meta = meta
+        self.rows = {skill: i for i, skill in enumerate(skills)}
+
+    def __len__(self):
+        return len(self.skills)
+
+    def __contains__(self, skill: str) -> bool:
+        return skill in self.rows
+
+    def lookup(self, skills: List[str]) -> Tuple[List[int], List[int]]:
+        """(row per input skill or -1, positions of the skills not in the snapshot)"""
+        rows = [self.rows.get(skill, -1) for skill in skills]
+        return rows, [i for i, row in enumerate(rows) if row < 0]
+
+
+def build_snapshot(model_name: str = DEFAULT_MODEL, directory: str = None, model=None,
+                   skills: List[str] = None, dtype: str = None) -> SkillSnapshot:
+    """Encode the vocabulary and write <stem>.npy + <stem>.json; the index is written last"""
+    skills = skills if skills is not None else canonical_vocabulary()
+    dtype = dtype or SNAPSHOT_DTYPE
+    if model is None:
+        model = get_embedder(model_name)
+
+    started = time.perf_counter()
+    vectors = np.asarray(model.encode(skills), dtype=np.float32)
+    store = EmbeddingStore.from_float(vectors, dtype)
+    npy_path, index_path = snapshot_paths(model_name, directory)
+    os.makedirs(os.path.dirname(npy_path), exist_ok=True)
+
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "model": encoder_id(model_name),
+        "vocabulary_hash": vocabulary_hash(skills),
+        "count": len(skills),
+        "dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+        "dtype": store.dtype,
+        "bytes": store.nbytes,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "encode_seconds": round(time.perf_counter() - started, 3),
+        "skills": skills
+    }
+    # Replace atomically so workers never map a half-written file
+    tmp_npy = npy_path + f".{os.getpid()}.tmp.npy"
+    store.save(tmp_npy)
+    if store.scales is not None:
+        os.replace(scales_path(tmp_npy), scales_path(npy_path))
+    os.replace(tmp_npy, npy_path)
+    tmp_index = index_path + f".{os.getpid()}.tmp"
+    with open(tmp_index, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_index, index_path)
+    return SkillSnapshot(skills, EmbeddingStore.load(npy_path), meta)
+
+
+def snapshot_status(model_name: str = DEFAULT_MODEL, directory: str = None,
+                    skills: List[str] = None, dtype: str = None) -> Tuple[str, Optional[Dict]]:
+    """('current' | 'missing' | 'stale: <reason>', index) for the snapshot on disk"""
+    npy_path, index_path = snapshot_paths(model_name, directory)
+    dtype = dtype or SNAPSHOT_DTYPE
+    if not (os.path.exists(npy_path) and os.path.exists(index_path)):
+        return "missing", None
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError) as e:
+        return f"stale: unreadable index ({e})", None
+    skills = skills if skills is not None else canonical_vocabulary()
+    if meta.get("version") != SNAPSHOT_VERSION:
+        return f"stale: version {meta.get('version')} != {SNAPSHOT_VERSION}", meta
+    if meta.get("model") != encoder_id(model_name):
+        return f"stale: built for {meta.get('model')}", meta
+    if meta.get("vocabulary_hash") != vocabulary_hash(skills):
+        return "stale: vocabulary changed", meta
+    if meta.get("dtype") != dtype:
+        return f"stale: stored as {meta.get('dtype')}, {dtype} requested", meta
+    if dtype == "int8" and not os.path.exists(scales_path(npy_path)):
+        return "stale: int8 scales missing", meta
+    return "current", meta
+
+
+def load_snapshot(model_name: str = DEFAULT_MODEL, directory: str = None) -> Optional[SkillSnapshot]:
+    """Memory-mapped snapshot, or None when it is missing or no longer matches the model/vocabulary"""
+    status, meta = snapshot_status(model_name, directory)
+    if status != "current":
+        if status != "missing":
+            print(f"⚠️ Embedding snapshot ignored ({status}); run: python skill_taxonomy.py build")
+        return None
+    npy_path, _ = snapshot_paths(model_name, directory)
+    store = EmbeddingStore.load(npy_path)
+    if len(store) != len(meta["skills"]):
+        print("⚠️ Embedding snapshot ignored (row count does not match index)")
+        return None
+    return SkillSnapshot(meta["skills"], store, meta)
+
+
+class SnapshotEmbedder:
+    """
+    encode() that serves canonical skills from the snapshot and only runs the
+    model for the rest. The snapshot is loaded on first use; without one every
+    call goes straight to the wrapped embedder.
+
+    Over an active static_encoder.StaticEncoder the snapshot steps aside: the static
+    table covers every vocabulary phrase, so nothing the snapshot would have served
+    reaches the transformer, and serving those phrases as full-model vectors would only
+    add more of them next to the pooled ones. Phrases with out-of-vocabulary tokens do
+    still come back as full-model vectors, so the two spaces can meet in one call.
+    """
+
+    def __init__(self, model, model_name: str = DEFAULT_MODEL, directory: str = None):
+        self.model = model
+        self.model_name = model_name
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._snapshot = None
+        self._checked = False
+        self._lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> Optional[SkillSnapshot]:
+        if not self._checked:
+            with self._lock:
+                if not self._checked:
+                    self._snapshot = load_snapshot(self.model_name, self.directory)
+                    self._checked = True
+        return self._snapshot
+
+    def encode(self, sentences, normalize_embeddings: bool = False, **kwargs):
+        snapshot = None if getattr(self.model, "active", False) else self.snapshot
+        single = isinstance(sentences, str)
+        if snapshot is None or kwargs.get("convert_to_tensor"):
+            return self.model.encode(sentences, normalize_embeddings=normalize_embeddings, **kwargs)
+
+        texts = [sentences] if single else list(sentences)
+        rows, missing = snapshot.lookup(texts)
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        out = np.empty((len(texts), snapshot.store.shape[1]), dtype=np.float32)
+        known = [i for i, row in enumerate(rows) if row >= 0]
+        if known:
+            out[known] = snapshot.store.rows([rows[i] for i in known])
+        if missing:
+            kwargs.pop("convert_to_numpy", None)
+            encoded = self.model.encode([texts[i] for i in missing], **kwargs)
+            out[missing] = np.asarray(encoded, dtype=np.float32)
+        if normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            out = out / np.where(norms == 0, 1.0, norms)
+        return out[0] if single else out
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.model, attr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or inspect the canonical skill embedding snapshot")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--dir", default=SNAPSHOT_DIR)
+    parser.add_argument("--dtype", choices=STORAGE_DTYPES, default=SNAPSHOT_DTYPE)
+    parser.add_argument("--force", action="store_true", help="rebuild even when the snapshot is current")
+    args = parser.parse_args()
+
+    vocabulary = canonical_vocabulary()
+    status, meta = snapshot_status(args.model, args.dir, vocabulary, args.dtype)
+    npy_path, index_path = snapshot_paths(args.model, args.dir)
+    if args.command == "info":
+        print(f"📚 Vocabulary: {len(vocabulary)} skills (hash {vocabulary_hash(vocabulary)[:12]})")
+        print(f"📦 {npy_path}: {status}")
+        if meta:
+            print(f"   model {meta['model']}, {meta['count']} x {meta['dim']} {meta['dtype']} "
+                  f"({meta.get('bytes', 0) / 1024:.0f} KB), built {meta['created']}")
+    elif status == "current" and not args.force:
+        print(f"✅ Snapshot already current: {npy_path}")
+    else:
+        print(f"🔨 Encoding {len(vocabulary)} skills with {encoder_id(args.model)} ({status})...")
+        snapshot = build_snapshot(args.model, args.dir, skills=vocabulary, dtype=args.dtype)
+        print(f"✅ Wrote {npy_path} ({len(snapshot)} x {snapshot.meta['dim']}, "
+              f"{snapshot.meta['encode_seconds']}s) and {os.path.basename(index_path)}")
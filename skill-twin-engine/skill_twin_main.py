@@ -1,18 +1,11 @@
 import json
-from openai import OpenAI
-import os
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer, util
+import llm_gateway
+from lazy_models import openai_client, embedder as lazy_embedder, util
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-# Load syllabus skills (from previous extraction)
-with open('giet_cse_skills.json', 'r') as f:
-    syllabus_data = json.load(f)
-syllabus_skills = syllabus_data.get('overall_technical_skills', [])
-
-embedder = SentenceTransformer('all-MiniLM-L6-v2')
+client = openai_client()
+embedder = lazy_embedder('all-MiniLM-L6-v2')
 
 # -----------------------------
 # 1. Extract skills from JD (paste or input)
@@ -25,12 +18,13 @@ def extract_skills(text, label="text"):
     {{"skills": ["Python", "AWS", "React", ...]}}
     Text: {text[:6000]}
     """
-    response = client.chat.completions.create(
+    content = llm_gateway.chat_completion(
+        client, "skill_twin_main.extract_skills",
         model="gpt-4o-mini",
         messages=[{"role": "user", "content": prompt}],
         response_format={"type": "json_object"}
     )
-    return json.loads(response.choices[0].message.content)['skills']
+    return json.loads(content)['skills']
 
 # -----------------------------
 # 2. Compute gaps
@@ -93,50 +87,59 @@ def generate_roadmap(gaps, weeks=8):
     }}
     """
 
-    response = client.chat.completions.create(
+    content = llm_gateway.chat_completion(
+        client, "skill_twin_main.generate_roadmap",
         model="gpt-4o-mini",
         messages=[{"role": "user", "content": prompt}],
         response_format={"type": "json_object"}
     )
-    return json.loads(response.choices[0].message.content)
+    return json.loads(content)
 
 # -----------------------------
 # MAIN FLOW - Run this
 # -----------------------------
-print("Skill-Twin Engine - Test Run")
-print("=============================")
+if __name__ == "__main__":
+    from parse_resume import extract_resume_skills
 
-# Paste your real inputs here for testing
-resume_text_or_path = "temp_resume.pdf"  # or paste text
-jd_text = """
+    print("Skill-Twin Engine - Test Run")
+    print("=============================")
+
+    # Paste your real inputs here for testing
+    resume_text_or_path = "temp_resume.pdf"  # or paste text
+    jd_text = """
 Job: Software Developer - Fresher
 Skills required: Python, JavaScript, React, Node.js, SQL, Git, REST API, Problem Solving, AWS basics
 Experience: 0-1 year, good communication
 """
 
-# Step 1: Get student skills (from your parse_resume)
-student_skills_dict = extract_resume_skills(resume_text_or_path)  # Reuse your function
-student_skills = student_skills_dict.get('technical_skills', [])
-
-# Step 2: Get job skills
-job_skills = extract_skills(jd_text, "Job Description")
-
-# Step 3: Combine student + syllabus
-combined_known = list(set(student_skills + syllabus_skills))
-
-# Step 4: Find gaps
-gaps = compute_gaps(job_skills, combined_known)
-
-print("\nJob Required Skills:", job_skills)
-print("\nYour Known Skills (Resume + Syllabus):", combined_known[:20], "...")
-print("\nDetected Gaps:")
-for g in gaps:
-    print(f"• {g['required_skill']} (match {g['best_match_score']}, {g['gap_level']})")
-
-# Step 5: Generate roadmap
-if gaps:
-    roadmap = generate_roadmap(gaps, weeks=8)
-    print("\nPersonalized Bridge Roadmap:")
-    print(json.dumps(roadmap, indent=2))
-else:
-    print("\nNo significant gaps — you're well prepared!")
\ No newline at end of file
+    # Load syllabus skills (from previous extraction)
+    with open('giet_cse_skills.json', 'r') as f:
+        syllabus_data = json.load(f)
+    syllabus_skills = syllabus_data.get('overall_technical_skills', [])
+
+    # Step 1: Get student skills (from your parse_resume)
+    student_skills_dict = extract_resume_skills(resume_text_or_path)
+    student_skills = student_skills_dict.get('technical_skills', [])
+
+    # Step 2: Get job skills
+    job_skills = extract_skills(jd_text, "Job Description")
+
+    # Step 3: Combine student + syllabus
+    combined_known = list(set(student_skills + syllabus_skills))
+
+    # Step 4: Find gaps
+    gaps = compute_gaps(job_skills, combined_known)
+
+    print("\nJob Required Skills:", job_skills)
+    print("\nYour Known Skills (Resume + Syllabus):", combined_known[:20], "...")
+    print("\nDetected Gaps:")
+    for g in gaps:
+        print(f"• {g['required_skill']} (match {g['best_match_score']}, {g['gap_level']})")
+
+    # Step 5: Generate roadmap
+    if gaps:
+        roadmap = generate_roadmap(gaps, weeks=8)
+        print("\nPersonalized Bridge Roadmap:")
+        print(json.dumps(roadmap, indent=2))
+    else:
+        print("\nNo significant gaps — you're well prepared!")
\ No newline at end of file
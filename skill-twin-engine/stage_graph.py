@@ -0,0 +1,236 @@
+"""
+Stage Graph for Skill-Twin Engine
+Runs a request's stages as a dependency graph: each stage starts as soon as the stages it
+reads have finished, so independent ones (resume parsing, role skill generation) overlap
+and the request costs its critical path instead of the sum of its stages. Stage results
+are cached by a hash of their inputs and handed back in the order they finish.
+
+    SKILL_TWIN_STAGE_WORKERS=8         # threads shared by every graph run
+    SKILL_TWIN_STAGE_CACHE=512         # stage results kept in memory (0 disables)
+    SKILL_TWIN_STAGE_CACHE_TTL=3600    # seconds a cached stage result is served
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import llm_gateway
+import metrics
+
+WORKERS = int(os.getenv("SKILL_TWIN_STAGE_WORKERS", "8"))
+CACHE_ENTRIES = int(os.getenv("SKILL_TWIN_STAGE_CACHE", "512"))
+CACHE_TTL = float(os.getenv("SKILL_TWIN_STAGE_CACHE_TTL", "3600"))
+
+# Not metrics.STAGE_SECONDS: inner stages (pdf_extract, embedding_encode, ...) run inside graph
+# stages, so sharing one series would count the same time twice
+STAGE_SECONDS = metrics.histogram("skilltwin_graph_stage_seconds", "Stage graph latency by graph stage", ["stage"])
+
+
+class Stage(NamedTuple):
+    name: str
+    fn: Callable[..., Any]              # called with the named graph inputs and dependency results as kwargs
+    deps: Tuple[str, ...] = ()
+    inputs: Tuple[str, ...] = ()
+    cache: bool = True
+
+
+class StageResult(NamedTuple):
+    name: str
+    value: Any
+    error: Optional[str]
+    seconds: float
+    cached: bool
+    finished_at: float                  # seconds since the run started
+
+
+def _canonical(value):
+    """JSON-able stand-in for hashing: bytes (uploaded PDFs) are replaced by their SHA-256"""
+    if isinstance(value, (bytes, bytearray)):
+        return {"sha256": hashlib.sha256(value).hexdigest()}
+    raise TypeError(f"cannot hash {type(value).__name__}")
+
+
+def input_hash(stage: str, kwargs: Dict) -> str:
+    body = json.dumps([stage, kwargs], sort_keys=True, default=_canonical)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+class StageCache:
+    """In-memory LRU of input hash -> stage result, with a TTL so LLM answers get refreshed"""
+
+    def __init__(self, max_entries: int = CACHE_ENTRIES, ttl: float = CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                return True, entry[1]
+            self._entries.pop(key, None)
+        return False, None
+
+    def put(self, key: str, value: Any):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class StageGraph:
+    def __init__(self, stages: List[Stage], cache: Optional[StageCache] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.stages = {stage.name: stage for stage in stages}
+        for stage in stages:
+            missing = [dep for dep in stage.deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"stage {stage.name} depends on unknown stages {missing}")
+        self.order = self._topological_order()
+        self.cache = cache
+        self.executor = executor
+
+    def _topological_order(self) -> List[str]:
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"stage graph has a cycle through {name}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def _execute(self, stage: Stage, kwargs: Dict, key: Optional[str]) -> Tuple[Any, float]:
+        started = time.perf_counter()
+        with llm_gateway.track_fallbacks() as fallbacks:
+            value = stage.fn(**kwargs)
+        seconds = time.perf_counter() - started
+        # Like the document cache: answers built from a fallback are not worth keeping
+        if key is not None and not fallbacks:
+            self.cache.put(key, value)
+        STAGE_SECONDS.observe(seconds, stage=stage.name)
+        return value, seconds
+
+    def run(self, inputs: Dict) -> Iterator[StageResult]:
+        """
+        Yields a StageResult per stage as it finishes. A failed stage yields its error and
+        every stage downstream of it is reported as skipped.
+        """
+        executor = self.executor or default_executor()
+        run_started = time.perf_counter()
+        results: Dict[str, StageResult] = {}
+        running = {}
+        waiting = list(self.order)
+
+        def finished(name, value, error, seconds, cached):
+            result = StageResult(name, value, error, round(seconds, 4), cached,
+                                 round(time.perf_counter() - run_started, 4))
+            results[name] = result
+            return result
+
+        while waiting or running:
+            ready = []
+            for name in list(waiting):
+                stage = self.stages[name]
+                if not all(dep in results for dep in stage.deps):
+                    continue
+                waiting.remove(name)
+                failed = [dep for dep in stage.deps if results[dep].error is not None]
+                if failed:
+                    yield finished(name, None, f"skipped: {', '.join(failed)} failed", 0.0, False)
+                    continue
+                ready.append(stage)
+            if ready:
+                for stage in ready:
+                    kwargs = {name: inputs.get(name) for name in stage.inputs}
+                    kwargs.update({dep: results[dep].value for dep in stage.deps})
+                    key = input_hash(stage.name, kwargs) if stage.cache and self.cache is not None else None
+                    if key is not None:
+                        hit, value = self.cache.get(key)
+                        metrics.record_cache("stage", hit)
+                        if hit:
+                            yield finished(stage.name, value, None, 0.0, True)
+                            continue
+                    # Each stage runs in a copy of the caller's context, so the request deadline applies
+                    context = contextvars.copy_context()
+                    running[executor.submit(context.run, self._execute, stage, kwargs, key)] = stage.name
+                # Cache hits and skips can unblock further stages without waiting on a future
+                continue
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    value, seconds = future.result()
+                    yield finished(name, value, None, seconds, False)
+                except Exception as e:
+                    yield finished(name, None, str(e), 0.0, False)
+
+    def critical_path(self, results: Dict[str, StageResult]) -> float:
+        """Longest chain of stage times through the graph: the floor on end-to-end latency"""
+        longest = {}
+        for name in self.order:
+            before = max((longest[dep] for dep in self.stages[name].deps), default=0.0)
+            longest[name] = before + (results[name].seconds if name in results else 0.0)
+        return round(max(longest.values(), default=0.0), 4)
+
+
+def summary(graph: StageGraph, results: Dict[str, StageResult], wall_seconds: float) -> Dict:
+    """Per-stage timings plus wall time against the critical path and the sequential sum"""
+    return {
+        "stages": {name: {"seconds": r.seconds, "cached": r.cached, "finished_at": r.finished_at,
+                          **({"error": r.error} if r.error else {})}
+                   for name, r in results.items()},
+        "wall_seconds": round(wall_seconds, 4),
+        "critical_path_seconds": graph.critical_path(results),
+        "sequential_seconds": round(sum(r.seconds for r in results.values()), 4)
+    }
+
+
+_executor = None
+_cache = None
+_default_lock = threading.Lock()
+
+
+def default_executor() -> ThreadPoolExecutor:
+    """Process-wide stage pool"""
+    global _executor
+    if _executor is None:
+        with _default_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="stage")
+    return _executor
+
+
+def default_cache() -> Optional[StageCache]:
+    """Process-wide stage result cache (None when SKILL_TWIN_STAGE_CACHE=0)"""
+    global _cache
+    if _cache is None:
+        with _default_lock:
+            if _cache is None:
+                _cache = StageCache() if CACHE_ENTRIES > 0 else False
+    return _cache if _cache is not False else None
@@ -9,6 +9,15 @@ import difflib
 from typing import List, Dict
 import time
 
+# Role-specific skill requirements (also embedded by skill_taxonomy)
+MOCK_ROLE_SKILLS = {
+    "Software Developer": ["Python", "Java", "JavaScript", "SQL", "Git", "REST API", "Spring", "React"],
+    "Full Stack Developer": ["JavaScript", "React", "Node.js", "MongoDB", "HTML", "CSS", "REST API", "Git"],
+    "Data Scientist": ["Python", "SQL", "Machine Learning", "Statistics", "Pandas", "NumPy", "R"],
+    "Machine Learning Engineer": ["Python", "TensorFlow", "PyTorch", "Machine Learning", "Deep Learning"],
+    "DevOps Engineer": ["Docker", "Kubernetes", "AWS", "Linux", "CI/CD", "Git", "Python"]
+}
+
 # Simple skill analyzer without external dependencies
 class StandaloneSkillAnalyzer:
     def __init__(self):
@@ -40,17 +49,8 @@ class StandaloneSkillAnalyzer:
     
     def mock_job_market_data(self, role: str) -> Dict:
         """Generate mock job market data"""
-        # Role-specific skill requirements
-        role_skills = {
-            "Software Developer": ["Python", "Java", "JavaScript", "SQL", "Git", "REST API", "Spring", "React"],
-            "Full Stack Developer": ["JavaScript", "React", "Node.js", "MongoDB", "HTML", "CSS", "REST API", "Git"],
-            "Data Scientist": ["Python", "SQL", "Machine Learning", "Statistics", "Pandas", "NumPy", "R"],
-            "Machine Learning Engineer": ["Python", "TensorFlow", "PyTorch", "Machine Learning", "Deep Learning"],
-            "DevOps Engineer": ["Docker", "Kubernetes", "AWS", "Linux", "CI/CD", "Git", "Python"]
-        }
-        
         # Default to general skills if role not found
-        market_skills = role_skills.get(role, ["Python", "Java", "SQL", "JavaScript"])
+        market_skills = MOCK_ROLE_SKILLS.get(role, ["Python", "Java", "SQL", "JavaScript"])
         
         return {
             "role": role,
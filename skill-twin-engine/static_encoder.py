@@ -0,0 +1,271 @@
+"""
+Static Phrase Embeddings for Skill-Twin Engine
+Skill strings are 1-4 tokens, so a transformer pass per lookup is mostly overhead.
+The build step embeds every token seen in the skill vocabulary with MiniLM once;
+phrases are then encoded by SIF-weighted pooling of their token vectors in NumPy.
+Phrases with an unknown token go to the transformer as before.
+
+    python static_encoder.py build [--corpus analysis.json ...]
+    python static_encoder.py report        # agreement with full-model scores
+    SKILL_TWIN_STATIC_EMBEDDINGS=1 python backend/app.py
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from lazy_models import encoder_id, get_embedder
+from skill_taxonomy import SNAPSHOT_DIR, canonical_vocabulary, vocabulary_hash
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+TABLE_VERSION = 1
+# SIF smoothing: frequent tokens ("developer", "api") get less weight than rare ones ("kubernetes")
+SIF_A = 1e-3
+CACHE_SIZE = 50000
+
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = [os.path.join(ENGINE_DIR, name) for name in
+                  ("real_job_market_analysis.json", "real_Software_Developer_market_analysis.json")]
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def tokenize(phrase: str) -> List[str]:
+    """'REST API' -> ['rest', 'api']; keeps node.js, c++, c# whole"""
+    return [t.rstrip(".") for t in TOKEN_RE.findall(phrase.lower()) if t.rstrip(".")]
+
+
+def _skill_strings(value, under_skill_key: bool = False) -> List[str]:
+    """Short strings found under *skill* keys of an analysis JSON (top_skills, skills_list, ...)"""
+    if isinstance(value, str):
+        return [value] if under_skill_key and 0 < len(value.split()) <= 4 else []
+    if isinstance(value, dict):
+        found = []
+        if under_skill_key:
+            # skill_frequency-style {"python": 12} maps
+            found.extend(k for k, v in value.items() if isinstance(v, (int, float)) and 0 < len(k.split()) <= 4)
+        for key, item in value.items():
+            found.extend(_skill_strings(item, under_skill_key or "skill" in str(key).lower()))
+        return found
+    if isinstance(value, list):
+        found = []
+        for item in value:
+            found.extend(_skill_strings(item, under_skill_key))
+        return found
+    return []
+
+
+def collect_phrases(corpus_files: List[str] = None) -> List[str]:
+    """Canonical vocabulary plus skill strings from saved analyses (resumes, postings, curricula)"""
+    phrases = canonical_vocabulary()
+    for path in corpus_files if corpus_files is not None else DEFAULT_CORPUS:
+        if not os.path.exists(path):
+            continue
+        if path.endswith(".json"):
+            with open(path, encoding="utf-8") as f:
+                phrases.extend(_skill_strings(json.load(f)))
+        else:
+            with open(path, encoding="utf-8") as f:
+                phrases.extend(line.strip() for line in f if line.strip())
+    return list(dict.fromkeys(p.strip() for p in phrases if p.strip()))
+
+
+def table_paths(model_name: str = DEFAULT_MODEL, directory: str = None):
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", encoder_id(model_name))
+    stem = os.path.join(directory or SNAPSHOT_DIR, f"static-v{TABLE_VERSION}-{slug}")
+    return stem + ".npy", stem + ".json"
+
+
+def build_table(model_name: str = DEFAULT_MODEL, directory: str = None, corpus_files: List[str] = None,
+                model=None) -> Dict:
+    """Embed every token of the collected phrases and write the token table + SIF weights"""
+    phrases = collect_phrases(corpus_files)
+    counts = Counter(token for phrase in phrases for token in tokenize(phrase))
+    tokens = sorted(counts)
+    model = model or get_embedder(model_name)
+
+    started = time.perf_counter()
+    vectors = np.asarray(model.encode(tokens), dtype=np.float32)
+    total = sum(counts.values())
+    weights = [round(SIF_A / (SIF_A + counts[t] / total), 6) for t in tokens]
+
+    npy_path, index_path = table_paths(model_name, directory)
+    os.makedirs(os.path.dirname(npy_path), exist_ok=True)
+    meta = {
+        "version": TABLE_VERSION,
+        "model": encoder_id(model_name),
+        "phrases": len(phrases),
+        "phrase_hash": vocabulary_hash(phrases),
+        "count": len(tokens),
+        "dim": int(vectors.shape[1]),
+        "sif_a": SIF_A,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "encode_seconds": round(time.perf_counter() - started, 3),
+        "tokens": tokens,
+        "weights": weights
+    }
+    tmp_npy = npy_path + f".{os.getpid()}.tmp.npy"
+    np.save(tmp_npy, vectors)
+    os.replace(tmp_npy, npy_path)
+    tmp_index = index_path + f".{os.getpid()}.tmp"
+    with open(tmp_index, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_index, index_path)
+    return meta
+
+
+class StaticEncoder:
+    """
+    encode() that pools token vectors for in-vocabulary phrases and sends the
+    rest to ``fallback`` (the transformer). Without a table for the current
+    model every call goes to the fallback. A batch with both kinds returns
+    pooled and full-model rows side by side, unit length but not from the
+    same space; the ``report`` command measures the resulting score drift.
+    """
+
+    def __init__(self, fallback, model_name: str = DEFAULT_MODEL, directory: str = None):
+        self.fallback = fallback
+        self.model_name = model_name
+        self.directory = directory
+        self.static_hits = 0
+        self.fallbacks = 0
+        self._cache = {}
+        self._table = None
+        self._checked = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> Optional[Dict]:
+        if not self._checked:
+            with self._lock:
+                if not self._checked:
+                    self._table = self._read_table()
+                    self._checked = True
+        return self._table
+
+    def _read_table(self) -> Optional[Dict]:
+        npy_path, index_path = table_paths(self.model_name, self.directory)
+        if not (os.path.exists(npy_path) and os.path.exists(index_path)):
+            return None
+        with open(index_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != TABLE_VERSION or meta.get("model") != encoder_id(self.model_name):
+            print(f"⚠️ Static embedding table ignored (built for {meta.get('model')}); "
+                  f"run: python static_encoder.py build")
+            return None
+        return {
+            "rows": {token: i for i, token in enumerate(meta["tokens"])},
+            # Small enough to keep in RAM; pooling reads it once per phrase
+            "vectors": np.load(npy_path),
+            "weights": np.asarray(meta["weights"], dtype=np.float32)
+        }
+
+    @property
+    def active(self) -> bool:
+        """True when a table for this model exists, i.e. encode() returns pooled vectors"""
+        return self._load() is not None
+
+    def phrase_vector(self, phrase: str) -> Optional[np.ndarray]:
+        """Pooled, unit-length vector for phrase, or None when a token is out of vocabulary"""
+        vector = self._cache.get(phrase)
+        if vector is not None:
+            return vector
+        table = self._load()
+        if table is None:
+            return None
+        rows = [table["rows"].get(token) for token in tokenize(phrase)]
+        if not rows or None in rows:
+            return None
+        weights = table["weights"][rows]
+        vector = weights @ table["vectors"][rows]
+        norm = float(np.linalg.norm(vector))
+        vector = vector / norm if norm else vector
+        if len(self._cache) >= CACHE_SIZE:
+            self._cache.clear()
+        self._cache[phrase] = vector
+        return vector
+
+    def encode(self, sentences, normalize_embeddings: bool = False, **kwargs):
+        table = self._load()
+        if table is None or kwargs.get("convert_to_tensor"):
+            return self.fallback.encode(sentences, normalize_embeddings=normalize_embeddings, **kwargs)
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        out = np.empty((len(texts), table["vectors"].shape[1]), dtype=np.float32)
+        missing = []
+        for i, text in enumerate(texts):
+            vector = self.phrase_vector(text)
+            if vector is None:
+                missing.append(i)
+            else:
+                out[i] = vector
+        self.static_hits += len(texts) - len(missing)
+        self.fallbacks += len(missing)
+        if missing:
+            kwargs.pop("convert_to_numpy", None)
+            encoded = np.asarray(self.fallback.encode([texts[i] for i in missing], **kwargs), dtype=np.float32)
+            # Pooled vectors are unit length; match them so mixed batches compare consistently
+            norms = np.linalg.norm(encoded, axis=1, keepdims=True)
+            out[missing] = encoded / np.where(norms == 0, 1.0, norms)
+        return out[0] if single else out
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.fallback, attr)
+
+
+def curriculum_level(score: float) -> str:
+    """compare_with_university_curriculum's classification of a best-match score"""
+    if score >= 0.7:
+        return "Covered"
+    return "Partially Covered" if score >= 0.5 else "Not Covered"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Static token-embedding table for short skill phrases")
+    parser.add_argument("command", choices=["build", "report"])
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--dir", default=SNAPSHOT_DIR)
+    parser.add_argument("--corpus", nargs="*", help="analysis JSON or one-skill-per-line text files")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        meta = build_table(args.model, args.dir, args.corpus)
+        print(f"✅ Static table for {meta['model']}: {meta['count']} tokens from {meta['phrases']} phrases "
+              f"({meta['encode_seconds']}s) -> {table_paths(args.model, args.dir)[0]}")
+    else:
+        from benchmarks.synthetic import make_dataset
+        from onnx_encoder import gap_level, latency_ms, parity_report
+
+        reference = get_embedder(args.model)
+        static = StaticEncoder(reference, args.model, args.dir)
+        if static._load() is None:
+            raise SystemExit("No static table for this model; run: python static_encoder.py build")
+
+        data = make_dataset("medium")
+        job_skills = list(dict.fromkeys(data["market_skills"] + data["extracted_skills"]))
+        known_skills = list(dict.fromkeys(data["student_skills"] + data["curriculum"]))
+        coverage = sum(static.phrase_vector(s) is not None for s in job_skills + known_skills)
+        print(f"📚 {coverage}/{len(job_skills) + len(known_skills)} phrases encoded statically")
+
+        for label, classify in (("compute_gaps (0.40/0.55)", gap_level),
+                                ("curriculum (0.50/0.70)", curriculum_level)):
+            report = parity_report(reference, static, job_skills, known_skills, classify)
+            print(f"📏 {label}: drift max {report['max_drift']}, mean {report['mean_drift']}; "
+                  f"level agreement {report['level_agreement']:.1%} over {report['pairs']} skills")
+            for flip in report["flips"][:10]:
+                print(f"   ↔ {flip['skill']}: {flip['reference']} -> {flip['candidate']}")
+
+        batches = [known_skills[i:i + 10] for i in range(0, len(known_skills), 10)]
+        static._cache.clear()
+        for name, model in (("transformer", reference), ("static", static)):
+            timing = latency_ms(model, batches)
+            print(f"⏱️ {name:<12} p50 {timing['p50']} ms, p95 {timing['p95']} ms per 10-skill call")
@@ -0,0 +1,172 @@
+"""
+Batch extraction: local-first request files, idempotent ingest, partial failures resubmitted
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+import posting_store
+from batch_extraction import BatchRunner, LocalBatchBackend
+from posting_store import MAX_ATTEMPTS, PostingStore, posting_id
+from tiered_extractor import TieredExtractor
+
+CLEAN = "Hiring a backend developer. Required skills: Python, Django, PostgreSQL, Docker, Git."
+UNKNOWN = "Data engineering intern. Required skills: Snowflake, dbt, Airbyte, Looker, Fivetran."
+PARTIAL = "Analytics intern for our dashboards team. Skills: Python, SQL, Tableau, Alteryx, Qlik."
+
+
+def _answer(body):
+    """Stand-in LLM: every capitalised word of the description is a skill"""
+    text = body["messages"][-1]["content"].split("Job Description:")[1].split("Output format")[0]
+    words = [word.strip(".,") for word in text.split()]
+    return json.dumps({"skills": [word for word in words if word[:1].isupper() and word.lower() != "required"]})
+
+
+def _runner(tmp, backend):
+    store = PostingStore(os.path.join(tmp, "postings.sqlite3"))
+    store.add([{"title": "Backend", "description": CLEAN}, {"title": "Data", "description": UNKNOWN},
+               {"title": "Analytics", "description": PARTIAL}, {"title": "Duplicate", "description": CLEAN + "  "}])
+    return store, BatchRunner(store, backend, os.path.join(tmp, "batches"), TieredExtractor(mode="tiered"))
+
+
+def test_local_first_and_idempotent_ingest():
+    """Confident postings never reach the request file; ingesting a batch twice changes nothing"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store, runner = _runner(tmp, LocalBatchBackend(_answer))
+        assert store.stats()["total"] == 3          # whitespace-only duplicate is the same posting
+        batch_ids = runner.submit()
+        with open(os.path.join(tmp, "batches", os.listdir(os.path.join(tmp, "batches"))[0])) as f:
+            requests = [json.loads(line) for line in f]
+        assert {r["custom_id"] for r in requests} == {posting_id(UNKNOWN), posting_id(PARTIAL)}, requests
+        assert store.skills_for(CLEAN) == ["Python", "Django", "PostgreSQL", "Docker", "Git"]
+
+        runner.poll()
+        assert "Snowflake" in store.skills_for(UNKNOWN)
+        partial = store.skills_for(PARTIAL)
+        assert partial[:2] == ["Python", "SQL"] and "Alteryx" in partial and partial.count("Python") == 1, partial
+        assert runner.ingest(batch_ids[0]) == {"batch_id": batch_ids[0], "succeeded": 0, "failed": 0}
+        assert store.stats()["done"] == 3
+
+
+def test_partial_failures_resubmitted():
+    """Errored and missing lines go back to pending; a posting that always fails stops at MAX_ATTEMPTS"""
+    attempts = {}
+
+    def flaky(body):
+        text = body["messages"][-1]["content"]
+        attempts[text] = attempts.get(text, 0) + 1
+        if "Snowflake" in text and attempts[text] == 1:
+            raise RuntimeError("rate limited")
+        if "Alteryx" in text:
+            return "not json"
+        return _answer(body)
+
+    dropped = set()
+
+    def drop_once(custom_id):
+        if custom_id == posting_id(UNKNOWN) or custom_id in dropped:
+            return False
+        dropped.add(custom_id)
+        return True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store, runner = _runner(tmp, LocalBatchBackend(flaky, drop=drop_once))
+        report = runner.run(poll_seconds=0)
+        stats = store.stats()
+        assert "Snowflake" in store.skills_for(UNKNOWN), stats
+        assert store.skills_for(PARTIAL) is None and stats["exhausted"] == 1, stats
+        assert report["batches"] == MAX_ATTEMPTS and report["succeeded"] == 1, report
+        assert report["cost_usd"] == report["sync_cost_usd"] / 2
+
+
+def test_job_scraper_reads_store():
+    """After a nightly batch, JobScraper serves stored skills instead of extracting again"""
+    try:
+        import job_scraper
+    except ImportError as e:
+        raise unittest.SkipTest(f"job_scraper dependencies missing: {e}")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PostingStore(os.path.join(tmp, "postings.sqlite3"))
+        store.add([{"description": UNKNOWN}])
+        store.finish({posting_id(UNKNOWN): ["Snowflake", "dbt"]})
+        original = posting_store._default
+        posting_store._default = store
+        try:
+            skills = job_scraper.JobScraper().extract_skills_from_description(UNKNOWN)
+        finally:
+            posting_store._default = original
+        assert skills == ["Snowflake", "dbt"]
+
+
+def test_store_opt_in_and_keyed_by_extractor(monkeypatch):
+    """No store unless configured; skills from another extractor version or mode are re-extracted, not served"""
+    monkeypatch.delenv("SKILL_TWIN_POSTING_STORE", raising=False)
+    assert PostingStore.from_env() is None
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "postings.sqlite3")
+        monkeypatch.setenv("SKILL_TWIN_POSTING_STORE", path)
+        store = PostingStore.from_env()
+        store.add([{"description": UNKNOWN}])
+        store.finish({posting_id(UNKNOWN): ["Snowflake", "dbt"]})
+        assert store.skills_for(UNKNOWN) == ["Snowflake", "dbt"] and store.pending() == []
+
+        monkeypatch.setattr(posting_store, "extractor_key", lambda: "v0:llm@0.8")
+        assert store.skills_for(UNKNOWN) is None
+        assert [p["id"] for p in store.pending()] == [posting_id(UNKNOWN)]
+
+
+class Crash(BaseException):
+    """The process dying mid-submit: not an Exception, so nothing in submit() handles it"""
+
+
+def test_crashed_submit_not_paid_twice():
+    """A submit that dies after the backend accepted the file is adopted, one that died before is resent"""
+    class CrashingBackend(LocalBatchBackend):
+        def __init__(self, respond):
+            super().__init__(respond)
+            self.calls, self.crash = [], None
+
+        def submit(self, request_path, submission=None):
+            self.calls.append(submission)
+            if self.crash == "before":
+                raise Crash()
+            batch_id = super().submit(request_path, submission)
+            if self.crash == "after":
+                raise Crash()
+            return batch_id
+
+    for crash, submits in (("after", 1), ("before", 2)):
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = CrashingBackend(_answer)
+            store, runner = _runner(tmp, backend)
+            backend.crash = crash
+            try:
+                runner.submit()
+            except Crash:
+                pass
+            assert store.pending() == [] and runner.open_batches() == [], crash
+            assert runner.reconcile() == {}          # a submit still in its grace period is left alone
+
+            backend.crash = None
+            recovered = runner.reconcile(grace_seconds=0)
+            assert len(backend.calls) == submits and list(recovered.values()) == runner.open_batches(), crash
+            runner.poll()
+            assert store.stats()["done"] == 3 and runner.reconcile(grace_seconds=0) == {}, crash
+
+
+def test_poll_from_another_process():
+    """`poll --backend local` in a new process ingests what `submit` answered instead of failing it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = os.path.join(tmp, "batches")
+        store, runner = _runner(tmp, LocalBatchBackend(_answer, output_dir=output_dir))
+        batch_ids = runner.submit()
+
+        lost = BatchRunner(store, LocalBatchBackend(_answer), output_dir, TieredExtractor(mode="tiered"))
+        assert lost.poll() == {batch_ids[0]: "unknown"} and store.submitted(batch_ids[0])
+
+        later = BatchRunner(store, LocalBatchBackend(_answer, output_dir=output_dir), output_dir,
+                            TieredExtractor(mode="tiered"))
+        assert later.poll() == {batch_ids[0]: "completed"}
+        assert store.stats()["done"] == 3 and later.open_batches() == []
@@ -0,0 +1,100 @@
+"""
+Cassettes: HTTP and chat completions recorded once, then replayed offline in order
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from cassettes import Cassette, CassetteAdapter, CassetteMiss, http_key, llm_key
+
+REQUEST = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "skills for SDE"}]}
+
+
+def _job_board():
+    """Local site whose pages change on every hit, so replay order is observable"""
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            body = f"<h1>{self.path} #{len(hits)}</h1>".encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", hits
+
+
+def test_http_record_then_replay_offline(tmp_path):
+    path = str(tmp_path / "board.json.gz")
+    server, base_url, hits = _job_board()
+    try:
+        with Cassette(path, "record"):
+            session = requests.Session()
+            recorded = [session.get(f"{base_url}/jobs?q=python&page=1").text for _ in range(2)]
+    finally:
+        server.shutdown()
+    assert recorded == ["<h1>/jobs?q=python&page=1 #1</h1>", "<h1>/jobs?q=python&page=1 #2</h1>"]
+
+    with Cassette(path, "replay") as cassette:
+        session = requests.Session()
+        # Query order does not matter; repeated fetches replay in recorded order and wrap around
+        replayed = [session.get(f"{base_url}/jobs?page=1&q=python").text for _ in range(3)]
+        assert replayed == recorded + recorded[:1]
+        with pytest.raises(requests.exceptions.ConnectionError):
+            session.get(f"{base_url}/jobs?q=rust")
+    assert len(hits) == 2 and cassette.store.stats == {"recorded": 0, "replayed": 3, "misses": 1}
+    # Sessions made after the cassette is uninstalled are not patched
+    assert not isinstance(requests.Session().get_adapter(base_url), CassetteAdapter)
+
+
+def test_keys_normalized():
+    assert http_key("get", "HTTP://Example.com/a?b=2&a=1") == http_key("GET", "http://example.com/a?a=1&b=2")
+    assert http_key("POST", "http://example.com/a", b"x") != http_key("POST", "http://example.com/a", b"y")
+    assert llm_key(dict(REQUEST, stream=True, timeout=5)) == llm_key(REQUEST)
+    assert llm_key(dict(REQUEST, temperature=0)) != llm_key(REQUEST)
+
+
+def test_llm_record_then_replay(tmp_path):
+    """Plain and streamed completions replay without the real client; a new prompt is a miss"""
+    path = str(tmp_path / "llm.json.gz")
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        content = '{"skills": ["Python", "SQL"]}'
+        if kwargs.get("stream"):
+            return iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content[:9]))]),
+                         SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content[9:]))])])
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], model="m", usage=None)
+
+    real = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    real.with_options = lambda **options: real
+
+    recorder = Cassette(path, "record")
+    client = recorder.wrap(real).with_options(timeout=5)
+    answer = client.chat.completions.create(**REQUEST).choices[0].message.content
+    streamed = "".join(c.choices[0].delta.content or "" for c in client.chat.completions.create(stream=True, **REQUEST))
+    recorder.save()
+    assert streamed == answer and len(calls) == 2
+
+    replay = Cassette(path, "replay").wrap(None)
+    assert replay.chat.completions.create(**REQUEST).choices[0].message.content == answer
+    chunks = list(replay.chat.completions.create(stream=True, **REQUEST))
+    assert "".join(c.choices[0].delta.content or "" for c in chunks) == answer
+    assert chunks[-1].choices[0].finish_reason == "stop"
+    with pytest.raises(CassetteMiss):
+        replay.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": "other"}])
+    assert len(calls) == 2
@@ -0,0 +1,61 @@
+"""
+Cohort gap reports: malformed payloads are rejected cleanly and duplicate role names are one role
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from cohort import CohortHistogram, parse_cohort, role_key  # noqa: E402
+
+
+@pytest.mark.parametrize("body, message", [
+    (None, "JSON object"),
+    ([{"known_skills": ["SQL"]}], "JSON object"),
+    ({}, "students is required"),
+    ({"students": []}, "students is required"),
+    ({"students": {"id": 1}}, "students is required"),
+    ({"students": ["SQL"]}, r"students\[0\] must be an object"),
+    ({"students": [{"known_skills": "SQL, Python"}]}, r"students\[0\].known_skills"),
+    ({"students": [{}], "roles": {"role": "SDE"}}, "roles must be"),
+    ({"students": [{}], "roles": [{"role": ""}]}, r"roles\[0\].role"),
+    ({"students": [{}], "roles": [{"role": "SDE", "job_skills": "Python"}]}, r"roles\[0\].job_skills"),
+    ({"students": [{}], "job_skills": 3}, r"roles\[0\].job_skills"),
+])
+def test_malformed_payloads_rejected(body, message):
+    with pytest.raises(ValueError, match=message):
+        parse_cohort(body)
+
+
+def test_defaults_and_cleaning():
+    students, roles = parse_cohort({"students": [{"known_skills": [" SQL ", "", 3]}, {"id": "s2"}],
+                                    "job_skills": ["Python", " "]})
+    assert students == [{"id": 0, "known_skills": ["SQL"]}, {"id": "s2", "known_skills": []}]
+    assert roles == [{"role": "target", "key": "target", "job_skills": ["Python"]}]
+
+
+def test_duplicate_role_names_merged():
+    """Same role under different spelling: one key, job skills unioned, nothing overwritten"""
+    _, roles = parse_cohort({"students": [{}], "roles": [
+        {"role": "Data Analyst", "job_skills": ["SQL", "Excel"]},
+        {"role": "SDE", "job_skills": ["Python"]},
+        {"role": " data  analyst", "job_skills": ["Excel", "Tableau"]},
+        {"role": "data analyst"},
+    ]})
+    assert roles == [{"role": "Data Analyst", "key": "data analyst", "job_skills": ["SQL", "Excel", "Tableau"]},
+                     {"role": "SDE", "key": "sde", "job_skills": ["Python"]}]
+    assert role_key("Data\tAnalyst ") == "data analyst"
+
+
+def test_histogram_per_role_key():
+    _, roles = parse_cohort({"students": [{}], "roles": [{"role": "Data Analyst"}, {"role": "SDE"}]})
+    histogram = CohortHistogram(roles)
+    histogram.add({"data analyst": [{"skill": "SQL", "level": "High"}], "sde": []})
+    histogram.add({"data analyst": [{"skill": "SQL", "level": "Medium"}], "sde": []})
+    report = histogram.report()
+    assert report["roles"]["data analyst"]["skill_gaps"] == [
+        {"skill": "SQL", "share": 1.0, "students": 2, "High": 1, "Medium": 1}]
+    assert report["roles"]["sde"]["gaps_per_student"] == {"0": 2}
@@ -0,0 +1,116 @@
+"""
+Document cache: identical bytes are parsed once, degraded LLM results are not kept
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+import llm_gateway
+from document_cache import DocumentCache
+
+
+def _cache(tmp: str) -> DocumentCache:
+    return DocumentCache(os.path.join(tmp, "documents.sqlite3"), memory_entries=2)
+
+
+def test_same_bytes_parsed_once():
+    """Reruns, other users and a fresh process (disk) all reuse the first record"""
+    calls = []
+
+    def compute(data):
+        calls.append(data)
+        return {"pages": [data.decode()], "validated_skills": ["Python"]}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = _cache(tmp)
+        first, cached = cache.get_or_compute(b"syllabus", "syllabus", compute)
+        assert not cached and first["validated_skills"] == ["Python"]
+        assert cache.get_or_compute(b"syllabus", "syllabus", compute) == (first, True)
+        # Same bytes under another label or app are different extractions
+        cache.get_or_compute(b"syllabus", "resume", compute)
+        cache.get_or_compute(b"syllabus", "syllabus", compute, namespace="backend")
+        assert _cache(tmp).get_or_compute(b"syllabus", "syllabus", compute) == (first, True)
+        assert len(calls) == 3, calls
+
+
+def test_concurrent_uploads_coalesce():
+    """A batch of students uploading the same PDF at once runs one extraction"""
+    calls = []
+
+    def compute(data):
+        calls.append(data)
+        time.sleep(0.1)
+        return {"validated_skills": ["SQL"]}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = _cache(tmp)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute(b"pdf", "syllabus", compute)))
+                   for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1 and sum(cached for _, cached in results) == 5
+
+
+def test_fallback_results_not_cached():
+    """A record built while the LLM fell back is returned but parsed again next time"""
+    calls = []
+
+    class Broken:
+        def with_options(self, **kwargs):
+            raise RuntimeError("provider down")
+
+    def compute(data):
+        calls.append(data)
+        content = llm_gateway.chat_completion(Broken(), "test.document_cache", fallback=lambda: "[]",
+                                              model="m", messages=[])
+        return {"validated_skills": [], "content": content}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = _cache(tmp)
+        assert cache.get_or_compute(b"resume", "resume", compute) == ({"validated_skills": [], "content": "[]"}, False)
+        assert cache.get_or_compute(b"resume", "resume", compute)[1] is False
+        assert len(calls) == 2 and cache.stats()["entries"] == 0
+
+
+def test_unparseable_completion_not_cached():
+    """The LLM answered, but not with the JSON asked for: the degraded record is not kept either"""
+    calls = []
+
+    truncated = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='{"technical_skills": ["Py'))])
+    garbled = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kwargs: truncated)))
+    garbled.with_options = lambda **kwargs: garbled
+
+    def compute(data):
+        calls.append(data)
+        content = llm_gateway.chat_completion(garbled, "test.document_cache", model="m", messages=[])
+        try:
+            skills = json.loads(content)["technical_skills"]
+        except ValueError:
+            llm_gateway.mark_fallback("test.document_cache")
+            skills = []
+        return {"validated_skills": skills}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = _cache(tmp)
+        assert cache.get_or_compute(b"resume", "resume", compute) == ({"validated_skills": []}, False)
+        assert cache.get_or_compute(b"resume", "resume", compute)[1] is False
+        assert len(calls) == 2 and cache.stats()["entries"] == 0
+
+
+def test_key_depends_on_extraction_config(monkeypatch):
+    """Records written under another SKILL_TWIN_EXTRACTION mode or threshold are not served"""
+    import tiered_extractor
+
+    key = DocumentCache.key("abc", "backend", "resume")
+    monkeypatch.setattr(tiered_extractor, "MODE", "llm")
+    assert DocumentCache.key("abc", "backend", "resume") != key
+    monkeypatch.setattr(tiered_extractor, "MODE", "tiered")
+    monkeypatch.setattr(tiered_extractor, "CONFIDENCE_THRESHOLD", 0.5)
+    assert DocumentCache.key("abc", "backend", "resume") != key
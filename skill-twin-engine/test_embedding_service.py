@@ -0,0 +1,131 @@
+"""
+Embedding service: concurrent workers share batched forward passes over a Unix socket
+"""
+
+import socket
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from embedding_service import EmbeddingClient, EmbeddingServer
+
+SKILLS = ["Python", "SQL", "Docker", "Kubernetes", "Snowflake", "dbt", "Airbyte", "Looker"]
+
+
+class CountingModel:
+    """Stand-in MiniLM: fixed cost per call, deterministic vectors, records every batch"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        if self.fail:
+            raise MemoryError("out of memory")
+        time.sleep(0.02)
+        return np.array([[len(t), sum(map(ord, t)) % 97, 1.0] for t in texts], dtype=np.float32)
+
+
+class SimpleFallback:
+    """LazyEmbedder-shaped wrapper: takes normalize_embeddings like SentenceTransformer.encode"""
+
+    def __init__(self, model):
+        self.model = model
+
+    def encode(self, sentences, normalize_embeddings=False, **kwargs):
+        return self.model.encode(sentences)
+
+
+@pytest.fixture
+def server(tmp_path):
+    started = []
+
+    def start(model, window_ms=50.0):
+        service = EmbeddingServer(str(tmp_path / "embed.sock"), window_ms=window_ms, model=model).start()
+        started.append(service)
+        return service
+
+    yield start
+    for service in started:
+        service.shutdown()
+
+
+def test_concurrent_requests_coalesced(server):
+    """Eight workers asking at once share a forward pass; repeated skills are encoded once"""
+    model = CountingModel()
+    service = server(model)
+    client = EmbeddingClient(service.socket_path)
+    results, barrier = {}, threading.Barrier(8)
+
+    def worker(i):
+        texts = SKILLS[i:i + 3] + ["Python"]
+        barrier.wait()
+        results[i] = (texts, client.encode(texts))
+        client.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for texts, vectors in results.values():
+        assert np.array_equal(vectors, CountingModel().encode(texts))
+    assert len(model.calls) < 8 and all(len(set(call)) == len(call) for call in model.calls), model.calls
+    stats = service.stats()
+    assert stats["requests"] == 8 and stats["batches"] == len(model.calls)
+    assert "skilltwin_embedding_batch_requests_count" in stats["prometheus"]
+
+
+def test_normalize_and_single_text(server):
+    client = EmbeddingClient(server(CountingModel(), window_ms=1.0).socket_path)
+    try:
+        vectors = client.encode(SKILLS, normalize_embeddings=True)
+        assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+        # A larger request than the first buffer still comes back intact
+        many = client.encode([f"skill {i}" for i in range(8000)])
+        assert many.shape == (8000, 3) and many[-1][0] == len("skill 7999")
+        assert np.array_equal(client.encode("SQL"), CountingModel().encode(["SQL"])[0])
+    finally:
+        client.close()
+
+
+def test_model_error_reaches_caller(server):
+    client = EmbeddingClient(server(CountingModel(fail=True), window_ms=1.0).socket_path)
+    try:
+        with pytest.raises(RuntimeError, match="MemoryError"):
+            client.encode(SKILLS)
+    finally:
+        client.close()
+
+
+def test_unreachable_service_uses_fallback(tmp_path):
+    fallback = CountingModel()
+    client = EmbeddingClient(str(tmp_path / "missing.sock"), fallback=SimpleFallback(fallback))
+    assert client.encode(SKILLS).shape == (len(SKILLS), 3)
+    assert client.encode(SKILLS[:2]).shape == (2, 3) and len(fallback.calls) == 2
+    with pytest.raises(OSError):
+        EmbeddingClient(str(tmp_path / "missing.sock")).encode(SKILLS)
+
+
+def test_second_server_refused_stale_socket_replaced(server, tmp_path):
+    path = str(tmp_path / "embed.sock")
+    server(CountingModel())
+    with pytest.raises(RuntimeError):
+        EmbeddingServer(path, model=CountingModel()).start()
+
+    stale_path = str(tmp_path / "stale.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(stale_path)
+    stale.close()         # the file stays behind, like after a crash
+    service = EmbeddingServer(stale_path, window_ms=1.0, model=CountingModel()).start()
+    client = EmbeddingClient(stale_path)
+    try:
+        assert client.encode(["Go"]).shape == (1, 3)
+    finally:
+        client.close()
+        service.shutdown()
+
@@ -0,0 +1,76 @@
+"""
+Compact embedding storage must not change what the float32 kernels find
+float16 / int8 top-k recall, score drift and round-trip through the snapshot files.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from embedding_store import EmbeddingStore, best_match, drift_report
+
+MIN_INT8_RECALL = 0.97
+MAX_INT8_DRIFT = 0.01
+MAX_FLOAT16_DRIFT = 0.001
+
+
+def _corpus(rows: int = 20000, dim: int = 384, queries: int = 32):
+    rng = np.random.default_rng(0)
+    corpus = rng.standard_normal((rows, dim)).astype(np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    picked = corpus[rng.integers(0, rows, queries)] + 0.05 * rng.standard_normal((queries, dim)).astype(np.float32)
+    return corpus, picked / np.linalg.norm(picked, axis=1, keepdims=True)
+
+
+def test_compact_topk_matches_float32():
+    """Recall@10 and score drift of float16 / int8 against float32 brute force"""
+    corpus, queries = _corpus()
+    float16 = drift_report(corpus, EmbeddingStore.from_float(corpus, "float16"), queries)
+    int8 = drift_report(corpus, EmbeddingStore.from_float(corpus, "int8"), queries)
+    print(f"🧪 float16 {float16}\n🧪 int8 {int8}")
+
+    assert float16["recall@10"] == 1.0 and float16["max_score_drift"] <= MAX_FLOAT16_DRIFT, float16
+    assert int8["recall@10"] >= MIN_INT8_RECALL and int8["max_score_drift"] <= MAX_INT8_DRIFT, int8
+    assert int8["top1_agreement"] == 1.0 and int8["compression"] > 3.9, int8
+
+
+def test_blocked_kernels_agree():
+    """topk / best_match / scores give the same rows whatever the block size"""
+    corpus, queries = _corpus(rows=3000, dim=32, queries=5)
+    store = EmbeddingStore.from_float(corpus)
+    exact = np.argsort(-(queries @ corpus.T), axis=1)[:, :5]
+    rows, scores = store.topk(queries, 5, block_rows=333)
+    assert (rows == exact).all()
+    assert np.allclose(scores, np.take_along_axis(store.scores(queries, block_rows=1000), rows, axis=1))
+    best, best_row = store.best_match(queries, block_rows=777)
+    assert (best_row == exact[:, 0]).all() and np.allclose(best, scores[:, 0])
+
+
+def test_int8_save_load_roundtrip():
+    """int8 codes and per-row scales survive save / memory-mapped load"""
+    corpus, _ = _corpus(rows=100, dim=16)
+    store = EmbeddingStore.from_float(corpus, "int8")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rows.npy")
+        store.save(path)
+        loaded = EmbeddingStore.load(path)
+        assert loaded.dtype == "int8" and isinstance(loaded.data, np.memmap)
+        assert np.array_equal(loaded.to_float(), store.to_float())
+        assert np.abs(loaded.rows([3, 7]) - corpus[[3, 7]]).max() < 0.01
+
+
+def test_gap_best_match_is_cosine():
+    """best_match() used by compute_gaps / curriculum comparison equals cosine max on raw (unnormalised) encoder output"""
+    rng = np.random.default_rng(1)
+    job = rng.standard_normal((40, 64)).astype(np.float32) * 3
+    known = rng.standard_normal((25, 64)).astype(np.float32) * 0.5
+    cosine = (job / np.linalg.norm(job, axis=1, keepdims=True)) @ (known / np.linalg.norm(known, axis=1, keepdims=True)).T
+    scores, rows = best_match(job, known)
+    assert np.abs(scores - cosine.max(axis=1)).max() < 1e-5
+    assert np.array_equal(rows, cosine.argmax(axis=1))
+    # A prebuilt compact store is matched as held, not requantized
+    for dtype, tolerance in (("float16", MAX_FLOAT16_DRIFT), ("int8", MAX_INT8_DRIFT)):
+        store = EmbeddingStore.from_float(known, dtype, normalize=True)
+        scores, _ = best_match(job, store)
+        assert np.abs(scores - cosine.max(axis=1)).max() < tolerance, dtype
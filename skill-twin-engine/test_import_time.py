@@ -0,0 +1,88 @@
+"""
+Import-time budget for the core analysis modules
+Each module is imported in a fresh interpreter. It must not pull in torch,
+sentence-transformers, openai or pdfplumber until they are used (a hard check), and the
+median of a few cold imports must stay under a budget generous enough for slow machines.
+Tighten it locally with SKILL_TWIN_IMPORT_BUDGET=0.4; set it to 0 to skip the timing check.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import pytest
+
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Seconds. The target is "a few hundred milliseconds"; the default only catches a heavy
+# dependency sneaking back in, since one cold import on a busy machine can take twice the target
+IMPORT_BUDGET_S = float(os.getenv("SKILL_TWIN_IMPORT_BUDGET", "1.5"))
+IMPORT_RUNS = int(os.getenv("SKILL_TWIN_IMPORT_RUNS", "5"))
+
+CORE_MODULES = [
+    "llm_gateway",
+    "simple_job_analyzer",
+    "job_scraper",
+    "real_job_scraper",
+    "advanced_job_scraper",
+    "real_job_integration",
+    "real_job_api_integration",
+    "job_market_integration",
+    "parse_resume",
+    "skill_twin_main"
+]
+
+HEAVY_MODULES = ["torch", "sentence_transformers", "openai", "pdfplumber", "transformers"]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    # No key: nothing may construct an OpenAI client at import time
+    env.pop("OPENAI_API_KEY", None)
+    env.pop("SKILL_TWIN_PRELOAD", None)
+    return env
+
+
+def measure_import(module: str, warm: bool = True) -> dict:
+    """Import time and heavy modules loaded, from a fresh interpreter"""
+    env = _env()
+    if warm:
+        # Warm the bytecode cache first so the budget measures imports, not compilation
+        subprocess.run([sys.executable, "-c", f"import {module}"], cwd=ENGINE_DIR, env=env,
+                       capture_output=True, timeout=120)
+    completed = subprocess.run([sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                               cwd=ENGINE_DIR, env=env, capture_output=True, text=True, timeout=120)
+    if completed.returncode != 0:
+        raise AssertionError(f"import {module} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_core_modules_leave_heavy_dependencies_unloaded():
+    """Deterministic: importing a core module never loads torch, openai, pdfplumber and friends"""
+    loaded = {module: measure_import(module)["heavy"] for module in CORE_MODULES}
+    assert not any(loaded.values()), {module: heavy for module, heavy in loaded.items() if heavy}
+
+
+def test_core_modules_import_within_budget():
+    """Median of several cold imports per module, so one slow run on a busy machine does not fail it"""
+    if IMPORT_BUDGET_S <= 0:
+        pytest.skip("SKILL_TWIN_IMPORT_BUDGET=0")
+    print(f"🧪 Import-time budget: {IMPORT_BUDGET_S * 1000:.0f} ms per module (median of {IMPORT_RUNS})")
+    failures = []
+    for module in CORE_MODULES:
+        measure_import(module)
+        median = statistics.median(measure_import(module, warm=False)["seconds"] for _ in range(IMPORT_RUNS))
+        print(f"  {module:<28} {median * 1000:7.1f} ms")
+        if median > IMPORT_BUDGET_S:
+            failures.append(f"{module} took {median * 1000:.0f} ms")
+    assert not failures, "; ".join(failures)
@@ -0,0 +1,143 @@
+"""
+Resume job queue: status transitions are reported promptly, counters stay exact under concurrent workers
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import closing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from job_queue import QueueFull, SQLiteJobQueue  # noqa: E402
+
+
+def _queue(tmp_path, handler, **kwargs) -> SQLiteJobQueue:
+    return SQLiteJobQueue(str(tmp_path / "jobs.sqlite3"), handler=handler, **kwargs)
+
+
+def test_wait_returns_on_status_change(tmp_path):
+    """A caller following a queued job hears about `running` when it happens, not when the job ends"""
+    release = threading.Event()
+    queue = _queue(tmp_path, lambda payload, meta: release.wait(5) and {"ok": True}, workers=1)
+    try:
+        job_id = queue.submit(b"pdf")
+        started = time.monotonic()
+        job = queue.wait(job_id, timeout=5, poll_interval=0.01, changed_from="queued")
+        assert job["status"] == "running" and time.monotonic() - started < 1.0, job
+
+        # Without changed_from only a finished job (or the timeout) ends the wait
+        job = queue.wait(job_id, timeout=0.2, poll_interval=0.01)
+        assert job["status"] == "running"
+        release.set()
+        job = queue.wait(job_id, timeout=5, poll_interval=0.01, changed_from="running")
+        assert job["status"] == "done" and job["result"] == {"ok": True}
+    finally:
+        release.set()
+        queue.shutdown()
+
+
+def test_counters_exact_under_concurrency(tmp_path):
+    """Submits from many request threads and completions on several workers are all counted"""
+    jobs = 60
+
+    def handler(payload, meta):
+        if payload == b"bad":
+            raise ValueError("unreadable PDF")
+        return {"skills": []}
+
+    queue = _queue(tmp_path, handler, workers=4, max_depth=jobs)
+    try:
+        ids = []
+        submitters = [threading.Thread(target=lambda i=i: ids.append(queue.submit(b"bad" if i % 3 == 0 else b"pdf")))
+                      for i in range(jobs)]
+        for thread in submitters:
+            thread.start()
+        for thread in submitters:
+            thread.join()
+        for job_id in ids:
+            queue.wait(job_id, timeout=10, poll_interval=0.01)
+        counters = queue.stats()["counters"]
+        assert counters == {"submitted": jobs, "rejected": 0, "completed": jobs - jobs // 3, "failed": jobs // 3}, \
+            counters
+        assert queue.stats()["processing_seconds"]["count"] == jobs
+    finally:
+        queue.shutdown()
+
+
+def test_full_queue_rejects(tmp_path):
+    release = threading.Event()
+    queue = _queue(tmp_path, lambda payload, meta: release.wait(5) and {}, workers=1, max_depth=1)
+    try:
+        running = queue.submit(b"first")
+        queue.wait(running, timeout=5, poll_interval=0.01, changed_from="queued")
+        queue.submit(b"second")
+        try:
+            queue.submit(b"third")
+            raise AssertionError("expected QueueFull")
+        except QueueFull:
+            pass
+        assert queue.stats()["counters"]["rejected"] == 1
+    finally:
+        release.set()
+        queue.shutdown()
+
+
+def test_finish_failures_do_not_kill_workers(tmp_path):
+    """An unserializable result fails its job; a DB error while finishing leaves the worker running"""
+    def handler(payload, meta):
+        return {"skills": {"Python"}} if payload == b"set" else {"skills": ["Python"]}
+
+    queue = _queue(tmp_path, handler, workers=1)
+    finish, calls = queue._finish, []
+
+    def flaky_finish(job_id, result, error):
+        calls.append(job_id)
+        if len(calls) == 2:
+            raise sqlite3.OperationalError("database is locked")
+        return finish(job_id, result, error)
+
+    queue._finish = flaky_finish
+    try:
+        bad = queue.submit(b"set")
+        job = queue.wait(bad, timeout=5, poll_interval=0.01)
+        assert job["status"] == "failed" and "serialized" in job["error"], job
+        locked = queue.submit(b"pdf")
+        deadline = time.monotonic() + 5
+        while len(calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        after = queue.submit(b"pdf")
+        assert queue.wait(after, timeout=5, poll_interval=0.01)["status"] == "done"
+        assert queue.get(locked)["status"] == "running"
+        assert queue.stats()["counters"]["failed"] == 1 and queue.stats()["counters"]["completed"] == 1
+    finally:
+        queue.shutdown()
+
+
+def test_stale_running_jobs_requeued_while_live_ones_kept(tmp_path):
+    """A job orphaned by a restart within stale_after_seconds is still picked up; a slow live job is not rerun"""
+    calls = []
+
+    def handler(payload, meta):
+        calls.append(payload)
+        if payload == b"slow":
+            time.sleep(1.2)
+        return {"payload": payload.decode()}
+
+    path = str(tmp_path / "jobs.sqlite3")
+    crashed = SQLiteJobQueue(path, handler=handler, stale_after_seconds=0.4)
+    with closing(crashed._connect()) as conn:
+        conn.execute("INSERT INTO jobs (id, status, payload, meta, created_at, started_at) "
+                     "VALUES ('orphan', 'running', ?, '{}', ?, ?)", (b"orphan", time.time(), time.time()))
+
+    queue = SQLiteJobQueue(path, handler=handler, workers=2, stale_after_seconds=0.4)
+    try:
+        assert queue.get("orphan")["status"] == "running"      # too recent for the startup sweep
+        slow = queue.submit(b"slow")
+        assert queue.wait("orphan", timeout=5, poll_interval=0.01)["status"] == "done"
+        assert queue.wait(slow, timeout=5, poll_interval=0.01)["status"] == "done"
+        assert sorted(calls) == [b"orphan", b"slow"], calls
+    finally:
+        queue.shutdown()
@@ -0,0 +1,81 @@
+"""
+Incremental JSON parsing: array elements leave the parser as soon as they close, whatever the chunking
+"""
+
+import json
+
+import pytest
+
+from json_stream import JSONArrayStream, iter_array_items
+
+ROADMAP = {
+    "title": "Data \"Engineer\" plan [8 weeks]",
+    "roadmap": [
+        {"week": 1, "topics": ["SQL", "dbt"], "note": "escape \\ and \" and } inside strings"},
+        {"week": 2, "topics": [{"name": "Airflow", "links": ["a", "b"]}], "note": "café → 🚀"},
+        {"week": 3, "topics": [], "note": None},
+    ],
+    "summary": {"roadmap": ["not", "the", "target"]},
+}
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_items_match_full_parse_for_any_chunking(size):
+    """Escapes, nested values and keys split across deltas give the same elements as json.loads"""
+    text = json.dumps(ROADMAP)
+    parser = JSONArrayStream("roadmap")
+    items = [item for chunk in _chunks(text, size) for item in parser.feed(chunk)]
+    assert items == ROADMAP["roadmap"] and parser.complete
+    assert parser.result() == ROADMAP
+
+
+def test_each_week_emitted_when_it_closes():
+    """A week comes out on the chunk that closes it, not at the end of the document"""
+    text = json.dumps(ROADMAP)
+    parser = JSONArrayStream("roadmap")
+    first_close = text.index("}, {\"week\": 2") + 1
+    assert parser.feed(text[:first_close - 1]) == []
+    assert parser.feed(text[first_close - 1:first_close]) == [ROADMAP["roadmap"][0]]
+    assert not parser.complete
+
+
+def test_split_escape_and_unicode_escape():
+    """A backslash at the end of one delta escapes the quote at the start of the next"""
+    parser = JSONArrayStream("skills")
+    assert parser.feed('{"skills": ["C\\') == []
+    assert parser.feed('"++\\u00e9", "G') == ['C"++é']
+    assert parser.feed('o"]}') == ["Go"] and parser.complete
+
+
+def test_key_split_across_deltas():
+    """The target key only matches once its closing quote has arrived"""
+    parser = JSONArrayStream("technical_skills")
+    items = []
+    for chunk in ['{"techni', 'cal_sk', 'ills"', ' :', ' ["Py', 'thon", 4', '2, true, null', ']}']:
+        items.extend(parser.feed(chunk))
+    assert items == ["Python", 42, True, None] and parser.complete
+
+
+def test_top_level_array():
+    parser = JSONArrayStream()
+    assert parser.feed('[{"a": [1, 2]}, 3.5') == [{"a": [1, 2]}]
+    assert parser.feed(', "x"]') == [3.5, "x"]
+
+
+def test_truncated_stream_raises_after_partial_items():
+    """A completion cut off mid-array yields what closed, then raises"""
+    text = json.dumps(ROADMAP)
+    cut = text.index("{\"week\": 2") + 20
+    stream = iter_array_items(_chunks(text[:cut], 5), "roadmap")
+    assert next(stream) == ROADMAP["roadmap"][0]
+    with pytest.raises(ValueError):
+        next(stream)
+
+
+def test_missing_key_raises():
+    with pytest.raises(ValueError):
+        list(iter_array_items(['{"weeks": [1, 2]}'], "roadmap"))
@@ -0,0 +1,98 @@
+"""
+Shared LLM client: one pool for every module, warm connections reused across calls
+"""
+
+import asyncio
+import unittest
+
+REQUEST = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "skills for SDE"}]}
+
+
+def _server():
+    try:
+        import openai  # noqa: F401
+    except ImportError as e:
+        raise unittest.SkipTest(f"openai not installed: {e}")
+    from fake_llm_server import LatencyProfile, start_fake_server
+    return start_fake_server(profile=LatencyProfile(median=0.001, sigma=0.0, tail_probability=0.0))
+
+
+def test_modules_share_one_client():
+    """openai_client() in every module resolves to the same OpenAI client and connection pool"""
+    _server()[0].shutdown()
+    import llm_client
+    from lazy_models import LazyOpenAI
+
+    first, second = LazyOpenAI(api_key="fake").load(), LazyOpenAI(api_key="fake").load()
+    assert first is second
+    # The gateway's per-call with_options() copies keep the pool
+    assert first.with_options(timeout=5, max_retries=0)._client is llm_client.http_client()
+
+
+def test_back_to_back_calls_reuse_connection():
+    """Ten calls through the gateway open one connection; keep-alive off opens ten"""
+    server, base_url, _ = _server()
+    import llm_client
+    import llm_gateway
+    from openai import OpenAI
+
+    try:
+        client = llm_client.sync_client(api_key="fake", base_url=base_url)
+        before = llm_client.stats()
+        for _ in range(10):
+            llm_gateway.chat_completion(client, "test.llm_client", **REQUEST)
+        after = llm_client.stats()
+        assert after["new_connections"] - before["new_connections"] == 1, after
+        assert after["reused"] - before["reused"] == 9, after
+
+        cold = llm_client.new_http_client(llm_client.limits(max_keepalive=0))
+        uncached = OpenAI(api_key="fake", base_url=base_url, http_client=cold)
+        before = llm_client.stats()
+        for _ in range(10):
+            uncached.chat.completions.create(**REQUEST)
+        assert llm_client.stats()["new_connections"] - before["new_connections"] == 10
+        cold.close()
+    finally:
+        server.shutdown()
+
+
+def test_async_pool_bounded_and_reused():
+    """Concurrent async calls stay within the pool size; a second wave reuses the warm connections"""
+    server, base_url, _ = _server()
+    import llm_client
+
+    async def waves():
+        client = llm_client.async_client(api_key="fake", base_url=base_url)
+        assert client is llm_client.async_client(api_key="fake", base_url=base_url)
+        counts = []
+        for _ in range(2):
+            before = llm_client.stats()["new_connections"]
+            await asyncio.gather(*(client.chat.completions.create(**REQUEST) for _ in range(8)))
+            counts.append(llm_client.stats()["new_connections"] - before)
+        return counts
+
+    try:
+        first, second = asyncio.run(waves())
+    finally:
+        server.shutdown()
+    assert 1 <= first <= min(8, llm_client.MAX_CONNECTIONS) and second == 0, (first, second)
+
+
+def test_async_clients_released_with_loop():
+    """One asyncio.run() per request keeps at most one loop's client and pool, not one per run"""
+    server, base_url, _ = _server()
+    import gc
+    import llm_client
+
+    async def call():
+        # The pooled connection stays open after the call, pointing back at this loop
+        await llm_client.async_client(api_key="fake", base_url=base_url).chat.completions.create(**REQUEST)
+
+    try:
+        for _ in range(5):
+            asyncio.run(call())
+            gc.collect()
+            assert len(llm_client._async_clients) <= 1 and len(llm_client._async_http) <= 1
+    finally:
+        server.shutdown()
+    assert not [key for key in llm_client._clients if key[0] == "async"]
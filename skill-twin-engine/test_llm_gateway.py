@@ -0,0 +1,225 @@
+"""
+LLM gateway: breaker, deadlines, fallback cache, and hedged calls within their budget and concurrency slots
+"""
+
+import time
+from types import SimpleNamespace
+
+import llm_gateway
+from llm_gateway import CircuitBreaker, CircuitOpen, DeadlineExceeded, LLMGateway
+
+REQUEST = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "skills for SDE"}]}
+OTHER_REQUEST = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "skills for DevOps"}]}
+
+
+class StatusError(Exception):
+    """Stand-in for openai.APIStatusError"""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeClient:
+    """Just enough of OpenAI for the gateway: with_options().chat.completions.create()"""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.calls = 0
+        self.timeouts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def with_options(self, timeout=None, max_retries=None):
+        self.timeouts.append(timeout)
+        return self
+
+    def _create(self, stream=False, **kwargs):
+        self.calls += 1
+        content = self.respond(**kwargs)
+        if stream:
+            return iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _raise(error):
+    def respond(**kwargs):
+        raise error
+    return respond
+
+
+def _gateway(failures=2, reset=30.0):
+    return LLMGateway(max_concurrency=2, default_timeout=5.0, queue_timeout=1.0,
+                      breaker=CircuitBreaker(failure_threshold=failures, reset_timeout=reset))
+
+
+def test_deadline_cut_timeouts_keep_breaker_closed():
+    """Timeouts of calls shortened by X-Request-Timeout fall back without counting against the provider"""
+    gateway, client = _gateway(), FakeClient(_raise(TimeoutError("read timed out")))
+    with llm_gateway.deadline(0.1):
+        for _ in range(5):
+            assert gateway.chat_completion(client, "test.gateway", fallback=lambda: "local", **REQUEST) == "local"
+        assert list(gateway.stream_chat_completion(client, "test.gateway", fallback=lambda: "local", **REQUEST)) \
+            == ["local"]
+    assert max(client.timeouts) <= 0.1, client.timeouts
+    assert gateway.breaker.state == "closed" and gateway.breaker.failures == 0
+
+    # The same timeout with the full default_timeout is the provider's fault
+    for _ in range(2):
+        gateway.chat_completion(client, "test.gateway", fallback=lambda: "local", **REQUEST)
+    assert gateway.breaker.state == "open"
+
+
+def test_client_errors_keep_breaker_closed():
+    """A rejected request (4xx) is the caller's problem; a 429 or 5xx is the provider's"""
+    gateway = _gateway()
+    for _ in range(5):
+        gateway.chat_completion(FakeClient(_raise(StatusError(400))), "test.gateway", fallback=lambda: "", **REQUEST)
+    assert gateway.breaker.state == "closed"
+    for _ in range(2):
+        gateway.chat_completion(FakeClient(_raise(StatusError(429))), "test.gateway", fallback=lambda: "", **REQUEST)
+    assert gateway.breaker.state == "open"
+
+
+def test_open_breaker_serves_cached_then_fallback():
+    """Once open, calls skip the provider: the last good answer first, then fallback(), else CircuitOpen"""
+    gateway = _gateway()
+    answers = iter(['{"skills": ["Python"]}'])
+
+    def respond(**kwargs):
+        answer = next(answers, None)
+        if answer is None:
+            raise StatusError(503)
+        return answer
+
+    client = FakeClient(respond)
+    assert gateway.chat_completion(client, "test.gateway", **REQUEST) == '{"skills": ["Python"]}'
+    with llm_gateway.track_fallbacks() as fallbacks:
+        for _ in range(2):
+            assert gateway.chat_completion(client, "test.gateway", **REQUEST) == '{"skills": ["Python"]}'
+    assert fallbacks == ["test.gateway", "test.gateway"] and gateway.breaker.state == "open"
+
+    calls = client.calls
+    assert gateway.chat_completion(client, "test.gateway", **REQUEST) == '{"skills": ["Python"]}'
+    assert gateway.chat_completion(client, "test.gateway", fallback=lambda: "local", **OTHER_REQUEST) == "local"
+    try:
+        gateway.chat_completion(client, "test.gateway", **OTHER_REQUEST)
+        raise AssertionError("expected CircuitOpen")
+    except CircuitOpen:
+        pass
+    assert client.calls == calls
+
+
+def test_half_open_trial_returned_after_deadline_timeout():
+    """A trial call that timed out on the caller's deadline leaves the breaker half-open for the next one"""
+    gateway, client = _gateway(failures=1, reset=0.05), FakeClient(_raise(StatusError(502)))
+    gateway.chat_completion(client, "test.gateway", fallback=lambda: "", **REQUEST)
+    assert gateway.breaker.state == "open"
+    time.sleep(0.06)
+    client.respond = _raise(TimeoutError("read timed out"))
+    with llm_gateway.deadline(0.1):
+        gateway.chat_completion(client, "test.gateway", fallback=lambda: "", **REQUEST)
+    assert gateway.breaker.state == "half_open" and gateway.breaker.allow()
+
+
+def test_expired_deadline_never_calls_provider():
+    gateway, client = _gateway(), FakeClient(lambda **kwargs: "never")
+    with llm_gateway.deadline(0):
+        try:
+            gateway.chat_completion(client, "test.gateway", **REQUEST)
+            raise AssertionError("expected DeadlineExceeded")
+        except DeadlineExceeded:
+            pass
+        assert gateway.chat_completion(client, "test.gateway", fallback=lambda: "local", **REQUEST) == "local"
+    assert client.calls == 0 and gateway.breaker.failures == 0
+
+
+def _latencies(*seconds):
+    """respond() whose n-th call takes seconds[n] (the last value repeats)"""
+    calls = []
+
+    def respond(**kwargs):
+        calls.append(None)
+        time.sleep(seconds[min(len(calls), len(seconds)) - 1])
+        return '{"skills": ["Python"]}'
+    return respond
+
+
+def _hedging_gateway(budget, delay=0.02):
+    return LLMGateway(max_concurrency=2, default_timeout=5.0, hedge_budget=budget, hedge_initial_delay=delay)
+
+
+def test_hedges_stay_within_budget():
+    """With a 0.5 budget every other slow call may hedge; the rest wait for the primary"""
+    gateway = _hedging_gateway(budget=0.5)
+    client = FakeClient(_latencies(0.06))
+    for _ in range(4):
+        gateway.chat_completion(client, "test.hedge", hedge=True, **REQUEST)
+    outcomes = gateway.stats()["sites"]["test.hedge"]["outcomes"]
+    assert outcomes.get("hedged") == 2 and outcomes.get("hedge_denied") == 2, outcomes
+
+
+def test_losing_primary_keeps_its_slot():
+    """When the duplicate wins, the still-running primary holds a slot until it really finishes"""
+    gateway = _hedging_gateway(budget=1.0, delay=0.03)
+    client = FakeClient(_latencies(0.3, 0.01))
+    started = time.monotonic()
+    assert gateway.chat_completion(client, "test.hedge", hedge=True, **REQUEST) == '{"skills": ["Python"]}'
+    assert time.monotonic() - started < 0.2
+    assert gateway.stats()["sites"]["test.hedge"]["outcomes"].get("hedge_won") == 1
+    assert gateway.stats()["in_flight"] == 1
+
+    time.sleep(0.35)
+    assert gateway.stats()["in_flight"] == 0
+    # Both slots are free again, and the loser's latency was recorded for the hedge delay
+    assert all(gateway._semaphore.acquire(blocking=False) for _ in range(2))
+    assert len(gateway._recent_latency["test.hedge"]) == 2, gateway._recent_latency
+
+
+class TrickleClient(FakeClient):
+    """Streams one token every `gap` seconds: each read is fast enough for httpx, the call is not"""
+
+    def __init__(self, tokens, gap):
+        super().__init__(lambda **kwargs: "")
+        self.tokens, self.gap, self.closed = tokens, gap, 0
+
+    def _create(self, stream=False, **kwargs):
+        self.calls += 1
+        client = self
+
+        class Stream:
+            def __iter__(self):
+                for token in client.tokens:
+                    time.sleep(client.gap)
+                    yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+
+            def close(self):
+                client.closed += 1
+        return Stream()
+
+
+def test_trickling_stream_held_to_deadline():
+    """A slow-dripping stream is cut at the request deadline, streamed or hedged, instead of running on"""
+    gateway = _gateway()
+    client = TrickleClient(["[", '"Py"', ",", '"SQL"', "]"], gap=0.06)
+    started = time.monotonic()
+    with llm_gateway.deadline(0.1):
+        try:
+            list(gateway.stream_chat_completion(client, "test.trickle", fallback=lambda: "[]", **REQUEST))
+            raise AssertionError("expected the interrupted stream to raise")
+        except llm_gateway.LLMUnavailable:
+            pass
+    assert time.monotonic() - started < 0.25 and client.closed == 1
+    assert gateway.breaker.failures == 0            # cut short by the caller's deadline, not the provider's fault
+
+    # Nothing yielded yet when the deadline passes: the fallback is served
+    slow_start = TrickleClient(["[]"], gap=0.2)
+    with llm_gateway.deadline(0.1):
+        assert list(gateway.stream_chat_completion(slow_start, "test.trickle", fallback=lambda: "local",
+                                                   **REQUEST)) == ["local"]
+
+    hedging = _hedging_gateway(budget=0.0, delay=1.0)
+    started = time.monotonic()
+    with llm_gateway.deadline(0.1):
+        assert hedging.chat_completion(client, "test.trickle", hedge=True, fallback=lambda: "local",
+                                       **REQUEST) == "local"
+    assert time.monotonic() - started < 0.25
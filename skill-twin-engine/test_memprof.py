@@ -0,0 +1,37 @@
+"""
+Memory profiling: peak and retained allocations per stage, result size per key
+"""
+
+import tracemalloc
+
+import memprof
+import tracing
+
+
+def _pipeline():
+    with tracing.span("scratch", "stage"):
+        scratch = [bytes(1024) for _ in range(2000)]      # ~2 MB, freed when the stage ends
+        del scratch
+    with tracing.span("keep", "stage"):
+        jobs = [{"description": "x" * 1000 + str(i)} for i in range(500)]
+    return {"jobs": jobs, "skills": ["Python"] * 10, "alias": jobs}
+
+
+def test_stage_peak_and_retained():
+    """A stage that frees its scratch space shows a peak but retains nothing; the kept one retains"""
+    result, report = memprof.profile("pipeline", _pipeline)
+    scratch, keep = report["stages"]["scratch"], report["stages"]["keep"]
+    assert scratch["peak_kb"] > 1500 and scratch["retained_kb"] < 100, scratch
+    assert keep["retained_kb"] > 400 and keep["calls"] == 1, keep
+    assert report["peak_kb"] >= scratch["peak_kb"] and report["retained_kb"] >= keep["retained_kb"] * 0.9, report
+    assert memprof.PROFILE_SPAN not in report["stages"]
+    assert not tracemalloc.is_tracing() and tracing.current_run() is None
+    assert "keep" in memprof.format_report(report)
+
+
+def test_result_keys_count_shared_objects_once():
+    """The alias key points at the same list, so only the first key pays for it"""
+    result = _pipeline()
+    sizes = memprof.result_key_sizes(result)
+    assert sizes["jobs"] > 400 and sizes["alias"] == 0.0, sizes
+    assert memprof.deep_sizeof(result) < memprof.deep_sizeof(result["jobs"]) * 1.1
@@ -0,0 +1,76 @@
+"""
+Metrics: Prometheus text output for histograms, counters and gauges, and the LLM gateway's series
+"""
+
+import threading
+
+import pytest
+
+import llm_gateway
+import metrics
+from metrics import Registry
+
+
+def test_histogram_exposition():
+    """Buckets are cumulative and end in +Inf; _sum and _count follow each labelled series"""
+    registry = Registry()
+    latency = registry.histogram("test_seconds", "Test latency", ["route"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value, route="/api/x")
+    with latency.time(route="/api/y"):
+        pass
+    text = registry.render()
+    assert "# TYPE test_seconds histogram" in text
+    for line in ('test_seconds_bucket{route="/api/x",le="0.1"} 1', 'test_seconds_bucket{route="/api/x",le="1"} 3',
+                 'test_seconds_bucket{route="/api/x",le="+Inf"} 4', 'test_seconds_sum{route="/api/x"} 4.05',
+                 'test_seconds_count{route="/api/x"} 4', 'test_seconds_count{route="/api/y"} 1'):
+        assert line in text.splitlines(), (line, text)
+
+
+def test_labels_checked_and_escaped():
+    registry = Registry()
+    calls = registry.counter("test_total", "Calls", ["site"])
+    calls.inc(site='say "hi"\n')
+    assert 'test_total{site="say \\"hi\\"\\n"} 1' in registry.render()
+    with pytest.raises(ValueError):
+        calls.inc(route="/api/x")
+    with pytest.raises(ValueError):
+        registry.gauge("test_total", "Same name, other type", ["site"])
+    assert registry.counter("test_total", "Calls", ["site"]) is calls
+
+
+def test_concurrent_increments_not_lost():
+    registry = Registry()
+    calls = registry.counter("test_total", "Calls")
+
+    def work():
+        for _ in range(1000):
+            calls.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls.value() == 8000
+
+
+def test_cache_hit_ratio_refreshed_on_render():
+    metrics.record_cache("test_metrics", True)
+    metrics.record_cache("test_metrics", True)
+    metrics.record_cache("test_metrics", False)
+    metrics.record_cache("test_metrics", True)
+    assert 'skilltwin_cache_hit_ratio{cache="test_metrics"} 0.75' in metrics.render().splitlines()
+
+
+def test_llm_fallback_counted_per_site():
+    """A failing provider shows up as a fallback outcome and a latency sample for its call site"""
+    class Broken:
+        def with_options(self, **kwargs):
+            raise RuntimeError("provider down")
+
+    before = llm_gateway.LLM_CALLS.value(site="test.metrics", outcome="local_fallback")
+    assert llm_gateway.chat_completion(Broken(), "test.metrics", fallback=lambda: "[]",
+                                       model="m", messages=[]) == "[]"
+    assert llm_gateway.LLM_CALLS.value(site="test.metrics", outcome="local_fallback") == before + 1
+    assert 'skilltwin_llm_call_seconds_count{site="test.metrics"}' in metrics.render()
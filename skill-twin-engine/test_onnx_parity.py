@@ -0,0 +1,54 @@
+"""
+Parity of the int8 ONNX encoder with the PyTorch SentenceTransformer
+Best-match cosine scores on our skill strings must stay close enough that compute_gaps
+classifies (0.40 / 0.55 thresholds) the same skills as High / Medium / no gap.
+Skipped when onnxruntime, tokenizers or sentence-transformers are not installed.
+"""
+
+import pytest
+
+from benchmarks.synthetic import make_dataset
+from skill_taxonomy import canonical_vocabulary
+
+MAX_SCORE_DRIFT = 0.05
+MIN_LEVEL_AGREEMENT = 0.97
+# A flip is only tolerated when the PyTorch score sits this close to a threshold
+THRESHOLD_MARGIN = 0.03
+
+
+def _encoders():
+    for module in ("onnxruntime", "tokenizers", "sentence_transformers", "torch"):
+        pytest.importorskip(module)
+    from sentence_transformers import SentenceTransformer
+    from onnx_encoder import DEFAULT_MODEL, OnnxEncoder
+    return SentenceTransformer(DEFAULT_MODEL, device="cpu"), OnnxEncoder.load_or_export(DEFAULT_MODEL)
+
+
+def test_onnx_int8_matches_pytorch_gap_levels():
+    """Score drift and gap-level agreement of the int8 encoder on canonical and synthetic skills"""
+    from onnx_encoder import parity_report
+
+    reference, candidate = _encoders()
+    data = make_dataset("medium")
+    job_skills = list(dict.fromkeys(data["market_skills"] + data["extracted_skills"] + canonical_vocabulary()[:60]))
+    known_skills = list(dict.fromkeys(data["student_skills"] + data["curriculum"]))
+
+    report = parity_report(reference, candidate, job_skills, known_skills)
+    print(f"🧪 ONNX int8 parity: max drift {report['max_drift']}, agreement {report['level_agreement']:.1%} "
+          f"over {report['pairs']} skills")
+
+    assert report["max_drift"] <= MAX_SCORE_DRIFT, report
+    assert report["level_agreement"] >= MIN_LEVEL_AGREEMENT, report
+    for flip in report["flips"]:
+        distance = min(abs(flip["reference"] - 0.40), abs(flip["reference"] - 0.55))
+        assert distance <= THRESHOLD_MARGIN, f"gap level changed away from a threshold: {flip}"
+
+
+def test_onnx_encode_interface():
+    """encode() returns SentenceTransformer-shaped float32 output for str and list input"""
+    reference, candidate = _encoders()
+    single = candidate.encode("REST API")
+    batch = candidate.encode(["Node.js", "Machine Learning", "C++"], normalize_embeddings=True)
+    assert single.shape == (reference.get_sentence_embedding_dimension(),)
+    assert batch.shape == (3, single.shape[0]) and batch.dtype.name == "float32"
+    assert abs(float((batch ** 2).sum(axis=1).max()) - 1.0) < 1e-4
@@ -0,0 +1,35 @@
+"""
+Request profiler: the X-Profile header only starts a profile when PROFILE_TOKEN is configured and matches
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from request_profiler import RequestProfiler  # noqa: E402
+
+ROUTE = "/api/analyze-gaps"
+
+
+def test_header_ignored_without_token(tmp_path):
+    """With no token configured anyone could send the header, so it never profiles"""
+    profiler = RequestProfiler(str(tmp_path))
+    assert not profiler.wants(ROUTE, {"X-Profile": "1"})
+    assert not profiler.wants(ROUTE, {"X-Profile": ""})
+    assert not profiler.authorized({"X-Profile": "1"})
+
+
+def test_header_needs_matching_token(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), token="s3cret")
+    assert profiler.wants(ROUTE, {"X-Profile": "s3cret"}) and profiler.authorized({"X-Profile": "s3cret"})
+    assert not profiler.wants(ROUTE, {"X-Profile": "guess"})
+    assert not profiler.authorized({})
+
+
+def test_sampling_works_without_token(tmp_path):
+    """Server-side sampling is configured by the operator, not the caller, so it needs no token"""
+    profiler = RequestProfiler(str(tmp_path), sample_rates={ROUTE: 1.0})
+    assert profiler.wants(ROUTE, {}) and not profiler.wants("/api/parse-resume", {})
+    # ...but a caller cannot force one with a bogus header on a sampled route
+    assert not profiler.wants(ROUTE, {"X-Profile": "1"})
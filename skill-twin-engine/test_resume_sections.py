@@ -0,0 +1,67 @@
+"""
+Section-aware resume prompts on fixtures/resumes
+The sectioned prompt must be much smaller and keep the skills the full prompt finds.
+"""
+
+import glob
+import os
+
+from resume_sections import FIXTURE_DIR, fixture_report, relevant_text, segment, text_lines
+
+MIN_TOKEN_SAVINGS = 0.40
+MIN_SKILL_RECALL = 0.95
+
+
+def test_fixture_token_savings_and_parity():
+    """Prompt tokens shrink and keyword-extracted skills survive across the fixture set"""
+    report = fixture_report(sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.txt"))))
+    print(f"🧪 tokens {report['full_tokens']} -> {report['section_tokens']}, recall {report['skill_recall']:.1%}")
+    assert report["token_savings"] >= MIN_TOKEN_SAVINGS, report
+    assert report["skill_recall"] >= MIN_SKILL_RECALL, report
+
+
+def test_heading_cues():
+    """ALL-CAPS, 'Heading:' and unknown caps headings split sections; skill sub-labels do not"""
+    resume = "\n".join([
+        "ANANYA MISHRA", "Bhubaneswar | ananya@example.com",
+        "EDUCATION", "B.Tech CSE, GIET University, 2025",
+        "Relevant Coursework: DBMS, Operating Systems",
+        "TECHNICAL SKILLS", "Languages: Python, C", "Tools: Git, Docker",
+        "HOBBIES", "Badminton",
+        "Projects: Attendance system in Flask",
+    ])
+    sections = {s.name: s.text for s in segment(text_lines(resume))}
+    assert sections["skills"] == "Languages: Python, C\nTools: Git, Docker", sections
+    assert sections["coursework"] == "DBMS, Operating Systems"
+    assert sections["projects"] == "Attendance system in Flask"
+    prompt = relevant_text(text_lines(resume), resume)
+    assert "Badminton" not in prompt and "GIET" not in prompt and "Docker" in prompt
+
+
+def test_unstructured_resume_keeps_full_text():
+    """No recognisable section -> the prompt falls back to the whole text"""
+    resume = "Final year student. Worked with Python, Pandas and TensorFlow on course projects."
+    assert relevant_text(text_lines(resume), resume) == resume
+
+
+def test_unknown_skill_headings_kept():
+    """Top-level LANGUAGES / FRAMEWORKS / DATABASES lists reach the prompt; spoken languages do not"""
+    with open(os.path.join(FIXTURE_DIR, "07_languages_frameworks.txt"), encoding="utf-8") as f:
+        resume = f.read()
+    prompt = relevant_text(text_lines(resume), resume)
+    for skill in ("Python", "Java", "C++", "React", "Django", "MySQL", "Placement Tracker"):
+        assert skill in prompt, (skill, prompt)
+    assert "Odia" not in prompt and "Chess" not in prompt and "CGPA" not in prompt, prompt
+
+
+def test_resume_projects_merge_llm_and_local(monkeypatch):
+    """The LLM only sees the residual text, so its projects add to the locally found ones instead of replacing them"""
+    import parse_resume
+
+    monkeypatch.setattr(parse_resume, "llm_resume_skills", lambda residual: {
+        "technical_skills": ["Snowflake"], "soft_skills": [], "projects": ["Built a Flask attendance portal"]})
+    with open(os.path.join(FIXTURE_DIR, "01_caps_headings.txt"), encoding="utf-8") as f:
+        resume = f.read()
+    projects = parse_resume.extract_resume_skills(resume)["projects"]
+    assert projects[0] == "Built a Flask attendance portal"
+    assert projects[1:] == parse_resume.local_projects(text_lines(resume)), projects
@@ -0,0 +1,128 @@
+"""
+Streaming skills: each skill leaves the parser as it closes and is embedded while the LLM is still generating
+"""
+
+import json
+import threading
+import time
+
+import numpy as np
+
+from skill_stream import SkillEncoder, VectorCache, encode, stream_skills
+from tiered_extractor import TieredExtractor
+
+SKILLS = ["Python", "SQL", "Docker", "Kubernetes", "Snowflake", "dbt", "Airbyte", "Looker"]
+TOKEN_SECONDS = 0.03
+ENCODE_SECONDS = 0.03
+
+
+def _deltas(key, skills, consumed, delay=0.0):
+    """The completion in small chunks; `consumed` counts how many have been handed out"""
+    text = json.dumps({key: skills})
+    for i in range(0, len(text), 5):
+        if delay:
+            time.sleep(delay)
+        consumed.append(i)
+        yield text[i:i + 5]
+
+
+class SlowModel:
+    """Stand-in embedder: fixed cost per encode call, deterministic vectors"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        time.sleep(ENCODE_SECONDS)
+        return np.array([[len(t), sum(map(ord, t)) % 97, 1.0] for t in texts], dtype=np.float32)
+
+
+def test_skills_yielded_before_completion_closes():
+    """The first skill is out after a few chunks; duplicates and blanks are dropped"""
+    consumed = []
+    stream = stream_skills(_deltas("skills", ["Python", "SQL", "python", " ", "Go"], consumed), "skills")
+    assert next(stream) == "Python"
+    total = len(json.dumps({"skills": ["Python", "SQL", "python", " ", "Go"]})) // 5 + 1
+    assert len(consumed) < total / 2, (len(consumed), total)
+    assert list(stream) == ["SQL", "Go"]
+
+
+def test_encoding_overlaps_generation():
+    """Streamed skills finish embedding about one encode call after the last token, not len(skills) calls"""
+    model = SlowModel()
+    encoder = SkillEncoder(model, cache=VectorCache(), batch_size=4)
+    started = time.perf_counter()
+    for skill in stream_skills(_deltas("skills", SKILLS, [], delay=TOKEN_SECONDS), "skills"):
+        encoder.add(skill)
+    generated = time.perf_counter() - started
+    vectors = encoder.close()
+    tail = time.perf_counter() - started - generated
+
+    assert tail < 2.5 * ENCODE_SECONDS, (tail, generated)
+    assert np.array_equal(vectors, SlowModel().encode(SKILLS)), vectors
+    assert sum(len(call) for call in model.calls) == len(SKILLS)
+
+
+def test_vector_cache_skips_model():
+    """Skills embedded by a streamed request are served from the cache on the next call"""
+    model, cache = SlowModel(), VectorCache()
+    encoder = SkillEncoder(model, cache=cache)
+    encoder.extend(SKILLS[:4])
+    encoder.close()
+    calls = len(model.calls)
+    matrix = encode(model, SKILLS[:4] + ["Rust"], cache)
+    assert model.calls[calls:] == [["Rust"]], model.calls
+    assert matrix.shape == (5, 3) and len(cache) == 5
+
+
+def test_tiered_stream_local_first():
+    """Local matches are yielded before the LLM is asked; its skills follow without repeats"""
+    text = "Skills: Python, SQL, Snowflake, dbt, Airbyte\nLocation: Bhubaneswar, Odisha"
+    calls = []
+
+    def llm_stream(residual):
+        calls.append(residual)
+        yield from stream_skills(_deltas("technical_skills", ["Snowflake", "python", "dbt", "Airbyte"], []),
+                                 "technical_skills")
+
+    stream = TieredExtractor(mode="tiered").stream(text, "test.stream", llm_stream)
+    assert [next(stream), next(stream)] == ["Python", "SQL"] and calls == []
+    assert list(stream) == ["Snowflake", "dbt", "Airbyte"]
+    assert len(calls) == 1 and "Python" not in calls[0], calls
+
+
+def _encoder_threads():
+    return [t for t in threading.enumerate() if t.name == "skill-encoder" and t.is_alive()]
+
+
+def test_failed_stream_stops_encoder():
+    """A stream that raises mid-way, or a consumer that stops early, leaves no worker thread behind"""
+    def failing():
+        yield from stream_skills(_deltas("skills", SKILLS[:3], []), "skills")
+        raise RuntimeError("stream interrupted")
+
+    before = len(_encoder_threads())
+    for _ in range(5):
+        try:
+            with SkillEncoder(SlowModel(), cache=VectorCache()) as encoder:
+                for skill in failing():
+                    encoder.add(skill)
+                encoder.close()
+        except RuntimeError:
+            pass
+
+    def events():
+        with SkillEncoder(SlowModel(), cache=VectorCache()) as encoder:
+            for skill in SKILLS:
+                encoder.add(skill)
+                yield skill
+
+    stream = events()
+    next(stream)
+    stream.close()      # what a disconnecting SSE client does to the generator
+
+    deadline = time.monotonic() + 2
+    while len(_encoder_threads()) > before and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(_encoder_threads()) == before, _encoder_threads()
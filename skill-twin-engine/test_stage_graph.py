@@ -0,0 +1,115 @@
+"""
+Stage graph: independent stages overlap, results stream as they finish, repeats come from the cache
+"""
+
+import time
+
+import llm_gateway
+from stage_graph import Stage, StageCache, StageGraph, summary
+
+SLOW = 0.2
+FAST = 0.05
+
+
+def _sleep_then(seconds, value, calls=None):
+    def run(**kwargs):
+        if calls is not None:
+            calls.append(kwargs)
+        time.sleep(seconds)
+        return value(**kwargs) if callable(value) else value
+    return run
+
+
+def _dashboard_graph(calls, cache=None):
+    """The full-analysis shape: two independent slow stages feeding a fast one"""
+    return StageGraph([
+        Stage("resume", _sleep_then(SLOW, lambda resume: ["Python"] if resume else [], calls), inputs=("resume",)),
+        Stage("job_skills", _sleep_then(SLOW, lambda role: ["Python", "Docker"], calls), inputs=("role",)),
+        Stage("gaps", _sleep_then(FAST, lambda resume, job_skills: [s for s in job_skills if s not in resume]),
+              deps=("resume", "job_skills")),
+    ], cache=cache)
+
+
+def test_independent_stages_overlap():
+    """End-to-end time is the critical path (slow + fast), not the sum of all three stages"""
+    graph = _dashboard_graph([])
+    started = time.perf_counter()
+    results = {r.name: r for r in graph.run({"resume": b"%PDF-1.4", "role": "SDE"})}
+    wall = time.perf_counter() - started
+    assert results["gaps"].value == ["Docker"], results
+    assert wall < SLOW + FAST + 0.1 < 2 * SLOW + FAST, wall
+    report = summary(graph, results, wall)
+    assert report["sequential_seconds"] > report["critical_path_seconds"] >= SLOW + FAST, report
+
+
+def test_results_stream_as_stages_finish():
+    """A fast stage is handed back while a slow sibling is still running"""
+    graph = StageGraph([
+        Stage("fast", _sleep_then(FAST, "fast")),
+        Stage("slow", _sleep_then(SLOW, "slow")),
+        Stage("both", lambda fast, slow: fast + slow, deps=("fast", "slow")),
+    ])
+    started = time.perf_counter()
+    first = next(graph.run({}))
+    assert first.name == "fast" and time.perf_counter() - started < SLOW, first
+
+
+def test_stage_results_cached_by_input_hash():
+    """Same inputs skip every stage; a new role only reruns the stages that read it"""
+    calls = []
+    graph = _dashboard_graph(calls, cache=StageCache())
+    list(graph.run({"resume": b"%PDF-1.4", "role": "SDE"}))
+    assert len(calls) == 2
+    results = {r.name: r for r in graph.run({"resume": b"%PDF-1.4", "role": "SDE"})}
+    assert len(calls) == 2 and all(r.cached for r in results.values()), results
+    results = {r.name: r for r in graph.run({"resume": b"%PDF-1.4", "role": "Data Analyst"})}
+    assert calls[-1] == {"role": "Data Analyst"} and len(calls) == 3, calls
+    assert results["resume"].cached and not results["job_skills"].cached
+
+
+def test_failure_skips_dependents():
+    """A failing stage reports its error; stages downstream of it are skipped, siblings still run"""
+    def broken(role):
+        raise RuntimeError("LLM down")
+
+    graph = StageGraph([
+        Stage("resume", lambda: ["Python"]),
+        Stage("job_skills", broken, inputs=("role",)),
+        Stage("gaps", lambda resume, job_skills: [], deps=("resume", "job_skills")),
+    ])
+    results = {r.name: r for r in graph.run({"role": "SDE"})}
+    assert results["resume"].value == ["Python"]
+    assert results["job_skills"].error == "LLM down"
+    assert results["gaps"].error.startswith("skipped"), results["gaps"]
+
+
+def test_stages_keep_request_deadline():
+    """Stages run on pool threads but see the deadline set by the request that started the graph"""
+    graph = StageGraph([Stage("remaining", llm_gateway.remaining_time)])
+    token = llm_gateway.set_deadline(5.0)
+    try:
+        remaining = next(graph.run({})).value
+    finally:
+        llm_gateway.reset_deadline(token)
+    assert remaining is not None and 0 < remaining <= 5.0, remaining
+
+
+def test_cycle_rejected():
+    try:
+        StageGraph([Stage("a", lambda b: b, deps=("b",)), Stage("b", lambda a: a, deps=("a",))])
+    except ValueError:
+        return
+    raise AssertionError("cycle was accepted")
+
+
+def test_graph_stages_have_their_own_series():
+    """Graph stages are not mixed into the pipeline-step histogram they contain"""
+    import metrics
+
+    graph = StageGraph([Stage("graph_series_probe", lambda: metrics.STAGE_SECONDS.observe(0.01, stage="inner"),
+                              cache=False)])
+    list(graph.run({}))
+    lines = metrics.render().splitlines()
+    assert any(line.startswith('skilltwin_graph_stage_seconds_count{stage="graph_series_probe"}') for line in lines)
+    assert not any('stage="graph_series_probe"' in line for line in lines
+                   if line.startswith("skilltwin_stage_seconds"))
@@ -0,0 +1,41 @@
+"""
+Static phrase embeddings under the skill snapshot: one compute_gaps call never mixes full-model and pooled vectors
+"""
+
+import numpy as np
+
+from skill_taxonomy import SnapshotEmbedder, build_snapshot
+from static_encoder import StaticEncoder, build_table
+
+SKILLS = ["Python", "Machine Learning"]
+
+
+class HashModel:
+    """Stand-in transformer: deterministic vectors per text, counting what it is asked to encode"""
+
+    def __init__(self):
+        self.seen = []
+
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        texts = [texts] if isinstance(texts, str) else list(texts)
+        self.seen.extend(texts)
+        return np.stack([np.random.default_rng(sum(map(ord, t))).standard_normal(16).astype(np.float32)
+                         for t in texts])
+
+
+def test_snapshot_steps_aside_for_static_table(tmp_path):
+    """With a static table every vocabulary phrase is pooled; without one the snapshot serves it"""
+    model = HashModel()
+    build_snapshot(directory=str(tmp_path), model=model)
+    snapshot_only = SnapshotEmbedder(StaticEncoder(model, directory=str(tmp_path)), directory=str(tmp_path))
+    model.seen.clear()
+    assert np.allclose(snapshot_only.encode(SKILLS), HashModel().encode(SKILLS))
+    assert model.seen == [] and snapshot_only.hits == 2
+
+    build_table(directory=str(tmp_path), corpus_files=[], model=model)
+    static = StaticEncoder(model, directory=str(tmp_path))
+    stacked = SnapshotEmbedder(static, directory=str(tmp_path))
+    model.seen.clear()
+    vectors = stacked.encode(SKILLS + ["xyzzy plugh"])
+    assert stacked.hits == 0 and static.static_hits == 2 and model.seen == ["xyzzy plugh"]
+    assert np.allclose(vectors[:2], np.stack([static.phrase_vector(s) for s in SKILLS]))
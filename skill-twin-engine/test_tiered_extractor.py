@@ -0,0 +1,53 @@
+"""
+Tiered extraction: known skills never reach the LLM, unknown ones reach it without the rest
+"""
+
+
+from tiered_extractor import TieredExtractor
+
+POSTING = """Data Science Intern
+Requirements: Python, SQL, Pandas, NumPy, TensorFlow
+Good communication skills. Apply at careers@example.com"""
+
+
+def _llm(calls, answer):
+    def extract(text):
+        calls.append(text)
+        return answer
+    return extract
+
+
+def test_known_skills_stay_local():
+    """A posting made of taxonomy skills is answered without an LLM call"""
+    calls = []
+    extractor = TieredExtractor()
+    skills = extractor.extract(POSTING, "test.tiered", _llm(calls, ["Ignored"]))
+    assert calls == [], calls
+    assert {"Python", "SQL", "Pandas", "NumPy", "TensorFlow"} <= set(skills), skills
+    assert extractor.stats()["local_only"] == 1
+
+
+def test_only_residual_goes_to_llm():
+    """Unknown list items are sent on their own, and the LLM's skills are appended once"""
+    calls = []
+    text = "Skills: Python, SQL, Snowflake, dbt, Airbyte\nLocation: Bhubaneswar, Odisha"
+    skills = TieredExtractor().extract(text, "test.tiered", _llm(calls, ["Snowflake", "dbt", "Airbyte", "python"]))
+    assert len(calls) == 1 and "Snowflake" in calls[0] and "Python" not in calls[0], calls
+    assert "Bhubaneswar" not in calls[0], calls
+    assert skills[:2] == ["Python", "SQL"] and skills.count("Python") == 1, skills
+    assert {"Snowflake", "dbt", "Airbyte"} <= set(skills), skills
+
+
+def test_llm_mode_sends_full_text():
+    """SKILL_TWIN_EXTRACTION=llm keeps the previous behaviour"""
+    calls = []
+    skills = TieredExtractor(mode="llm").extract(POSTING, "test.tiered", _llm(calls, ["Python"]))
+    assert calls == [POSTING] and skills == ["Python"]
+
+
+def test_short_names_are_case_sensitive():
+    """'Go' the language matches, 'go' the verb does not; aliases map to display names"""
+    extractor = TieredExtractor()
+    assert "Go" in extractor.match("Backend services in Go and Rust").skills
+    assert "Go" not in extractor.match("Ready to go the extra mile").skills
+    assert "Vue" in " ".join(extractor.match("Frontend: vue, React, JavaScript").skills)
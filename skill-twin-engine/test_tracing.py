@@ -0,0 +1,61 @@
+"""
+Span tracing: spans nest inside one run, cost nothing outside it, and export as Chrome trace events
+"""
+
+import json
+import threading
+
+import tracing
+
+
+@tracing.traced("matching")
+def _match(skills):
+    with tracing.span("normalize", "matching", count=len(skills)):
+        return [s.lower() for s in skills]
+
+
+def test_spans_outside_a_run_are_noops():
+    assert tracing.current_run() is None
+    assert tracing.span("anything") is tracing.span("other")
+    assert _match(["SQL"]) == ["sql"]
+    with tracing.trace_run("disabled", enabled=False) as run:
+        assert run is None and tracing.current_run() is None
+
+
+def test_trace_file_is_chrome_json(tmp_path):
+    """Nested spans, decorator spans and errors end up in one file chrome://tracing can open"""
+    path = str(tmp_path / "run.json")
+    with tracing.trace_run("analysis", enabled=True, path=path) as run:
+        _match(["Python", "SQL"])
+        try:
+            with tracing.span("fetch", "network"):
+                raise TimeoutError()
+        except TimeoutError:
+            pass
+        # An inner pipeline joins the outer run instead of writing its own file
+        with tracing.trace_run("inner", enabled=True) as inner:
+            assert inner is run
+
+    with open(path, encoding="utf-8") as f:
+        trace = json.load(f)
+    events = {e["name"]: e for e in trace["traceEvents"] if e["ph"] == "X"}
+    assert trace["traceEvents"][0] == {"name": "process_name", "ph": "M", "pid": run._pid,
+                                       "args": {"name": "analysis"}}
+    assert set(events) == {"_match", "normalize", "fetch", "inner", "analysis"}
+    assert events["normalize"]["args"] == {"count": 2}
+    assert events["fetch"]["args"] == {"error": "TimeoutError"}
+    outer, child = events["_match"], events["normalize"]
+    assert outer["ts"] <= child["ts"] and child["ts"] + child["dur"] <= outer["ts"] + outer["dur"] + 1
+    assert set(run.summary()) == {"matching", "network", "pipeline"}
+    assert tracing.current_run() is None
+
+
+def test_threads_do_not_share_runs():
+    """A run is per context: a worker thread started outside it records nothing"""
+    seen = []
+    with tracing.activate(tracing.TraceRun("request")) as run:
+        worker = threading.Thread(target=lambda: seen.append(tracing.current_run()))
+        worker.start()
+        worker.join()
+        _match(["Go"])
+    assert seen == [None] and [e["name"] for e in run.events] == ["normalize", "_match"]
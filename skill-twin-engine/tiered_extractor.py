@@ -0,0 +1,385 @@
+"""
+Tiered Skill Extraction for Skill-Twin Engine
+Tier 1 is a compiled matcher over our own skill lists (TRUSTED_SKILLS, the scrapers'
+TECH_SKILLS, the role skill lists) plus common aliases. It scores how much of the
+skill-looking text it explained; only when that confidence is low does tier 2 call
+the LLM, and then only with the unexplained lines.
+
+    SKILL_TWIN_EXTRACTION=tiered | llm | tagger   # llm: previous behaviour, whole text to the LLM
+                                                  # tagger: the distilled skill_tagger model instead of the LLM
+    SKILL_TWIN_EXTRACTION_CONFIDENCE=0.8          # below this the residual goes to the LLM
+    python tiered_extractor.py report             # LLM share and tier latency on fixtures + synthetic postings
+"""
+
+import argparse
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+import metrics
+from skill_taxonomy import ENGINE_DIR, _flatten, _module_constant
+
+MODE = os.getenv("SKILL_TWIN_EXTRACTION", "tiered").lower()
+CONFIDENCE_THRESHOLD = float(os.getenv("SKILL_TWIN_EXTRACTION_CONFIDENCE", "0.8"))
+MAX_RESIDUAL_CHARS = 2000
+
+# Read with ast, like skill_taxonomy, so building the matcher imports none of these modules.
+# Earlier sources win when two spell the same skill differently.
+TAXONOMY_SOURCES = [
+    ("backend/app.py", "TRUSTED_SKILLS"),
+    ("real_job_api_integration.py", "SAMPLE_ROLE_SKILLS"),
+    ("standalone_app.py", "MOCK_ROLE_SKILLS"),
+    ("real_job_scraper.py", "TECH_SKILLS"),
+]
+SKILL_ALIASES = {
+    "js": "JavaScript", "reactjs": "React", "react.js": "React", "nodejs": "Node.js", "vue": "Vue.js",
+    "vuejs": "Vue.js", "expressjs": "Express", "express.js": "Express", "postgres": "PostgreSQL",
+    "k8s": "Kubernetes", "golang": "Go", "ml": "Machine Learning", "dl": "Deep Learning",
+    "rest apis": "REST API", "restful": "REST API", "restful apis": "REST API", "rest": "REST API",
+    "ci cd": "CI/CD", "google cloud": "GCP", "amazon web services": "AWS", "ts": "TypeScript",
+    "springboot": "Spring", "spring boot": "Spring", "mongo": "MongoDB", "py": "Python",
+}
+LOWERCASE_ACRONYMS = {"rest", "api", "html", "css", "sql", "aws", "gcp"}
+# Short names that are also English words: only matched in exactly this casing ("Go", not "go")
+CASE_SENSITIVE = {"C", "R", "Go", "Express", "Spring", "Swift", "Rust", "REST", "API", "AI", "JS", "TS", "ML", "DL", "PY"}
+# ALL-CAPS tokens that are not skills (degrees, grades, places)
+NON_SKILL_ACRONYMS = {
+    "CGPA", "SGPA", "GPA", "CSE", "ECE", "EEE", "IT", "ME", "CE", "NSS", "NCC", "HR", "CEO", "CTO", "USA", "INDIA",
+    "PVT", "LTD", "MBA", "BCA", "MCA", "ID", "OK", "PDF", "CBSE", "ICSE", "CHSE", "GIET", "KPI", "CRM", "LPA",
+    "UI", "UX", "IST", "DOB", "B.TECH", "M.TECH", "PG", "UG", "NPTEL", "SWAYAM", "DAV",
+}
+_TOKEN = re.compile(r"[A-Za-z][A-Za-z0-9+#./-]*[A-Za-z0-9+#]|[A-Za-z]")
+_LIST_SPLIT = re.compile(r"\s*[,;|•·]\s*|\s+/\s+")
+# Emails, URLs, phone numbers and dates are never skills
+_NOISE = re.compile(r"\S+@\S+|(?:https?://)?(?:www\.)?[\w-]+\.(?:com|in|org|dev|io|net)(?:/\S*)?|[\d+()/ .%:-]{4,}")
+_ROMAN = re.compile(r"^[IVXL]+$")
+_DOTTED = re.compile(r"\.(?:js|net|io|py)$", re.I)
+_LEADING_FILLER = re.compile(r"^(?:and|or|with|using|in|of|knowledge of|experience with|familiarity with)\s+", re.I)
+
+EXTRACTION_SECONDS = metrics.histogram("skilltwin_extraction_seconds", "Skill extraction latency by tier",
+                                       ["tier"])
+EXTRACTION_DOCUMENTS = metrics.counter("skilltwin_extraction_documents_total",
+                                       "Documents by extraction site and path (local / llm_residual / llm_full / tagger)",
+                                       ["site", "path"])
+
+
+class LocalResult(NamedTuple):
+    skills: List[str]
+    coverage: float
+    confidence: float
+    residual: str
+
+
+def load_taxonomy(engine_dir: str = ENGINE_DIR) -> Dict[str, str]:
+    """lower-case spelling -> display name, from TAXONOMY_SOURCES and SKILL_ALIASES"""
+    names = {}
+    for relative, constant in TAXONOMY_SOURCES:
+        for skill in sorted(_flatten(_module_constant(os.path.join(engine_dir, relative), constant))):
+            skill = skill.strip()
+            if skill == skill.lower():
+                # TECH_SKILLS is all lower case: 'vue' -> 'Vue.js', 'html' -> 'HTML', 'ruby' -> 'Ruby'
+                skill = SKILL_ALIASES.get(skill) or (skill.upper() if skill in LOWERCASE_ACRONYMS else skill.title())
+            names.setdefault(skill.lower(), skill)
+    for alias, skill in SKILL_ALIASES.items():
+        names.setdefault(alias, names.get(skill.lower(), skill))
+    return names
+
+
+class TieredExtractor:
+    def __init__(self, taxonomy: Dict[str, str] = None, threshold: float = CONFIDENCE_THRESHOLD,
+                 mode: str = MODE):
+        self.taxonomy = taxonomy if taxonomy is not None else load_taxonomy()
+        self.threshold = threshold
+        self.mode = mode
+        boundary = r"(?<![\w+#.]){}(?![\w+#]|\.\w)"
+        exact = [surface for surface in CASE_SENSITIVE if surface.lower() in self.taxonomy]
+        folded = [s for s in self.taxonomy if s not in {surface.lower() for surface in exact}]
+        by_length = lambda items: sorted(items, key=len, reverse=True)
+        self._folded = re.compile(boundary.format("(" + "|".join(map(re.escape, by_length(folded))) + ")"), re.I)
+        self._exact = re.compile(boundary.format("(" + "|".join(map(re.escape, by_length(exact))) + ")"))
+
+        self._lock = threading.Lock()
+        self._counts = {"documents": 0, "local_only": 0, "llm_residual": 0, "llm_full": 0, "tagger": 0,
+                        "chars_in": 0, "chars_to_llm": 0}
+        self._latency = {"local": deque(maxlen=1000), "llm": deque(maxlen=1000), "tagger": deque(maxlen=1000)}
+
+    def _spans(self, text: str) -> List[tuple]:
+        spans = [(m.start(), m.end(), self.taxonomy[m.group(1).lower()]) for m in self._folded.finditer(text)]
+        # "REST API" wins over the "REST" and "API" inside it
+        spans += [(m.start(), m.end(), self.taxonomy[m.group(1).lower()]) for m in self._exact.finditer(text)
+                  if not any(s < m.end() and m.start() < e for s, e, _ in spans)]
+        return spans
+
+    @staticmethod
+    def _candidates(line: str, spans: List[tuple]) -> List[tuple]:
+        """
+        (start, end) of things in a line that look like skills: the other items of a list
+        that already names a known skill ("Excel, SQL, Power BI") and tech-shaped tokens
+        (AWS, PostgreSQL, C#, Node.js, ES6). Emails, URLs, names and headings are ignored.
+        """
+        found = []
+        parts = _LIST_SPLIT.split(line)
+        if len(parts) >= 3 and spans:
+            position = 0
+            for part in parts:
+                start = line.find(part, position)
+                position = start + len(part)
+                item = _LEADING_FILLER.sub("", part.strip(" .:-()"))
+                if item and len(item.split()) <= 3 and not _NOISE.search(item):
+                    offset = start + part.find(item)
+                    found.append((offset, offset + len(item)))
+        clean = _NOISE.sub(lambda n: " " * len(n.group(0)), line)
+        shouting = clean.upper() == clean
+        for m in _TOKEN.finditer(clean):
+            token = m.group(0)
+            if token.upper() in NON_SKILL_ACRONYMS or _ROMAN.match(token):
+                continue
+            letters = sum(c.isalpha() for c in token)
+            tech_shaped = (
+                (not shouting and len(token) >= 2 and token.isalpha() and token.isupper())   # AWS, SQL
+                or (token.isalnum() and any(c.isupper() for c in token[1:])
+                    and any(c.islower() for c in token))                                      # PostgreSQL
+                or any(c in "+#" for c in token)                                              # C++, C#
+                or bool(_DOTTED.search(token))                                                # Node.js
+                or (any(c.isdigit() for c in token) and letters >= 2)                         # ES6, ESP32
+            )
+            if tech_shaped:
+                found.append((m.start(), m.end()))
+        return found
+
+    def match(self, text: str) -> LocalResult:
+        """Tier 1: skills found locally, share of skill-looking spans explained, and the unexplained lines"""
+        skills, total, covered, residual = [], 0, 0, []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            spans = self._spans(line)
+            skills.extend(name for _, _, name in spans)
+            unexplained = []
+            for start, end in self._candidates(line, spans):
+                total += 1
+                if any(s < end and start < e for s, e, _ in spans):
+                    covered += 1
+                else:
+                    unexplained.append(line[start:end])
+            if unexplained:
+                # A skill list only sends its unknown items; prose sends the whole line for context
+                is_list = len(_LIST_SPLIT.split(line)) >= 3 and len(spans) >= 2
+                residual.append(", ".join(dict.fromkeys(unexplained)) if is_list else line.strip())
+        skills = list(dict.fromkeys(skills))
+        coverage = covered / total if total else 1.0
+        # Finding nothing at all in a real document is not confidence
+        confidence = coverage if skills or len(text.strip()) < 50 else 0.0
+        residual_text = "\n".join(dict.fromkeys(residual))[:MAX_RESIDUAL_CHARS]
+        if not skills and not residual_text:
+            residual_text = text[:MAX_RESIDUAL_CHARS]
+        return LocalResult(skills, round(coverage, 4), round(confidence, 4), residual_text)
+
+    def extract(self, text: str, site: str, llm_extract: Optional[Callable[[str], List[str]]] = None,
+                teacher: Optional[List[Dict]] = None) -> List[str]:
+        """
+        Local matches, plus whatever ``llm_extract`` finds in the unexplained text when
+        confidence is below the threshold. In 'llm' mode the whole text goes to the LLM.
+        Each LLM call is appended to ``teacher`` as {"text", "skills"}: exactly what the
+        model saw and answered, for distilling skill_tagger.
+        """
+        if self.mode == "llm" and llm_extract is not None:
+            started = time.perf_counter()
+            skills = list(llm_extract(text))
+            self._record(site, "llm_full", len(text), len(text), llm_seconds=time.perf_counter() - started)
+            _teach(teacher, text, skills)
+            return skills
+
+        started = time.perf_counter()
+        local = self.match(text)
+        local_seconds = time.perf_counter() - started
+        tagger = self._tagger() if self.mode == "tagger" else None
+        second_tier = tagger is not None or llm_extract is not None
+        if local.confidence >= self.threshold or not second_tier or not local.residual.strip():
+            self._record(site, "local_only", len(text), 0, local_seconds)
+            return local.skills
+
+        started = time.perf_counter()
+        if tagger is not None:
+            # Cheap enough for the whole text, like the postings it was partly trained on (still no API call)
+            extra = tagger.extract(text)
+            self._record(site, "tagger", len(text), 0, local_seconds, tagger_seconds=time.perf_counter() - started)
+        else:
+            extra = llm_extract(local.residual) or []
+            self._record(site, "llm_residual", len(text), len(local.residual), local_seconds,
+                         time.perf_counter() - started)
+            _teach(teacher, local.residual, extra)
+        return merge_skills(local.skills, extra)
+
+    def stream(self, text: str, site: str, llm_stream: Optional[Callable[[str], Iterable[str]]] = None,
+               teacher: Optional[List[Dict]] = None) -> Iterator[str]:
+        """
+        extract() for a streamed LLM tier: local matches are yielded at once, then each new
+        skill from ``llm_stream(residual)`` as the completion produces it. ``teacher`` gets
+        the LLM call once its stream has finished.
+        """
+        if self.mode == "llm" and llm_stream is not None:
+            started = time.perf_counter()
+            answered = []
+            for skill in llm_stream(text):
+                if skill not in answered:
+                    yield skill
+                answered.append(skill)
+            self._record(site, "llm_full", len(text), len(text), llm_seconds=time.perf_counter() - started)
+            _teach(teacher, text, answered)
+            return
+
+        if self.mode == "tagger" or llm_stream is None:
+            yield from self.extract(text, site)
+            return
+
+        started = time.perf_counter()
+        local = self.match(text)
+        local_seconds = time.perf_counter() - started
+        yield from local.skills
+        if local.confidence >= self.threshold or not local.residual.strip():
+            self._record(site, "local_only", len(text), 0, local_seconds)
+            return
+
+        started = time.perf_counter()
+        seen = {skill.lower() for skill in local.skills}
+        answered = []
+        for skill in llm_stream(local.residual):
+            answered.append(skill)
+            if isinstance(skill, str) and skill.lower() not in seen:
+                seen.add(skill.lower())
+                yield skill
+        self._record(site, "llm_residual", len(text), len(local.residual), local_seconds,
+                     time.perf_counter() - started)
+        _teach(teacher, local.residual, answered)
+
+    @staticmethod
+    def _tagger():
+        import skill_tagger
+        return skill_tagger.default_tagger()
+
+    def _record(self, site: str, path: str, chars_in: int, chars_to_llm: int, local_seconds: float = None,
+                llm_seconds: float = None, tagger_seconds: float = None):
+        with self._lock:
+            self._counts["documents"] += 1
+            self._counts[path] += 1
+            self._counts["chars_in"] += chars_in
+            self._counts["chars_to_llm"] += chars_to_llm
+            if local_seconds is not None:
+                self._latency["local"].append(local_seconds)
+            if llm_seconds is not None:
+                self._latency["llm"].append(llm_seconds)
+            if tagger_seconds is not None:
+                self._latency["tagger"].append(tagger_seconds)
+        EXTRACTION_DOCUMENTS.inc(site=site, path=path)
+        if local_seconds is not None:
+            EXTRACTION_SECONDS.observe(local_seconds, tier="local")
+        if llm_seconds is not None:
+            EXTRACTION_SECONDS.observe(llm_seconds, tier="llm")
+        if tagger_seconds is not None:
+            EXTRACTION_SECONDS.observe(tagger_seconds, tier="tagger")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self._counts)
+            latency = {tier: list(samples) for tier, samples in self._latency.items()}
+        documents = counts["documents"]
+        return {
+            "mode": self.mode,
+            "threshold": self.threshold,
+            **counts,
+            "llm_share": round((counts["llm_residual"] + counts["llm_full"]) / documents, 4) if documents else 0.0,
+            "latency_ms": {
+                tier: {"count": len(samples),
+                       "p50": round(float(np.percentile(samples, 50)) * 1000, 3),
+                       "p95": round(float(np.percentile(samples, 95)) * 1000, 3)}
+                for tier, samples in latency.items() if samples
+            }
+        }
+
+
+def _teach(teacher: Optional[List[Dict]], text: str, skills: List[str]):
+    if teacher is not None:
+        teacher.append({"text": text, "skills": list(skills)})
+
+
+def merge_skills(local: List[str], extra: List[str]) -> List[str]:
+    """Local skills, then second-tier skills not already found (case-insensitive)"""
+    seen = {skill.lower() for skill in local}
+    return list(local) + [s for s in dict.fromkeys(extra) if isinstance(s, str) and s.lower() not in seen]
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_extractor() -> TieredExtractor:
+    """Process-wide extractor; the matcher is compiled on first use"""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = TieredExtractor()
+    return _default
+
+
+def config_key() -> str:
+    """Mode and threshold of the default extractor; caches of its output must include them"""
+    return f"{MODE}@{CONFIDENCE_THRESHOLD:g}"
+
+
+def extract(text: str, site: str, llm_extract: Optional[Callable[[str], List[str]]] = None,
+            teacher: Optional[List[Dict]] = None) -> List[str]:
+    return default_extractor().extract(text, site, llm_extract, teacher)
+
+
+def stream(text: str, site: str, llm_stream: Optional[Callable[[str], Iterable[str]]] = None,
+           teacher: Optional[List[Dict]] = None) -> Iterator[str]:
+    return default_extractor().stream(text, site, llm_stream, teacher)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiered (local first, LLM on residual) skill extraction")
+    parser.add_argument("command", choices=["match", "report"])
+    parser.add_argument("paths", nargs="*", help="text files (match) ")
+    parser.add_argument("--threshold", type=float, default=CONFIDENCE_THRESHOLD)
+    args = parser.parse_args()
+
+    extractor = TieredExtractor(threshold=args.threshold, mode="tiered")
+    if args.command == "match":
+        for path in args.paths:
+            with open(path, encoding="utf-8") as f:
+                result = extractor.match(f.read())
+            print(f"📄 {path}: confidence {result.confidence}, coverage {result.coverage}")
+            print(f"   local: {', '.join(result.skills)}")
+            if result.confidence < extractor.threshold:
+                print(f"   → LLM gets {len(result.residual)} chars:\n     " + result.residual.replace("\n", "\n     "))
+    else:
+        import glob
+        from benchmarks.synthetic import make_dataset
+        from resume_sections import FIXTURE_DIR
+
+        documents = []
+        for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.txt"))):
+            with open(path, encoding="utf-8") as f:
+                documents.append(("resume", f.read()))
+        data = make_dataset("medium")
+        documents += [("resume", text) for text in data["resumes"]]
+        documents += [("posting", job["description"]) for job in data["jobs"]]
+
+        # Stand-in LLM: records what it would have been sent
+        sent = []
+        for kind, text in documents:
+            extractor.extract(text, f"report.{kind}", lambda residual: sent.append(residual) or [])
+        stats = extractor.stats()
+        print(f"📊 {stats['documents']} documents: {stats['local_only']} local only, "
+              f"{stats['llm_residual']} needed the LLM ({stats['llm_share']:.0%})")
+        print(f"✂️ LLM input {stats['chars_to_llm']} of {stats['chars_in']} chars "
+              f"({1 - stats['chars_to_llm'] / max(stats['chars_in'], 1):.0%} never sent)")
+        for tier, timing in stats["latency_ms"].items():
+            print(f"⏱️ {tier:<6} p50 {timing['p50']} ms, p95 {timing['p95']} ms over {timing['count']} calls")
@@ -0,0 +1,193 @@
+"""
+Span Tracing for Skill-Twin Engine
+Times the stages of one analysis run and writes them as Chrome trace-event JSON
+(open the file in chrome://tracing or https://ui.perfetto.dev)
+"""
+
+import contextvars
+import functools
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Set SKILL_TWIN_TRACE=1 to record a trace file for every pipeline run
+TRACE_ENABLED = os.getenv("SKILL_TWIN_TRACE", "").lower() in ("1", "true", "yes")
+TRACE_DIR = os.getenv("SKILL_TWIN_TRACE_DIR", "traces")
+
+_current_run = contextvars.ContextVar("skill_twin_trace_run", default=None)
+
+
+class TraceRun:
+    """Spans collected for one pipeline run"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.events = []
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def add(self, name: str, category: str, started: float, finished: float, args: Optional[Dict] = None):
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((started - self._origin) * 1e6, 1),
+            "dur": round((finished - started) * 1e6, 1),
+            "pid": self._pid,
+            "tid": threading.get_ident()
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    def enter_span(self, span: "_Span"):
+        """Hook for subclasses that measure more than time (see memprof.MemoryRun)"""
+
+    def exit_span(self, span: "_Span"):
+        """Called before the span's event is recorded; may add to span.args"""
+
+    def to_chrome(self) -> Dict:
+        with self._lock:
+            events = list(self.events)
+        meta = {"name": "process_name", "ph": "M", "pid": self._pid, "args": {"name": self.name}}
+        return {"traceEvents": [meta] + events, "displayTimeUnit": "ms"}
+
+    def summary(self) -> Dict[str, float]:
+        """Total milliseconds per category, handy for logs and tests"""
+        totals = {}
+        with self._lock:
+            for event in self.events:
+                totals[event["cat"]] = totals.get(event["cat"], 0.0) + event["dur"] / 1000.0
+        return {cat: round(ms, 2) for cat, ms in totals.items()}
+
+    def save(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome(), f)
+        return path
+
+
+class _NullSpan:
+    """Shared no-op returned by span() when nothing is being traced"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, run: TraceRun, name: str, category: str, args: Dict):
+        self.run = run
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.run.enter_span(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        finished = time.perf_counter()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.run.exit_span(self)
+        self.run.add(self.name, self.category, self.started, finished, self.args)
+        return False
+
+
+def span(name: str, category: str = "stage", **args):
+    """``with span("match_student_skills", "matching"): ...`` - a no-op outside a trace run"""
+    run = _current_run.get()
+    if run is None:
+        return _NULL_SPAN
+    return _Span(run, name, category, args)
+
+
+def traced(category: str = "stage", name: Optional[str] = None):
+    """Decorator form of span(); the span is named after the function unless ``name`` is given"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            run = _current_run.get()
+            if run is None:
+                return func(*args, **kwargs)
+            with _Span(run, span_name, category, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_run() -> Optional[TraceRun]:
+    return _current_run.get()
+
+
+@contextmanager
+def activate(run: TraceRun):
+    """Make ``run`` collect the spans opened inside the block without writing a file"""
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+@contextmanager
+def trace_run(name: str, enabled: Optional[bool] = None, path: Optional[str] = None):
+    """
+    Collect every span opened inside the block into one TraceRun and write it to
+    ``path`` (default: TRACE_DIR/<name>-<timestamp>.json). Nested runs join the
+    outer one. Yields None when tracing is disabled.
+    """
+    if enabled is None:
+        enabled = TRACE_ENABLED
+    outer = _current_run.get()
+    if outer is not None or not enabled:
+        with span(name, "pipeline") if outer is not None else _NULL_SPAN:
+            yield outer
+        return
+
+    run = TraceRun(name)
+    token = _current_run.set(run)
+    started = time.perf_counter()
+    try:
+        yield run
+    finally:
+        run.add(name, "pipeline", started, time.perf_counter())
+        _current_run.reset(token)
+        if path is None:
+            safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+            path = os.path.join(TRACE_DIR, f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.json")
+        try:
+            run.save(path)
+        except OSError as e:
+            print(f"Could not write trace {path}: {e}")
+
+
+def traced_pipeline(name: Optional[str] = None):
+    """Decorator that wraps a whole analysis in trace_run()"""
+    def decorator(func):
+        run_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACE_ENABLED and _current_run.get() is None:
+                return func(*args, **kwargs)
+            with trace_run(run_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+